@@ -0,0 +1,8 @@
+"""
+Benchmarks offline del motor de matching.
+
+Se ejecutan desde la carpeta Backend, sin base de datos:
+
+    python -m benchmarks.asignacion     # GREEDY vs OPTIMO
+    python -m benchmarks.rendimiento    # filas/s, pico de memoria, precisión y recall
+"""
@@ -0,0 +1,42 @@
+"""
+Benchmark: motor GREEDY vs OPTIMO.
+
+Compara tiempo de ejecución y calidad del matching (precisión, recall y
+score total) sobre periodos sintéticos con emparejamiento conocido.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.asignacion
+    python -m benchmarks.asignacion --tamanos 500 2000 4000 --semilla 7
+"""
+import argparse
+import time
+from dataclasses import replace
+
+from src.domain.models.configuracion_matching import ConfiguracionMatching, ModoAsignacion
+from src.domain.services.matching_service import MatchingService
+from benchmarks.generador import generar_periodo, evaluar_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GREEDY vs OPTIMO del matching")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[100, 500, 1000, 2000])
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    servicio = MatchingService()
+    base = ConfiguracionMatching.crear_configuracion_default()
+
+    print(f"{'n':>6} {'modo':>7} {'tiempo(s)':>10} {'vinculados':>10} {'precision':>9} {'recall':>7} {'score_total':>12}")
+    for n in args.tamanos:
+        periodo = generar_periodo(n, semilla=args.semilla)
+        for modo in (ModoAsignacion.GREEDY, ModoAsignacion.OPTIMO):
+            config = replace(base, modo_asignacion=modo)
+            inicio = time.perf_counter()
+            matches = servicio.ejecutar_matching(periodo.movs_extracto, periodo.movs_sistema, config)
+            duracion = time.perf_counter() - inicio
+            vinculados, precision, recall, score_total = evaluar_matches(matches, periodo.pares_reales)
+            print(f"{n:>6} {modo.value:>7} {duracion:>10.3f} {vinculados:>10} {precision:>9.3f} {recall:>7.3f} {float(score_total):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: extracción de texto de PDFs en serie vs por rangos de páginas en el
+pool de procesos (DocumentoPDF.desde_archivo).
+
+Genera extractos sintéticos (con semilla) de N páginas con ~45 movimientos por
+página, mide páginas/s para cada cantidad de procesos y verifica que el
+resultado paralelo sea idéntico al serial. El caché en disco no interviene
+(se llama a desde_archivo directamente). El pool se arranca antes de medir y
+ese tiempo se reporta aparte.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.extraccion_pdf
+    python -m benchmarks.extraccion_pdf --paginas 10 50 200 --procesos 1 2 4 --repeticiones 3
+"""
+import argparse
+import io
+import random
+import time
+
+from src.infrastructure.extractors import documento_pdf
+from src.infrastructure.extractors.documento_pdf import DocumentoPDF
+
+
+DESCRIPCIONES = [
+    'PAGO PSE', 'TRANSFERENCIA', 'COMPRA EXITO', 'ABONO INTERESES', 'CUOTA MANEJO',
+    'RETIRO CAJERO', 'NOMINA', 'RAPPI', 'UBER', 'CARULLA', 'EPM', 'CLARO',
+]
+
+
+def generar_pdf(paginas: int, semilla: int = 42, lineas_por_pagina: int = 45) -> bytes:
+    """PDF con líneas tipo extracto (fecha, descripción, valor, saldo) en cada página."""
+    rnd = random.Random(semilla)
+    objetos = {1: "<< /Type /Catalog /Pages 2 0 R >>", 3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    saldo = 1_000_000
+    for i in range(paginas):
+        pagina, contenido = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{pagina} 0 R")
+        lineas = [f"EXTRACTO CUENTA DE AHORROS PAGINA {i + 1} DE {paginas}"]
+        for _ in range(lineas_por_pagina):
+            valor = rnd.choice([-1, 1]) * rnd.randint(1_000, 900_000)
+            saldo += valor
+            lineas.append(
+                f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d} {rnd.choice(DESCRIPCIONES)} "
+                f"{rnd.randint(100000, 999999)} {valor:,.2f} {saldo:,.2f}"
+            )
+        texto = "".join(f"({linea}) Tj 0 -15 Td " for linea in lineas)
+        stream = f"BT /F1 9 Tf 30 770 Td {texto}ET"
+        objetos[pagina] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                           f"/Resources << /Font << /F1 3 0 R >> >> /Contents {contenido} 0 R >>")
+        objetos[contenido] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+    objetos[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    salida = b"%PDF-1.4\n"
+    offsets = {}
+    for numero in sorted(objetos):
+        offsets[numero] = len(salida)
+        salida += f"{numero} 0 obj\n{objetos[numero]}\nendobj\n".encode("latin-1")
+    xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    salida += "".join(f"{offsets[n]:010d} 00000 n \n" for n in sorted(objetos)).encode()
+    salida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return salida
+
+
+def medir(contenido: bytes, procesos: int, repeticiones: int) -> dict:
+    """Mejor tiempo de `repeticiones` extracciones con `procesos` procesos."""
+    tiempos = []
+    documento = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        documento = DocumentoPDF.desde_archivo(io.BytesIO(contenido), procesos=procesos)
+        tiempos.append(time.perf_counter() - inicio)
+    segundos = min(tiempos)
+    return {
+        'segundos': segundos,
+        'paginas_por_segundo': len(documento.paginas) / segundos if segundos else 0.0,
+        'documento': documento,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de PDFs en serie vs en paralelo")
+    parser.add_argument('--paginas', type=int, nargs='+', default=[5, 25, 100, 300])
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    # Calentar el pool con el máximo de procesos para no medir el arranque en cada fila
+    inicio = time.perf_counter()
+    list(documento_pdf._obtener_pool(max(args.procesos)).map(abs, range(max(args.procesos) * 4)))
+    print(f"arranque del pool ({max(args.procesos)} procesos): {time.perf_counter() - inicio:.3f}s")
+    print(f"umbral serie: < {documento_pdf.PAGINAS_MIN_PARALELO} páginas, "
+          f"mínimo {documento_pdf.PAGINAS_POR_RANGO_MIN} páginas por rango")
+
+    print(f"{'paginas':>7} {'procesos':>8} {'efectivos':>9} {'tiempo(s)':>10} {'pag/s':>8} {'speedup':>7} {'igual':>5}")
+    try:
+        for n in args.paginas:
+            contenido = generar_pdf(n, semilla=args.semilla)
+            base = None
+            for procesos in args.procesos:
+                r = medir(contenido, procesos, args.repeticiones)
+                if base is None:
+                    base = r
+                igual = r['documento'].a_dict() == base['documento'].a_dict()
+                print(
+                    f"{n:>7} {procesos:>8} {documento_pdf._procesos_para(n, procesos):>9} "
+                    f"{r['segundos']:>10.3f} {r['paginas_por_segundo']:>8.1f} "
+                    f"{base['segundos'] / r['segundos']:>7.2f} {'si' if igual else 'NO':>5}"
+                )
+    finally:
+        documento_pdf.cerrar_pool()
+
+
+if __name__ == '__main__':
+    main()
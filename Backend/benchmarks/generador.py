@@ -0,0 +1,175 @@
+"""
+Generador determinista (con semilla) de periodos sintéticos para benchmarks de matching.
+
+Cada movimiento del sistema generado a partir de un extracto conserva la
+referencia a su extracto de origen, lo que permite medir precisión y recall.
+
+El ruido es configurable: desfase de fechas, diferencias de valor,
+descripciones distintas, filas en USD (el valor en pesos difiere por la TRM)
+y descripciones del banco que solo coinciden tras aplicar un alias.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from src.domain.models.matching_alias import MatchingAlias
+from src.domain.models.movimiento import Movimiento
+from src.domain.models.movimiento_extracto import MovimientoExtracto
+from src.domain.models.movimiento_match import MatchEstado
+
+
+PALABRAS = [
+    'PAGO', 'PSE', 'TRANSFERENCIA', 'COMPRA', 'EXITO', 'ABONO', 'INTERESES',
+    'CUOTA', 'MANEJO', 'RETIRO', 'CAJERO', 'NOMINA', 'RAPPI', 'UBER',
+    'CARULLA', 'EPM', 'CLARO', 'NEQUI', 'DAVIPLATA', 'SEGURO'
+]
+
+VALORES_FRECUENTES = [-10000, -20000, -50000, -100000, 50000, 100000]
+
+# Descripción del banco (patrón del alias) -> descripción registrada en el sistema
+ALIASES = [
+    ('COMPRA EN ESTABLECIMIENTO', 'COMPRA'),
+    ('TRANSFERENCIA ELECTRONICA', 'TRASLADO'),
+    ('PAGO SUC VIRTUAL', 'PAGO PSE'),
+    ('ABONO INTERESES AHORROS', 'INTERESES'),
+    ('CUOTA DE MANEJO TARJETA', 'CUOTA MANEJO'),
+]
+
+
+@dataclass
+class PeriodoSintetico:
+    """Periodo generado: movimientos de ambos lados y el emparejamiento verdadero."""
+    movs_extracto: List[MovimientoExtracto]
+    movs_sistema: List[Movimiento]
+    # id del movimiento del extracto -> id del movimiento del sistema que le corresponde
+    pares_reales: Dict[int, int] = field(default_factory=dict)
+    aliases: List[MatchingAlias] = field(default_factory=list)
+
+
+def generar_periodo(
+    n: int,
+    semilla: int = 0,
+    year: int = 2025,
+    month: int = 3,
+    proporcion_registrados: float = 0.85,
+    proporcion_ruido: float = 0.15,
+    proporcion_usd: float = 0.0,
+    proporcion_alias: float = 0.0,
+    proporcion_desfase_fecha: float = 1 / 3,
+    proporcion_diferencia_valor: float = 0.2,
+    proporcion_otra_descripcion: float = 0.3
+) -> PeriodoSintetico:
+    """
+    Genera un periodo con n movimientos de extracto.
+
+    Para una semilla y unos parámetros dados el periodo es siempre el mismo,
+    así los resultados son comparables entre versiones del motor.
+
+    Args:
+        n: Cantidad de movimientos del extracto
+        semilla: Semilla para reproducibilidad
+        year, month: Periodo generado
+        proporcion_registrados: Fracción de extractos que tienen su movimiento en sistema
+        proporcion_ruido: Movimientos de sistema sin contraparte (relativo a n)
+        proporcion_usd: Fracción de filas en USD (valor en pesos con TRM distinta en cada lado)
+        proporcion_alias: Fracción de filas cuya descripción del banco requiere un alias
+        proporcion_desfase_fecha: Fracción de pares registrados con ±1 día de diferencia
+        proporcion_diferencia_valor: Fracción de pares registrados con diferencia de valor
+        proporcion_otra_descripcion: Fracción de pares registrados con otra descripción
+
+    Returns:
+        PeriodoSintetico
+    """
+    rnd = random.Random(semilla)
+    inicio = date(year, month, 1)
+    dias = 28
+
+    movs_extracto: List[MovimientoExtracto] = []
+    movs_sistema: List[Movimiento] = []
+    pares_reales: Dict[int, int] = {}
+
+    for i in range(n):
+        fecha = inicio + timedelta(days=rnd.randrange(dias))
+        if rnd.random() < 0.3:
+            valor = Decimal(rnd.choice(VALORES_FRECUENTES))
+        else:
+            valor = Decimal(rnd.randint(-900000, 900000)) + Decimal(rnd.randint(0, 99)) / 100
+        descripcion = _descripcion(rnd)
+        descripcion_banco = descripcion
+
+        usd = trm = None
+        if proporcion_usd and rnd.random() < proporcion_usd:
+            usd, trm = _monto_usd(rnd)
+            valor = (usd * trm).quantize(Decimal('0.01'))
+        if proporcion_alias and rnd.random() < proporcion_alias:
+            descripcion_banco, descripcion = rnd.choice(ALIASES)
+
+        mov_extracto = MovimientoExtracto(
+            id=i + 1, cuenta_id=1, year=year, month=month, fecha=fecha,
+            descripcion=descripcion_banco, referencia=None, valor=valor,
+            usd=usd, trm=trm
+        )
+        movs_extracto.append(mov_extracto)
+
+        if rnd.random() < proporcion_registrados:
+            id_sistema = 100000 + i
+            desfase = rnd.choice([1, -1]) if rnd.random() < proporcion_desfase_fecha else 0
+            diferencia = rnd.randint(-80, 80) if rnd.random() < proporcion_diferencia_valor else 0
+            mov_sistema = Movimiento(
+                id=id_sistema, moneda_id=1, cuenta_id=1,
+                fecha=fecha + timedelta(days=desfase),
+                valor=valor + Decimal(diferencia),
+                descripcion=descripcion if rnd.random() >= proporcion_otra_descripcion else _descripcion(rnd)
+            )
+            if usd is not None:
+                # Mismo monto en USD, registrado con la TRM del día en el sistema
+                mov_sistema.trm = trm + Decimal(rnd.randint(-30, 30))
+                mov_sistema.usd = usd
+                mov_sistema.valor = (usd * mov_sistema.trm).quantize(Decimal('0.01'))
+            movs_sistema.append(mov_sistema)
+            pares_reales[mov_extracto.id] = id_sistema
+
+    for j in range(int(n * proporcion_ruido)):
+        movs_sistema.append(Movimiento(
+            id=900000 + j, moneda_id=1, cuenta_id=1,
+            fecha=inicio + timedelta(days=rnd.randrange(dias)),
+            valor=Decimal(rnd.choice(VALORES_FRECUENTES)),
+            descripcion=_descripcion(rnd)
+        ))
+
+    rnd.shuffle(movs_sistema)
+    aliases = [
+        MatchingAlias(cuenta_id=1, patron=patron, reemplazo=reemplazo, id=k + 1)
+        for k, (patron, reemplazo) in enumerate(ALIASES)
+    ] if proporcion_alias else []
+    return PeriodoSintetico(movs_extracto, movs_sistema, pares_reales, aliases)
+
+
+def evaluar_matches(matches, pares_reales: Dict[int, int]) -> Tuple[int, float, float, Decimal]:
+    """
+    Compara las vinculaciones OK/PROBABLE contra el emparejamiento verdadero.
+
+    Returns:
+        (vinculados, precisión, recall, score total de los vinculados)
+    """
+    vinculados = [
+        m for m in matches
+        if m.mov_sistema is not None and m.estado in (MatchEstado.OK, MatchEstado.PROBABLE)
+    ]
+    correctos = sum(1 for m in vinculados if pares_reales.get(m.mov_extracto.id) == m.mov_sistema.id)
+    precision = correctos / len(vinculados) if vinculados else 0.0
+    recall = correctos / len(pares_reales) if pares_reales else 0.0
+    score_total = sum((m.score_total for m in vinculados), Decimal('0'))
+    return len(vinculados), precision, recall, score_total
+
+
+def _monto_usd(rnd: random.Random) -> Tuple[Decimal, Decimal]:
+    usd = Decimal(rnd.randint(-2000, 2000)) + Decimal(rnd.randint(1, 99)) / 100
+    trm = Decimal(rnd.randint(3800, 4300))
+    return usd, trm
+
+
+def _descripcion(rnd: random.Random) -> str:
+    return ' '.join(rnd.choice(PALABRAS) for _ in range(rnd.randint(1, 4)))
@@ -0,0 +1,90 @@
+"""
+Benchmark: throughput y calidad del motor de matching.
+
+Ejecuta MatchingService.ejecutar_matching sobre periodos sintéticos de
+distintos tamaños (con ruido en fechas, valores y descripciones, filas en USD
+y aliases) y reporta filas/s, pico de memoria, precisión y recall.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.rendimiento
+    python -m benchmarks.rendimiento --tamanos 100 1000 10000 50000 --usd 0.2 --alias 0.1
+    python -m benchmarks.rendimiento --modo OPTIMO --sin-memoria
+"""
+import argparse
+import time
+import tracemalloc
+from dataclasses import replace
+
+from src.domain.models.configuracion_matching import ConfiguracionMatching, ModoAsignacion
+from src.domain.services.matching_service import MatchingService
+from benchmarks.generador import generar_periodo, evaluar_matches
+
+
+def medir(servicio, periodo, config, memoria: bool = True) -> dict:
+    """
+    Ejecuta el matching del periodo y mide tiempo y, opcionalmente, pico de memoria.
+
+    El pico de memoria se mide en una segunda ejecución con tracemalloc, que
+    ralentiza el código medido y no debe contaminar el tiempo reportado.
+    """
+    inicio = time.perf_counter()
+    matches = servicio.ejecutar_matching(
+        periodo.movs_extracto, periodo.movs_sistema, config, aliases=periodo.aliases
+    )
+    duracion = time.perf_counter() - inicio
+
+    pico_mb = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            servicio.ejecutar_matching(
+                periodo.movs_extracto, periodo.movs_sistema, config, aliases=periodo.aliases
+            )
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        pico_mb = pico / (1024 * 1024)
+
+    vinculados, precision, recall, _ = evaluar_matches(matches, periodo.pares_reales)
+    return {
+        'segundos': duracion,
+        'filas_por_segundo': len(periodo.movs_extracto) / duracion if duracion else float('inf'),
+        'pico_mb': pico_mb,
+        'vinculados': vinculados,
+        'precision': precision,
+        'recall': recall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput y calidad del matching")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[100, 1000, 5000, 10000])
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--modo', choices=[m.value for m in ModoAsignacion], default=ModoAsignacion.GREEDY.value)
+    parser.add_argument('--usd', type=float, default=0.1, help='Fracción de filas en USD')
+    parser.add_argument('--alias', type=float, default=0.1, help='Fracción de filas que requieren alias')
+    parser.add_argument('--sin-memoria', action='store_true', help='No medir el pico de memoria')
+    args = parser.parse_args()
+
+    servicio = MatchingService()
+    config = replace(
+        ConfiguracionMatching.crear_configuracion_default(),
+        modo_asignacion=ModoAsignacion(args.modo)
+    )
+
+    print(f"modo={args.modo} usd={args.usd} alias={args.alias} semilla={args.semilla}")
+    print(f"{'n':>6} {'sistema':>7} {'tiempo(s)':>10} {'filas/s':>10} {'pico(MB)':>9} {'vinculados':>10} {'precision':>9} {'recall':>7}")
+    for n in args.tamanos:
+        periodo = generar_periodo(
+            n, semilla=args.semilla, proporcion_usd=args.usd, proporcion_alias=args.alias
+        )
+        r = medir(servicio, periodo, config, memoria=not args.sin_memoria)
+        pico = f"{r['pico_mb']:>9.1f}" if r['pico_mb'] is not None else f"{'-':>9}"
+        print(
+            f"{n:>6} {len(periodo.movs_sistema):>7} {r['segundos']:>10.3f} {r['filas_por_segundo']:>10.0f} "
+            f"{pico} {r['vinculados']:>10} {r['precision']:>9.3f} {r['recall']:>7.3f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 from datetime import date, datetime
 import calendar
 from decimal import Decimal
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from src.domain.models.conciliacion import Conciliacion
+from src.domain.models.trabajo_ingesta import ETAPA_PARSEO, ETAPA_DEDUPLICACION, ETAPA_INSERCION, ETAPA_CONCILIACION
 from src.domain.models.movimiento_extracto import MovimientoExtracto
 from src.domain.ports.conciliacion_repository import ConciliacionRepository
 from src.domain.ports.movimiento_extracto_repository import MovimientoExtractoRepository
@@ -10,6 +11,8 @@ from src.domain.ports.cuenta_extractor_repository import CuentaExtractorReposito
 from src.infrastructure.logging.config import logger
 import importlib
 from src.infrastructure.extractors.utils import extraer_periodo_de_nombre_archivo, obtener_nombre_mes, extraer_periodo_de_movimientos
+from src.infrastructure.extractors.documento_pdf import abrir_pdf
+from src.infrastructure.extractors.cache_pdf import ejecutar_extractor
 
 class CargarExtractoBancarioService:
     """
@@ -60,6 +63,14 @@ class CargarExtractoBancarioService:
         FIX: Usa lógica de signos para sumatorias (Positivo=Entrada, Negativo=Salida).
         """
         datos = {}
+
+        # El PDF se parsea una sola vez (o se recupera del caché en disco) y todos los
+        # extractores (RESUMEN y MOVIMIENTOS) leen del mismo documento
+        try:
+            documento = abrir_pdf(file_obj)
+        except Exception as e:
+            logger.warning(f"No se pudo parsear el PDF por adelantado ({e}); cada extractor lo abrirá por su cuenta")
+            documento = file_obj
         
         # 1. Extraer Resumen (Encabezado del PDF)
         # -------------------------------------------------------------------------
@@ -69,9 +80,9 @@ class CargarExtractoBancarioService:
             modulos = self.cuenta_extractor_repo.obtener_modulos(cuenta_id, 'RESUMEN')
             for nombre_modulo in modulos:
                 try:
-                    if hasattr(file_obj, 'seek'): file_obj.seek(0)
+                    if hasattr(documento, 'seek'): documento.seek(0)
                     module = importlib.import_module(f"src.infrastructure.extractors.bancolombia.{nombre_modulo}")
-                    datos = module.extraer_resumen(file_obj)
+                    datos = ejecutar_extractor(module, 'extraer_resumen', documento)
                     if datos:
                         extracted_summary = True
                         break
@@ -81,25 +92,25 @@ class CargarExtractoBancarioService:
         
         # Fallback Hardcoded si no se obtuvo resumen por DB
         if not extracted_summary:
-            if hasattr(file_obj, 'seek'): file_obj.seek(0)
+            if hasattr(documento, 'seek'): documento.seek(0)
             if tipo_cuenta == 'Ahorros':
                 from src.infrastructure.extractors.bancolombia import ahorros_extracto
-                datos = ahorros_extracto.extraer_resumen(file_obj)
+                datos = ejecutar_extractor(ahorros_extracto, 'extraer_resumen', documento)
             elif tipo_cuenta == 'FondoRenta':
                 from src.infrastructure.extractors.bancolombia import fondorenta_extracto
-                datos = fondorenta_extracto.extraer_resumen(file_obj)
+                datos = ejecutar_extractor(fondorenta_extracto, 'extraer_resumen', documento)
             elif tipo_cuenta == 'MasterCardPesos':
                  periodo = self._extraer_periodo_nombre_archivo(filename)
                  usar_anterior = (periodo and (periodo[0] < 2025 or (periodo[0] == 2025 and periodo[1] <= 8)))
                  if usar_anterior:
                      from src.infrastructure.extractors.bancolombia import mastercard_pesos_extracto_anterior
-                     datos = mastercard_pesos_extracto_anterior.extraer_resumen(file_obj)
+                     datos = ejecutar_extractor(mastercard_pesos_extracto_anterior, 'extraer_resumen', documento)
                  else:
                      from src.infrastructure.extractors.bancolombia import mastercard_pesos_extracto
-                     datos = mastercard_pesos_extracto.extraer_resumen(file_obj)
+                     datos = ejecutar_extractor(mastercard_pesos_extracto, 'extraer_resumen', documento)
             elif tipo_cuenta == 'MasterCardUSD':
                  from src.infrastructure.extractors.bancolombia import mastercard_usd_extracto
-                 datos = mastercard_usd_extracto.extraer_resumen(file_obj)
+                 datos = ejecutar_extractor(mastercard_usd_extracto, 'extraer_resumen', documento)
 
         if not datos:
             raise ValueError("No se pudo extraer el resumen del archivo. Verifique el formato.")
@@ -131,8 +142,8 @@ class CargarExtractoBancarioService:
                 movs = []
                 for extractor_module in extractores:
                     try:
-                        if hasattr(file_obj, 'seek'): file_obj.seek(0)
-                        movs_temp = extractor_module.extraer_movimientos(file_obj)
+                        if hasattr(documento, 'seek'): documento.seek(0)
+                        movs_temp = ejecutar_extractor(extractor_module, 'extraer_movimientos', documento)
                         if movs_temp:
                             movs = movs_temp
                             datos['movimientos'] = movs
@@ -289,11 +300,15 @@ class CargarExtractoBancarioService:
 
         return datos
 
-    async def procesar_extracto(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, year: Optional[int] = None, month: Optional[int] = None, overrides: Optional[Dict[str, Decimal]] = None, movimientos_confirmados: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    def procesar_extracto(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, year: Optional[int] = None, month: Optional[int] = None, overrides: Optional[Dict[str, Decimal]] = None, movimientos_confirmados: Optional[List[Dict[str, Any]]] = None, progreso: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
         """
         Procesa un extracto PDF y guarda resumen + movimientos.
+        `progreso(etapa, procesadas=0, total=None)` se invoca al empezar cada etapa.
         """
         import calendar
+
+        avisar = progreso or (lambda etapa, procesadas=0, total=None: None)
+        avisar(ETAPA_PARSEO)
         
         # 1. Analizar para obtener datos base o usar confirmados
         if movimientos_confirmados:
@@ -331,7 +346,38 @@ class CargarExtractoBancarioService:
             if not year or not month:
                 raise ValueError("No se pudo determinar el periodo del extracto.")
 
-        # 2. Guardar Conciliación
+        # 2. Preparar Movimientos Extracto
+        avisar(ETAPA_DEDUPLICACION, 0, len(movimientos_data))
+        movimientos_extracto_objs = []
+        total_duplicados = 0
+        total_errores = 0
+
+        for mov_data in movimientos_data:
+            try:
+                f_mov = mov_data['fecha']
+                if isinstance(f_mov, str):
+                    try: f_mov = datetime.strptime(f_mov, "%Y-%m-%d").date()
+                    except: pass
+
+                # Contar duplicados (marcados previamente en análisis)
+                if mov_data.get('es_duplicado'):
+                    total_duplicados += 1
+
+                movimientos_extracto_objs.append(MovimientoExtracto(
+                    id=None, cuenta_id=cuenta_id, year=year, month=month, fecha=f_mov,
+                    descripcion=mov_data['descripcion'], referencia=mov_data.get('referencia'),
+                    valor=Decimal(str(mov_data['valor'])),
+                    usd=Decimal(str(mov_data['usd'])) if mov_data.get('usd') else None,
+                    trm=Decimal(str(mov_data['trm'])) if mov_data.get('trm') else None,
+                    numero_linea=mov_data.get('numero_linea'),
+                    raw_text=mov_data.get('raw_text')
+                ))
+            except Exception as e:
+                logger.warning(f"Error procesando movimiento: {e}")
+                total_errores += 1
+
+        # 3. Guardar Conciliación y Movimientos Extracto
+        avisar(ETAPA_INSERCION, 0, len(movimientos_extracto_objs))
         last_day = calendar.monthrange(year, month)[1]
         fecha_corte = date(year, month, last_day)
         
@@ -365,39 +411,17 @@ class CargarExtractoBancarioService:
             
         guardado = self.conciliacion_repo.guardar(conciliacion_to_save)
 
-        # 3. Guardar Movimientos Extracto
-        movimientos_extracto_objs = []
-        total_duplicados = 0
-        total_errores = 0
-
-        for mov_data in movimientos_data:
-            try:
-                f_mov = mov_data['fecha']
-                if isinstance(f_mov, str):
-                    try: f_mov = datetime.strptime(f_mov, "%Y-%m-%d").date()
-                    except: pass
-
-                # Contar duplicados (marcados previamente en análisis)
-                if mov_data.get('es_duplicado'):
-                    total_duplicados += 1
-
-                movimientos_extracto_objs.append(MovimientoExtracto(
-                    id=None, cuenta_id=cuenta_id, year=year, month=month, fecha=f_mov,
-                    descripcion=mov_data['descripcion'], referencia=mov_data.get('referencia'),
-                    valor=Decimal(str(mov_data['valor'])),
-                    usd=Decimal(str(mov_data['usd'])) if mov_data.get('usd') else None,
-                    trm=Decimal(str(mov_data['trm'])) if mov_data.get('trm') else None,
-                    numero_linea=mov_data.get('numero_linea'),
-                    raw_text=mov_data.get('raw_text')
-                ))
-            except Exception as e:
-                logger.warning(f"Error procesando movimiento: {e}")
-                total_errores += 1
-
         if self.movimiento_extracto_repo:
             self.movimiento_extracto_repo.eliminar_por_periodo(cuenta_id, year, month)
             self.movimiento_extracto_repo.guardar_lote(movimientos_extracto_objs)
 
+        # 4. Recalcular el lado del sistema contra los nuevos totales del extracto
+        avisar(ETAPA_CONCILIACION, len(movimientos_extracto_objs), len(movimientos_extracto_objs))
+        try:
+            self.conciliacion_repo.recalcular_sistema(cuenta_id, year, month)
+        except Exception as e:
+            logger.warning(f"Error al recalcular conciliacion {cuenta_id} {year}/{month}: {e}")
+
         total_leidos = len(movimientos_data)
         total_nuevos = len(movimientos_extracto_objs)
 
@@ -1,14 +1,27 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from src.domain.models.movimiento import Movimiento
+from src.domain.models.trabajo_ingesta import ETAPA_PARSEO, ETAPA_DEDUPLICACION, ETAPA_INSERCION, ETAPA_CONCILIACION
 from src.domain.ports.movimiento_repository import MovimientoRepository
 from src.domain.ports.moneda_repository import MonedaRepository
 from src.domain.ports.cuenta_extractor_repository import CuentaExtractorRepository
+from src.domain.ports.conciliacion_repository import ConciliacionRepository
+from src.domain.services.indice_duplicados import IndiceDuplicados, a_fecha
 import importlib
 import traceback
 from datetime import date
 from src.infrastructure.extractors.utils import extraer_periodo_de_movimientos
+from src.infrastructure.extractors.documento_pdf import abrir_pdf
+from src.infrastructure.extractors.cache_pdf import ejecutar_extractor
 from src.infrastructure.logging.config import logger
 
+# Cada cuántas filas se reporta progreso durante la deduplicación
+FILAS_POR_AVISO = 200
+
+
+def _sin_progreso(etapa: str, procesadas: int = 0, total: Optional[int] = None) -> None:
+    pass
+
+
 class CargarMovimientosService:
     """
     Servicio especializado en la carga mecánica de movimientos diarios (PDFs diarios, CSV, Excel).
@@ -16,10 +29,13 @@ class CargarMovimientosService:
     def __init__(self, 
                  movimiento_repo: MovimientoRepository, 
                  moneda_repo: MonedaRepository,
-                 cuenta_extractor_repo: Optional[CuentaExtractorRepository] = None):
+                 cuenta_extractor_repo: Optional[CuentaExtractorRepository] = None,
+                 conciliacion_repo: Optional[ConciliacionRepository] = None):
         self.movimiento_repo = movimiento_repo
         self.moneda_repo = moneda_repo
         self.cuenta_extractor_repo = cuenta_extractor_repo
+        # Si está, la conciliación se recalcula en su propia etapa y no dentro de guardar_lote
+        self.conciliacion_repo = conciliacion_repo
         self._monedas_cache = {}
 
     def _obtener_id_moneda(self, codigo_iso: str) -> int:
@@ -68,10 +84,16 @@ class CargarMovimientosService:
         modulos = self._obtener_modulos_extractor_movimientos(cuenta_id)
         
         if modulos:
+            # Parsear una vez y compartir el documento entre los extractores configurados
+            try:
+                documento = abrir_pdf(file_obj)
+            except Exception as e:
+                logger.warning(f"No se pudo parsear el PDF por adelantado ({e}); cada extractor lo abrirá por su cuenta")
+                documento = file_obj
             for module in modulos:
                 try:
-                    if hasattr(file_obj, 'seek'): file_obj.seek(0)
-                    raw_movs = module.extraer_movimientos(file_obj)
+                    if hasattr(documento, 'seek'): documento.seek(0)
+                    raw_movs = ejecutar_extractor(module, 'extraer_movimientos', documento)
                     if raw_movs:
                         for m in raw_movs:
                             if m.get('description'):
@@ -89,11 +111,32 @@ class CargarMovimientosService:
                     continue
         return []
 
+    def _construir_indice_duplicados(self, raw_movs: List[Dict[str, Any]], cuenta_id: Optional[int]) -> IndiceDuplicados:
+        """
+        Carga en una sola consulta los movimientos existentes de la cuenta en el
+        rango de fechas del archivo y los indexa para detectar duplicados en memoria.
+        """
+        if not cuenta_id:
+            return IndiceDuplicados()
+
+        fechas = []
+        for raw in raw_movs:
+            try:
+                fechas.append(a_fecha(raw['fecha']))
+            except (KeyError, TypeError, ValueError):
+                continue  # La fila fallará (y se reportará) al clasificarla
+        if not fechas:
+            return IndiceDuplicados()
+
+        existentes = self.movimiento_repo.obtener_por_cuenta_y_rango(cuenta_id, min(fechas), max(fechas))
+        return IndiceDuplicados(existentes)
+
     def analizar_archivo(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: Optional[int] = None) -> Dict[str, Any]:
         """Analiza el archivo previo a la carga (Previsualización)."""
         raw_movs = self._extraer_movimientos(file_obj, tipo_cuenta, cuenta_id)
         resultado_detalle = []
         stats = {"leidos": len(raw_movs), "duplicados": 0, "nuevos": 0, "actualizables": 0}
+        indice = self._construir_indice_duplicados(raw_movs, cuenta_id)
         
         for raw in raw_movs:
             try:
@@ -101,9 +144,9 @@ class CargarMovimientosService:
                 valor_para_check = 0 if es_usd else raw['valor']
                 usd_val = raw['valor'] if es_usd else None
                 
-                es_duplicado = self.movimiento_repo.existe_movimiento(
+                es_duplicado = indice.existe(
                     fecha=raw['fecha'], valor=valor_para_check,
-                    referencia=raw.get('referencia', ''), cuenta_id=cuenta_id,
+                    referencia=raw.get('referencia', ''),
                     descripcion=raw['descripcion'], usd=usd_val
                 )
 
@@ -111,18 +154,15 @@ class CargarMovimientosService:
                 descripcion_actual = None
 
                 if not es_duplicado and cuenta_id:
-                    soft_match = self.movimiento_repo.obtener_exacto(
-                        cuenta_id=cuenta_id, fecha=raw['fecha'],
-                        valor=valor_para_check, referencia=None, descripcion=None
-                    )
+                    soft_match = indice.coincidencia_blanda(fecha=raw['fecha'], valor=valor_para_check)
                     if soft_match:
                         es_actualizable = True
                         descripcion_actual = soft_match.descripcion
 
                 if not es_duplicado and tipo_cuenta in ['MasterCardPesos', 'MasterCardUSD']:
-                    posible_duplicado = self.movimiento_repo.existe_movimiento(
+                    posible_duplicado = indice.existe(
                         fecha=raw['fecha'], valor=valor_para_check,
-                        referencia=raw.get('referencia', ''), cuenta_id=cuenta_id,
+                        referencia=raw.get('referencia', ''),
                         descripcion='', usd=usd_val
                     )
                     if posible_duplicado: es_duplicado = True
@@ -150,27 +190,89 @@ class CargarMovimientosService:
             "periodo": extraer_periodo_de_movimientos(resultado_detalle)
         }
 
-    def procesar_archivo(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, actualizar_descripciones: bool = False) -> Dict[str, Any]:
-        """Carga formal de los movimientos a la base de datos."""
+    @staticmethod
+    def _acumular(stats: Dict[str, float], categoria: str, valor: float, es_usd: bool) -> None:
+        """Suma el valor a ingresos_/egresos_<categoria>[_usd] según signo y moneda."""
+        clave = f"{'ingresos' if valor > 0 else 'egresos'}_{categoria}{'_usd' if es_usd else ''}"
+        stats[clave] = stats.get(clave, 0) + valor
+
+    def _insertar_nuevos(self, pendientes: List[tuple]) -> List[Optional[Exception]]:
+        """
+        Inserta los movimientos nuevos del archivo en bloque (COPY).
+        Si el bloque falla (ej. un periodo CONCILIADO), reintenta fila por fila
+        para que solo las filas afectadas cuenten como error.
+        Retorna el error de cada pendiente (None si se insertó).
+        """
+        if not pendientes:
+            return []
+        movs = [mov for _, mov, _, _ in pendientes]
+        try:
+            if self.conciliacion_repo is None:
+                self.movimiento_repo.guardar_lote(movs)
+            else:
+                self.movimiento_repo.guardar_lote(movs, recalcular_conciliacion=False)
+            return [None] * len(movs)
+        except Exception as e:
+            logger.warning(f"Carga en bloque falló ({e}); se reintenta movimiento por movimiento")
+
+        errores = []
+        for mov in movs:
+            try:
+                self.movimiento_repo.guardar(mov)
+                errores.append(None)
+            except Exception as e:
+                logger.error(f"ERROR procesando movimiento: {e}")
+                errores.append(e)
+        return errores
+
+    def _recalcular_conciliaciones(self, movimientos: List[Movimiento]) -> None:
+        """Recalcula una vez cada periodo tocado por los movimientos insertados."""
+        periodos = {(m.cuenta_id, m.fecha.year, m.fecha.month) for m in movimientos if m.cuenta_id and m.fecha}
+        for c_id, year, month in sorted(periodos):
+            try:
+                self.conciliacion_repo.recalcular_sistema(c_id, year, month)
+            except Exception as e:
+                logger.warning(f"Error al recalcular conciliacion {c_id} {year}/{month}: {e}")
+
+    def procesar_archivo(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, actualizar_descripciones: bool = False,
+                         progreso: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Carga formal de los movimientos a la base de datos.
+
+        Args:
+            progreso: Callback opcional `progreso(etapa, procesadas=0, total=None)` que se
+                invoca al empezar cada etapa (PARSEO, DEDUPLICACION, INSERCION,
+                CONCILIACION) y cada FILAS_POR_AVISO filas
+        """
+        avisar = progreso or _sin_progreso
+        avisar(ETAPA_PARSEO)
         raw_movs = self._extraer_movimientos(file_obj, tipo_cuenta, cuenta_id)
+        avisar(ETAPA_DEDUPLICACION, 0, len(raw_movs))
         insertados, actualizados, duplicados, errores = 0, 0, 0, 0
         detalle_errores = []
 
-        # Financial stats por categoría
-        ingresos_cargados = 0
-        egresos_cargados = 0
-        ingresos_duplicados = 0
-        egresos_duplicados = 0
-        ingresos_errores = 0
-        egresos_errores = 0
-        ingresos_cargados_usd = 0
-        egresos_cargados_usd = 0
-        ingresos_duplicados_usd = 0
-        egresos_duplicados_usd = 0
-        ingresos_errores_usd = 0
-        egresos_errores_usd = 0
+        # Financial stats por categoría: {ingresos|egresos}_{cargados|duplicados|errores}[_usd]
+        stats: Dict[str, float] = {}
+        indice = self._construir_indice_duplicados(raw_movs, cuenta_id)
+        # Movimientos nuevos: (raw, movimiento, es_usd, valor), se insertan en bloque al final
+        pendientes = []
+
+        def registrar_error(raw: Dict[str, Any], e: Exception):
+            # Acumular stats de errores
+            try:
+                self._acumular(stats, 'errores', float(raw.get('valor', 0)), raw.get('moneda') == 'USD')
+            except:
+                pass
+            detalle_errores.append({
+                "fecha": raw.get('fecha', '?'),
+                "descripcion": raw.get('descripcion', '?'),
+                "valor": str(raw.get('valor', '?')),
+                "error": str(e)
+            })
         
-        for raw in raw_movs:
+        for fila, raw in enumerate(raw_movs):
+            if fila and fila % FILAS_POR_AVISO == 0:
+                avisar(ETAPA_DEDUPLICACION, fila, len(raw_movs))
             try:
                 es_usd = raw.get('moneda') == 'USD'
                 valor_para_bd = 0 if es_usd else raw['valor']
@@ -179,54 +281,42 @@ class CargarMovimientosService:
                 moneda_id = 1 if es_usd else self._obtener_id_moneda(raw.get('moneda', 'COP'))
                 valor = float(raw['valor'])
 
-                existe = self.movimiento_repo.existe_movimiento(
+                existe = indice.existe(
                     fecha=raw['fecha'], valor=valor_para_check,
-                    referencia=raw.get('referencia', ''), cuenta_id=cuenta_id,
+                    referencia=raw.get('referencia', ''),
                     descripcion=raw['descripcion'], usd=usd_val
                 )
                 
                 if not existe and tipo_cuenta in ['MasterCardPesos', 'MasterCardUSD']:
-                    existe = self.movimiento_repo.existe_movimiento(
+                    existe = indice.existe(
                         fecha=raw['fecha'], valor=valor_para_check,
-                        referencia=raw.get('referencia', ''), cuenta_id=cuenta_id,
+                        referencia=raw.get('referencia', ''),
                         descripcion='', usd=usd_val
                     )
                 
                 if existe:
                     duplicados += 1
-                    if es_usd:
-                        if valor > 0:
-                            ingresos_duplicados_usd += valor
-                        else:
-                            egresos_duplicados_usd += valor
-                    else:
-                        if valor > 0:
-                            ingresos_duplicados += valor
-                        else:
-                            egresos_duplicados += valor
+                    self._acumular(stats, 'duplicados', valor, es_usd)
                     continue
                 
                 if actualizar_descripciones:
-                    soft_match = self.movimiento_repo.obtener_exacto(
-                        cuenta_id=cuenta_id, fecha=raw['fecha'],
-                        valor=valor_para_check, referencia=None, descripcion=None
-                    )
+                    candidato = indice.coincidencia_blanda(fecha=raw['fecha'], valor=valor_para_check)
+                    if candidato and candidato.id is None:
+                        # Fila nueva de este mismo archivo aún pendiente de insertar: se actualiza en memoria
+                        soft_match = candidato
+                    else:
+                        # El índice solo tiene encabezados: cargar el movimiento completo (con detalles) para guardarlo
+                        soft_match = self.movimiento_repo.obtener_por_id(candidato.id) if candidato else None
                     if soft_match:
                         soft_match.descripcion = raw['descripcion']
                         if raw.get('referencia'): soft_match.referencia = raw['referencia']
-                        self.movimiento_repo.guardar(soft_match)
+                        if soft_match.id:
+                            self.movimiento_repo.guardar(soft_match)
+                        indice.remover(candidato)
+                        indice.agregar(soft_match)
                         actualizados += 1
                         # Los actualizados se cuentan como cargados para stats financieras
-                        if es_usd:
-                            if valor > 0:
-                                ingresos_cargados_usd += valor
-                            else:
-                                egresos_cargados_usd += valor
-                        else:
-                            if valor > 0:
-                                ingresos_cargados += valor
-                            else:
-                                egresos_cargados += valor
+                        self._acumular(stats, 'cargados', valor, es_usd)
                         continue
 
                 fecha_obj = date.fromisoformat(raw['fecha'])
@@ -236,67 +326,48 @@ class CargarMovimientosService:
                     referencia=raw.get('referencia', ''), valor=valor_para_bd,
                     moneda_id=moneda_id, cuenta_id=cuenta_id, usd=usd_val
                 )
-                self.movimiento_repo.guardar(nuevo_mov)
-                insertados += 1
-                if es_usd:
-                    if valor > 0:
-                        ingresos_cargados_usd += valor
-                    else:
-                        egresos_cargados_usd += valor
-                else:
-                    if valor > 0:
-                        ingresos_cargados += valor
-                    else:
-                        egresos_cargados += valor
+                # Visible para las filas siguientes del mismo archivo
+                indice.agregar(nuevo_mov)
+                pendientes.append((raw, nuevo_mov, es_usd, valor))
             except Exception as e:
                 logger.error(f"ERROR procesando movimiento: {e}")
                 logger.error(traceback.format_exc())
                 errores += 1
-                # Acumular stats de errores
-                try:
-                    valor_err = float(raw.get('valor', 0))
-                    es_usd_err = raw.get('moneda') == 'USD'
-                    if es_usd_err:
-                        if valor_err > 0:
-                            ingresos_errores_usd += valor_err
-                        else:
-                            egresos_errores_usd += valor_err
-                    else:
-                        if valor_err > 0:
-                            ingresos_errores += valor_err
-                        else:
-                            egresos_errores += valor_err
-                except:
-                    pass
-                detalle_errores.append({
-                    "fecha": raw.get('fecha', '?'),
-                    "descripcion": raw.get('descripcion', '?'),
-                    "valor": str(raw.get('valor', '?')),
-                    "error": str(e)
-                })
-                
+                registrar_error(raw, e)
+
+        avisar(ETAPA_INSERCION, 0, len(pendientes))
+        insertados_ok = []
+        for (raw, mov, es_usd, valor), error in zip(pendientes, self._insertar_nuevos(pendientes)):
+            if error is None:
+                insertados += 1
+                insertados_ok.append(mov)
+                self._acumular(stats, 'cargados', valor, es_usd)
+            else:
+                errores += 1
+                registrar_error(raw, error)
+
+        if self.conciliacion_repo is not None:
+            avisar(ETAPA_CONCILIACION, insertados, insertados)
+            self._recalcular_conciliaciones(insertados_ok)
+
+        def total(clave: str) -> float:
+            return sum(stats.get(clave.format(c), 0) for c in ('cargados', 'duplicados', 'errores'))
+
         return {
             "archivo": filename, "total_extraidos": len(raw_movs),
             "nuevos_insertados": insertados, "actualizados": actualizados,
             "duplicados": duplicados, "errores": errores, "detalle_errores": detalle_errores,
             "periodo": extraer_periodo_de_movimientos(raw_movs),
             # Totales (para compatibilidad)
-            "total_ingresos": ingresos_cargados + ingresos_duplicados + ingresos_errores,
-            "total_egresos": egresos_cargados + egresos_duplicados + egresos_errores,
-            "total_ingresos_usd": ingresos_cargados_usd + ingresos_duplicados_usd + ingresos_errores_usd,
-            "total_egresos_usd": egresos_cargados_usd + egresos_duplicados_usd + egresos_errores_usd,
-            # Desglose por categoría COP
-            "ingresos_cargados": ingresos_cargados,
-            "egresos_cargados": egresos_cargados,
-            "ingresos_duplicados": ingresos_duplicados,
-            "egresos_duplicados": egresos_duplicados,
-            "ingresos_errores": ingresos_errores,
-            "egresos_errores": egresos_errores,
-            # Desglose por categoría USD
-            "ingresos_cargados_usd": ingresos_cargados_usd,
-            "egresos_cargados_usd": egresos_cargados_usd,
-            "ingresos_duplicados_usd": ingresos_duplicados_usd,
-            "egresos_duplicados_usd": egresos_duplicados_usd,
-            "ingresos_errores_usd": ingresos_errores_usd,
-            "egresos_errores_usd": egresos_errores_usd
+            "total_ingresos": total('ingresos_{}'),
+            "total_egresos": total('egresos_{}'),
+            "total_ingresos_usd": total('ingresos_{}_usd'),
+            "total_egresos_usd": total('egresos_{}_usd'),
+            # Desglose por categoría COP y USD
+            **{
+                f"{tipo}_{categoria}{sufijo}": stats.get(f"{tipo}_{categoria}{sufijo}", 0)
+                for sufijo in ('', '_usd')
+                for tipo in ('ingresos', 'egresos')
+                for categoria in ('cargados', 'duplicados', 'errores')
+            }
         }
@@ -12,6 +12,7 @@ from src.domain.ports.centro_costo_repository import CentroCostoRepository
 from src.domain.ports.concepto_repository import ConceptoRepository
 from src.domain.ports.cuenta_repository import CuentaRepository
 from src.domain.ports.matching_alias_repository import MatchingAliasRepository
+from src.domain.services.automata_aliases import obtener_automata
 import unicodedata
 
 def _normalizar_acentos(texto: str) -> str:
@@ -168,16 +169,11 @@ class ClasificacionService:
             return descripcion.upper().strip()
 
         desc_norm = descripcion.upper().strip()
-        # Versión sin acentos para comparación
-        desc_sin_acentos = _normalizar_acentos(desc_norm)
-
-        for alias in aliases:
-            # Normalizar patrón sin acentos para comparación
-            patron_sin_acentos = _normalizar_acentos(alias.patron)
-            if patron_sin_acentos in desc_sin_acentos:
-                # Reemplazar en la versión sin acentos
-                desc_sin_acentos = desc_sin_acentos.replace(patron_sin_acentos, alias.reemplazo)
-                desc_norm = desc_sin_acentos  # Usar versión sin acentos como resultado
+        # Versión sin acentos para comparación (los patrones se compilan también sin acentos)
+        automata = obtener_automata(aliases, _normalizar_acentos)
+        desc_sin_acentos, aplicados = automata.aplicar_en_cadena(_normalizar_acentos(desc_norm))
+        if aplicados:
+            desc_norm = desc_sin_acentos  # Usar versión sin acentos como resultado
 
         return desc_norm
 
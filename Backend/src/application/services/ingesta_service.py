@@ -0,0 +1,86 @@
+"""
+Ingesta asíncrona de archivos (movimientos y extractos).
+
+Cargar un extracto era un único request largo (parseo, duplicados, inserción)
+que ocupaba un worker y vencía con archivos grandes. Ahora el upload solo
+encola un TrabajoIngesta con el contenido del archivo y responde con su id; los
+workers de ColaIngesta lo ejecutan por etapas sobre ProcesadorArchivosService y
+el cliente consulta el avance. El matching en lote de un año usa la misma cola.
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+import io
+
+from src.application.services.matching_lote_service import MatchingLoteService
+from src.application.services.procesador_archivos_service import ProcesadorArchivosService
+from src.domain.models.trabajo_ingesta import TrabajoIngesta, TIPOS_ARCHIVO, TIPO_MOVIMIENTOS, TIPO_MATCHING_LOTE
+from src.domain.ports.trabajo_ingesta_repository import TrabajoIngestaRepository
+
+
+class IngestaService:
+    def __init__(self, trabajo_repo: TrabajoIngestaRepository):
+        self.trabajo_repo = trabajo_repo
+
+    def encolar(self, tipo: str, archivo: str, contenido: bytes, tipo_cuenta: str, cuenta_id: int,
+                parametros: Optional[Dict[str, Any]] = None) -> TrabajoIngesta:
+        """
+        Valida y encola un archivo.
+
+        Args:
+            tipo: 'MOVIMIENTOS' o 'EXTRACTO'
+            parametros: Argumentos extra del servicio; deben ser serializables a JSON
+                (los Decimal de overrides se guardan como texto)
+        """
+        if tipo not in TIPOS_ARCHIVO:
+            raise ValueError(f"Tipo de trabajo inválido: {tipo}")
+        if not archivo or not archivo.lower().endswith('.pdf'):
+            raise ValueError("Solo se permiten archivos PDF")
+        if not contenido:
+            raise ValueError("El archivo está vacío")
+
+        trabajo = TrabajoIngesta(
+            id=None, tipo=tipo, archivo=archivo, tipo_cuenta=tipo_cuenta,
+            cuenta_id=cuenta_id, parametros=parametros or {}
+        )
+        return self.trabajo_repo.crear(trabajo, contenido)
+
+    def encolar_matching_lote(self, year: int, cuenta_ids: Optional[List[int]] = None,
+                              month: Optional[int] = None, max_procesos: Optional[int] = None) -> TrabajoIngesta:
+        """Encola el matching en lote de un año (ver MatchingLoteService.ejecutar)."""
+        if month is not None and not 1 <= month <= 12:
+            raise ValueError(f"Mes inválido: {month}")
+        trabajo = TrabajoIngesta(
+            id=None, tipo=TIPO_MATCHING_LOTE, archivo=None, tipo_cuenta=None,
+            parametros={'year': year, 'cuenta_ids': cuenta_ids, 'month': month, 'max_procesos': max_procesos}
+        )
+        return self.trabajo_repo.crear(trabajo, None)
+
+    @staticmethod
+    def ejecutar(trabajo: TrabajoIngesta, contenido: bytes, procesador: ProcesadorArchivosService,
+                 progreso: Callable[..., None]) -> Dict[str, Any]:
+        """Corre el trabajo con el servicio síncrono de siempre, reportando cada etapa a `progreso`."""
+        file_obj = io.BytesIO(contenido)
+        p = trabajo.parametros or {}
+
+        if trabajo.tipo == TIPO_MOVIMIENTOS:
+            return procesador.procesar_archivo(
+                file_obj, trabajo.archivo, trabajo.tipo_cuenta, trabajo.cuenta_id,
+                bool(p.get('actualizar_descripciones', False)), progreso=progreso
+            )
+
+        overrides = {clave: Decimal(str(valor)) for clave, valor in (p.get('overrides') or {}).items()}
+        return procesador.procesar_extracto(
+            file_obj, trabajo.archivo, trabajo.tipo_cuenta, trabajo.cuenta_id,
+            p.get('year'), p.get('month'), overrides=overrides,
+            movimientos_confirmados=p.get('movimientos_confirmados'), progreso=progreso
+        )
+
+    @staticmethod
+    def ejecutar_matching_lote(trabajo: TrabajoIngesta, servicio: MatchingLoteService,
+                               progreso: Callable[..., None]) -> Dict[str, Any]:
+        """Corre un trabajo MATCHING_LOTE, reportando los periodos terminados a `progreso`."""
+        p = trabajo.parametros or {}
+        return servicio.ejecutar(
+            p['year'], cuenta_ids=p.get('cuenta_ids'), month=p.get('month'),
+            max_procesos=p.get('max_procesos'), progreso=progreso
+        )
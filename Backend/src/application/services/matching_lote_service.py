@@ -0,0 +1,275 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+import multiprocessing
+import os
+import time
+
+import psycopg2
+
+from src.domain.models.trabajo_ingesta import ETAPA_MATCHING
+from src.infrastructure.logging.config import logger
+
+
+# Estado de conciliación que bloquea cualquier cambio del periodo
+ESTADO_BLOQUEADO = 'CONCILIADO'
+
+
+def _estado_periodo(conn, cuenta_id: int, year: int, month: int) -> Optional[str]:
+    """Estado actual del periodo en conciliaciones (None si no existe)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT estado FROM conciliaciones WHERE cuenta_id = %s AND year = %s AND month = %s",
+            (cuenta_id, year, month)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+
+def _procesar_periodo(cuenta_id: int, year: int, month: int) -> Dict:
+    """
+    Ejecuta el matching de un periodo con su propia conexión a la base de datos.
+
+    Es una función de módulo para poder ejecutarse en un proceso hijo: cada
+    worker abre y cierra su conexión (las conexiones de psycopg2 no se pueden
+    compartir entre procesos) y corre el MatchingService puro sobre el periodo.
+    """
+    # Imports locales: el proceso hijo solo carga lo que necesita el worker
+    from src.infrastructure.database.connection import DB_CONFIG
+    from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+    from src.infrastructure.database.postgres_movimiento_extracto_repository import PostgresMovimientoExtractoRepository
+    from src.infrastructure.database.postgres_movimiento_vinculacion_repository import PostgresMovimientoVinculacionRepository
+    from src.infrastructure.database.postgres_configuracion_matching_repository import PostgresConfiguracionMatchingRepository
+    from src.infrastructure.database.postgres_matching_alias_repository import PostgresMatchingAliasRepository
+    from src.infrastructure.database.postgres_conciliacion_repository import PostgresConciliacionRepository
+    from src.domain.models.movimiento_match import MatchEstado
+    from src.domain.services.date_range_service import DateRangeService
+    from src.domain.services.conciliacion_service import ConciliacionService
+    from src.domain.services.matching_service import MatchingService
+    from src.application.services.matching_periodo_service import MatchingPeriodoService
+
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    resultado = {
+        'cuenta_id': cuenta_id,
+        'year': year,
+        'month': month,
+        'estado': 'PROCESADO',
+        'movimientos_extracto': 0,
+        'recalculados': 0,
+        'ok': 0,
+        'probables': 0,
+        'sin_match': 0,
+        'huerfanos_eliminados': 0,
+        'error': None,
+    }
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        # Re-verificar el bloqueo: el periodo pudo cerrarse después de listarlo
+        if _estado_periodo(conn, cuenta_id, year, month) == ESTADO_BLOQUEADO:
+            resultado['estado'] = 'BLOQUEADO'
+            return resultado
+
+        repo_extracto = PostgresMovimientoExtractoRepository(conn)
+        vinculacion_repo = PostgresMovimientoVinculacionRepository(conn)
+        conciliacion_service = ConciliacionService(
+            PostgresMovimientoRepository(conn),
+            vinculacion_repo,
+            PostgresConciliacionRepository(conn),
+            DateRangeService(repo_extracto)
+        )
+        servicio = MatchingPeriodoService(
+            MatchingService(),
+            repo_extracto,
+            vinculacion_repo,
+            PostgresConfiguracionMatchingRepository(conn),
+            PostgresMatchingAliasRepository(conn),
+            conciliacion_service
+        )
+
+        periodo = servicio.ejecutar(cuenta_id, year, month)
+        conn.commit()
+
+        nuevos = periodo.matches_nuevos
+        resultado.update({
+            'movimientos_extracto': len(periodo.movs_extracto),
+            'recalculados': periodo.instantanea.recalculados,
+            'ok': sum(1 for m in nuevos if m.estado == MatchEstado.OK),
+            'probables': sum(1 for m in nuevos if m.estado == MatchEstado.PROBABLE),
+            'sin_match': sum(1 for m in nuevos if m.estado == MatchEstado.SIN_MATCH),
+            'huerfanos_eliminados': periodo.huerfanos_eliminados,
+        })
+        if periodo.errores:
+            resultado['estado'] = 'ERROR'
+            resultado['error'] = '; '.join(periodo.errores)
+    except Exception as e:
+        conn.rollback()
+        resultado['estado'] = 'ERROR'
+        resultado['error'] = str(e)
+    finally:
+        conn.close()
+        resultado['segundos'] = round(time.perf_counter() - inicio, 4)
+        resultado['segundos_cpu'] = round(time.process_time() - inicio_cpu, 4)
+
+    return resultado
+
+
+class MatchingLoteService:
+    """
+    Matching en lote de todos los periodos de un año, para todas o varias cuentas.
+
+    Los periodos se reparten en un pool de procesos (contexto 'spawn', cada
+    worker con su propia conexión). Los periodos CONCILIADO se omiten y se
+    reportan como bloqueados.
+    """
+
+    def __init__(self, connection):
+        self.conn = connection
+
+    def listar_periodos(
+        self,
+        year: int,
+        cuenta_ids: Optional[List[int]] = None,
+        month: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Periodos con movimientos de extracto (los únicos donde hay algo que vincular).
+
+        Returns:
+            Lista de dicts con cuenta_id, year, month y estado de conciliación
+        """
+        query = """
+            SELECT DISTINCT me.cuenta_id, me.year, me.month, c.estado
+            FROM movimientos_extracto me
+            LEFT JOIN conciliaciones c
+                ON c.cuenta_id = me.cuenta_id AND c.year = me.year AND c.month = me.month
+            WHERE me.year = %s
+        """
+        params: list = [year]
+        if cuenta_ids:
+            query += " AND me.cuenta_id = ANY(%s)"
+            params.append(list(cuenta_ids))
+        if month:
+            query += " AND me.month = %s"
+            params.append(month)
+        query += " ORDER BY me.cuenta_id, me.month"
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            return [
+                {'cuenta_id': row[0], 'year': row[1], 'month': row[2], 'estado': row[3]}
+                for row in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+    def ejecutar(
+        self,
+        year: int,
+        cuenta_ids: Optional[List[int]] = None,
+        month: Optional[int] = None,
+        max_procesos: Optional[int] = None,
+        progreso: Optional[Callable[..., None]] = None
+    ) -> Dict:
+        """
+        Ejecuta el matching de todos los periodos que cumplen los filtros.
+
+        Args:
+            year: Año a procesar
+            cuenta_ids: Cuentas a incluir (None = todas)
+            month: Mes a procesar (None = todos)
+            max_procesos: Procesos del pool (None = CPUs disponibles; 1 = en este proceso)
+            progreso: Callback opcional `progreso(etapa, procesados, total)` con los
+                periodos terminados (cola de trabajos)
+
+        Returns:
+            Dict con 'periodos' (resultado y tiempos por periodo) y 'totales'
+        """
+        inicio = time.perf_counter()
+        periodos = self.listar_periodos(year, cuenta_ids, month)
+
+        resultados: List[Dict] = []
+        pendientes = []
+        for periodo in periodos:
+            if periodo['estado'] == ESTADO_BLOQUEADO:
+                resultados.append({
+                    'cuenta_id': periodo['cuenta_id'],
+                    'year': periodo['year'],
+                    'month': periodo['month'],
+                    'estado': 'BLOQUEADO',
+                })
+            else:
+                pendientes.append((periodo['cuenta_id'], periodo['year'], periodo['month']))
+
+        if max_procesos is None:
+            max_procesos = os.cpu_count() or 1
+        max_procesos = max(1, min(max_procesos, len(pendientes) or 1))
+
+        logger.info(
+            f"Matching en lote {year}: {len(pendientes)} periodos a procesar, "
+            f"{len(resultados)} bloqueados, {max_procesos} procesos"
+        )
+
+        def avisar():
+            if progreso:
+                progreso(ETAPA_MATCHING, len(resultados), len(periodos))
+
+        avisar()
+        if max_procesos == 1:
+            for cuenta_id, y, m in pendientes:
+                resultados.append(_procesar_periodo(cuenta_id, y, m))
+                avisar()
+        else:
+            # 'spawn': los hijos no heredan conexiones ni el pool del proceso padre
+            contexto = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=max_procesos, mp_context=contexto) as executor:
+                futuros = {
+                    executor.submit(_procesar_periodo, cuenta_id, y, m): (cuenta_id, y, m)
+                    for cuenta_id, y, m in pendientes
+                }
+                for futuro in as_completed(futuros):
+                    cuenta_id, y, m = futuros[futuro]
+                    try:
+                        resultados.append(futuro.result())
+                    except Exception as e:
+                        logger.error(f"Error en worker de matching {cuenta_id} {y}/{m}: {e}")
+                        resultados.append({
+                            'cuenta_id': cuenta_id, 'year': y, 'month': m,
+                            'estado': 'ERROR', 'error': str(e),
+                        })
+                    avisar()
+
+        resultados.sort(key=lambda r: (r['cuenta_id'], r['year'], r['month']))
+        totales = self._totalizar(resultados)
+        totales['procesos'] = max_procesos
+        totales['segundos'] = round(time.perf_counter() - inicio, 4)
+
+        logger.info(
+            f"Matching en lote {year} completado en {totales['segundos']}s: "
+            f"{totales['procesados']} procesados, {totales['bloqueados']} bloqueados, "
+            f"{totales['errores']} con error"
+        )
+        return {'periodos': resultados, 'totales': totales}
+
+    @staticmethod
+    def _totalizar(resultados: List[Dict]) -> Dict:
+        """Suma los contadores y tiempos de los periodos."""
+        def sumar(clave):
+            return sum(r.get(clave, 0) for r in resultados)
+
+        return {
+            'periodos': len(resultados),
+            'procesados': sum(1 for r in resultados if r['estado'] == 'PROCESADO'),
+            'bloqueados': sum(1 for r in resultados if r['estado'] == 'BLOQUEADO'),
+            'errores': sum(1 for r in resultados if r['estado'] == 'ERROR'),
+            'movimientos_extracto': sumar('movimientos_extracto'),
+            'ok': sumar('ok'),
+            'probables': sumar('probables'),
+            'sin_match': sumar('sin_match'),
+            'segundos_periodos': round(sumar('segundos'), 4),
+            'segundos_cpu': round(sumar('segundos_cpu'), 4),
+        }
@@ -0,0 +1,159 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.domain.models.movimiento import Movimiento
+from src.domain.models.movimiento_extracto import MovimientoExtracto
+from src.domain.models.movimiento_match import MovimientoMatch, MatchEstado
+from src.domain.models.configuracion_matching import ConfiguracionMatching
+from src.domain.ports.movimiento_extracto_repository import MovimientoExtractoRepository
+from src.domain.ports.movimiento_vinculacion_repository import MovimientoVinculacionRepository
+from src.domain.ports.configuracion_matching_repository import ConfiguracionMatchingRepository
+from src.domain.ports.matching_alias_repository import MatchingAliasRepository
+from src.domain.services.conciliacion_service import ConciliacionService
+from src.domain.services.matching_service import MatchingService
+from src.domain.services.matching_incremental import InstantaneaMatching
+from src.infrastructure.logging.config import logger
+
+
+@dataclass
+class ResultadoMatchingPeriodo:
+    """Resultado de ejecutar y persistir el matching de un periodo."""
+    config: ConfiguracionMatching
+    movs_extracto: List[MovimientoExtracto]
+    movs_sistema_disponibles: List[Movimiento]
+    matches_existentes: List[MovimientoMatch]
+    matches_nuevos: List[MovimientoMatch]
+    instantanea: InstantaneaMatching
+    huerfanos_eliminados: int = 0
+    errores: List[str] = field(default_factory=list)
+
+
+class MatchingPeriodoService:
+    """
+    Caso de uso: ejecutar el matching de un periodo (cuenta, año, mes) y persistirlo.
+
+    Limpia vinculaciones huérfanas, calcula solo las filas pendientes del
+    extracto contra los movimientos del sistema disponibles y guarda en lote
+    las vinculaciones OK/PROBABLE. Lo usan el endpoint de matching y el
+    matching en lote por cuentas y periodos.
+    """
+
+    def __init__(self,
+                 matching_service: MatchingService,
+                 repo_extracto: MovimientoExtractoRepository,
+                 vinculacion_repo: MovimientoVinculacionRepository,
+                 config_repo: ConfiguracionMatchingRepository,
+                 alias_repo: MatchingAliasRepository,
+                 conciliacion_service: ConciliacionService):
+        self.matching_service = matching_service
+        self.repo_extracto = repo_extracto
+        self.vinculacion_repo = vinculacion_repo
+        self.config_repo = config_repo
+        self.alias_repo = alias_repo
+        self.conciliacion_service = conciliacion_service
+
+    def ejecutar(
+        self,
+        cuenta_id: int,
+        year: int,
+        month: int,
+        previa: Optional[InstantaneaMatching] = None
+    ) -> ResultadoMatchingPeriodo:
+        """
+        Ejecuta el matching del periodo sobre lo pendiente y guarda los resultados.
+
+        Args:
+            cuenta_id: ID de la cuenta
+            year: Año del periodo
+            month: Mes del periodo
+            previa: Instantánea de la ejecución anterior (recalcula solo lo que cambió)
+
+        Returns:
+            ResultadoMatchingPeriodo con existentes, nuevos y la nueva instantánea
+        """
+        # 1. Obtener configuración activa
+        config = self.config_repo.obtener_activa()
+
+        # 2. Obtener movimientos del extracto
+        movs_extracto = self.repo_extracto.obtener_por_periodo(cuenta_id, year, month)
+        logger.info(f"Encontrados {len(movs_extracto)} movimientos en extracto")
+
+        # 3. Obtener movimientos del sistema (Universo Completo: Calendario + Vinculados)
+        movs_sistema = self.conciliacion_service.obtener_universo_sistema(cuenta_id, year, month)
+        logger.info(f"Encontrados {len(movs_sistema)} movimientos en universo sistema")
+
+        # 3.1 Obtener vinculaciones existentes en DB
+        matches_existentes = self.vinculacion_repo.obtener_por_periodo(cuenta_id, year, month)
+
+        # Identificar y limpiar "orphans" (matches que apuntan a movimientos de sistema borrados)
+        matches_validos = []
+        ids_huerfanos = []
+        for match in matches_existentes:
+            es_huerfano = False
+            # Si el estado implica que debería haber un movimiento de sistema...
+            if match.estado in [MatchEstado.OK, MatchEstado.PROBABLE, MatchEstado.MANUAL]:
+                # ...pero no hay movimiento de sistema asociado
+                if not match.mov_sistema:
+                    es_huerfano = True
+
+            if es_huerfano:
+                logger.warning(f"Detectado match huérfano ID {match.id} (Estado {match.estado.value}, Extracto {match.mov_extracto.id}). Eliminando...")
+                ids_huerfanos.append(match.id)
+                # No lo agregamos a matches_validos, así el extracto quedará libre para ser procesado de nuevo
+            else:
+                matches_validos.append(match)
+
+        # Eliminar todos los huérfanos en una sola sentencia
+        if ids_huerfanos:
+            self.vinculacion_repo.eliminar_lote(ids_huerfanos)
+
+        # Identificar items ya procesados y sistemas ocupados
+        extracto_ids_procesados = {m.mov_extracto.id for m in matches_validos}
+        sistema_ids_ocupados = {m.mov_sistema.id for m in matches_validos if m.mov_sistema}
+
+        # Filtrar pendientes
+        movs_extracto_pendientes = [m for m in movs_extracto if m.id not in extracto_ids_procesados]
+        movs_sistema_disponibles = [m for m in movs_sistema if m.id not in sistema_ids_ocupados]
+
+        logger.info(f"Procesando {len(movs_extracto_pendientes)} items pendientes y {len(movs_sistema_disponibles)} sistemas disponibles")
+
+        # 3.2 Obtener reglas de normalización (Alias)
+        aliases = self.alias_repo.obtener_por_cuenta(cuenta_id)
+
+        # 4. Ejecutar algoritmo de matching solo en pendientes (incremental si hay instantánea previa)
+        matches_nuevos, instantanea = self.matching_service.ejecutar_matching_incremental(
+            movs_extracto_pendientes,
+            movs_sistema_disponibles,
+            config,
+            aliases=aliases,
+            previa=previa
+        )
+        logger.info(
+            f"Matching completado: {len(matches_nuevos)} vinculaciones nuevas generadas "
+            f"({instantanea.recalculados} filas recalculadas)"
+        )
+
+        # 5. Guardar vinculaciones nuevas (solo las automáticas relevantes)
+        # SIN_MATCH no se guarda en DB; la instantánea del periodo evita re-calcularlo.
+        # guardar_lote asigna el ID generado y created_at a cada match; un conflicto
+        # (ej. movimiento del sistema ya vinculado en otro mes) solo pierde esa fila.
+        errores = []
+        matches_a_guardar = [
+            m for m in matches_nuevos
+            if m.estado in [MatchEstado.OK, MatchEstado.PROBABLE]
+        ]
+        if matches_a_guardar:
+            for match, error in zip(matches_a_guardar, self.vinculacion_repo.guardar_lote(matches_a_guardar)):
+                if error is not None:
+                    errores.append(f"Extracto {match.mov_extracto.id}: {error}")
+
+        return ResultadoMatchingPeriodo(
+            config=config,
+            movs_extracto=movs_extracto,
+            movs_sistema_disponibles=movs_sistema_disponibles,
+            matches_existentes=matches_validos,
+            matches_nuevos=matches_nuevos,
+            instantanea=instantanea,
+            huerfanos_eliminados=len(ids_huerfanos),
+            errores=errores
+        )
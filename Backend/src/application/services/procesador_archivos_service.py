@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 from src.domain.ports.movimiento_repository import MovimientoRepository
 from src.domain.ports.moneda_repository import MonedaRepository
 from src.domain.ports.tercero_repository import TerceroRepository
@@ -26,7 +26,8 @@ class ProcesadorArchivosService:
         self.cargar_movimientos_service = CargarMovimientosService(
             movimiento_repo=movimiento_repo,
             moneda_repo=moneda_repo,
-            cuenta_extractor_repo=cuenta_extractor_repo
+            cuenta_extractor_repo=cuenta_extractor_repo,
+            conciliacion_repo=conciliacion_repo
         )
         
         self.cargar_extracto_service = CargarExtractoBancarioService(
@@ -39,12 +40,12 @@ class ProcesadorArchivosService:
     def analizar_archivo(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: Optional[int] = None) -> Dict[str, Any]:
         return self.cargar_movimientos_service.analizar_archivo(file_obj, filename, tipo_cuenta, cuenta_id)
 
-    def procesar_archivo(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, actualizar_descripciones: bool = False) -> Dict[str, Any]:
-        return self.cargar_movimientos_service.procesar_archivo(file_obj, filename, tipo_cuenta, cuenta_id, actualizar_descripciones)
+    def procesar_archivo(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, actualizar_descripciones: bool = False, progreso: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        return self.cargar_movimientos_service.procesar_archivo(file_obj, filename, tipo_cuenta, cuenta_id, actualizar_descripciones, progreso=progreso)
 
     # --- Delegación a CargarExtractoBancarioService ---
     def analizar_extracto(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: Optional[int] = None) -> Dict[str, Any]:
         return self.cargar_extracto_service.analizar_extracto(file_obj, filename, tipo_cuenta, cuenta_id)
 
-    async def procesar_extracto(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, year: Optional[int] = None, month: Optional[int] = None, overrides: Optional[Dict[str, Any]] = None, movimientos_confirmados: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        return await self.cargar_extracto_service.procesar_extracto(file_obj, filename, tipo_cuenta, cuenta_id, year, month, overrides, movimientos_confirmados)
+    def procesar_extracto(self, file_obj: Any, filename: str, tipo_cuenta: str, cuenta_id: int, year: Optional[int] = None, month: Optional[int] = None, overrides: Optional[Dict[str, Any]] = None, movimientos_confirmados: Optional[List[Dict[str, Any]]] = None, progreso: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        return self.cargar_extracto_service.procesar_extracto(file_obj, filename, tipo_cuenta, cuenta_id, year, month, overrides, movimientos_confirmados, progreso=progreso)
@@ -2,6 +2,13 @@ from dataclasses import dataclass
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
+from enum import Enum
+
+
+class ModoAsignacion(str, Enum):
+    """Motor usado para asignar movimientos del extracto a movimientos del sistema"""
+    GREEDY = "GREEDY"   # En orden del extracto, cada fila toma su mejor candidato disponible
+    OPTIMO = "OPTIMO"   # Asignación 1-a-1 que maximiza el score total del periodo
 
 
 @dataclass
@@ -27,6 +34,9 @@ class ConfiguracionMatching:
     score_minimo_exacto: Decimal  # ej: 0.95 = 95% para considerar EXACTO
     score_minimo_probable: Decimal  # ej: 0.70 = 70% para considerar PROBABLE
     
+    # Motor de asignación
+    modo_asignacion: ModoAsignacion = ModoAsignacion.GREEDY
+    
     # Metadata
     id: Optional[int] = None
     activo: bool = True
@@ -44,6 +54,16 @@ class ConfiguracionMatching:
             if value is not None and not isinstance(value, Decimal):
                 setattr(self, attr, Decimal(str(value)))
         
+        # Convertir modo de asignación si viene como string
+        if not isinstance(self.modo_asignacion, ModoAsignacion):
+            try:
+                self.modo_asignacion = ModoAsignacion(str(self.modo_asignacion).upper())
+            except ValueError:
+                raise ValueError(
+                    f"modo_asignacion debe ser uno de {[m.value for m in ModoAsignacion]}, "
+                    f"recibido: {self.modo_asignacion}"
+                )
+        
         # Validar que los pesos sumen 1.00 (con tolerancia de 0.01 por redondeo)
         suma_pesos = self.peso_fecha + self.peso_valor + self.peso_descripcion
         if abs(suma_pesos - Decimal('1.00')) > Decimal('0.01'):
@@ -147,6 +167,7 @@ class ConfiguracionMatching:
             f"tolerancia=${float(self.tolerancia_valor):.2f}, "
             f"similitud_min={float(self.similitud_descripcion_minima):.0%}, "
             f"pesos=[{float(self.peso_fecha):.0%}, {float(self.peso_valor):.0%}, {float(self.peso_descripcion):.0%}], "
-            f"scores=[exacto={float(self.score_minimo_exacto):.0%}, probable={float(self.score_minimo_probable):.0%}]"
+            f"scores=[exacto={float(self.score_minimo_exacto):.0%}, probable={float(self.score_minimo_probable):.0%}], "
+            f"modo={self.modo_asignacion.value}"
             f")"
         )
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import List
+from decimal import Decimal
+
+from src.domain.models.movimiento_extracto import MovimientoExtracto
+from src.domain.models.movimiento import Movimiento
+
+
+@dataclass
+class MatchGrupo:
+    """
+    Entidad de Dominio que representa una coincidencia agrupada (pago dividido).
+
+    Un movimiento del extracto explicado por la suma de varios movimientos del
+    sistema (1 a muchos) o varios movimientos del extracto que suman un único
+    movimiento del sistema (muchos a 1), ej. pagos con tarjeta o traslados agrupados.
+
+    Arquitectura Hexagonal: Pertenece a la capa de Dominio.
+    """
+    movs_extracto: List[MovimientoExtracto]
+    movs_sistema: List[Movimiento]
+    diferencia: Decimal  # Suma extracto - suma sistema
+
+    def __post_init__(self):
+        """Validaciones de integridad"""
+        if not self.movs_extracto or not self.movs_sistema:
+            raise ValueError("Un grupo requiere movimientos de extracto y de sistema")
+        if len(self.movs_extracto) > 1 and len(self.movs_sistema) > 1:
+            raise ValueError("Un grupo debe ser 1 a muchos o muchos a 1")
+
+    @property
+    def tipo(self) -> str:
+        """'1_A_MUCHOS' (un extracto, varios sistema) o 'MUCHOS_A_1'"""
+        return '1_A_MUCHOS' if len(self.movs_extracto) == 1 else 'MUCHOS_A_1'
+
+    def __repr__(self) -> str:
+        return (
+            f"MatchGrupo(tipo={self.tipo}, "
+            f"extracto={[m.id for m in self.movs_extracto]}, "
+            f"sistema={[m.id for m in self.movs_sistema]}, "
+            f"diferencia={self.diferencia})"
+        )
@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+# Tipos de archivo que se ingieren
+TIPO_MOVIMIENTOS = 'MOVIMIENTOS'
+TIPO_EXTRACTO = 'EXTRACTO'
+TIPOS_ARCHIVO = (TIPO_MOVIMIENTOS, TIPO_EXTRACTO)
+# Matching en lote de un año (sin archivo); comparte la cola y su límite de concurrencia
+TIPO_MATCHING_LOTE = 'MATCHING_LOTE'
+TIPOS = TIPOS_ARCHIVO + (TIPO_MATCHING_LOTE,)
+
+# Ciclo de vida: EN_COLA -> EN_CURSO -> COMPLETADO | ERROR
+# (un EN_CURSO sin latido vuelve a EN_COLA; ver ColaIngesta)
+ESTADO_EN_COLA = 'EN_COLA'
+ESTADO_EN_CURSO = 'EN_CURSO'
+ESTADO_COMPLETADO = 'COMPLETADO'
+ESTADO_ERROR = 'ERROR'
+
+# Etapas del ProcesadorArchivosService, en orden
+ETAPA_PARSEO = 'PARSEO'
+ETAPA_DEDUPLICACION = 'DEDUPLICACION'
+ETAPA_INSERCION = 'INSERCION'
+ETAPA_CONCILIACION = 'CONCILIACION'
+ETAPAS = (ETAPA_PARSEO, ETAPA_DEDUPLICACION, ETAPA_INSERCION, ETAPA_CONCILIACION)
+# Única etapa del matching en lote (filas = periodos)
+ETAPA_MATCHING = 'MATCHING'
+
+
+@dataclass
+class TrabajoIngesta:
+    """
+    Carga asíncrona de un archivo (movimientos o extracto) o matching en lote.
+    El contenido del archivo se guarda aparte (BYTEA) hasta que el trabajo termina;
+    el matching en lote no tiene archivo ni tipo de cuenta.
+    """
+    id: Optional[int]
+    tipo: str
+    archivo: Optional[str]
+    tipo_cuenta: Optional[str]
+    cuenta_id: Optional[int] = None
+    # Argumentos del servicio (actualizar_descripciones, year, month, overrides,
+    # movimientos_confirmados; cuenta_ids y max_procesos en el matching en lote)
+    parametros: Dict[str, Any] = field(default_factory=dict)
+
+    # --- Progreso ---
+    estado: str = ESTADO_EN_COLA
+    etapa: Optional[str] = None
+    filas_total: Optional[int] = None
+    filas_procesadas: int = 0
+    tiempos_ms: Dict[str, float] = field(default_factory=dict)  # Duración de cada etapa terminada
+
+    # --- Salida ---
+    resultado: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    intentos: int = 0
+    worker: Optional[str] = None
+
+    created_at: Optional[datetime] = None
+    iniciado_at: Optional[datetime] = None
+    actualizado_at: Optional[datetime] = None
+    terminado_at: Optional[datetime] = None
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado in (ESTADO_COMPLETADO, ESTADO_ERROR)
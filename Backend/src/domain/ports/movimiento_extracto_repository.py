@@ -14,7 +14,8 @@ class MovimientoExtractoRepository(ABC):
     @abstractmethod
     def guardar_lote(self, movimientos: List[MovimientoExtracto]) -> int:
         """
-        Guarda múltiples movimientos de extracto en batch.
+        Guarda múltiples movimientos de extracto en batch
+        y asigna id y created_at a cada uno.
         Retorna: cantidad guardada
         """
         pass
@@ -14,6 +14,15 @@ class MovimientoRepository(ABC):
         """Guarda o actualiza un movimiento"""
         pass
 
+    @abstractmethod
+    def guardar_lote(self, movimientos: List[Movimiento], recalcular_conciliacion: bool = True) -> List[Movimiento]:
+        """
+        Inserta movimientos nuevos en bloque (todo o nada).
+        Valida los bloqueos de periodo y asigna id a movimientos y detalles.
+        Con recalcular_conciliacion=False el llamador recalcula los periodos.
+        """
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id: int) -> Optional[Movimiento]:
         """Obtiene un movimiento por su ID único"""
@@ -47,6 +56,14 @@ class MovimientoRepository(ABC):
         """Busca movimientos por su referencia bancaria exacta"""
         pass
     
+    @abstractmethod
+    def obtener_por_cuenta_y_rango(self, cuenta_id: int, fecha_inicio: date, fecha_fin: date) -> List[Movimiento]:
+        """
+        Obtiene los encabezados (sin detalles) de una cuenta en un rango de fechas.
+        Útil para cargar en una sola consulta los candidatos a duplicado de un archivo.
+        """
+        pass
+
     @abstractmethod
     def existe_movimiento(self, fecha: date, valor: Decimal, referencia: str, cuenta_id: int, descripcion: str = None, usd: Decimal = None) -> bool:
         pass
@@ -98,6 +115,41 @@ class MovimientoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def buscar_avanzado_keyset(self,
+                       fecha_inicio: Optional[date] = None,
+                       fecha_fin: Optional[date] = None,
+                       cuenta_id: Optional[int] = None,
+                       tercero_id: Optional[int] = None,
+                       centro_costo_id: Optional[int] = None,
+                       concepto_id: Optional[int] = None,
+                       centros_costos_excluidos: Optional[List[int]] = None,
+                       solo_pendientes: bool = False,
+                       solo_clasificados: bool = False,
+                       tipo_movimiento: Optional[str] = None,
+                       descripcion_contiene: Optional[str] = None,
+                       referencia: Optional[str] = None,
+                       limit: int = 50,
+                       cursor: Optional[str] = None,
+                       contar: bool = False
+    ) -> tuple[List[Movimiento], Optional[str], Optional[dict]]:
+        """
+        Búsqueda con los mismos filtros que buscar_avanzado, paginada por keyset
+        sobre (fecha, abs(valor), id) en orden descendente.
+        
+        Args:
+            limit: Tamaño de la página
+            cursor: Token opaco devuelto por la página anterior (None = primera página)
+            contar: Si True, incluye el resumen (total, ingresos, egresos) de toda la búsqueda
+        
+        Returns:
+            tuple: (movimientos de la página, cursor de la siguiente página o None, resumen o None)
+        
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        pass
+
     @abstractmethod
     def resumir_por_clasificacion(self, 
                                  tipo_agrupacion: str,
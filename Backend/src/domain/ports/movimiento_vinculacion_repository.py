@@ -146,6 +146,24 @@ class MovimientoVinculacionRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def guardar_lote(self, vinculaciones: List[MovimientoMatch]) -> List[Optional[Exception]]:
+        """
+        Guarda o actualiza varias vinculaciones en una sola operación.
+        
+        Si ya existe una vinculación para el movimiento del extracto, se actualiza.
+        Si el bloque falla, se guarda vinculación por vinculación para que solo
+        las filas con conflicto se pierdan.
+        
+        Args:
+            vinculaciones: Lista de MovimientoMatch a persistir (se les asigna
+                ID y fecha de creación)
+        
+        Returns:
+            El error de cada vinculación, en el mismo orden (None si se guardó)
+        """
+        pass
+    
     @abstractmethod
     def eliminar(self, id: int) -> None:
         """
@@ -156,6 +174,19 @@ class MovimientoVinculacionRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def eliminar_lote(self, ids: List[int]) -> int:
+        """
+        Elimina físicamente varias vinculaciones en una sola operación.
+        
+        Args:
+            ids: IDs de las vinculaciones a eliminar
+        
+        Returns:
+            Cantidad de vinculaciones eliminadas
+        """
+        pass
+    
     @abstractmethod
     def obtener_por_sistema_id(self, sistema_id: int) -> Optional[MovimientoMatch]:
         """
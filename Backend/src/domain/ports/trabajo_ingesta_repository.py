@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from src.domain.models.trabajo_ingesta import TrabajoIngesta
+
+
+class TrabajoIngestaRepository(ABC):
+    """
+    Persistencia de la cola de trabajos de ingesta.
+    """
+
+    @abstractmethod
+    def crear(self, trabajo: TrabajoIngesta, contenido: Optional[bytes]) -> TrabajoIngesta:
+        """Encola el trabajo con el contenido del archivo (None si no tiene). Asigna id y created_at."""
+        pass
+
+    @abstractmethod
+    def obtener_por_id(self, id: int) -> Optional[TrabajoIngesta]:
+        pass
+
+    @abstractmethod
+    def listar(self, estado: Optional[str] = None, limit: int = 50) -> List[TrabajoIngesta]:
+        """Trabajos más recientes primero, opcionalmente filtrados por estado."""
+        pass
+
+    @abstractmethod
+    def obtener_contenido(self, id: int) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def reclamar_siguiente(self, worker: str, max_concurrentes: int, vencimiento_segundos: float, max_intentos: int) -> Optional[TrabajoIngesta]:
+        """
+        Pasa el trabajo en cola más antiguo a EN_CURSO para `worker`, si hay menos
+        de `max_concurrentes` en curso (entre todos los procesos). Antes devuelve a la
+        cola (o marca ERROR tras `max_intentos`) los EN_CURSO sin latido hace más de
+        `vencimiento_segundos`. Retorna None si no hay trabajo o se alcanzó el máximo.
+        """
+        pass
+
+    @abstractmethod
+    def actualizar_progreso(self, id: int, etapa: Optional[str], filas_procesadas: int, filas_total: Optional[int], tiempos_ms: Dict[str, float]) -> None:
+        pass
+
+    @abstractmethod
+    def registrar_latido(self, ids: List[int]) -> None:
+        """Marca como vivos los trabajos en curso de este proceso."""
+        pass
+
+    @abstractmethod
+    def finalizar(self, id: int, estado: str, tiempos_ms: Dict[str, float], resultado: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Cierra el trabajo (COMPLETADO o ERROR) y libera el contenido del archivo."""
+        pass
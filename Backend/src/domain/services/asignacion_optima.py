@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional, Tuple
+import time
+
+
+# Arista del grafo bipartito: (fila, columna, peso entero)
+Arista = Tuple[int, int, int]
+
+
+def resolver_asignacion_maxima(
+    aristas: List[Arista],
+    max_celdas_componente: int = 40_000,
+    tiempo_limite: Optional[float] = None
+) -> Dict[int, int]:
+    """
+    Resuelve una asignación 1-a-1 de peso máximo sobre un grafo bipartito disperso.
+
+    El grafo se descompone en componentes conexas (los candidatos de matching
+    están acotados a ±1 día y a scores sobre el umbral, así que las componentes
+    suelen ser pequeñas). Cada componente se resuelve de forma exacta con el
+    algoritmo Húngaro; si una componente excede max_celdas_componente o se
+    agota el tiempo_limite (segundos), esa componente se resuelve con un
+    greedy por peso descendente para mantener el tiempo acotado.
+
+    Args:
+        aristas: Lista de (fila, columna, peso) con peso > 0
+        max_celdas_componente: Máximo filas*columnas para resolver exacto
+        tiempo_limite: Presupuesto de tiempo total en segundos (None = sin límite)
+
+    Returns:
+        Diccionario fila -> columna con la asignación elegida
+    """
+    if not aristas:
+        return {}
+
+    limite = time.perf_counter() + tiempo_limite if tiempo_limite is not None else None
+    asignacion: Dict[int, int] = {}
+
+    for componente in _componentes_conexas(aristas):
+        filas = sorted({f for f, _, _ in componente})
+        columnas = sorted({c for _, c, _ in componente})
+
+        fuera_de_tiempo = limite is not None and time.perf_counter() > limite
+        if fuera_de_tiempo or len(filas) * len(columnas) > max_celdas_componente:
+            asignacion.update(_asignacion_greedy(componente))
+        else:
+            asignacion.update(_asignacion_hungara(componente, filas, columnas))
+
+    return asignacion
+
+
+def _componentes_conexas(aristas: List[Arista]) -> List[List[Arista]]:
+    """Agrupa las aristas por componente conexa (union-find), en orden determinista."""
+    padre: Dict[Tuple[str, int], Tuple[str, int]] = {}
+
+    def raiz(nodo):
+        padre.setdefault(nodo, nodo)
+        while padre[nodo] != nodo:
+            padre[nodo] = padre[padre[nodo]]
+            nodo = padre[nodo]
+        return nodo
+
+    for fila, columna, _ in aristas:
+        a, b = raiz(('f', fila)), raiz(('c', columna))
+        if a != b:
+            padre[b] = a
+
+    grupos: Dict[Tuple[str, int], List[Arista]] = {}
+    for arista in aristas:
+        grupos.setdefault(raiz(('f', arista[0])), []).append(arista)
+
+    return sorted(grupos.values(), key=lambda grupo: min(f for f, _, _ in grupo))
+
+
+def _asignacion_greedy(aristas: List[Arista]) -> Dict[int, int]:
+    """Asignación greedy por peso descendente (desempate por fila y columna)."""
+    asignacion: Dict[int, int] = {}
+    columnas_usadas = set()
+    for fila, columna, _ in sorted(aristas, key=lambda a: (-a[2], a[0], a[1])):
+        if fila not in asignacion and columna not in columnas_usadas:
+            asignacion[fila] = columna
+            columnas_usadas.add(columna)
+    return asignacion
+
+
+def _asignacion_hungara(
+    aristas: List[Arista],
+    filas: List[int],
+    columnas: List[int]
+) -> Dict[int, int]:
+    """
+    Asignación exacta de peso máximo con el algoritmo Húngaro (O(n²·m)).
+
+    Los pares sin arista tienen costo 0, equivalente a dejar la fila sin asignar,
+    por lo que el resultado no necesita ser una asignación perfecta.
+    """
+    transpuesta = len(filas) > len(columnas)
+    if transpuesta:
+        filas, columnas = columnas, filas
+        aristas = [(c, f, p) for f, c, p in aristas]
+
+    pos_fila = {f: i + 1 for i, f in enumerate(filas)}
+    pos_columna = {c: j + 1 for j, c in enumerate(columnas)}
+    n, m = len(filas), len(columnas)
+
+    # Matriz de costos 1-indexada: -peso para aristas, 0 para pares sin arista
+    costo = [[0] * (m + 1) for _ in range(n + 1)]
+    for fila, columna, peso in aristas:
+        i, j = pos_fila[fila], pos_columna[columna]
+        costo[i][j] = min(costo[i][j], -peso)
+
+    infinito = float('inf')
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)
+    camino = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [infinito] * (m + 1)
+        usado = [False] * (m + 1)
+        while True:
+            usado[j0] = True
+            i0 = p[j0]
+            delta = infinito
+            j1 = 0
+            fila_costo = costo[i0]
+            u_i0 = u[i0]
+            for j in range(1, m + 1):
+                if not usado[j]:
+                    actual = fila_costo[j] - u_i0 - v[j]
+                    if actual < minv[j]:
+                        minv[j] = actual
+                        camino[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if usado[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = camino[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    asignacion: Dict[int, int] = {}
+    for j in range(1, m + 1):
+        i = p[j]
+        if i and costo[i][j] < 0:
+            fila, columna = filas[i - 1], columnas[j - 1]
+            if transpuesta:
+                fila, columna = columna, fila
+            asignacion[fila] = columna
+    return asignacion
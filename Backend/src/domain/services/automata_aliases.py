@@ -0,0 +1,161 @@
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+import threading
+
+
+# Regla compilada: (patrón, reemplazo)
+Regla = Tuple[str, str]
+
+
+class AutomataAliases:
+    """
+    Autómata Aho-Corasick compilado a partir de las reglas de alias de una cuenta.
+
+    Encuentra en una sola pasada sobre el texto qué patrones aparecen, en lugar
+    de recorrer cada alias con `in`. Sobre ese resultado se implementan las dos
+    semánticas de aplicación que usa el sistema:
+
+    - aplicar_ultimo (Matching): se evalúan todos los patrones sobre el texto
+      original y gana el ÚLTIMO alias (en el orden de la lista) que aparece;
+      solo ese reemplazo se aplica, sobre el texto original.
+    - aplicar_en_cadena (Clasificación): los alias se aplican en orden sobre el
+      texto ya transformado por los anteriores.
+    """
+
+    def __init__(self, reglas: Sequence[Regla]):
+        self.reglas: List[Regla] = list(reglas)
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._fallo: List[int] = [0]
+        self._salida: List[Tuple[int, ...]] = [()]
+        # Un patrón vacío está presente en cualquier texto (igual que '' in texto)
+        self._siempre: Tuple[int, ...] = tuple(
+            indice for indice, (patron, _) in enumerate(self.reglas) if not patron
+        )
+
+        for indice, (patron, _) in enumerate(self.reglas):
+            if patron:
+                self._insertar(patron, indice)
+        self._construir_fallos()
+
+    @classmethod
+    def desde_aliases(
+        cls,
+        aliases: Sequence['MatchingAlias'],
+        normalizar_patron: Optional[Callable[[str], str]] = None
+    ) -> 'AutomataAliases':
+        """Compila las reglas de una lista de MatchingAlias, conservando su orden."""
+        normalizar = normalizar_patron or (lambda texto: texto)
+        return cls([(normalizar(alias.patron), alias.reemplazo) for alias in aliases])
+
+    def _insertar(self, patron: str, indice: int) -> None:
+        estado = 0
+        for caracter in patron:
+            siguiente = self._transiciones[estado].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salida.append(())
+                self._transiciones[estado][caracter] = siguiente
+            estado = siguiente
+        self._salida[estado] += (indice,)
+
+    def _construir_fallos(self) -> None:
+        """Enlaces de fallo por BFS; cada estado hereda las salidas de su sufijo."""
+        cola = list(self._transiciones[0].values())
+        posicion = 0
+        while posicion < len(cola):
+            estado = cola[posicion]
+            posicion += 1
+            for caracter, siguiente in self._transiciones[estado].items():
+                fallo = self._fallo[estado]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                self._fallo[siguiente] = self._transiciones[fallo].get(caracter, 0)
+                self._salida[siguiente] += self._salida[self._fallo[siguiente]]
+                cola.append(siguiente)
+
+    def indices_presentes(self, texto: str) -> Set[int]:
+        """Índices de las reglas cuyo patrón aparece en el texto (una pasada)."""
+        presentes = set(self._siempre)
+        transiciones, fallo, salida = self._transiciones, self._fallo, self._salida
+        estado = 0
+        for caracter in texto:
+            while estado and caracter not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(caracter, 0)
+            if salida[estado]:
+                presentes.update(salida[estado])
+        return presentes
+
+    def aplicar_ultimo(self, texto: str) -> str:
+        """
+        Semántica de Matching: gana el último alias cuyo patrón aparece.
+
+        Equivale a recorrer los alias en orden y, por cada patrón presente en el
+        texto ORIGINAL, reemplazar sobre el texto original; el último reemplazo
+        sobrescribe a los anteriores.
+        """
+        if not self.reglas:
+            return texto
+        presentes = self.indices_presentes(texto)
+        if not presentes:
+            return texto
+        patron, reemplazo = self.reglas[max(presentes)]
+        return texto.replace(patron, reemplazo)
+
+    def aplicar_en_cadena(self, texto: str) -> Tuple[str, int]:
+        """
+        Semántica de Clasificación: los alias se aplican en orden sobre el texto acumulado.
+
+        Tras cada reemplazo el texto cambia, así que se vuelve a escanear buscando
+        el siguiente alias (en orden) presente en el texto nuevo.
+
+        Returns:
+            Tupla (texto resultante, número de reemplazos aplicados)
+        """
+        aplicados = 0
+        desde = 0
+        while desde < len(self.reglas):
+            candidatos = [i for i in self.indices_presentes(texto) if i >= desde]
+            if not candidatos:
+                break
+            indice = min(candidatos)
+            patron, reemplazo = self.reglas[indice]
+            texto = texto.replace(patron, reemplazo)
+            aplicados += 1
+            desde = indice + 1
+        return texto, aplicados
+
+
+# Caché de autómatas por cuenta: (cuenta_id, normalizador) -> (huella, autómata)
+_cache_automatas: Dict[Tuple[Optional[int], Optional[Callable]], Tuple[Tuple[Regla, ...], AutomataAliases]] = {}
+_lock_cache = threading.Lock()
+
+
+def obtener_automata(
+    aliases: Sequence['MatchingAlias'],
+    normalizar_patron: Optional[Callable[[str], str]] = None
+) -> AutomataAliases:
+    """
+    Retorna el autómata compilado de los aliases de una cuenta, reutilizándolo entre llamadas.
+
+    El caché se indexa por cuenta y se invalida comparando la huella de las
+    reglas (patrón, reemplazo y orden), así que cualquier cambio en los alias
+    de la cuenta provoca una recompilación sin necesidad de avisos explícitos.
+
+    Args:
+        aliases: Aliases de la cuenta (ej. de MatchingAliasRepository.obtener_por_cuenta)
+        normalizar_patron: Transformación opcional de los patrones (ej. quitar acentos)
+    """
+    cuenta_id = aliases[0].cuenta_id if aliases else None
+    huella = tuple((alias.patron, alias.reemplazo) for alias in aliases)
+    clave = (cuenta_id, normalizar_patron)
+
+    en_cache = _cache_automatas.get(clave)
+    if en_cache is not None and en_cache[0] == huella:
+        return en_cache[1]
+
+    automata = AutomataAliases.desde_aliases(aliases, normalizar_patron)
+    with _lock_cache:
+        _cache_automatas[clave] = (huella, automata)
+    return automata
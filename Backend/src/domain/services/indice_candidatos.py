@@ -0,0 +1,83 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import date
+
+from src.domain.models.movimiento import Movimiento
+
+
+class IndiceCandidatos:
+    """
+    Índice en memoria de movimientos del sistema disponibles para matching.
+
+    Agrupa los movimientos por ordinal de fecha para que cada movimiento del
+    extracto solo consulte los días vecinos (±ventana_dias) en lugar de
+    recorrer toda la lista. Cada movimiento conserva su posición original,
+    de modo que los candidatos se devuelven en el mismo orden que tenía la
+    lista de entrada (necesario para que el desempate del algoritmo greedy
+    no cambie). La remoción de un movimiento consumido es O(1).
+
+    Arquitectura Hexagonal: Pertenece a la capa de Dominio.
+    """
+
+    def __init__(self, movs_sistema: Iterable[Movimiento], ventana_dias: int = 1):
+        self.ventana_dias = ventana_dias
+        # ordinal de fecha -> {posición original -> movimiento}
+        self._buckets: Dict[int, Dict[int, Movimiento]] = {}
+        # id(movimiento) -> (ordinal, posición) para remover en O(1)
+        self._ubicacion: Dict[int, tuple] = {}
+
+        for posicion, mov in enumerate(movs_sistema):
+            ordinal = mov.fecha.toordinal()
+            self._buckets.setdefault(ordinal, {})[posicion] = mov
+            self._ubicacion[id(mov)] = (ordinal, posicion)
+
+    def __len__(self) -> int:
+        return len(self._ubicacion)
+
+    def __contains__(self, mov: Movimiento) -> bool:
+        return id(mov) in self._ubicacion
+
+    def candidatos(self, fecha: date, ventana_dias: Optional[int] = None) -> List[Movimiento]:
+        """
+        Retorna los movimientos disponibles cuya fecha está a ±ventana_dias de la fecha dada.
+
+        Args:
+            fecha: Fecha del movimiento del extracto
+            ventana_dias: Ventana a usar (por defecto la del índice)
+
+        Returns:
+            Lista de candidatos en el orden original de entrada
+        """
+        ventana = self.ventana_dias if ventana_dias is None else ventana_dias
+        ordinal = fecha.toordinal()
+
+        encontrados = []
+        for dia in range(ordinal - ventana, ordinal + ventana + 1):
+            bucket = self._buckets.get(dia)
+            if bucket:
+                encontrados.extend(bucket.items())
+
+        encontrados.sort(key=lambda item: item[0])
+        return [mov for _, mov in encontrados]
+
+    def remover(self, mov: Movimiento) -> None:
+        """
+        Marca un movimiento como consumido (ya vinculado) en O(1).
+
+        Args:
+            mov: Movimiento del sistema a remover (se compara por identidad)
+        """
+        ubicacion = self._ubicacion.pop(id(mov), None)
+        if ubicacion is None:
+            return
+
+        ordinal, posicion = ubicacion
+        bucket = self._buckets[ordinal]
+        del bucket[posicion]
+        if not bucket:
+            del self._buckets[ordinal]
+
+    def disponibles(self) -> List[Movimiento]:
+        """Retorna los movimientos aún disponibles, en el orden original de entrada."""
+        items = [item for bucket in self._buckets.values() for item in bucket.items()]
+        items.sort(key=lambda item: item[0])
+        return [mov for _, mov in items]
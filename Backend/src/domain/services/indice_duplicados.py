@@ -0,0 +1,143 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date
+from decimal import Decimal
+import re
+
+from src.domain.models.movimiento import Movimiento
+
+
+def a_fecha(valor) -> date:
+    """Fecha de una fila importada (date o texto ISO 'YYYY-MM-DD')."""
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor))
+
+
+def a_decimal(valor) -> Optional[Decimal]:
+    """Valor numérico comparable con NUMERIC de PostgreSQL (None se conserva)."""
+    if valor is None or isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+def coincide_ilike(texto: Optional[str], patron: str) -> bool:
+    """
+    Equivalente en memoria de `texto ILIKE patron` en PostgreSQL.
+
+    % y _ son comodines y \\ escapa el siguiente carácter. Sin comodines se
+    reduce a una comparación sin distinción de mayúsculas.
+    """
+    if texto is None:
+        return False
+    if not any(c in patron for c in '%_\\'):
+        return texto.lower() == patron.lower()
+    return re.fullmatch(_patron_a_regex(patron), texto, re.IGNORECASE | re.DOTALL) is not None
+
+
+def _patron_a_regex(patron: str) -> str:
+    partes = []
+    escapado = False
+    for c in patron:
+        if escapado:
+            partes.append(re.escape(c))
+            escapado = False
+        elif c == '\\':
+            escapado = True
+        elif c == '%':
+            partes.append('.*')
+        elif c == '_':
+            partes.append('.')
+        else:
+            partes.append(re.escape(c))
+    if escapado:
+        raise ValueError("El patrón LIKE no puede terminar en carácter de escape")
+    return ''.join(partes)
+
+
+class IndiceDuplicados:
+    """
+    Índice en memoria de los movimientos existentes de una cuenta para detectar
+    duplicados al importar un archivo.
+
+    Se construye con una sola consulta (cuenta + rango de fechas del archivo) y
+    responde con la misma semántica que MovimientoRepository.existe_movimiento
+    y obtener_exacto(referencia=None, descripcion=None):
+
+    - Con referencia: misma fecha y referencia (y mismo USD si se indica).
+    - Sin referencia: misma fecha y mismo valor (o USD), y si hay descripción,
+      descripción equivalente (ILIKE).
+    - Coincidencia blanda: misma fecha y mismo valor.
+
+    Los movimientos insertados o actualizados durante la importación se
+    registran con agregar/remover para que las filas siguientes del mismo
+    archivo los vean, igual que cuando cada fila consultaba la base de datos.
+
+    Arquitectura Hexagonal: Pertenece a la capa de Dominio.
+    """
+
+    def __init__(self, movimientos: Iterable[Movimiento] = ()):
+        self._por_referencia: Dict[Tuple[date, str], List[Movimiento]] = {}
+        self._por_valor: Dict[Tuple[date, Decimal], List[Movimiento]] = {}
+        self._por_usd: Dict[Tuple[date, Decimal], List[Movimiento]] = {}
+        # id(movimiento) -> claves con las que quedó indexado
+        self._claves: Dict[int, list] = {}
+        for mov in movimientos:
+            self.agregar(mov)
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def agregar(self, mov: Movimiento) -> None:
+        """Indexa un movimiento (existente o recién insertado)."""
+        fecha = a_fecha(mov.fecha)
+        claves = []
+        if mov.referencia:
+            claves.append((self._por_referencia, (fecha, mov.referencia)))
+        if mov.valor is not None:
+            claves.append((self._por_valor, (fecha, a_decimal(mov.valor))))
+        if mov.usd is not None:
+            claves.append((self._por_usd, (fecha, a_decimal(mov.usd))))
+        for indice, clave in claves:
+            indice.setdefault(clave, []).append(mov)
+        self._claves[id(mov)] = claves
+
+    def remover(self, mov: Movimiento) -> None:
+        """Quita un movimiento del índice (ej. antes de re-indexarlo con datos nuevos)."""
+        for indice, clave in self._claves.pop(id(mov), []):
+            lista = [m for m in indice.get(clave, []) if m is not mov]
+            if lista:
+                indice[clave] = lista
+            else:
+                indice.pop(clave, None)
+
+    def existe(
+        self,
+        fecha,
+        valor,
+        referencia: Optional[str],
+        descripcion: Optional[str] = None,
+        usd=None
+    ) -> bool:
+        """Misma semántica que MovimientoRepository.existe_movimiento para la cuenta indexada."""
+        fecha = a_fecha(fecha)
+        usd = a_decimal(usd)
+
+        if referencia and referencia.strip():
+            candidatos = self._por_referencia.get((fecha, referencia), [])
+            if usd is not None:
+                return any(m.usd is not None and a_decimal(m.usd) == usd for m in candidatos)
+            return bool(candidatos)
+
+        if usd is not None:
+            candidatos = self._por_usd.get((fecha, usd), [])
+        else:
+            candidatos = self._por_valor.get((fecha, a_decimal(valor)), [])
+
+        if descripcion:
+            return any(coincide_ilike(m.descripcion, descripcion) for m in candidatos)
+        return bool(candidatos)
+
+    def coincidencia_blanda(self, fecha, valor) -> Optional[Movimiento]:
+        """Primer movimiento con la misma fecha y valor (obtener_exacto sin referencia ni descripción)."""
+        candidatos = self._por_valor.get((a_fecha(fecha), a_decimal(valor)), [])
+        return candidatos[0] if candidatos else None
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import threading
+
+from src.domain.models.configuracion_matching import ConfiguracionMatching
+from src.domain.models.movimiento import Movimiento
+from src.domain.models.movimiento_extracto import MovimientoExtracto
+
+
+# Ventana de fechas en la que un movimiento del sistema es candidato de un extracto (±días)
+VENTANA_DIAS = 1
+
+
+def huella_extracto(mov: MovimientoExtracto) -> tuple:
+    """Entradas de una fila del extracto que afectan su score (la fecha va primero)."""
+    return (mov.fecha.toordinal(), mov.valor, mov.usd, mov.descripcion)
+
+
+def huella_sistema(mov: Movimiento) -> tuple:
+    """Entradas de un movimiento del sistema que afectan su score (la fecha va primero)."""
+    return (mov.fecha.toordinal(), mov.valor, mov.usd, mov.descripcion)
+
+
+def huella_parametros(config: ConfiguracionMatching, aliases: List['MatchingAlias']) -> tuple:
+    """Parámetros globales del matching: configuración activa y reglas de alias."""
+    return (
+        config.tolerancia_valor,
+        config.similitud_descripcion_minima,
+        config.peso_fecha,
+        config.peso_valor,
+        config.peso_descripcion,
+        config.score_minimo_exacto,
+        config.score_minimo_probable,
+        config.modo_asignacion,
+        tuple((alias.patron, alias.reemplazo) for alias in aliases),
+    )
+
+
+@dataclass
+class InstantaneaMatching:
+    """
+    Estado de las entradas de la última ejecución de matching de un periodo.
+
+    Solo guarda lo necesario para saber qué cambió: las filas del extracto que
+    quedaron SIN_MATCH y los movimientos del sistema que quedaron disponibles,
+    cada uno con su huella. Las filas vinculadas (OK/PROBABLE) se persisten y
+    dejan de estar pendientes, así que no hace falta recordarlas.
+    """
+    huella_parametros: tuple
+    pendientes: Dict[int, tuple] = field(default_factory=dict)
+    disponibles: Dict[int, tuple] = field(default_factory=dict)
+    recalculados: int = 0
+
+
+def filas_afectadas(
+    previa: Optional[InstantaneaMatching],
+    parametros: tuple,
+    huellas_extracto: Dict[int, tuple],
+    huellas_sistema: Dict[int, tuple]
+) -> Set[int]:
+    """
+    Determina qué filas pendientes del extracto deben volver a calificarse.
+
+    Una fila que quedó SIN_MATCH solo puede cambiar de resultado si cambian sus
+    propias entradas o los movimientos disponibles dentro de su ventana de
+    fechas (aparece uno nuevo, se libera uno vinculado o se modifica). Con menos
+    o los mismos candidatos su mejor score no puede subir, así que el resto se
+    conserva como SIN_MATCH sin recalcular.
+
+    Args:
+        previa: Instantánea de la ejecución anterior (None = primera vez)
+        parametros: huella_parametros actual
+        huellas_extracto: id -> huella de las filas pendientes actuales
+        huellas_sistema: id -> huella de los movimientos disponibles actuales
+
+    Returns:
+        IDs de las filas del extracto a recalcular
+    """
+    if previa is None or previa.huella_parametros != parametros:
+        return set(huellas_extracto)
+
+    # Fechas (ordinales) donde cambió el conjunto de movimientos disponibles
+    fechas_cambiadas: Set[int] = set()
+    for sistema_id in previa.disponibles.keys() | huellas_sistema.keys():
+        anterior = previa.disponibles.get(sistema_id)
+        actual = huellas_sistema.get(sistema_id)
+        if anterior != actual:
+            if anterior is not None:
+                fechas_cambiadas.add(anterior[0])
+            if actual is not None:
+                fechas_cambiadas.add(actual[0])
+
+    afectadas = set()
+    for extracto_id, huella in huellas_extracto.items():
+        if extracto_id is None or previa.pendientes.get(extracto_id) != huella:
+            afectadas.add(extracto_id)
+            continue
+        ordinal = huella[0]
+        if any(ordinal + delta in fechas_cambiadas for delta in range(-VENTANA_DIAS, VENTANA_DIAS + 1)):
+            afectadas.add(extracto_id)
+
+    return afectadas
+
+
+class RegistroInstantaneas:
+    """
+    Registro en memoria (LRU, thread-safe) de la última instantánea por periodo.
+
+    Si se pierde (reinicio o expulsión) el periodo simplemente se recalcula completo.
+    """
+
+    def __init__(self, max_periodos: int = 256):
+        self.max_periodos = max_periodos
+        self._instantaneas: 'OrderedDict[Hashable, InstantaneaMatching]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable) -> Optional[InstantaneaMatching]:
+        with self._lock:
+            instantanea = self._instantaneas.get(clave)
+            if instantanea is not None:
+                self._instantaneas.move_to_end(clave)
+            return instantanea
+
+    def guardar(self, clave: Hashable, instantanea: InstantaneaMatching) -> None:
+        with self._lock:
+            self._instantaneas[clave] = instantanea
+            self._instantaneas.move_to_end(clave)
+            while len(self._instantaneas) > self.max_periodos:
+                self._instantaneas.popitem(last=False)
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._instantaneas.pop(clave, None)
@@ -2,11 +2,21 @@ from typing import List, Optional, Tuple
 from decimal import Decimal
 from datetime import date
 from difflib import SequenceMatcher
+import time
 
 from src.domain.models.movimiento_extracto import MovimientoExtracto
 from src.domain.models.movimiento import Movimiento
 from src.domain.models.movimiento_match import MovimientoMatch, MatchEstado
-from src.domain.models.configuracion_matching import ConfiguracionMatching
+from src.domain.models.configuracion_matching import ConfiguracionMatching, ModoAsignacion
+from src.domain.models.match_grupo import MatchGrupo
+from src.domain.services.indice_candidatos import IndiceCandidatos
+from src.domain.services.asignacion_optima import resolver_asignacion_maxima
+from src.domain.services.puntaje_entero import EvaluadorEntero
+from src.domain.services.suma_subconjuntos import buscar_subconjunto
+from src.domain.services.matching_incremental import (
+    InstantaneaMatching, filas_afectadas, huella_extracto, huella_sistema, huella_parametros
+)
+from src.domain.services.similitud_descripcion import ComparadorDescripciones, proyectar_descripcion, normalizar_descripcion
 
 
 class MatchingService:
@@ -18,6 +28,18 @@ class MatchingService:
     Contiene lógica de negocio pura, sin dependencias de infraestructura.
     """
     
+    # Límites del modo OPTIMO para mantener el tiempo acotado en periodos grandes
+    MAX_CELDAS_COMPONENTE_OPTIMO = 40_000
+    TIEMPO_LIMITE_OPTIMO_SEGUNDOS = 5.0
+    
+    # Límites de la etapa de grupos (pagos divididos)
+    VENTANA_DIAS_GRUPO = 3
+    MAX_ELEMENTOS_GRUPO = 4
+    MAX_CANDIDATOS_GRUPO = 24
+    MAX_COMBINACIONES_GRUPO = 20_000
+    TIEMPO_LIMITE_GRUPOS_SEGUNDOS = 2.0
+    TOLERANCIA_CENTAVOS_GRUPO = 0
+
     def ejecutar_matching(
         self,
         movs_extracto: List[MovimientoExtracto],
@@ -29,6 +51,10 @@ class MatchingService:
         """
         Ejecuta el algoritmo de matching completo.
         
+        El motor de asignación depende de config.modo_asignacion:
+        - GREEDY: en orden del extracto, cada fila toma su mejor candidato disponible.
+        - OPTIMO: asignación 1-a-1 que maximiza la suma de scores del periodo.
+        
         Args:
             movs_extracto: Movimientos del extracto bancario
             movs_sistema: Movimientos del sistema
@@ -39,99 +65,44 @@ class MatchingService:
         Returns:
             Lista de MovimientoMatch con estados y scores asignados
         """
-        resultados: List[MovimientoMatch] = []
-        movs_sistema_disponibles = movs_sistema.copy()
+        # Descripciones normalizadas y proyectadas con aliases una sola vez por ejecución
+        comparador = ComparadorDescripciones(aliases)
         
-        # Pre-procesar aliases para búsqueda rápida si es necesario
-        # Pero como son pocos por cuenta, iteración directa está bien.
-        aliases = aliases or []
+        if config.modo_asignacion == ModoAsignacion.OPTIMO:
+            return self._ejecutar_matching_optimo(movs_extracto, movs_sistema, config, comparador)
+        
+        resultados: List[MovimientoMatch] = []
+        # Índice por fecha: cada extracto solo consulta los días vecinos
+        indice_disponibles = IndiceCandidatos(movs_sistema)
+        # Ruta rápida en enteros (None si algún monto no es exacto a centavos)
+        evaluador = EvaluadorEntero.crear(config, movs_extracto + movs_sistema)
         
         for mov_extracto in movs_extracto:
             # Buscar candidatos en sistema (mismo día o cercano)
             candidatos = self._buscar_candidatos(
                 mov_extracto, 
-                movs_sistema_disponibles,
+                indice_disponibles,
                 config
             )
             
             if not candidatos:
                 # Sin candidatos: SIN_MATCH directamente
-                
-                estado = MatchEstado.SIN_MATCH
-                
-                match = MovimientoMatch(
-                    mov_extracto=mov_extracto,
-                    mov_sistema=None,
-                    estado=estado,
-                    score_total=Decimal('0.00'),
-                    score_fecha=Decimal('0.00'),
-                    score_valor=Decimal('0.00'),
-                    score_descripcion=Decimal('0.00')
-                )
-                resultados.append(match)
+                resultados.append(self._crear_sin_match(mov_extracto))
                 continue
             
             # Calcular scores para cada candidato
-            mejor_match = None
-            mejor_score = Decimal('0.00')
-            
-            for mov_sistema in candidatos:
-                score_fecha = self.calcular_score_fecha(
-                    mov_extracto.fecha, 
-                    mov_sistema.fecha
+            if evaluador:
+                mejor_match = self._mejor_candidato_entero(
+                    mov_extracto, candidatos, config, comparador, evaluador
                 )
-                
-                # REGLA PARA USD: Si ambos tienen USD, priorizamos USD para el score_valor
-                # En cuentas USD, el valor COP puede ser 0 o inconsistente por TRM.
-                val1 = mov_extracto.valor
-                val2 = mov_sistema.valor
-                tolerancia = config.tolerancia_valor
-
-                if mov_extracto.usd is not None and mov_sistema.usd is not None:
-                    val1 = mov_extracto.usd
-                    val2 = mov_sistema.usd
-                    # Si comparamos USD, una tolerancia de pesos (ej: 500) es muy alta.
-                    # Usamos una tolerancia técnica mínima para USD (ej: 0.01) si la proporcionada es mayor.
-                    if tolerancia > Decimal('1.00'):
-                        tolerancia = Decimal('0.01')
-
-                score_valor = self.calcular_score_valor(
-                    val1,
-                    val2,
-                    tolerancia
-                )
-                
-                score_descripcion = self.calcular_score_descripcion(
-                    mov_extracto.descripcion,
-                    mov_sistema.descripcion,
-                    aliases
-                )
-                
-                # Calcular score total ponderado
-                score_total = config.calcular_score_ponderado(
-                    score_fecha,
-                    score_valor,
-                    score_descripcion
+            else:
+                mejor_match = self._mejor_candidato_decimal(
+                    mov_extracto, candidatos, config, comparador
                 )
-
-                # ELEGANT MATCHING RULE: Strong Identity Match
-                # If Date and Value are identical (score 1.0), but description differs,
-                # we treat it as a strong PROBABLE match.
-                if score_fecha == Decimal('1.00') and score_valor == Decimal('1.00'):
-                    # Force score to be high enough to be PROBABLE (e.g. 0.85 or based on config)
-                    # Using 0.85 as a safe default for "High Probability"
-                    min_probable = Decimal('0.85')
-                    if score_total < min_probable:
-                        score_total = min_probable
-                
-                # Guardar si es el mejor hasta ahora
-                if score_total > mejor_score:
-                    mejor_score = score_total
-                    mejor_match = (mov_sistema, score_fecha, score_valor, score_descripcion)
             
             # Determinar estado basado en score
-            if mejor_match and mejor_score >= config.similitud_descripcion_minima:
-                mov_sistema, score_fecha, score_valor, score_descripcion = mejor_match
+            if mejor_match and mejor_match[1] >= config.similitud_descripcion_minima:
+                mov_sistema, mejor_score, score_fecha, score_valor, score_descripcion = mejor_match
                 
                 estado = self._determinar_estado_match(mejor_score, config)
                 
@@ -148,27 +119,459 @@ class MatchingService:
                 # Remover de disponibles si ya fue vinculado (auto-vincular OK o Sugerencia PROBABLE)
                 # Esto garantiza la integridad 1-a-1 desde el algoritmo
                 if estado in [MatchEstado.OK, MatchEstado.PROBABLE]:
-                    movs_sistema_disponibles.remove(mov_sistema)
+                    indice_disponibles.remover(mov_sistema)
                 
                 resultados.append(match)
             else:
                 # Score muy bajo: SIN_MATCH
+                resultados.append(self._crear_sin_match(mov_extracto))
+        
+        return resultados
+    
+    def ejecutar_matching_incremental(
+        self,
+        movs_extracto: List[MovimientoExtracto],
+        movs_sistema: List[Movimiento],
+        config: ConfiguracionMatching,
+        aliases: Optional[List['MatchingAlias']] = None,
+        previa: Optional[InstantaneaMatching] = None
+    ) -> Tuple[List[MovimientoMatch], InstantaneaMatching]:
+        """
+        Ejecuta el matching recalculando solo las filas cuyas entradas cambiaron.
+
+        Compara las huellas de las filas pendientes y de los movimientos
+        disponibles contra la instantánea de la ejecución anterior. Las filas que
+        quedaron SIN_MATCH y cuyos datos y ventana de fechas no cambiaron se
+        devuelven como SIN_MATCH sin calcular scores. Si cambió la configuración
+        o los aliases (o no hay instantánea) se recalcula todo.
+
+        Args:
+            movs_extracto: Movimientos del extracto pendientes de vincular
+            movs_sistema: Movimientos del sistema disponibles
+            config: Configuración de parámetros del algoritmo
+            aliases: Lista de reglas de normalización (alias)
+            previa: Instantánea de la ejecución anterior del mismo periodo
+
+        Returns:
+            Tupla (matches en el orden de movs_extracto, nueva instantánea)
+        """
+        aliases = aliases or []
+        parametros = huella_parametros(config, aliases)
+        huellas_extracto = {m.id: huella_extracto(m) for m in movs_extracto}
+        huellas_sistema = {m.id: huella_sistema(m) for m in movs_sistema}
+
+        afectadas = filas_afectadas(previa, parametros, huellas_extracto, huellas_sistema)
+        a_recalcular = [m for m in movs_extracto if m.id in afectadas]
+
+        recalculados = {}
+        if a_recalcular:
+            matches = self.ejecutar_matching(a_recalcular, movs_sistema, config, aliases=aliases)
+            recalculados = {id(m.mov_extracto): m for m in matches}
+
+        resultados = [
+            recalculados.get(id(mov)) or self._crear_sin_match(mov)
+            for mov in movs_extracto
+        ]
+
+        vinculados = [m for m in resultados if m.estado in [MatchEstado.OK, MatchEstado.PROBABLE]]
+        usados = {id(m.mov_sistema) for m in vinculados}
+        extractos_vinculados = {id(m.mov_extracto) for m in vinculados}
+        instantanea = InstantaneaMatching(
+            huella_parametros=parametros,
+            pendientes={
+                m.id: huellas_extracto[m.id] for m in movs_extracto
+                if id(m) not in extractos_vinculados
+            },
+            disponibles={
+                m.id: huellas_sistema[m.id] for m in movs_sistema
+                if id(m) not in usados
+            },
+            recalculados=len(a_recalcular)
+        )
+
+        return resultados, instantanea
+
+    def detectar_grupos(
+        self,
+        movs_extracto: List[MovimientoExtracto],
+        movs_sistema: List[Movimiento],
+        config: ConfiguracionMatching
+    ) -> List[MatchGrupo]:
+        """
+        Etapa posterior al matching 1-a-1: explica sobrantes como sumas (pagos divididos).
+        
+        Primero intenta explicar cada fila del extracto como la suma de 2..k
+        movimientos del sistema dentro de la ventana de fechas (1 a muchos) y
+        luego cada movimiento del sistema restante como la suma de 2..k filas
+        del extracto (muchos a 1). Cada movimiento participa en un solo grupo.
+        
+        La búsqueda está acotada por candidatos, combinaciones y tiempo total
+        (ver constantes *_GRUPO), así que nunca escala sin control.
+        
+        Args:
+            movs_extracto: Filas del extracto que quedaron SIN_MATCH
+            movs_sistema: Movimientos del sistema que quedaron disponibles
+            config: Configuración activa
+        
+        Returns:
+            Lista de MatchGrupo encontrados
+        """
+        limite = time.perf_counter() + self.TIEMPO_LIMITE_GRUPOS_SEGUNDOS
+        grupos: List[MatchGrupo] = []
+        
+        # 1 a muchos: un extracto = suma de varios movimientos del sistema
+        indice_sistema = IndiceCandidatos(movs_sistema, ventana_dias=self.VENTANA_DIAS_GRUPO)
+        extractos_restantes = []
+        for mov_extracto in movs_extracto:
+            partes = None
+            if time.perf_counter() < limite:
+                partes = self._buscar_partes(
+                    mov_extracto, indice_sistema.candidatos(mov_extracto.fecha), config, limite
+                )
+            if partes:
+                for mov in partes:
+                    indice_sistema.remover(mov)
+                grupos.append(self._crear_grupo([mov_extracto], partes))
+            else:
+                extractos_restantes.append(mov_extracto)
+        
+        # Muchos a 1: un movimiento del sistema = suma de varias filas del extracto
+        indice_extracto = IndiceCandidatos(extractos_restantes, ventana_dias=self.VENTANA_DIAS_GRUPO)
+        for mov_sistema in indice_sistema.disponibles():
+            if time.perf_counter() >= limite:
+                break
+            partes = self._buscar_partes(
+                mov_sistema, indice_extracto.candidatos(mov_sistema.fecha), config, limite
+            )
+            if partes:
+                for mov in partes:
+                    indice_extracto.remover(mov)
+                grupos.append(self._crear_grupo(partes, [mov_sistema]))
+        
+        return grupos
+    
+    def _buscar_partes(self, objetivo, candidatos: list, config: ConfiguracionMatching, limite: float) -> Optional[list]:
+        """
+        Busca entre los candidatos 2..k movimientos cuya suma iguale al objetivo.
+        
+        Solo considera candidatos del mismo signo y menores que el objetivo, en
+        la misma moneda de comparación (USD si el objetivo tiene USD, como en el
+        matching 1-a-1), priorizando los más cercanos en fecha. La suma debe ser
+        exacta (TOLERANCIA_CENTAVOS_GRUPO): con varias partes, una tolerancia
+        como la del 1-a-1 produce coincidencias por azar.
+        """
+        en_usd = objetivo.usd is not None
+        
+        monto_objetivo = self._monto_centavos(objetivo, en_usd)
+        if not monto_objetivo:
+            return None
+        signo = 1 if monto_objetivo > 0 else -1
+        monto_objetivo *= signo
+        
+        utiles = []
+        for posicion, candidato in enumerate(candidatos):
+            monto = self._monto_centavos(candidato, en_usd)
+            if monto is None or monto * signo <= 0 or monto * signo > monto_objetivo:
+                continue
+            distancia = abs((candidato.fecha - objetivo.fecha).days)
+            utiles.append((distancia, posicion, monto * signo, candidato))
+        utiles.sort(key=lambda c: (c[0], c[1]))
+        utiles = utiles[:self.MAX_CANDIDATOS_GRUPO]
+        
+        indices = buscar_subconjunto(
+            monto_objetivo,
+            [c[2] for c in utiles],
+            min_elementos=2,
+            max_elementos=self.MAX_ELEMENTOS_GRUPO,
+            tolerancia=self.TOLERANCIA_CENTAVOS_GRUPO,
+            max_combinaciones=self.MAX_COMBINACIONES_GRUPO,
+            limite=limite
+        )
+        if indices is None:
+            return None
+        # Partes en el orden original de entrada
+        return [c[3] for c in sorted((utiles[i] for i in indices), key=lambda c: c[1])]
+    
+    def _monto_centavos(self, mov, en_usd: bool) -> Optional[int]:
+        """Monto del movimiento en centavos (USD o valor); None si no aplica o no es exacto."""
+        monto = mov.usd if en_usd else mov.valor
+        if monto is None:
+            return None
+        centavos = monto * 100
+        if centavos != centavos.to_integral_value():
+            return None
+        return int(centavos)
+    
+    def _crear_grupo(self, movs_extracto: list, movs_sistema: list) -> MatchGrupo:
+        """Construye el MatchGrupo con la diferencia entre ambas sumas (en USD si todos lo tienen)."""
+        en_usd = all(m.usd is not None for m in movs_extracto + movs_sistema)
+        monto = (lambda m: m.usd) if en_usd else (lambda m: m.valor)
+        return MatchGrupo(
+            movs_extracto=movs_extracto,
+            movs_sistema=movs_sistema,
+            diferencia=sum(monto(m) for m in movs_extracto) - sum(monto(m) for m in movs_sistema)
+        )
+    
+    def _mejor_candidato_decimal(
+        self,
+        mov_extracto: MovimientoExtracto,
+        candidatos: List[Movimiento],
+        config: ConfiguracionMatching,
+        comparador: ComparadorDescripciones
+    ) -> Optional[Tuple[Movimiento, Decimal, Decimal, Decimal, Decimal]]:
+        """
+        Elige el mejor candidato calculando los scores con Decimal.
+        
+        Returns:
+            Tupla (mov_sistema, score_total, score_fecha, score_valor, score_descripcion)
+            o None si ningún candidato supera score 0
+        """
+        mejor_match = None
+        mejor_score = Decimal('0.00')
+        esperada = comparador.proyectar(mov_extracto.descripcion)
+        
+        for mov_sistema in candidatos:
+            descripcion = comparador.centesimas(esperada, comparador.normalizar(mov_sistema.descripcion))
+            evaluacion = self._evaluar_candidato(
+                mov_extracto, mov_sistema, config, comparador.aliases, descripcion
+            )
+            
+            # Guardar si es el mejor hasta ahora
+            if evaluacion[0] > mejor_score:
+                mejor_score = evaluacion[0]
+                mejor_match = (mov_sistema,) + evaluacion
+        
+        return mejor_match
+    
+    def _mejor_candidato_entero(
+        self,
+        mov_extracto: MovimientoExtracto,
+        candidatos: List[Movimiento],
+        config: ConfiguracionMatching,
+        comparador: ComparadorDescripciones,
+        evaluador: EvaluadorEntero
+    ) -> Optional[Tuple[Movimiento, Decimal, Decimal, Decimal, Decimal]]:
+        """
+        Elige el mejor candidato comparando scores como enteros exactos.
+        
+        Produce el mismo resultado que _mejor_candidato_decimal: en un empate
+        exacto con score de valor fraccional se desempata con los Decimal, que
+        es lo que decidiría la ruta original. Los Decimal del ganador se
+        construyen una sola vez al final.
+        
+        Una vez hay un mejor candidato, los pares cuya cota superior de
+        descripción no alcanza su score se descartan sin calcular el ratio.
+        """
+        aliases = comparador.aliases
+        esperada = comparador.proyectar(mov_extracto.descripcion)
+        mejor = None
+        mejor_total = 0
+        mejor_fraccional = False
+        mejor_descripcion = 0
+        
+        for mov_sistema in candidatos:
+            alcanza = None
+            if mejor is not None:
+                def alcanza(cota, mov_sistema=mov_sistema, minimo=mejor_total):
+                    return evaluador.evaluar(mov_extracto, mov_sistema, cota)[0] >= minimo
+            
+            descripcion = comparador.centesimas_acotadas(
+                esperada,
+                comparador.normalizar(mov_sistema.descripcion),
+                alcanza
+            )
+            if descripcion is None:
+                continue
+            
+            total, fraccional = evaluador.evaluar(mov_extracto, mov_sistema, descripcion)
+            
+            if total > mejor_total:
+                reemplazar = True
+            elif total == mejor_total and mejor is not None and (fraccional or mejor_fraccional):
+                nuevo = self._evaluar_candidato(mov_extracto, mov_sistema, config, aliases, descripcion)
+                actual = self._evaluar_candidato(mov_extracto, mejor, config, aliases, mejor_descripcion)
+                reemplazar = nuevo[0] > actual[0]
+            else:
+                reemplazar = False
+            
+            if reemplazar:
+                mejor = mov_sistema
+                mejor_total = total
+                mejor_fraccional = fraccional
+                mejor_descripcion = descripcion
+        
+        if mejor is None:
+            return None
+        
+        return (mejor,) + self._evaluar_candidato(mov_extracto, mejor, config, aliases, mejor_descripcion)
+    
+    def _ejecutar_matching_optimo(
+        self,
+        movs_extracto: List[MovimientoExtracto],
+        movs_sistema: List[Movimiento],
+        config: ConfiguracionMatching,
+        comparador: ComparadorDescripciones
+    ) -> List[MovimientoMatch]:
+        """
+        Matching con asignación global 1-a-1 de score máximo.
+        
+        Construye una matriz dispersa de scores con los candidatos del índice por
+        fecha, descarta los pares que no alcanzarían a ser OK/PROBABLE y resuelve
+        la asignación de peso máximo sobre los pares restantes.
+        
+        Returns:
+            Lista de MovimientoMatch en el mismo orden de movs_extracto
+        """
+        indice = IndiceCandidatos(movs_sistema)
+        posicion_sistema = {id(m): j for j, m in enumerate(movs_sistema)}
+        umbral = max(config.similitud_descripcion_minima, config.score_minimo_probable)
+        evaluador = EvaluadorEntero.crear(config, movs_extracto + movs_sistema)
+        umbral_entero = evaluador.umbral(umbral) if evaluador else None
+        aliases = comparador.aliases
+        
+        aristas = []
+        descripciones = {}
+        for i, mov_extracto in enumerate(movs_extracto):
+            esperada = comparador.proyectar(mov_extracto.descripcion)
+            for mov_sistema in self._buscar_candidatos(mov_extracto, indice, config):
+                alcanza = None
+                if evaluador:
+                    def alcanza(cota, mov_extracto=mov_extracto, mov_sistema=mov_sistema):
+                        return evaluador.evaluar(mov_extracto, mov_sistema, cota)[0] >= umbral_entero
                 
-                estado = MatchEstado.SIN_MATCH
-                
-                match = MovimientoMatch(
-                    mov_extracto=mov_extracto,
-                    mov_sistema=None,
-                    estado=estado,
-                    score_total=Decimal('0.00'),
-                    score_fecha=Decimal('0.00'),
-                    score_valor=Decimal('0.00'),
-                    score_descripcion=Decimal('0.00')
+                descripcion = comparador.centesimas_acotadas(
+                    esperada,
+                    comparador.normalizar(mov_sistema.descripcion),
+                    alcanza
                 )
-                resultados.append(match)
+                if descripcion is None:
+                    continue
+                if evaluador:
+                    peso, _ = evaluador.evaluar(mov_extracto, mov_sistema, descripcion)
+                    if peso < umbral_entero:
+                        continue
+                else:
+                    score_total = self._evaluar_candidato(
+                        mov_extracto, mov_sistema, config, aliases, descripcion
+                    )[0]
+                    if score_total < umbral:
+                        continue
+                    # Peso entero (score en puntos básicos)
+                    peso = int(score_total * 10000)
+                j = posicion_sistema[id(mov_sistema)]
+                aristas.append((i, j, peso))
+                descripciones[(i, j)] = descripcion
+        
+        asignacion = resolver_asignacion_maxima(
+            aristas,
+            max_celdas_componente=self.MAX_CELDAS_COMPONENTE_OPTIMO,
+            tiempo_limite=self.TIEMPO_LIMITE_OPTIMO_SEGUNDOS
+        )
+        
+        resultados: List[MovimientoMatch] = []
+        for i, mov_extracto in enumerate(movs_extracto):
+            j = asignacion.get(i)
+            if j is None:
+                resultados.append(self._crear_sin_match(mov_extracto))
+                continue
+            
+            score_total, score_fecha, score_valor, score_descripcion = self._evaluar_candidato(
+                mov_extracto, movs_sistema[j], config, aliases, descripciones[(i, j)]
+            )
+            resultados.append(MovimientoMatch(
+                mov_extracto=mov_extracto,
+                mov_sistema=movs_sistema[j],
+                estado=self._determinar_estado_match(score_total, config),
+                score_total=score_total,
+                score_fecha=score_fecha,
+                score_valor=score_valor,
+                score_descripcion=score_descripcion
+            ))
         
         return resultados
     
+    def _evaluar_candidato(
+        self,
+        mov_extracto: MovimientoExtracto,
+        mov_sistema: Movimiento,
+        config: ConfiguracionMatching,
+        aliases: List['MatchingAlias'],
+        descripcion_centesimas: Optional[int] = None
+    ) -> Tuple[Decimal, Decimal, Decimal, Decimal]:
+        """
+        Calcula los scores de un par extracto/sistema.
+        
+        Args:
+            descripcion_centesimas: Score de descripción ya calculado (evita recalcularlo)
+        
+        Returns:
+            Tupla (score_total, score_fecha, score_valor, score_descripcion)
+        """
+        score_fecha = self.calcular_score_fecha(
+            mov_extracto.fecha, 
+            mov_sistema.fecha
+        )
+        
+        # REGLA PARA USD: Si ambos tienen USD, priorizamos USD para el score_valor
+        # En cuentas USD, el valor COP puede ser 0 o inconsistente por TRM.
+        val1 = mov_extracto.valor
+        val2 = mov_sistema.valor
+        tolerancia = config.tolerancia_valor
+
+        if mov_extracto.usd is not None and mov_sistema.usd is not None:
+            val1 = mov_extracto.usd
+            val2 = mov_sistema.usd
+            # Si comparamos USD, una tolerancia de pesos (ej: 500) es muy alta.
+            # Usamos una tolerancia técnica mínima para USD (ej: 0.01) si la proporcionada es mayor.
+            if tolerancia > Decimal('1.00'):
+                tolerancia = Decimal('0.01')
+
+        score_valor = self.calcular_score_valor(
+            val1,
+            val2,
+            tolerancia
+        )
+        
+        if descripcion_centesimas is not None:
+            score_descripcion = Decimal(descripcion_centesimas) / 100
+        else:
+            score_descripcion = self.calcular_score_descripcion(
+                mov_extracto.descripcion,
+                mov_sistema.descripcion,
+                aliases
+            )
+        
+        # Calcular score total ponderado
+        score_total = config.calcular_score_ponderado(
+            score_fecha,
+            score_valor,
+            score_descripcion
+        )
+
+        # ELEGANT MATCHING RULE: Strong Identity Match
+        # If Date and Value are identical (score 1.0), but description differs,
+        # we treat it as a strong PROBABLE match.
+        if score_fecha == Decimal('1.00') and score_valor == Decimal('1.00'):
+            # Force score to be high enough to be PROBABLE (e.g. 0.85 or based on config)
+            # Using 0.85 as a safe default for "High Probability"
+            min_probable = Decimal('0.85')
+            if score_total < min_probable:
+                score_total = min_probable
+        
+        return score_total, score_fecha, score_valor, score_descripcion
+    
+    def _crear_sin_match(self, mov_extracto: MovimientoExtracto) -> MovimientoMatch:
+        """Crea un resultado SIN_MATCH con scores en cero."""
+        return MovimientoMatch(
+            mov_extracto=mov_extracto,
+            mov_sistema=None,
+            estado=MatchEstado.SIN_MATCH,
+            score_total=Decimal('0.00'),
+            score_fecha=Decimal('0.00'),
+            score_valor=Decimal('0.00'),
+            score_descripcion=Decimal('0.00')
+        )
+    
     def calcular_score_fecha(self, fecha1: date, fecha2: date) -> Decimal:
         """
         Calcula score de coincidencia de fecha.
@@ -236,20 +639,9 @@ class MatchingService:
         if not desc1 or not desc2:
             return Decimal('0.00')
         
-        # Normalizar textos base
-        desc1_norm = desc1.upper().strip()  # EXTRACTO
-        desc2_norm = desc2.upper().strip()  # SISTEMA
-        
         # Aplicar reglas SOLO al Extracto para proyectar lo que "Debería decir el Sistema"
-        desc_esperada_sistema = desc1_norm
-        
-        if aliases:
-            for alias in aliases:
-                # El patrón del alias (ej. "ADICION") se busca en el Extracto
-                if alias.patron in desc1_norm:
-                    # Se reemplaza por el texto del Sistema (ej. "TRASLADO DESDE CUENTA")
-                    # Usamos replace para permitir coincidencias parciales si el patrón es solo una parte
-                    desc_esperada_sistema = desc1_norm.replace(alias.patron, alias.reemplazo)
+        desc_esperada_sistema = proyectar_descripcion(normalizar_descripcion(desc1), aliases)
+        desc2_norm = normalizar_descripcion(desc2)  # SISTEMA
         
         # Usar SequenceMatcher para comparar lo que ESPERAMOS vs lo que TENEMOS
         similitud = SequenceMatcher(None, desc_esperada_sistema, desc2_norm).ratio()
@@ -259,32 +651,24 @@ class MatchingService:
     def _buscar_candidatos(
         self,
         mov_extracto: MovimientoExtracto,
-        movs_sistema: List[Movimiento],
+        indice: IndiceCandidatos,
         config: ConfiguracionMatching
     ) -> List[Movimiento]:
         """
         Busca candidatos en sistema para un movimiento del extracto.
         
-        Filtra por fecha (mismo día o ±1 día) para optimizar.
+        Filtra por fecha (mismo día o ±1 día) consultando solo los buckets
+        vecinos del índice, en lugar de recorrer todos los disponibles.
         
         Args:
             mov_extracto: Movimiento del extracto
-            movs_sistema: Lista de movimientos del sistema disponibles
+            indice: Índice de movimientos del sistema disponibles
             config: Configuración
         
         Returns:
-            Lista de candidatos potenciales
+            Lista de candidatos potenciales (en el orden original de entrada)
         """
-        candidatos = []
-        
-        for mov_sistema in movs_sistema:
-            # Filtro por fecha: mismo día o ±1 día
-            diferencia_dias = abs((mov_extracto.fecha - mov_sistema.fecha).days)
-            
-            if diferencia_dias <= 1:  # Mismo día o adyacente
-                candidatos.append(mov_sistema)
-        
-        return candidatos
+        return indice.candidatos(mov_extracto.fecha, ventana_dias=1)
     
     def _determinar_estado_match(
         self, 
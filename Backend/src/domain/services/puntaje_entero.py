@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, Optional, Tuple
+from decimal import Decimal
+
+from src.domain.models.configuracion_matching import ConfiguracionMatching
+
+
+# Movimiento preparado: (ordinal de fecha, valor en centavos, usd en centavos o None)
+Preparado = Tuple[int, int, Optional[int]]
+
+# Piso de la regla "Strong Identity Match" (misma fecha y mismo valor)
+PISO_IDENTIDAD_CENTESIMAS = 85
+
+
+def _a_entero(valor: Decimal, escala: int) -> Optional[int]:
+    """Escala un Decimal a entero; None si se perdería precisión."""
+    escalado = valor * escala
+    if escalado != escalado.to_integral_value():
+        return None
+    return int(escalado)
+
+
+class EvaluadorEntero:
+    """
+    Ruta rápida del scoring de matching sobre enteros.
+
+    Los valores se manejan en centavos, los pesos y el score de descripción en
+    centésimas y las fechas como ordinales. Todos los scores totales de un
+    periodo comparten el denominador 10000·T (T = tolerancia en centavos), así
+    que se comparan como enteros exactos sin crear objetos Decimal por par.
+    Los Decimal solo se construyen al emitir el MovimientoMatch.
+
+    Solo se usa cuando todos los montos, pesos y la tolerancia son exactos a
+    dos decimales; en otro caso crear() retorna None y se usa la ruta Decimal.
+    """
+
+    def __init__(
+        self,
+        peso_fecha: int,
+        peso_valor: int,
+        peso_descripcion: int,
+        tolerancia: int,
+        preparados: Dict[int, Preparado]
+    ):
+        self.peso_fecha = peso_fecha
+        self.peso_valor = peso_valor
+        self.peso_descripcion = peso_descripcion
+        self.tolerancia = tolerancia
+        # Para USD se usa una tolerancia técnica de 0.01 si la configurada es mayor a 1.00
+        self.tolerancia_usd = 1 if tolerancia > 100 else tolerancia
+        # Denominador común: 10000 · T (T mínimo 1 para tolerancia cero)
+        self.escala_valor = tolerancia if tolerancia > 0 else 1
+        self.denominador = 10000 * self.escala_valor
+        self.piso_identidad = PISO_IDENTIDAD_CENTESIMAS * 100 * self.escala_valor
+        self._preparados = preparados
+
+    @classmethod
+    def crear(
+        cls,
+        config: ConfiguracionMatching,
+        movimientos: Iterable
+    ) -> Optional['EvaluadorEntero']:
+        """
+        Construye el evaluador si todos los datos son representables en enteros.
+
+        Args:
+            config: Configuración activa
+            movimientos: Movimientos de extracto y sistema del periodo
+
+        Returns:
+            EvaluadorEntero o None si algún dato no es exacto a dos decimales
+        """
+        pesos = [
+            _a_entero(config.peso_fecha, 100),
+            _a_entero(config.peso_valor, 100),
+            _a_entero(config.peso_descripcion, 100),
+        ]
+        tolerancia = _a_entero(config.tolerancia_valor, 100)
+        if tolerancia is None or any(p is None for p in pesos):
+            return None
+
+        preparados: Dict[int, Preparado] = {}
+        for mov in movimientos:
+            centavos = _a_entero(mov.valor, 100)
+            usd = _a_entero(mov.usd, 100) if mov.usd is not None else None
+            if centavos is None or (mov.usd is not None and usd is None):
+                return None
+            preparados[id(mov)] = (mov.fecha.toordinal(), centavos, usd)
+
+        return cls(pesos[0], pesos[1], pesos[2], tolerancia, preparados)
+
+    def umbral(self, score: Decimal) -> int:
+        """Convierte un umbral Decimal (0.00 a 1.00) al numerador entero equivalente (redondeo hacia arriba)."""
+        escalado = score * self.denominador
+        entero = int(escalado)
+        return entero + 1 if escalado > entero else entero
+
+    def evaluar(self, mov_extracto, mov_sistema, descripcion_centesimas: int) -> Tuple[int, bool]:
+        """
+        Calcula el numerador del score total ponderado de un par.
+
+        Args:
+            mov_extracto: Movimiento del extracto
+            mov_sistema: Movimiento del sistema
+            descripcion_centesimas: Score de descripción en centésimas (0 a 100)
+
+        Returns:
+            Tupla (numerador sobre self.denominador, score_valor es fraccional)
+        """
+        fecha_e, valor_e, usd_e = self._preparados[id(mov_extracto)]
+        fecha_s, valor_s, usd_s = self._preparados[id(mov_sistema)]
+
+        if usd_e is not None and usd_s is not None:
+            diferencia = abs(usd_e - usd_s)
+            tolerancia = self.tolerancia_usd
+        else:
+            diferencia = abs(valor_e - valor_s)
+            tolerancia = self.tolerancia
+
+        misma_fecha = fecha_e == fecha_s
+        fraccional = False
+        if diferencia == 0:
+            valor_escalado = self.escala_valor
+        elif diferencia > tolerancia:
+            valor_escalado = 0
+        else:
+            valor_escalado = (tolerancia - diferencia) * self.escala_valor // tolerancia
+            fraccional = valor_escalado > 0
+
+        total = (
+            (self.peso_fecha * 100 * self.escala_valor if misma_fecha else 0)
+            + self.peso_valor * 100 * valor_escalado
+            + self.peso_descripcion * descripcion_centesimas * self.escala_valor
+        )
+
+        if misma_fecha and diferencia == 0 and total < self.piso_identidad:
+            total = self.piso_identidad
+
+        return total, fraccional
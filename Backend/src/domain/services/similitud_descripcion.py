@@ -0,0 +1,114 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from difflib import SequenceMatcher
+
+from src.domain.services.automata_aliases import obtener_automata
+
+
+def normalizar_descripcion(descripcion: str) -> str:
+    """Normalización base de descripciones para comparar (mayúsculas, sin espacios en los extremos)."""
+    return descripcion.upper().strip()
+
+
+def proyectar_descripcion(desc_norm: str, aliases: Optional[List['MatchingAlias']] = None) -> str:
+    """
+    Aplica las reglas de alias a una descripción de extracto ya normalizada.
+
+    Proyecta lo que "Debería decir el Sistema". Si varios patrones aparecen
+    en el texto, gana el último alias de la lista (ver AutomataAliases.aplicar_ultimo).
+    """
+    if not aliases:
+        return desc_norm
+    return obtener_automata(aliases).aplicar_ultimo(desc_norm)
+
+
+def a_centesimas(similitud: float) -> int:
+    """Ratio de similitud en centésimas enteras; coincide con Decimal(str(round(x, 2))) * 100."""
+    return round(round(similitud, 2) * 100)
+
+
+class ComparadorDescripciones:
+    """
+    Comparador de descripciones con caché para una ejecución de matching.
+
+    Cada descripción del extracto se normaliza y proyecta con los aliases una
+    sola vez, y cada descripción del sistema se normaliza una sola vez. Para
+    cada descripción del sistema se mantiene un SequenceMatcher con su análisis
+    precalculado, y los pares ya comparados se memorizan (las descripciones
+    repetidas como "PAGO PSE" son frecuentes).
+
+    El score final es exactamente SequenceMatcher.ratio(). Antes de calcularlo
+    se usan real_quick_ratio() (longitudes) y quick_ratio() (caracteres en
+    común), que son cotas superiores baratas del ratio, para descartar pares
+    que no pueden superar al mejor candidato actual.
+    """
+
+    def __init__(self, aliases: Optional[List['MatchingAlias']] = None):
+        self.aliases = aliases or []
+        self._automata = obtener_automata(self.aliases) if self.aliases else None
+        self._proyecciones: Dict[str, Optional[str]] = {}
+        self._normalizadas: Dict[str, Optional[str]] = {}
+        self._matchers: Dict[str, SequenceMatcher] = {}
+        self._memo: Dict[Tuple[str, str], int] = {}
+
+    def proyectar(self, desc_extracto: str) -> Optional[str]:
+        """Descripción esperada del sistema para un extracto (None si está vacía)."""
+        if desc_extracto not in self._proyecciones:
+            if not desc_extracto:
+                self._proyecciones[desc_extracto] = None
+            else:
+                desc_norm = normalizar_descripcion(desc_extracto)
+                self._proyecciones[desc_extracto] = (
+                    self._automata.aplicar_ultimo(desc_norm) if self._automata else desc_norm
+                )
+        return self._proyecciones[desc_extracto]
+
+    def normalizar(self, desc_sistema: str) -> Optional[str]:
+        """Descripción del sistema normalizada (None si está vacía)."""
+        if desc_sistema not in self._normalizadas:
+            self._normalizadas[desc_sistema] = (
+                normalizar_descripcion(desc_sistema) if desc_sistema else None
+            )
+        return self._normalizadas[desc_sistema]
+
+    def centesimas(self, esperada: Optional[str], sistema: Optional[str]) -> int:
+        """Score de descripción en centésimas (0 a 100)."""
+        return self.centesimas_acotadas(esperada, sistema, None)
+
+    def centesimas_acotadas(
+        self,
+        esperada: Optional[str],
+        sistema: Optional[str],
+        alcanza: Optional[Callable[[int], bool]]
+    ) -> Optional[int]:
+        """
+        Score de descripción en centésimas, descartando pares sin posibilidad.
+
+        Args:
+            esperada: Descripción proyectada del extracto (de proyectar)
+            sistema: Descripción normalizada del sistema (de normalizar)
+            alcanza: Indica si un score de descripción dado aún podría ganar;
+                None para calcular siempre
+
+        Returns:
+            Centésimas (0 a 100), o None si la cota superior no alcanza
+        """
+        if esperada is None or sistema is None:
+            return 0
+
+        clave = (esperada, sistema)
+        if clave in self._memo:
+            return self._memo[clave]
+
+        matcher = self._matchers.get(sistema)
+        if matcher is None:
+            matcher = self._matchers[sistema] = SequenceMatcher(None, '', sistema)
+        matcher.set_seq1(esperada)
+
+        if alcanza is not None:
+            if not alcanza(a_centesimas(matcher.real_quick_ratio())):
+                return None
+            if not alcanza(a_centesimas(matcher.quick_ratio())):
+                return None
+
+        resultado = self._memo[clave] = a_centesimas(matcher.ratio())
+        return resultado
@@ -0,0 +1,110 @@
+from bisect import bisect_left, bisect_right
+from math import comb
+from typing import List, Optional, Tuple
+import time
+
+
+# Subconjunto enumerado: (suma, índices)
+Subconjunto = Tuple[int, Tuple[int, ...]]
+
+
+def buscar_subconjunto(
+    objetivo: int,
+    valores: List[int],
+    min_elementos: int = 2,
+    max_elementos: int = 4,
+    tolerancia: int = 0,
+    max_combinaciones: int = 20_000,
+    limite: Optional[float] = None
+) -> Optional[Tuple[int, ...]]:
+    """
+    Busca un subconjunto de valores cuya suma iguale al objetivo (± tolerancia).
+
+    Meet-in-the-middle acotado: los valores se parten en dos mitades, se
+    enumeran los subconjuntos de cada mitad con hasta max_elementos elementos
+    (podando los que ya superan el objetivo, todos los valores son positivos)
+    y se combinan por búsqueda binaria sobre las sumas ordenadas de la otra
+    mitad.
+
+    El costo está acotado de dos formas:
+    - Si el número de subconjuntos a enumerar excede max_combinaciones, se
+      descartan los últimos valores (los candidatos menos preferidos).
+    - Si se alcanza el instante `limite` (time.perf_counter), se abandona.
+
+    Entre varias soluciones se prefiere la de menos elementos, luego la de
+    menor diferencia y luego la que usa los primeros valores de la lista.
+
+    Args:
+        objetivo: Suma buscada (entero positivo, ej. centavos)
+        valores: Valores positivos candidatos, en orden de preferencia
+        min_elementos: Tamaño mínimo del subconjunto
+        max_elementos: Tamaño máximo del subconjunto
+        tolerancia: Diferencia máxima aceptada entre la suma y el objetivo
+        max_combinaciones: Presupuesto de subconjuntos enumerados
+        limite: Instante límite (time.perf_counter) o None
+
+    Returns:
+        Tupla de índices (ordenados) dentro de valores, o None si no hay solución
+    """
+    valores = list(valores)
+    while valores and _total_subconjuntos(len(valores), max_elementos) > max_combinaciones:
+        valores.pop()
+    if len(valores) < min_elementos:
+        return None
+
+    mitad = len(valores) // 2
+    maximo = objetivo + tolerancia
+    izquierda = _enumerar(valores, 0, mitad, max_elementos, maximo)
+    derecha = _enumerar(valores, mitad, len(valores), max_elementos, maximo)
+    derecha.sort()
+    sumas_derecha = [suma for suma, _ in derecha]
+
+    mejor = None
+    mejor_clave = None
+    for revisados, (suma, indices) in enumerate(izquierda):
+        if limite is not None and revisados % 256 == 0 and time.perf_counter() > limite:
+            break
+        desde = bisect_left(sumas_derecha, objetivo - tolerancia - suma)
+        hasta = bisect_right(sumas_derecha, objetivo + tolerancia - suma)
+        for suma_derecha, indices_derecha in derecha[desde:hasta]:
+            tamano = len(indices) + len(indices_derecha)
+            if not min_elementos <= tamano <= max_elementos:
+                continue
+            combinados = indices + indices_derecha
+            clave = (tamano, abs(suma + suma_derecha - objetivo), combinados)
+            if mejor_clave is None or clave < mejor_clave:
+                mejor, mejor_clave = combinados, clave
+
+    return mejor
+
+
+def _total_subconjuntos(n: int, max_elementos: int) -> int:
+    """Subconjuntos de hasta max_elementos en ambas mitades de n valores (sin poda)."""
+    mitad = n // 2
+    return sum(
+        comb(mitad, k) + comb(n - mitad, k)
+        for k in range(max_elementos + 1)
+    )
+
+
+def _enumerar(
+    valores: List[int],
+    inicio: int,
+    fin: int,
+    max_elementos: int,
+    maximo: int
+) -> List[Subconjunto]:
+    """Subconjuntos de valores[inicio:fin] con hasta max_elementos y suma <= maximo (incluye el vacío)."""
+    resultado: List[Subconjunto] = []
+
+    def recorrer(posicion: int, suma: int, indices: Tuple[int, ...]) -> None:
+        resultado.append((suma, indices))
+        if len(indices) == max_elementos:
+            return
+        for siguiente in range(posicion, fin):
+            nueva_suma = suma + valores[siguiente]
+            if nueva_suma <= maximo:
+                recorrer(siguiente + 1, nueva_suma, indices + (siguiente,))
+
+    recorrer(inicio, 0, ())
+    return resultado
@@ -0,0 +1,243 @@
+"""
+Workers de la cola de ingesta (tabla trabajos_ingesta, Sql/migration_trabajos_ingesta.sql).
+
+Cada proceso de la API arranca INGESTA_WORKERS hilos que reclaman el trabajo en
+cola más antiguo y lo ejecutan con IngestaService (archivos o matching en lote).
+El reclamo se serializa con un advisory lock y cuenta los EN_CURSO de todos los
+procesos, así nunca hay más de INGESTA_WORKERS trabajos a la vez aunque corran
+varios workers de uvicorn.
+
+- Los POST despiertan a los hilos (notificar); además se sondea la tabla cada
+  INGESTA_INTERVALO_SONDEO segundos, lo que recoge trabajos encolados por otros
+  procesos o que quedaron pendientes antes de un reinicio.
+- El trabajo usa su propia conexión; el progreso (etapa, filas, ms por etapa)
+  se guarda en otra conexión para que sea visible mientras la primera sigue
+  trabajando, como mucho cada INTERVALO_PROGRESO segundos salvo al cambiar de etapa.
+- Un hilo de latidos mantiene vivos los trabajos en curso. Si el proceso muere,
+  el trabajo vuelve a la cola cuando su latido supera INGESTA_VENCIMIENTO_SEGUNDOS
+  (ERROR tras INGESTA_MAX_INTENTOS). Reintentar es seguro: los duplicados se
+  detectan contra lo ya insertado y los movimientos de extracto del periodo se
+  reemplazan.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set
+import os
+import socket
+import threading
+import time
+
+import psycopg2.errors
+
+from src.application.services.ingesta_service import IngestaService
+from src.application.services.matching_lote_service import MatchingLoteService
+from src.domain.models.trabajo_ingesta import TrabajoIngesta, ESTADO_COMPLETADO, ESTADO_ERROR, TIPO_MATCHING_LOTE
+from src.infrastructure.api.dependencies import crear_procesador_service, get_registro_instantaneas_matching
+from src.infrastructure.database.connection import get_db_connection
+from src.infrastructure.database.postgres_trabajo_ingesta_repository import PostgresTrabajoIngestaRepository
+from src.infrastructure.logging.config import logger
+
+
+WORKERS = int(os.getenv('INGESTA_WORKERS', '2'))
+INTERVALO_SONDEO = float(os.getenv('INGESTA_INTERVALO_SONDEO', '2'))
+VENCIMIENTO_SEGUNDOS = float(os.getenv('INGESTA_VENCIMIENTO_SEGUNDOS', '300'))
+MAX_INTENTOS = int(os.getenv('INGESTA_MAX_INTENTOS', '3'))
+INTERVALO_PROGRESO = 0.5
+# Espera antes de volver a buscar la tabla si la migración no se ha ejecutado
+ESPERA_SIN_TABLA = 60.0
+
+_conexion = contextmanager(get_db_connection)
+
+
+def _invalidar_instantaneas(resultado: dict) -> None:
+    """El matching en lote cambia vinculaciones en procesos hijos: descartar las instantáneas de este proceso."""
+    registro = get_registro_instantaneas_matching()
+    for periodo in resultado['periodos']:
+        if periodo['estado'] == 'PROCESADO':
+            registro.invalidar((periodo['cuenta_id'], periodo['year'], periodo['month']))
+
+
+def _con_repositorio(accion: Callable[[PostgresTrabajoIngestaRepository], object]):
+    """Ejecuta `accion` con un repositorio sobre una conexión prestada del pool solo para eso."""
+    with _conexion() as conn:
+        return accion(PostgresTrabajoIngestaRepository(conn))
+
+
+class ReporteProgreso:
+    """
+    Callback `progreso(etapa, procesadas=0, total=None)` de un trabajo: mide la
+    duración de cada etapa y la persiste (limitada a una escritura cada `intervalo`
+    segundos, salvo al cambiar de etapa).
+    """
+
+    def __init__(self, trabajo_id: int, guardar: Optional[Callable] = None, intervalo: float = INTERVALO_PROGRESO):
+        self.trabajo_id = trabajo_id
+        self.intervalo = intervalo
+        self._guardar = guardar or (lambda *args: _con_repositorio(lambda repo: repo.actualizar_progreso(*args)))
+        self.etapa: Optional[str] = None
+        self.procesadas = 0
+        self.total: Optional[int] = None
+        self.tiempos_ms: Dict[str, float] = {}
+        self._inicio = time.perf_counter()
+        self._inicio_etapa = self._inicio
+        self._ultimo_envio = 0.0
+
+    def __call__(self, etapa: str, procesadas: int = 0, total: Optional[int] = None) -> None:
+        ahora = time.perf_counter()
+        cambio = etapa != self.etapa
+        if cambio:
+            self._cerrar_etapa(ahora)
+            self.etapa, self._inicio_etapa = etapa, ahora
+        self.procesadas, self.total = procesadas, total
+        if cambio or ahora - self._ultimo_envio >= self.intervalo:
+            self._ultimo_envio = ahora
+            self._enviar()
+
+    def _cerrar_etapa(self, ahora: float) -> None:
+        if self.etapa:
+            self.tiempos_ms[self.etapa] = round((ahora - self._inicio_etapa) * 1000, 1)
+
+    def _enviar(self) -> None:
+        try:
+            self._guardar(self.trabajo_id, self.etapa, self.procesadas, self.total, dict(self.tiempos_ms))
+        except Exception as e:
+            # El progreso es informativo: nunca debe tumbar la ingesta
+            logger.warning(f"No se pudo guardar el progreso del trabajo {self.trabajo_id}: {e}")
+
+    def cerrar(self) -> Dict[str, float]:
+        """Cierra la etapa en curso y retorna los ms por etapa más el total."""
+        ahora = time.perf_counter()
+        self._cerrar_etapa(ahora)
+        return {**self.tiempos_ms, 'total': round((ahora - self._inicio) * 1000, 1)}
+
+
+class ColaIngesta:
+    """
+    Hilos que reclaman y ejecutan trabajos de ingesta.
+
+    Args:
+        workers: Máximo de ingestas a la vez (por proceso y en total)
+        intervalo: Segundos entre sondeos de la tabla sin trabajo
+        vencimiento: Segundos sin latido tras los cuales un EN_CURSO se considera huérfano
+        max_intentos: Reclamos de un trabajo antes de marcarlo ERROR
+    """
+
+    def __init__(self, workers: int = WORKERS, intervalo: float = INTERVALO_SONDEO,
+                 vencimiento: float = VENCIMIENTO_SEGUNDOS, max_intentos: int = MAX_INTENTOS):
+        self.workers = workers
+        self.intervalo = intervalo
+        self.vencimiento = vencimiento
+        self.max_intentos = max_intentos
+        self.nombre = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._hilos: List[threading.Thread] = []
+        self._detener = threading.Event()
+        self._despertar = threading.Event()
+        self._en_curso: Set[int] = set()
+        self._completados = 0
+        self._errores = 0
+
+    def iniciar(self) -> None:
+        if self.workers <= 0 or self._hilos:
+            return
+        self._detener.clear()
+        for i in range(self.workers):
+            hilo = threading.Thread(target=self._bucle, name=f"ingesta-{i}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+        latidos = threading.Thread(target=self._latidos, name="ingesta-latidos", daemon=True)
+        latidos.start()
+        self._hilos.append(latidos)
+        logger.info(f"Cola de ingesta iniciada: {self.workers} workers ({self.nombre})")
+
+    def detener(self, timeout: float = 30.0) -> None:
+        """Deja de reclamar trabajos y espera a que terminen los en curso (hasta `timeout`)."""
+        self._detener.set()
+        self._despertar.set()
+        limite = time.monotonic() + timeout
+        for hilo in self._hilos:
+            hilo.join(max(0.0, limite - time.monotonic()))
+        self._hilos = []
+
+    def notificar(self) -> None:
+        """Despierta a los workers (hay un trabajo nuevo en cola)."""
+        self._despertar.set()
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            espera = self.intervalo
+            try:
+                trabajo = _con_repositorio(lambda repo: repo.reclamar_siguiente(
+                    self.nombre, self.workers, self.vencimiento, self.max_intentos
+                ))
+                if trabajo is not None:
+                    self.procesar(trabajo)
+                    continue
+            except psycopg2.errors.UndefinedTable:
+                logger.warning("La tabla trabajos_ingesta no existe (ejecute Sql/migration_trabajos_ingesta.sql)")
+                espera = ESPERA_SIN_TABLA
+            except Exception as e:
+                logger.error(f"Error en worker de ingesta: {e}")
+            self._despertar.wait(espera)
+            self._despertar.clear()
+
+    def _latidos(self) -> None:
+        while not self._detener.wait(self.vencimiento / 3):
+            with self._lock:
+                ids = list(self._en_curso)
+            if not ids:
+                continue
+            try:
+                _con_repositorio(lambda repo: repo.registrar_latido(ids))
+            except Exception as e:
+                logger.warning(f"No se pudo registrar el latido de los trabajos {ids}: {e}")
+
+    def procesar(self, trabajo: TrabajoIngesta) -> None:
+        """Ejecuta un trabajo ya reclamado y guarda su resultado o error."""
+        with self._lock:
+            self._en_curso.add(trabajo.id)
+        logger.info(f"Trabajo de ingesta {trabajo.id} ({trabajo.tipo} {trabajo.archivo or ''}) intento {trabajo.intentos}")
+        reporte = ReporteProgreso(trabajo.id)
+        resultado, error = None, None
+        try:
+            with _conexion() as conn:
+                if trabajo.tipo == TIPO_MATCHING_LOTE:
+                    resultado = IngestaService.ejecutar_matching_lote(trabajo, MatchingLoteService(conn), reporte)
+                    _invalidar_instantaneas(resultado)
+                else:
+                    contenido = PostgresTrabajoIngestaRepository(conn).obtener_contenido(trabajo.id)
+                    if contenido is None:
+                        raise ValueError("El trabajo no tiene archivo asociado")
+                    resultado = IngestaService.ejecutar(trabajo, contenido, crear_procesador_service(conn), reporte)
+        except Exception as e:
+            logger.error(f"Trabajo de ingesta {trabajo.id} falló: {e}", exc_info=True)
+            error = str(e) or type(e).__name__
+
+        tiempos = reporte.cerrar()
+        estado = ESTADO_ERROR if error else ESTADO_COMPLETADO
+        try:
+            _con_repositorio(lambda repo: repo.finalizar(trabajo.id, estado, tiempos, resultado=resultado, error=error))
+        except Exception as e:
+            # Sin latido, otro worker lo reintentará al vencer
+            logger.error(f"No se pudo cerrar el trabajo de ingesta {trabajo.id}: {e}")
+        finally:
+            with self._lock:
+                self._en_curso.discard(trabajo.id)
+                if error:
+                    self._errores += 1
+                else:
+                    self._completados += 1
+        logger.info(f"Trabajo de ingesta {trabajo.id} {estado} en {tiempos['total']:.0f} ms")
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {
+                'worker': self.nombre,
+                'workers': self.workers,
+                'activa': any(h.is_alive() for h in self._hilos),
+                'en_curso': sorted(self._en_curso),
+                'completados': self._completados,
+                'errores': self._errores,
+            }
+
+
+cola_ingesta = ColaIngesta()
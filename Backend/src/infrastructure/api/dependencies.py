@@ -116,6 +116,20 @@ def get_matching_service() -> MatchingService:
     """
     return MatchingService()
 
+from src.domain.services.matching_incremental import RegistroInstantaneas
+
+# Instantáneas de matching compartidas por el proceso (sobreviven entre requests)
+_registro_instantaneas_matching = RegistroInstantaneas()
+
+def get_registro_instantaneas_matching() -> RegistroInstantaneas:
+    """
+    Retorna el registro de instantáneas de matching por periodo.
+    
+    Es un singleton del proceso: permite que llamadas repetidas al matching de
+    un periodo recalculen solo lo que cambió desde la ejecución anterior.
+    """
+    return _registro_instantaneas_matching
+
 from src.infrastructure.database.postgres_matching_alias_repository import PostgresMatchingAliasRepository
 from src.domain.ports.matching_alias_repository import MatchingAliasRepository
 
@@ -137,3 +151,38 @@ def get_conciliacion_service(
     date_service: DateRangeService = Depends(get_date_range_service)
 ) -> ConciliacionService:
     return ConciliacionService(mov_repo, vinc_repo, conciliacion_repo, date_service)
+
+from src.application.services.matching_periodo_service import MatchingPeriodoService
+
+def get_matching_periodo_service(
+    matching_service: MatchingService = Depends(get_matching_service),
+    repo_extracto: MovimientoExtractoRepository = Depends(get_movimiento_extracto_repository),
+    vinculacion_repo: MovimientoVinculacionRepository = Depends(get_movimiento_vinculacion_repository),
+    config_repo: ConfiguracionMatchingRepository = Depends(get_configuracion_matching_repository),
+    alias_repo: MatchingAliasRepository = Depends(get_matching_alias_repository),
+    conciliacion_service: ConciliacionService = Depends(get_conciliacion_service)
+) -> MatchingPeriodoService:
+    return MatchingPeriodoService(
+        matching_service, repo_extracto, vinculacion_repo,
+        config_repo, alias_repo, conciliacion_service
+    )
+
+# Carga de archivos fuera del request (ejecutor_pdf y cola de ingesta)
+from src.application.services.procesador_archivos_service import ProcesadorArchivosService
+
+def crear_procesador_service(conn) -> ProcesadorArchivosService:
+    """Servicio sobre una conexión propia del trabajo (no la del request)."""
+    return ProcesadorArchivosService(
+        PostgresMovimientoRepository(conn),
+        PostgresMonedaRepository(conn),
+        PostgresTerceroRepository(conn),
+        PostgresConciliacionRepository(conn),
+        PostgresMovimientoExtractoRepository(conn),
+        PostgresCuentaExtractorRepository(conn)
+    )
+
+from src.infrastructure.database.postgres_trabajo_ingesta_repository import PostgresTrabajoIngestaRepository
+from src.domain.ports.trabajo_ingesta_repository import TrabajoIngestaRepository
+
+def get_trabajo_ingesta_repository(conn=Depends(get_db_connection)) -> TrabajoIngestaRepository:
+    return PostgresTrabajoIngestaRepository(conn)
@@ -0,0 +1,247 @@
+"""
+Ejecutor acotado para el trabajo bloqueante de los uploads de PDF.
+
+Los endpoints de archivos y conciliaciones son `async def`, pero pdfplumber y
+psycopg2 son síncronos: llamados directamente bloqueaban el event loop y un
+extracto grande congelaba todos los requests del worker. Ahora corren en un
+ThreadPoolExecutor propio (PDF_EJECUTOR_HILOS) y el loop sigue atendiendo
+catálogos, matching, etc. Se usan hilos y no procesos porque los servicios
+necesitan repositorios y conexiones; la extracción de PDFs grandes ya se
+reparte en procesos (documento_pdf).
+
+- Admisión: a lo sumo PDF_EJECUTOR_MAX_PENDIENTES trabajos entre en curso y en
+  cola; el siguiente falla de inmediato (503) en vez de esperar sin límite.
+- Timeout por trabajo (PDF_EJECUTOR_TIMEOUT, 504). Un hilo no se puede matar:
+  el trabajo se marca cancelado, se cancela la consulta en curso
+  (connection.cancel()) y solo lo no confirmado se revierte. Los servicios
+  confirman por etapa (guardar_lote, extractos, recalcular_sistema), así que lo
+  confirmado antes del timeout queda guardado; volver a cargar el archivo es
+  seguro porque los duplicados se detectan. El cupo se libera cuando el hilo
+  termina de verdad.
+- Los trabajos con BD toman su propia conexión del pool y no la del request,
+  así un trabajo abandonado nunca usa una conexión ya devuelta al pool.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import contextvars
+import itertools
+import os
+import threading
+import time
+
+from src.infrastructure.database.connection import get_db_connection
+from src.infrastructure.database.pool import Histograma
+from src.infrastructure.logging.config import logger
+
+
+HILOS = int(os.getenv('PDF_EJECUTOR_HILOS', '2'))
+MAX_PENDIENTES = int(os.getenv('PDF_EJECUTOR_MAX_PENDIENTES', '8'))
+TIMEOUT_SEGUNDOS = float(os.getenv('PDF_EJECUTOR_TIMEOUT', '120'))
+
+_conexion_trabajo = contextmanager(get_db_connection)
+
+
+class EjecutorSaturadoError(Exception):
+    """Se alcanzó el máximo de trabajos en curso y en cola."""
+    pass
+
+
+class TrabajoExpiradoError(Exception):
+    """El trabajo superó su tiempo máximo."""
+    pass
+
+
+class TrabajoCanceladoError(Exception):
+    """El trabajo expiró (o el cliente se desconectó) antes de terminar; su transacción se revierte."""
+    pass
+
+
+@dataclass
+class Trabajo:
+    id: int
+    nombre: str
+    creado: float
+    iniciado: Optional[float] = None
+    cancelado: threading.Event = field(default_factory=threading.Event)
+    # Conexión en uso (para cancelar su consulta si el trabajo expira)
+    conexion: Any = None
+
+    def resumen(self, ahora: float) -> dict:
+        return {
+            'id': self.id,
+            'nombre': self.nombre,
+            'estado': 'CANCELANDO' if self.cancelado.is_set() else ('EN_CURSO' if self.iniciado else 'EN_COLA'),
+            'segundos': round(ahora - self.creado, 3),
+        }
+
+
+class EjecutorPDF:
+    """
+    Ejecuta funciones bloqueantes fuera del event loop con admisión y timeout.
+
+    Args:
+        hilos: Trabajos ejecutándose a la vez
+        max_pendientes: Máximo de trabajos admitidos (en curso + en cola)
+        timeout: Segundos por defecto antes de abandonar un trabajo
+    """
+
+    def __init__(self, hilos: int = HILOS, max_pendientes: int = MAX_PENDIENTES, timeout: float = TIMEOUT_SEGUNDOS):
+        self.hilos = max(1, hilos)
+        self.max_pendientes = max(self.hilos, max_pendientes)
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._trabajos: Dict[int, Trabajo] = {}
+        self._secuencia = itertools.count(1)
+        self._completados = 0
+        self._errores = 0
+        self._rechazados = 0
+        self._expirados = 0
+        self._espera = Histograma()
+        self._duracion = Histograma()
+
+    def _obtener_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix='ejecutor_pdf')
+            return self._executor
+
+    def _admitir(self, nombre: str) -> Trabajo:
+        with self._lock:
+            if len(self._trabajos) >= self.max_pendientes:
+                self._rechazados += 1
+                raise EjecutorSaturadoError(
+                    f"Hay {len(self._trabajos)} archivos en proceso (máximo {self.max_pendientes}); intente de nuevo en unos segundos"
+                )
+            trabajo = Trabajo(next(self._secuencia), nombre, time.perf_counter())
+            self._trabajos[trabajo.id] = trabajo
+            return trabajo
+
+    def _liberar(self, trabajo: Trabajo, error: bool = False) -> None:
+        with self._lock:
+            if self._trabajos.pop(trabajo.id, None) is None:
+                return
+            if trabajo.iniciado is not None:
+                self._duracion.registrar((time.perf_counter() - trabajo.iniciado) * 1000)
+            if error:
+                self._errores += 1
+            elif not trabajo.cancelado.is_set():
+                self._completados += 1
+
+    def _correr(self, trabajo: Trabajo, funcion: Callable, args: tuple, con_conexion: bool) -> Any:
+        trabajo.iniciado = time.perf_counter()
+        with self._lock:
+            self._espera.registrar((trabajo.iniciado - trabajo.creado) * 1000)
+        error = False
+        try:
+            if trabajo.cancelado.is_set():
+                raise TrabajoCanceladoError(f"Trabajo {trabajo.nombre} cancelado antes de iniciar")
+            if not con_conexion:
+                return funcion(*args)
+            with _conexion_trabajo() as conn:
+                trabajo.conexion = conn
+                try:
+                    resultado = funcion(conn, *args)
+                    if trabajo.cancelado.is_set():
+                        # Nadie espera el resultado: no confirmar lo que el cliente vio fallar
+                        raise TrabajoCanceladoError(f"Trabajo {trabajo.nombre} expiró; se revierte su transacción")
+                    return resultado
+                finally:
+                    trabajo.conexion = None
+        except TrabajoCanceladoError as e:
+            logger.warning(str(e))
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._liberar(trabajo, error=error)
+
+    def _cancelar(self, trabajo: Trabajo, futuro: Future) -> None:
+        trabajo.cancelado.set()
+        if futuro.cancel():
+            # No había empezado: _correr nunca se ejecutará
+            self._liberar(trabajo)
+            return
+        conn = trabajo.conexion
+        if conn is not None:
+            try:
+                conn.cancel()
+            except Exception as e:
+                logger.warning(f"No se pudo cancelar la consulta del trabajo {trabajo.nombre}: {e}")
+
+    async def ejecutar(
+        self, nombre: str, funcion: Callable, *args, con_conexion: bool = False, timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Ejecuta `funcion(*args)` en el pool de hilos y espera su resultado sin bloquear el loop.
+
+        Args:
+            nombre: Nombre del trabajo (logs y métricas)
+            funcion: Función síncrona; con `con_conexion` recibe primero una conexión propia
+                del pool. Al expirar se cancela la consulta en curso y se revierte lo que
+                `funcion` aún no confirmó; lo que ya confirmó internamente se conserva
+            con_conexion: Prestar una conexión de BD al trabajo
+            timeout: Segundos máximos (None = PDF_EJECUTOR_TIMEOUT)
+
+        Raises:
+            EjecutorSaturadoError: Se alcanzó PDF_EJECUTOR_MAX_PENDIENTES
+            TrabajoExpiradoError: El trabajo no terminó a tiempo
+        """
+        trabajo = self._admitir(nombre)
+        # Las métricas SQL del request (Server-Timing) viven en un ContextVar
+        contexto = contextvars.copy_context()
+        try:
+            futuro = self._obtener_executor().submit(contexto.run, self._correr, trabajo, funcion, args, con_conexion)
+        except Exception:
+            self._liberar(trabajo, error=True)
+            raise
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(futuro)), timeout)
+        except asyncio.TimeoutError:
+            self._cancelar(trabajo, futuro)
+            with self._lock:
+                self._expirados += 1
+            logger.error(f"Trabajo {trabajo.nombre} superó {timeout}s; se cancela")
+            raise TrabajoExpiradoError(
+                f"El procesamiento de '{nombre}' superó {timeout:.0f} segundos; lo ya guardado se conserva "
+                f"y se puede volver a cargar el archivo (los duplicados se omiten)"
+            )
+        except asyncio.CancelledError:
+            # El cliente se desconectó
+            self._cancelar(trabajo, futuro)
+            raise
+
+    def estado(self) -> dict:
+        ahora = time.perf_counter()
+        with self._lock:
+            trabajos = [t.resumen(ahora) for t in self._trabajos.values()]
+            return {
+                'hilos': self.hilos,
+                'max_pendientes': self.max_pendientes,
+                'timeout_segundos': self.timeout,
+                'en_curso': sum(1 for t in trabajos if t['estado'] != 'EN_COLA'),
+                'en_cola': sum(1 for t in trabajos if t['estado'] == 'EN_COLA'),
+                'completados': self._completados,
+                'errores': self._errores,
+                'rechazados': self._rechazados,
+                'expirados': self._expirados,
+                'espera': self._espera.resumen(),
+                'duracion': self._duracion.resumen(),
+                'trabajos': trabajos,
+            }
+
+    def cerrar(self) -> None:
+        """Cancela lo que está en cola y espera los trabajos en curso (shutdown de la app)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+ejecutor_pdf = EjecutorPDF()
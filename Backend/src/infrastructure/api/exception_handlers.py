@@ -19,6 +19,7 @@ from src.domain.exceptions import (
     FileProcessingException,
     BusinessRuleException
 )
+from src.infrastructure.api.ejecutor_pdf import EjecutorSaturadoError, TrabajoExpiradoError
 from src.infrastructure.logging.config import logger
 
 
@@ -41,6 +42,10 @@ def register_exception_handlers(app):
     # Excepciones de FastAPI/Starlette
     app.add_exception_handler(RequestValidationError, request_validation_handler)
     app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+
+    # Ejecutor de trabajos PDF (admisión y timeout)
+    app.add_exception_handler(EjecutorSaturadoError, ejecutor_saturado_handler)
+    app.add_exception_handler(TrabajoExpiradoError, trabajo_expirado_handler)
     
     # Excepciones generales (fallback)
     app.add_exception_handler(Exception, general_exception_handler)
@@ -200,6 +205,37 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     )
 
 
+# ============================================
+# Handlers del Ejecutor de PDFs
+# ============================================
+
+async def ejecutor_saturado_handler(request: Request, exc: EjecutorSaturadoError):
+    """Handler para uploads rechazados por el límite de admisión (503)."""
+    logger.warning(f"Ejecutor PDF saturado: {exc}", extra={"path": request.url.path})
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "5"},
+        content={
+            "error": "Service Busy",
+            "message": str(exc)
+        }
+    )
+
+
+async def trabajo_expirado_handler(request: Request, exc: TrabajoExpiradoError):
+    """Handler para trabajos de PDF que superaron su timeout (504)."""
+    logger.error(f"Trabajo PDF expirado: {exc}", extra={"path": request.url.path})
+
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={
+            "error": "Processing Timeout",
+            "message": str(exc)
+        }
+    )
+
+
 # ============================================
 # Handler General (Fallback)
 # ============================================
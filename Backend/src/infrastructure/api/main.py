@@ -1,11 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 import os
 from src.infrastructure.logging.config import logger
 from src.infrastructure.api.exception_handlers import register_exception_handlers
-from src.infrastructure.database.connection import get_connection_pool, close_all_connections
+from src.infrastructure.database.connection import get_connection_pool, close_all_connections, DB_CONFIG
+from src.infrastructure.database.cache_catalogos import iniciar_escucha_catalogos, detener_escucha_catalogos
+from src.infrastructure.database.instrumentacion import iniciar_metricas, finalizar_metricas
+from src.infrastructure.api.ejecutor_pdf import ejecutor_pdf
+from src.infrastructure.api.cola_ingesta import cola_ingesta
 
 # Importar routers
 from src.infrastructure.api.routers import (
@@ -29,7 +33,8 @@ from src.infrastructure.api.routers import (
     admin,
     config_valores_pendientes,
     mantenimiento,
-    tipos_cuenta
+    tipos_cuenta,
+    trabajos
 )
 
 
@@ -40,8 +45,13 @@ async def lifespan(app: FastAPI):
     
     Startup:
     - Inicializa el connection pool
+    - Inicia la escucha de cambios de catálogos
+    - Arranca los workers de la cola de ingesta
     
     Shutdown:
+    - Detiene la escucha de catálogos
+    - Detiene los workers de ingesta (los trabajos interrumpidos vuelven a la cola)
+    - Espera los trabajos de PDF en curso
     - Cierra todas las conexiones del pool
     """
     # Startup
@@ -52,10 +62,19 @@ async def lifespan(app: FastAPI):
     # (se creará al primer uso)
     logger.info("Connection pool listo (lazy initialization)")
     
+    # Invalidación del caché de catálogos entre workers (LISTEN/NOTIFY)
+    if os.getenv('CATALOGOS_LISTEN', '1') == '1':
+        iniciar_escucha_catalogos(**DB_CONFIG)
+    
+    cola_ingesta.iniciar()
+    
     yield
     
     # Shutdown
     logger.info("Cerrando aplicación...")
+    detener_escucha_catalogos()
+    cola_ingesta.detener()
+    ejecutor_pdf.cerrar()
     close_all_connections()
     logger.info("Aplicación cerrada correctamente")
     logger.info("=" * 50)
@@ -87,6 +106,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def instrumentacion_sql(request: Request, call_next):
+    """
+    Mide las sentencias SQL del request (cantidad, tiempo en BD, filas) y las
+    reporta en el header Server-Timing y en el log.
+    """
+    ruta = f"{request.method} {request.url.path}"
+    metricas, token = iniciar_metricas(ruta)
+    try:
+        response = await call_next(request)
+    finally:
+        finalizar_metricas(token)
+    if metricas.consultas:
+        response.headers["Server-Timing"] = metricas.server_timing()
+        logger.info(
+            f"SQL {ruta} consultas={metricas.consultas} tiempo_ms={metricas.tiempo_ms:.1f} "
+            f"filas={metricas.filas} lentas={len(metricas.lentas)}",
+            extra={'sql': metricas.resumen()}
+        )
+    return response
+
 # Registrar exception handlers globales
 register_exception_handlers(app)
 logger.info("Exception handlers registrados")
@@ -113,6 +153,7 @@ app.include_router(admin.router)
 app.include_router(config_valores_pendientes.router)
 app.include_router(mantenimiento.router)
 app.include_router(tipos_cuenta.router)
+app.include_router(trabajos.router)
 
 logger.info("Todos los routers registrados")
 
@@ -2,12 +2,19 @@ import os
 import csv
 import io
 import zipfile
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body
 from fastapi.responses import StreamingResponse
-from src.infrastructure.database.connection import get_db_connection
+from src.infrastructure.database.connection import get_db_connection, get_connection_pool
+from src.infrastructure.database.instrumentacion import consultas_lentas_recientes
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio, TABLAS_CATALOGO
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+from src.infrastructure.database.sentencias_preparadas import sentencias
+from src.infrastructure.extractors.cache_pdf import cache_pdf
+from src.infrastructure.api.ejecutor_pdf import ejecutor_pdf
+from src.infrastructure.api.cola_ingesta import cola_ingesta
 from src.infrastructure.logging.config import logger
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -63,6 +70,27 @@ RESTORE_DIR = os.path.join(SNAPSHOT_DIR, "restores")
 # Asegurar directorios
 os.makedirs(RESTORE_DIR, exist_ok=True)
 
+# Tablas que alimentan resumen_mensual_movimientos (Sql/migration_resumen_mensual.sql)
+TABLAS_RESUMEN_MENSUAL = {"movimientos_encabezado", "movimientos_detalle"}
+
+
+def _reconstruir_resumen_mensual(cursor, tablas) -> Optional[int]:
+    """
+    Reconstruye el resumen mensual en la transacción de la restauración si se
+    restauró alguna tabla de movimientos: la importación deshabilita los triggers
+    que lo mantienen. Retorna los periodos recalculados (None si no aplica).
+    """
+    if not TABLAS_RESUMEN_MENSUAL.intersection(tablas):
+        return None
+    cursor.execute("SELECT to_regprocedure('reconstruir_resumen_mensual()') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return None
+    cursor.execute("SELECT reconstruir_resumen_mensual()")
+    periodos = int(cursor.fetchone()[0] or 0)
+    logger.info(f"Resumen mensual reconstruido tras restauración: {periodos} periodos")
+    return periodos
+
+
 class BulkExportRequest(BaseModel):
     tables: List[str]
 
@@ -197,8 +225,13 @@ async def bulk_import_tables(file: UploadFile = File(...), conn=Depends(get_db_c
                 except:
                     pass
                 
+                if table_name in TABLAS_CATALOGO:
+                    notificar_cambio(cursor, table_name)
                 results[table_name] = f"OK ({len(processed_rows)} regs)"
 
+            periodos = _reconstruir_resumen_mensual(cursor, results.keys())
+            if periodos is not None:
+                results["resumen_mensual_movimientos"] = f"Reconstruido ({periodos} periodos)"
             conn.commit()
             
             # Guardar copia del ZIP subido
@@ -328,14 +361,20 @@ async def import_table_raw(table_name: str, file: UploadFile = File(...), conn=D
         except:
             pass
 
+        if table_name in TABLAS_CATALOGO:
+            notificar_cambio(cursor, table_name)
+        periodos = _reconstruir_resumen_mensual(cursor, [table_name])
         conn.commit()
         logger.info(f"Restauración exitosa: {len(processed_rows)} registros insertados en {table_name}")
         
-        return {
+        respuesta = {
             "mensaje": f"Tabla {table_name} restaurada exitosamente.",
             "registros_importados": len(processed_rows),
             "archivo_backup": filename
         }
+        if periodos is not None:
+            respuesta["periodos_resumen_reconstruidos"] = periodos
+        return respuesta
 
     except Exception as e:
         conn.rollback()
@@ -344,6 +383,78 @@ async def import_table_raw(table_name: str, file: UploadFile = File(...), conn=D
     finally:
         cursor.close()
 
+@router.get("/pool-conexiones")
+def metricas_pool_conexiones():
+    """
+    Métricas en vivo del pool de conexiones: conexiones en uso, libres y en
+    espera, timeouts, reciclajes e histogramas de espera y duración del préstamo.
+    """
+    return get_connection_pool().metricas()
+
+
+@router.get("/cache-catalogos")
+def estado_cache_catalogos():
+    """Entradas, versión por tabla y aciertos/fallos del caché de catálogos del proceso."""
+    return cache_catalogos.estado()
+
+
+@router.get("/cache-pdf")
+def estado_cache_pdf():
+    """Entradas, tamaño en disco y aciertos/fallos del caché de PDFs parseados y salidas de extractores."""
+    return cache_pdf.estado()
+
+
+@router.delete("/cache-pdf")
+def limpiar_cache_pdf():
+    """Borra todas las entradas del caché de PDFs."""
+    return {"borradas": cache_pdf.limpiar()}
+
+
+@router.get("/ejecutor-pdf")
+def estado_ejecutor_pdf():
+    """Trabajos de PDF en curso y en cola, rechazados por admisión, expirados y tiempos de espera/duración."""
+    return ejecutor_pdf.estado()
+
+
+@router.get("/cola-ingesta")
+def estado_cola_ingesta():
+    """Workers de ingesta de este proceso, trabajos que están ejecutando y totales completados/con error."""
+    return cola_ingesta.estado()
+
+
+@router.get("/consultas-lentas")
+def listar_consultas_lentas():
+    """
+    Últimas sentencias SQL que superaron DB_SLOW_QUERY_MS, con su SQL normalizado,
+    endpoint de origen y, si se muestreó, el plan de EXPLAIN (ANALYZE, BUFFERS).
+    """
+    return consultas_lentas_recientes()
+
+
+@router.get("/sentencias-preparadas")
+def metricas_sentencias_preparadas():
+    """
+    Llamadas, preparaciones (PREPARE por conexión) y tiempos de cada sentencia
+    preparada; la tasa de reutilización indica cuántas ejecuciones usaron un plan ya preparado.
+    """
+    return sentencias.metricas()
+
+
+@router.post("/resumen-mensual/reconstruir")
+def reconstruir_resumen_mensual(conn=Depends(get_db_connection)):
+    """
+    Reconstruye resumen_mensual_movimientos desde encabezados y detalles
+    (reparación si el resumen se desvió de los datos, p. ej. tras cargas con triggers deshabilitados).
+    """
+    try:
+        periodos = PostgresMovimientoRepository(conn).reconstruir_resumen_mensual()
+        logger.info(f"Resumen mensual reconstruido: {periodos} periodos")
+        return {"periodos": periodos}
+    except Exception as e:
+        logger.error(f"Error reconstruyendo resumen mensual: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/snapshots")
 def list_snapshots():
     """Lista los archivos de snapshot disponibles en el servidor."""
@@ -4,36 +4,20 @@ from typing import Dict, Any, Optional, List
 from decimal import Decimal
 import os
 import json
-import pdfplumber
-
-from src.application.services.procesador_archivos_service import ProcesadorArchivosService
-from src.infrastructure.api.dependencies import get_movimiento_repository, get_moneda_repository, get_tercero_repository, get_conciliacion_repository, get_movimiento_extracto_repository, get_cuenta_extractor_repository
-from src.domain.ports.movimiento_repository import MovimientoRepository
-from src.domain.ports.moneda_repository import MonedaRepository
-from src.domain.ports.tercero_repository import TerceroRepository
-from src.domain.ports.conciliacion_repository import ConciliacionRepository
+
+from src.infrastructure.api.ejecutor_pdf import ejecutor_pdf
+from src.infrastructure.extractors.documento_pdf import abrir_pdf
+from src.infrastructure.api.dependencies import get_movimiento_extracto_repository, crear_procesador_service
 from src.domain.ports.movimiento_extracto_repository import MovimientoExtractoRepository
-from src.domain.ports.cuenta_extractor_repository import CuentaExtractorRepository
 
 router = APIRouter(prefix="/api/archivos", tags=["archivos"])
 
-def get_procesador_service(
-    mov_repo: MovimientoRepository = Depends(get_movimiento_repository),
-    moneda_repo: MonedaRepository = Depends(get_moneda_repository),
-    tercero_repo: TerceroRepository = Depends(get_tercero_repository),
-    conciliacion_repo: ConciliacionRepository = Depends(get_conciliacion_repository),
-    movimiento_extracto_repo: MovimientoExtractoRepository = Depends(get_movimiento_extracto_repository),
-    cuenta_extractor_repo: CuentaExtractorRepository = Depends(get_cuenta_extractor_repository)
-) -> ProcesadorArchivosService:
-    return ProcesadorArchivosService(mov_repo, moneda_repo, tercero_repo, conciliacion_repo, movimiento_extracto_repo, cuenta_extractor_repo)
-
 @router.post("/cargar")
 async def cargar_archivo(
     file: UploadFile = File(...),
     tipo_cuenta: str = Form(...),
     cuenta_id: int = Form(...),
-    actualizar_descripciones: bool = Form(False),
-    service: ProcesadorArchivosService = Depends(get_procesador_service)
+    actualizar_descripciones: bool = Form(False)
 ) -> Dict[str, Any]:
     """
     Carga un archivo PDF (extracto) y procesa los movimientos.
@@ -47,23 +31,26 @@ async def cargar_archivo(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo se permiten archivos PDF")
 
-    try:
-        # file.file es un SpooledTemporaryFile compatible con pdfplumber
-        resultado = service.procesar_archivo(file.file, file.filename, tipo_cuenta, cuenta_id, actualizar_descripciones)
-        return resultado
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error procesando archivo: {str(e)}")
+    def cargar(conn):
+        try:
+            # file.file es un SpooledTemporaryFile compatible con pdfplumber
+            service = crear_procesador_service(conn)
+            return service.procesar_archivo(file.file, file.filename, tipo_cuenta, cuenta_id, actualizar_descripciones)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Error procesando archivo: {str(e)}")
+
+    # Fuera del event loop: pdfplumber y psycopg2 son bloqueantes
+    return await ejecutor_pdf.ejecutar('cargar_archivo', cargar, con_conexion=True)
 
 @router.post("/analizar")
 async def analizar_archivo(
     file: UploadFile = File(...),
     tipo_cuenta: str = Form(...),
-    cuenta_id: Optional[int] = Form(None),
-    service: ProcesadorArchivosService = Depends(get_procesador_service)
+    cuenta_id: Optional[int] = Form(None)
 ) -> Dict[str, Any]:
     """
     Analiza un archivo PDF y retorna estadísticas preliminares sin guardar.
@@ -72,11 +59,13 @@ async def analizar_archivo(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo se permiten archivos PDF")
 
-    try:
-        resultado = service.analizar_archivo(file.file, file.filename, tipo_cuenta, cuenta_id)
-        return resultado
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
+    def analizar(conn):
+        try:
+            return crear_procesador_service(conn).analizar_archivo(file.file, file.filename, tipo_cuenta, cuenta_id)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+
+    return await ejecutor_pdf.ejecutar('analizar_archivo', analizar, con_conexion=True)
 
 @router.get("/listar-directorios")
 async def listar_directorios(tipo: str) -> List[str]:
@@ -146,8 +135,9 @@ async def buscar_pagina_resumen(filename: str, moneda: str = "PESOS"):
     if not os.path.exists(filepath):
         return {"pagina": 1}
 
-    try:
-        with pdfplumber.open(filepath) as pdf:
+    def buscar():
+        # Documento en caché: la misma página se pide varias veces desde el visor
+        with abrir_pdf(filepath) as pdf:
             # Buscar la sección de la moneda correcta
             moneda_texto = f"Moneda: {moneda.upper()}"
             en_seccion_correcta = False
@@ -173,6 +163,8 @@ async def buscar_pagina_resumen(filename: str, moneda: str = "PESOS"):
             # Si no encontró, retornar página 1
             return {"pagina": 1}
 
+    try:
+        return await ejecutor_pdf.ejecutar('buscar_pagina_resumen', buscar)
     except Exception as e:
         print(f"Error buscando página de resumen: {e}")
         return {"pagina": 1}
@@ -195,8 +187,7 @@ async def procesar_archivo_local(
     rendimientos: Optional[Decimal] = Form(None),
     retenciones: Optional[Decimal] = Form(None),
     # Movimientos confirmados por el usuario (JSON string)
-    movimientos_json: Optional[str] = Form(None),
-    service: ProcesadorArchivosService = Depends(get_procesador_service)
+    movimientos_json: Optional[str] = Form(None)
 ) -> Dict[str, Any]:
     """
     Procesa un archivo local (del servidor) como si fuera un upload.
@@ -217,45 +208,45 @@ async def procesar_archivo_local(
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="Archivo no encontrado en el servidor")
 
-    try:
-        with open(filepath, 'rb') as f:
-            if accion == "analizar":
-                if tipo == "movimientos":
-                    return service.analizar_archivo(f, filename, tipo_cuenta, cuenta_id)
-                elif tipo == "extractos":
-                    return service.analizar_extracto(f, filename, tipo_cuenta, cuenta_id)
-            elif accion == "cargar":
-                if tipo == "movimientos":
-                    return service.procesar_archivo(f, filename, tipo_cuenta, cuenta_id, actualizar_descripciones)
-                elif tipo == "extractos":
-                    # Prepare overrides
-                    overrides = {}
-                    if saldo_anterior is not None: overrides['saldo_anterior'] = saldo_anterior
-                    if entradas is not None: overrides['entradas'] = entradas
-                    if salidas is not None: overrides['salidas'] = salidas
-                    if saldo_final is not None: overrides['saldo_final'] = saldo_final
-                    if rendimientos is not None: overrides['rendimientos'] = rendimientos
-                    if retenciones is not None: overrides['retenciones'] = retenciones
-
-                    # Parsear movimientos confirmados
-                    movimientos_confirmados = None
-                    if movimientos_json:
-                        try:
-                            movimientos_confirmados = json.loads(movimientos_json)
-                        except json.JSONDecodeError as je:
-                            print(f"Error parseando movimientos_json: {je}")
-
-                    return await service.procesar_extracto(f, filename, tipo_cuenta, cuenta_id, year, month, overrides=overrides, movimientos_confirmados=movimientos_confirmados)
-
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error procesando archivo local: {str(e)}")
-        
-        
-    # Re-route logic for extractos if needed
-    if tipo not in ["movimientos", "extractos"]:
-         raise HTTPException(status_code=400, detail="Tipo desconocido")
+    # Prepare overrides
+    overrides = {}
+    if saldo_anterior is not None: overrides['saldo_anterior'] = saldo_anterior
+    if entradas is not None: overrides['entradas'] = entradas
+    if salidas is not None: overrides['salidas'] = salidas
+    if saldo_final is not None: overrides['saldo_final'] = saldo_final
+    if rendimientos is not None: overrides['rendimientos'] = rendimientos
+    if retenciones is not None: overrides['retenciones'] = retenciones
+
+    # Parsear movimientos confirmados
+    movimientos_confirmados = None
+    if movimientos_json:
+        try:
+            movimientos_confirmados = json.loads(movimientos_json)
+        except json.JSONDecodeError as je:
+            print(f"Error parseando movimientos_json: {je}")
+
+    def procesar(conn):
+        service = crear_procesador_service(conn)
+        try:
+            with open(filepath, 'rb') as f:
+                if accion == "analizar":
+                    if tipo == "movimientos":
+                        return service.analizar_archivo(f, filename, tipo_cuenta, cuenta_id)
+                    elif tipo == "extractos":
+                        return service.analizar_extracto(f, filename, tipo_cuenta, cuenta_id)
+                elif accion == "cargar":
+                    if tipo == "movimientos":
+                        return service.procesar_archivo(f, filename, tipo_cuenta, cuenta_id, actualizar_descripciones)
+                    elif tipo == "extractos":
+                        return service.procesar_extracto(f, filename, tipo_cuenta, cuenta_id, year, month, overrides=overrides, movimientos_confirmados=movimientos_confirmados)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Error procesando archivo local: {str(e)}")
+
+    resultado = await ejecutor_pdf.ejecutar(f'procesar_local_{accion}', procesar, con_conexion=True)
+    if resultado is not None:
+        return resultado
 
     return {"status": "ok"}
 
@@ -3,6 +3,7 @@ from typing import List, Dict
 from pydantic import BaseModel
 from src.infrastructure.logging.config import logger
 from src.infrastructure.database.connection import get_db_connection
+from src.infrastructure.database.cache_catalogos import cache_catalogos
 
 from src.infrastructure.database.postgres_tercero_repository import PostgresTerceroRepository
 from src.infrastructure.database.postgres_centro_costo_repository import PostgresCentroCostoRepository
@@ -44,6 +45,14 @@ def obtener_conceptos(conn = Depends(get_db_connection)):
 
 @router.get("/catalogos")
 def obtener_todos_catalogos(conn = Depends(get_db_connection)):
+    # La respuesta completa se reutiliza hasta que cambie alguna de sus tablas
+    return cache_catalogos.obtener(
+        'respuesta_catalogos',
+        ('terceros', 'cuentas', 'tipo_cuenta', 'monedas', 'centro_costos', 'conceptos'),
+        lambda: _construir_catalogos(conn)
+    )
+
+def _construir_catalogos(conn) -> dict:
     logger.info("Cargando todos los catálogos")
     # Ejecutamos todo en una sola conexión
     repo_ter = PostgresTerceroRepository(conn)
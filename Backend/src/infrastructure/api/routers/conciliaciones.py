@@ -8,11 +8,10 @@ import logging
 
 from src.domain.models.conciliacion import Conciliacion
 from src.domain.ports.conciliacion_repository import ConciliacionRepository
-from src.infrastructure.api.dependencies import get_conciliacion_repository, get_date_range_service, get_conciliacion_service
+from src.infrastructure.api.dependencies import get_conciliacion_repository, get_date_range_service, get_conciliacion_service, crear_procesador_service
 from src.domain.services.date_range_service import DateRangeService
 from src.domain.services.conciliacion_service import ConciliacionService
-from src.application.services.procesador_archivos_service import ProcesadorArchivosService
-from src.infrastructure.api.routers.archivos import get_procesador_service
+from src.infrastructure.api.ejecutor_pdf import ejecutor_pdf
 
 router = APIRouter(prefix="/api/conciliaciones", tags=["conciliaciones"])
 
@@ -176,8 +175,7 @@ def cerrar_conciliacion(
 async def analizar_extracto(
     file: UploadFile = File(...),
     tipo_cuenta: str = Form(...),
-    cuenta_id: Optional[int] = Form(None),
-    service: ProcesadorArchivosService = Depends(get_procesador_service)
+    cuenta_id: Optional[int] = Form(None)
 ):
     """
     Analiza un PDF de extracto y retorna el resumen hallado (saldos).
@@ -185,19 +183,22 @@ async def analizar_extracto(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo se permiten archivos PDF")
 
-    try:
-        # Usamos file.file directamente
-        resultado = service.analizar_extracto(file.file, file.filename, tipo_cuenta, cuenta_id)
-        return resultado
-    except ValueError as ve:
-        # El extractor ya incluye detalles en el mensaje
-        logger.error(f"Error de validación en extracción: {ve}")
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        logger.error(f"Error NO CONTROLADO analizando extracto: {e}")
-        raise HTTPException(status_code=500, detail=f"Error interno analizando extracto: {str(e)}")
+    def analizar(conn):
+        try:
+            # Usamos file.file directamente
+            return crear_procesador_service(conn).analizar_extracto(file.file, file.filename, tipo_cuenta, cuenta_id)
+        except ValueError as ve:
+            # El extractor ya incluye detalles en el mensaje
+            logger.error(f"Error de validación en extracción: {ve}")
+            raise HTTPException(status_code=400, detail=str(ve))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            logger.error(f"Error NO CONTROLADO analizando extracto: {e}")
+            raise HTTPException(status_code=500, detail=f"Error interno analizando extracto: {str(e)}")
+
+    # Fuera del event loop: pdfplumber y psycopg2 son bloqueantes
+    return await ejecutor_pdf.ejecutar('analizar_extracto', analizar, con_conexion=True)
 
 @router.post("/cargar-extracto")
 async def cargar_extracto(
@@ -212,8 +213,7 @@ async def cargar_extracto(
     salidas: Optional[Decimal] = Form(None),
     saldo_final: Optional[Decimal] = Form(None),
     # New: JSON string with confirmed movements
-    movimientos_json: Optional[str] = Form(None),
-    service: ProcesadorArchivosService = Depends(get_procesador_service)
+    movimientos_json: Optional[str] = Form(None)
 ):
     """
     Carga un extracto y actualiza la conciliación del periodo.
@@ -222,44 +222,43 @@ async def cargar_extracto(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo se permiten archivos PDF")
 
-    try:
-        # Prepare overrides dict if any value is present
-        overrides = {}
-        if saldo_anterior is not None: overrides['saldo_anterior'] = saldo_anterior
-        if entradas is not None: overrides['entradas'] = entradas
-        if salidas is not None: overrides['salidas'] = salidas
-        if saldo_final is not None: overrides['saldo_final'] = saldo_final
-        
-        # Parse confirmed movements if present
-        movimientos_confirmados = None
-        if movimientos_json:
-            import json
-            try:
-                movimientos_confirmados = json.loads(movimientos_json)
-            except json.JSONDecodeError:
-                raise ValueError("Format error in movimientos_json")
+    # Prepare overrides dict if any value is present
+    overrides = {}
+    if saldo_anterior is not None: overrides['saldo_anterior'] = saldo_anterior
+    if entradas is not None: overrides['entradas'] = entradas
+    if salidas is not None: overrides['salidas'] = salidas
+    if saldo_final is not None: overrides['saldo_final'] = saldo_final
 
-        resultado = await service.procesar_extracto(
-            file.file, 
-            file.filename, 
-            tipo_cuenta, 
-            cuenta_id, 
-            year, 
-            month,
-            overrides=overrides,
-            movimientos_confirmados=movimientos_confirmados
-        )
-        
-        # Asegurar que periodo_texto se incluya si es una instancia de modelo
-        if hasattr(resultado, 'periodo_texto'):
-            return resultado
-        return resultado
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error cargando extracto: {str(e)}")
+    # Parse confirmed movements if present
+    movimientos_confirmados = None
+    if movimientos_json:
+        import json
+        try:
+            movimientos_confirmados = json.loads(movimientos_json)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Format error in movimientos_json")
+
+    def cargar(conn):
+        try:
+            return crear_procesador_service(conn).procesar_extracto(
+                file.file,
+                file.filename,
+                tipo_cuenta,
+                cuenta_id,
+                year,
+                month,
+                overrides=overrides,
+                movimientos_confirmados=movimientos_confirmados
+            )
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Error cargando extracto: {str(e)}")
+
+    # Fuera del event loop: pdfplumber y psycopg2 son bloqueantes
+    return await ejecutor_pdf.ejecutar('cargar_extracto', cargar, con_conexion=True)
 
 
 # --- Nuevos Endpoints para Movimientos de Extracto ---
@@ -7,8 +7,9 @@ import calendar
 
 from src.domain.models.movimiento import Movimiento
 from src.domain.models.movimiento_match import MovimientoMatch, MatchEstado
-from src.domain.models.configuracion_matching import ConfiguracionMatching
+from src.domain.models.configuracion_matching import ConfiguracionMatching, ModoAsignacion
 from src.domain.models.matching_alias import MatchingAlias
+from src.domain.models.match_grupo import MatchGrupo
 from src.domain.ports.movimiento_vinculacion_repository import MovimientoVinculacionRepository
 from src.domain.ports.configuracion_matching_repository import ConfiguracionMatchingRepository
 from src.domain.ports.movimiento_extracto_repository import MovimientoExtractoRepository
@@ -16,6 +17,7 @@ from src.domain.ports.movimiento_repository import MovimientoRepository
 from src.domain.ports.matching_alias_repository import MatchingAliasRepository
 from src.domain.ports.cuenta_repository import CuentaRepository
 from src.domain.services.matching_service import MatchingService
+from src.domain.services.matching_incremental import RegistroInstantaneas
 
 from src.infrastructure.api.dependencies import (
     get_movimiento_vinculacion_repository,
@@ -28,11 +30,18 @@ from src.infrastructure.api.dependencies import (
     get_matching_alias_repository,
     get_cuenta_repository,
     get_date_range_service,
-    get_conciliacion_service
+    get_conciliacion_service,
+    get_registro_instantaneas_matching,
+    get_matching_periodo_service,
+    get_trabajo_ingesta_repository
 )
 
 from src.domain.services.date_range_service import DateRangeService
 from src.domain.services.conciliacion_service import ConciliacionService
+from src.application.services.matching_periodo_service import MatchingPeriodoService
+from src.application.services.ingesta_service import IngestaService
+from src.domain.ports.trabajo_ingesta_repository import TrabajoIngestaRepository
+from src.infrastructure.api.cola_ingesta import cola_ingesta
 
 from src.infrastructure.logging.config import logger
 
@@ -81,6 +90,7 @@ class MatchingResultResponse(BaseModel):
     estadisticas: MatchingEstadisticas
     integridad: MatchingIntegridad
     movimientos_sistema_sin_match: Optional[List[dict]] = None
+    grupos_sugeridos: Optional[List[dict]] = None
 
 # ... (displaced code removed) ...
 
@@ -98,6 +108,12 @@ class IgnorarRequest(BaseModel):
     usuario: str
     razon: Optional[str] = None
 
+class MatchingLoteRequest(BaseModel):
+    year: int
+    cuenta_ids: Optional[List[int]] = None
+    month: Optional[int] = None
+    max_procesos: Optional[int] = None
+
 class ConfiguracionMatchingResponse(BaseModel):
     id: Optional[int]
     tolerancia_valor: float
@@ -107,6 +123,7 @@ class ConfiguracionMatchingResponse(BaseModel):
     peso_descripcion: float
     score_minimo_exacto: float
     score_minimo_probable: float
+    modo_asignacion: str
     activo: bool
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
@@ -119,6 +136,7 @@ class ConfiguracionMatchingUpdate(BaseModel):
     peso_descripcion: float
     score_minimo_exacto: float
     score_minimo_probable: float
+    modo_asignacion: Optional[str] = None  # GREEDY | OPTIMO (None = no cambiar)
 
 
 class CrearMovimientoItem(BaseModel):
@@ -167,8 +185,16 @@ def crear_movimientos_lote(
     """
     creados_count = 0
     errores = []
+    # Vinculaciones a guardar al final en una sola operación (guardar_lote)
+    vinculaciones = []
+    # Movimientos del sistema ya asignados en este lote (aún no persistidos como vinculados)
+    sistema_ids_reservados = set()
+    # (extracto_id, mov_extracto, mov_sistema) a vincular / (extracto_id, mov_extracto, nuevo_mov) a crear
+    por_vincular = []
+    por_crear = []
     
     logger.info(f"Iniciando creación en lote de {len(items)} movimientos.")
+    config = config_repo.obtener_activa()
     
     for item in items:
         try:
@@ -194,7 +220,10 @@ def crear_movimientos_lote(
 
             if mov_sistema_existente:
                 # Verificar si ya está vinculado (para no violar constraint UNIQUE)
-                is_linked = vinculacion_repo.obtener_por_sistema_id(mov_sistema_existente.id)
+                is_linked = (
+                    mov_sistema_existente.id in sistema_ids_reservados
+                    or vinculacion_repo.obtener_por_sistema_id(mov_sistema_existente.id)
+                )
                 
                 if is_linked:
                     # Ya está ocupado, NO podemos reutilizarlo.
@@ -203,11 +232,12 @@ def crear_movimientos_lote(
                     mov_sistema_existente = None
                 else:
                     # Si existe y está libre, lo usamos
-                    mov_creado = mov_sistema_existente
-                    logger.info(f"Movimiento existente encontrado ID {mov_creado.id} (libre), reutilizando.")
+                    logger.info(f"Movimiento existente encontrado ID {mov_sistema_existente.id} (libre), reutilizando.")
+                    sistema_ids_reservados.add(mov_sistema_existente.id)
+                    por_vincular.append((item.movimiento_extracto_id, mov_extracto, mov_sistema_existente))
             
             if not mov_sistema_existente:
-                # Si no existe o estaba ocupado, lo creamos
+                # Si no existe o estaba ocupado, lo creamos (en bloque, al final del ciclo)
                 nuevo_mov = Movimiento(
                     id=None,
                     fecha=item.fecha or mov_extracto.fecha,
@@ -225,62 +255,83 @@ def crear_movimientos_lote(
                 if nuevo_mov.moneda_id is None:
                     nuevo_mov.moneda_id = 1
 
-                logger.debug(f"Intentando guardar nuevo movimiento: {nuevo_mov.descripcion} | {nuevo_mov.valor}")
-                mov_creado = repo_sistema.guardar(nuevo_mov)
-                
-                if mov_creado and mov_creado.id:
-                    logger.info(f"Movimiento creado exitosamente con ID {mov_creado.id}")
-                    creados_count += 1
-                else:
-                    msg = f"ID {item.movimiento_extracto_id}: Fallo al guardar movimiento (sin ID retornado)"
-                    logger.error(msg)
-                    errores.append(msg)
-                    continue
-            
-            if mov_creado and mov_creado.id:
-                # 4. Auto-vincular (Matching Manual Inmediato)
-                # Verificar si ya existe una vinculación (ej: SIN_MATCH) para actualizarla
-                existing_match = vinculacion_repo.obtener_por_extracto_id(item.movimiento_extracto_id)
-                match_id = existing_match.id if existing_match else None
-                created_at = existing_match.created_at if existing_match else None
-
-                # Calcular scores
-                config = config_repo.obtener_activa()
-                score_fecha = matching_service.calcular_score_fecha(mov_extracto.fecha, mov_creado.fecha)
-                score_valor = matching_service.calcular_score_valor(
-                    mov_extracto.valor, 
-                    mov_creado.valor, 
-                    config.tolerancia_valor
-                )
-                score_descripcion = matching_service.calcular_score_descripcion(
-                    mov_extracto.descripcion, 
-                    mov_creado.descripcion
-                )
-                score_total = config.calcular_score_ponderado(score_fecha, score_valor, score_descripcion)
-                
-                match = MovimientoMatch(
-                    id=match_id,
-                    mov_extracto=mov_extracto,
-                    mov_sistema=mov_creado,
-                    estado=MatchEstado.OK, # Siempre OK al crear/vincular explícitamente
-                    score_total=score_total,
-                    score_fecha=score_fecha,
-                    score_valor=score_valor,
-                    score_descripcion=score_descripcion,
-                    confirmado_por_usuario=True,
-                    created_by="sistema", 
-                    notas="Creado/Vinculado desde extracto",
-                    created_at=created_at
-                )
-                
-                match_guardado = vinculacion_repo.guardar(match)
-                logger.info(f"Vinculación creada exitosamente ID {match_guardado.id} para Extracto {mov_extracto.id} <-> Sistema {mov_creado.id}")
-            else:
-                errores.append(f"ID {item.movimiento_extracto_id}: Error lógico, movimiento no disponible")
+                logger.debug(f"Movimiento a crear: {nuevo_mov.descripcion} | {nuevo_mov.valor}")
+                por_crear.append((item.movimiento_extracto_id, mov_extracto, nuevo_mov))
 
         except Exception as e:
             logger.error(f"Error procesando item {item.movimiento_extracto_id}: {e}", exc_info=True)
             errores.append(f"ID {item.movimiento_extracto_id}: {str(e)}")
+    
+    # 3. Crear los movimientos nuevos en una sola carga (COPY); si el bloque falla
+    #    (ej. un periodo CONCILIADO) se reintenta uno por uno para aislar el error.
+    if por_crear:
+        nuevos = [mov for _, _, mov in por_crear]
+        try:
+            repo_sistema.guardar_lote(nuevos)
+            creados = por_crear
+        except Exception as e:
+            logger.warning(f"Creación en bloque falló ({e}); se reintenta movimiento por movimiento")
+            creados = []
+            for extracto_id, mov_extracto, nuevo_mov in por_crear:
+                try:
+                    repo_sistema.guardar(nuevo_mov)
+                    creados.append((extracto_id, mov_extracto, nuevo_mov))
+                except Exception as e_mov:
+                    logger.error(f"Error procesando item {extracto_id}: {e_mov}", exc_info=True)
+                    errores.append(f"ID {extracto_id}: {str(e_mov)}")
+
+        for extracto_id, mov_extracto, mov_creado in creados:
+            if mov_creado.id:
+                logger.info(f"Movimiento creado exitosamente con ID {mov_creado.id}")
+                creados_count += 1
+                por_vincular.append((extracto_id, mov_extracto, mov_creado))
+            else:
+                msg = f"ID {extracto_id}: Fallo al guardar movimiento (sin ID retornado)"
+                logger.error(msg)
+                errores.append(msg)
+
+    # 4. Auto-vincular (Matching Manual Inmediato)
+    # Si ya existe una vinculación (ej: SIN_MATCH) guardar_lote la actualiza
+    for extracto_id, mov_extracto, mov_creado in por_vincular:
+        try:
+            # Calcular scores
+            score_fecha = matching_service.calcular_score_fecha(mov_extracto.fecha, mov_creado.fecha)
+            score_valor = matching_service.calcular_score_valor(
+                mov_extracto.valor, 
+                mov_creado.valor, 
+                config.tolerancia_valor
+            )
+            score_descripcion = matching_service.calcular_score_descripcion(
+                mov_extracto.descripcion, 
+                mov_creado.descripcion
+            )
+            score_total = config.calcular_score_ponderado(score_fecha, score_valor, score_descripcion)
+            
+            match = MovimientoMatch(
+                mov_extracto=mov_extracto,
+                mov_sistema=mov_creado,
+                estado=MatchEstado.OK, # Siempre OK al crear/vincular explícitamente
+                score_total=score_total,
+                score_fecha=score_fecha,
+                score_valor=score_valor,
+                score_descripcion=score_descripcion,
+                confirmado_por_usuario=True,
+                created_by="sistema", 
+                notas="Creado/Vinculado desde extracto"
+            )
+            vinculaciones.append(match)
+        except Exception as e:
+            logger.error(f"Error procesando item {extracto_id}: {e}", exc_info=True)
+            errores.append(f"ID {extracto_id}: {str(e)}")
+    
+    # 5. Guardar todas las vinculaciones del lote
+    # Un conflicto en una fila no impide vincular las demás
+    if vinculaciones:
+        for match, error in zip(vinculaciones, vinculacion_repo.guardar_lote(vinculaciones)):
+            if error is None:
+                logger.info(f"Vinculación creada exitosamente ID {match.id} para Extracto {match.mov_extracto.id} <-> Sistema {match.mov_sistema.id}")
+            else:
+                errores.append(f"ID {match.mov_extracto.id}: Movimiento disponible pero no se pudo vincular: {str(error)}")
             
     logger.info(f"Finalizado proceso lote. Creados: {creados_count}, Errores: {len(errores)}")
     return {"creados": creados_count, "errores": errores}
@@ -318,6 +369,15 @@ def _movimiento_sistema_to_dict(mov) -> dict:
         'concepto_nombre': mov.concepto_nombre
     }
 
+def _grupo_to_dict(grupo: MatchGrupo) -> dict:
+    """Convierte MatchGrupo a dict para JSON"""
+    return {
+        'tipo': grupo.tipo,
+        'movs_extracto': [_movimiento_extracto_to_dict(m) for m in grupo.movs_extracto],
+        'movs_sistema': [_movimiento_sistema_to_dict(m) for m in grupo.movs_sistema],
+        'diferencia': float(grupo.diferencia)
+    }
+
 def _match_to_response(match: MovimientoMatch) -> MovimientoMatchResponse:
     """Convierte MovimientoMatch a MovimientoMatchResponse"""
     return MovimientoMatchResponse(
@@ -342,95 +402,35 @@ def ejecutar_matching(
     year: int,
     month: int,
     matching_service: MatchingService = Depends(get_matching_service),
-    repo_extracto: MovimientoExtractoRepository = Depends(get_movimiento_extracto_repository),
-    repo_sistema: MovimientoRepository = Depends(get_movimiento_repository),
-    vinculacion_repo: MovimientoVinculacionRepository = Depends(get_movimiento_vinculacion_repository),
-    config_repo: ConfiguracionMatchingRepository = Depends(get_configuracion_matching_repository),
-    alias_repo: MatchingAliasRepository = Depends(get_matching_alias_repository),
+    matching_periodo_service: MatchingPeriodoService = Depends(get_matching_periodo_service),
     cuenta_repo: CuentaRepository = Depends(get_cuenta_repository),
-    conciliacion_service: ConciliacionService = Depends(get_conciliacion_service)
+    registro_instantaneas: RegistroInstantaneas = Depends(get_registro_instantaneas_matching)
 ):
     """
     Ejecuta el algoritmo de matching para un periodo específico.
     
     Compara movimientos del extracto bancario con movimientos del sistema
     y retorna las vinculaciones encontradas con sus scores de similitud.
+    Solo se recalculan las filas pendientes cuyas entradas cambiaron desde
+    la ejecución anterior del mismo periodo.
     """
     try:
         logger.info(f"Ejecutando matching para cuenta {cuenta_id}, periodo {year}/{month}")
         
-        # 1. Obtener configuración activa
-        config = config_repo.obtener_activa()
-        
-        # 2. Obtener movimientos del extracto
-        movs_extracto = repo_extracto.obtener_por_periodo(cuenta_id, year, month)
-        logger.info(f"Encontrados {len(movs_extracto)} movimientos en extracto")
-        
-        # 3. Obtener movimientos del sistema (Universo Completo: Calendario + Vinculados)
-        movs_sistema = conciliacion_service.obtener_universo_sistema(cuenta_id, year, month)
-        logger.info(f"Encontrados {len(movs_sistema)} movimientos en universo sistema")
-
-        # 3.1 Obtener vinculaciones existentes en DB
-        matches_existentes = vinculacion_repo.obtener_por_periodo(cuenta_id, year, month)
-        
-        # Identificar y limpiar "orphans" (matches que apuntan a movimientos de sistema borrados)
-        matches_validos = []
-        for match in matches_existentes:
-            es_huerfano = False
-            # Si el estado implica que debería haber un movimiento de sistema...
-            if match.estado in [MatchEstado.OK, MatchEstado.PROBABLE, MatchEstado.MANUAL]:
-                # ...pero no hay movimiento de sistema asociado
-                if not match.mov_sistema:
-                    es_huerfano = True
-            
-            if es_huerfano:
-                logger.warning(f"Detectado match huérfano ID {match.id} (Estado {match.estado.value}, Extracto {match.mov_extracto.id}). Eliminando...")
-                vinculacion_repo.eliminar(match.id)
-                # No lo agregamos a matches_validos, así el extracto quedará libre para ser procesado de nuevo
-            else:
-                matches_validos.append(match)
-
-        matches_map = {m.mov_extracto.id: m for m in matches_validos}
-        
-        # Identificar items ya procesados y sistemas ocupados
-        extracto_ids_procesados = set(matches_map.keys())
-        sistema_ids_ocupados = {m.mov_sistema.id for m in matches_validos if m.mov_sistema}
-        
-        # Filtrar pendientes
-        movs_extracto_pendientes = [m for m in movs_extracto if m.id not in extracto_ids_procesados]
-        movs_sistema_disponibles = [m for m in movs_sistema if m.id not in sistema_ids_ocupados]
-
-        logger.info(f"Procesando {len(movs_extracto_pendientes)} items pendientes y {len(movs_sistema_disponibles)} sistemas disponibles")
-        
-        # 3.2 Obtener reglas de normalización (Alias)
-        aliases = alias_repo.obtener_por_cuenta(cuenta_id)
-        
-        # 4. Ejecutar algoritmo de matching solo en pendientes
-        matches_nuevos = matching_service.ejecutar_matching(
-            movs_extracto_pendientes, 
-            movs_sistema_disponibles, 
-            config,
-            aliases=aliases
+        # 1-5. Matching del periodo (solo pendientes, incremental) y guardado en lote
+        clave_periodo = (cuenta_id, year, month)
+        resultado = matching_periodo_service.ejecutar(
+            cuenta_id, year, month,
+            previa=registro_instantaneas.obtener(clave_periodo)
         )
-        logger.info(f"Matching completado: {len(matches_nuevos)} vinculaciones nuevas generadas")
-        
-        # 5. Guardar vinculaciones nuevas (solo las automáticas relevantes)
-        for match in matches_nuevos:
-             # Guardamos incluso SIN_MATCH para evitar re-procesar? 
-             # No, SIN_MATCH no se suele guardar en DB a menos que queramos 'cachear' el fallo.
-             # Pero si no lo guardamos, la próxima vez se re-calcula.
-             # La lógica original guardaba OK y PROBABLE.
-            if match.estado in [MatchEstado.OK, MatchEstado.PROBABLE]:
-                try:
-                    match_guardado = vinculacion_repo.guardar(match)
-                    # Actualizar ID generado
-                    match.id = match_guardado.id
-                    match.created_at = match_guardado.created_at
-                except Exception as e:
-                    logger.warning(f"Error guardando vinculación: {e}")
+        registro_instantaneas.guardar(clave_periodo, resultado.instantanea)
+        config = resultado.config
+        movs_extracto = resultado.movs_extracto
+        movs_sistema_disponibles = resultado.movs_sistema_disponibles
+        matches_nuevos = resultado.matches_nuevos
         
         # 6. Combinar resultados (Existentes + Nuevos)
-        matches_finales = list(matches_map.values()) + matches_nuevos
+        matches_finales = list(resultado.matches_existentes) + matches_nuevos
         
         # --- CALCULAR NO EMPAREJADOS DEL SISTEMA ---
         # Identificar qué movimientos del sistema (de los disponibles) NO fueron usados en los matches nuevos
@@ -451,6 +451,18 @@ def ejecutar_matching(
         # Ordenar por fecha desc
         movimientos_sistema_sin_match_dicts.sort(key=lambda x: x['fecha'], reverse=True)
         
+        # --- GRUPOS (PAGOS DIVIDIDOS) ---
+        # Sugerencias 1-a-muchos / muchos-a-1 sobre lo que quedó sin vincular.
+        # No se persisten: la vinculación es 1-a-1 por extracto y el usuario decide.
+        grupos = matching_service.detectar_grupos(
+            [m.mov_extracto for m in matches_nuevos if m.estado == MatchEstado.SIN_MATCH],
+            movimientos_sistema_sin_match_objs,
+            config
+        )
+        if grupos:
+            logger.info(f"Detectados {len(grupos)} grupos (pagos divididos) sugeridos")
+        grupos_sugeridos = [_grupo_to_dict(g) for g in grupos]
+        
         # --- VALIDACIÓN DE INTEGRIDAD 1-A-1 ---
         # Verificar relaciones 1-a-muchos (sistema -> múltiples extractos)
         from src.application.services.matching_validation_service import detectar_matches_1_a_muchos
@@ -550,7 +562,8 @@ def ejecutar_matching(
             matches=[_match_to_response(m) for m in matches_finales],
             estadisticas=estadisticas,
             integridad=integridad,
-            movimientos_sistema_sin_match=movimientos_sistema_sin_match_dicts
+            movimientos_sistema_sin_match=movimientos_sistema_sin_match_dicts,
+            grupos_sugeridos=grupos_sugeridos
         )
         
     except ValueError as ve:
@@ -561,6 +574,32 @@ def ejecutar_matching(
         raise HTTPException(status_code=500, detail=f"Error interno ejecutando matching: {str(e)}")
 
 
+@router.post("/lote", status_code=202)
+def ejecutar_matching_lote(
+    request: MatchingLoteRequest,
+    trabajo_repo: TrabajoIngestaRepository = Depends(get_trabajo_ingesta_repository)
+):
+    """
+    Encola el matching de todos los periodos de un año (todas o varias cuentas).
+
+    Un año completo tarda más de lo que aguanta un request: el trabajo corre en la
+    cola de ingesta (mismo límite de concurrencia) y su avance, en periodos, y el
+    resultado por periodo se consultan en GET /api/trabajos/{id}. Para corridas
+    manuales o programadas el punto de entrada es Scripts/matching_lote.py.
+    """
+    try:
+        trabajo = IngestaService(trabajo_repo).encolar_matching_lote(
+            request.year,
+            cuenta_ids=request.cuenta_ids,
+            month=request.month,
+            max_procesos=request.max_procesos
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    cola_ingesta.notificar()
+    return {"trabajo_id": trabajo.id, "estado": trabajo.estado, "url": f"/api/trabajos/{trabajo.id}"}
+
+
 @router.post("/vincular", response_model=MovimientoMatchResponse)
 def vincular_manual(
     request: VincularRequest,
@@ -774,6 +813,7 @@ def obtener_configuracion(
             peso_descripcion=float(config.peso_descripcion),
             score_minimo_exacto=float(config.score_minimo_exacto),
             score_minimo_probable=float(config.score_minimo_probable),
+            modo_asignacion=config.modo_asignacion.value,
             activo=config.activo,
             created_at=config.created_at,
             updated_at=config.updated_at
@@ -811,6 +851,14 @@ def actualizar_configuracion(
         config.peso_descripcion = Decimal(str(update.peso_descripcion))
         config.score_minimo_exacto = Decimal(str(update.score_minimo_exacto))
         config.score_minimo_probable = Decimal(str(update.score_minimo_probable))
+        if update.modo_asignacion is not None:
+            try:
+                config.modo_asignacion = ModoAsignacion(update.modo_asignacion.upper())
+            except ValueError:
+                raise ValueError(
+                    f"modo_asignacion debe ser uno de {[m.value for m in ModoAsignacion]}, "
+                    f"recibido: {update.modo_asignacion}"
+                )
         
         # 3. Guardar (las validaciones se ejecutan en __post_init__ del modelo)
         config_actualizada = config_repo.actualizar(config)
@@ -825,6 +873,7 @@ def actualizar_configuracion(
             peso_descripcion=float(config_actualizada.peso_descripcion),
             score_minimo_exacto=float(config_actualizada.score_minimo_exacto),
             score_minimo_probable=float(config_actualizada.score_minimo_probable),
+            modo_asignacion=config_actualizada.modo_asignacion.value,
             activo=config_actualizada.activo,
             created_at=config_actualizada.created_at,
             updated_at=config_actualizada.updated_at
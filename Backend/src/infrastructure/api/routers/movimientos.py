@@ -1,6 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Iterator, List, Optional
+import csv
+import io
+import json
 from datetime import date, datetime
 from decimal import Decimal
 from src.infrastructure.logging.config import logger
@@ -24,6 +29,10 @@ from src.infrastructure.api.dependencies import (
     get_config_valor_pendiente_repository
 )
 from src.domain.ports.config_valor_pendiente_repository import ConfigValorPendienteRepository
+from src.domain.exceptions import DatabaseConnectionException
+from src.infrastructure.database.connection import get_connection_pool
+from src.infrastructure.database.pool import PoolAgotadoError
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
 
 router = APIRouter(prefix="/api/movimientos", tags=["movimientos"])
 
@@ -89,11 +98,12 @@ class MovimientoResponse(BaseModel):
 
 class PaginatedMovimientosResponse(BaseModel):
     items: List[MovimientoResponse]
-    total: int
+    total: Optional[int]  # None en modo keyset si no se pidió el conteo
     page: int
     page_size: int
     total_pages: int
     totales: dict  # Global totals: {ingresos, egresos, saldo}
+    siguiente_cursor: Optional[str] = None  # Solo en modo keyset (None = última página)
 
 def _to_response(mov: Movimiento) -> MovimientoResponse:
     """Convierte un Movimiento de dominio a MovimientoResponse con formato display"""
@@ -192,14 +202,20 @@ def listar_movimientos(
     centros_costos_excluidos: Optional[List[int]] = Query(None),
     pendiente: Optional[bool] = None,
     tipo_movimiento: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
     repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
     """
     Lista todos los movimientos con filtros (legacy compatible way).
     Si pendiente is None, trae todos.
     Si pendiente is False, aplica solo_clasificados=True en repo.
+    
+    Si se envía `limit`, pagina por keyset: retorna `siguiente_cursor` para pedir
+    la página siguiente con `cursor`. El total y los totales globales solo se
+    calculan (y se cachean unos segundos) si `incluir_total` es True.
     """
-    logger.info(f"Listando todos los movimientos sin paginación")
     
     # Logic transformation for repo
     solo_clasificados_val = False
@@ -212,6 +228,25 @@ def listar_movimientos(
         else:
             solo_clasificados_val = True
 
+    if limit is not None:
+        return _listar_movimientos_keyset(
+            repo,
+            limit=limit,
+            cursor=cursor,
+            incluir_total=incluir_total,
+            fecha_inicio=desde,
+            fecha_fin=hasta,
+            cuenta_id=cuenta_id,
+            tercero_id=tercero_id,
+            centro_costo_id=centro_costo_id,
+            concepto_id=concepto_id,
+            centros_costos_excluidos=centros_costos_excluidos,
+            solo_pendientes=solo_pendientes_val,
+            solo_clasificados=solo_clasificados_val,
+            tipo_movimiento=tipo_movimiento
+        )
+
+    logger.info(f"Listando todos los movimientos sin paginación")
     try:
         # Obtener TODOS los movimientos sin límites de paginación
         movimientos, total = repo.buscar_avanzado(
@@ -259,6 +294,47 @@ def listar_movimientos(
         logger.error(f"Error listando movimientos: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno al listar movimientos")
 
+def _listar_movimientos_keyset(
+    repo: MovimientoRepository,
+    limit: int,
+    cursor: Optional[str],
+    incluir_total: bool,
+    **filtros
+) -> PaginatedMovimientosResponse:
+    """Una página de movimientos paginada por keyset (fecha, abs(valor), id)."""
+    logger.info(f"Listando movimientos por keyset (limit={limit}, cursor={'sí' if cursor else 'no'})")
+    try:
+        movimientos, siguiente_cursor, resumen = repo.buscar_avanzado_keyset(
+            limit=limit,
+            cursor=cursor,
+            contar=incluir_total,
+            **filtros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listando movimientos: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error interno al listar movimientos")
+
+    total = resumen['total'] if resumen else None
+    totales = {}
+    if resumen:
+        totales = {
+            "ingresos": resumen['ingresos'],
+            "egresos": resumen['egresos'],
+            "saldo": resumen['ingresos'] - resumen['egresos']
+        }
+
+    return PaginatedMovimientosResponse(
+        items=[_to_response(m) for m in movimientos],
+        total=total,
+        page=1,  # En keyset la posición la da el cursor
+        page_size=limit,
+        total_pages=-(-total // limit) if total else 0,
+        totales=totales,
+        siguiente_cursor=siguiente_cursor
+    )
+
 @router.get("/pendientes", response_model=List[MovimientoResponse])
 def obtener_pendientes_dashboard(
     repo: MovimientoRepository = Depends(get_movimiento_repository),
@@ -637,6 +713,108 @@ def obtener_datos_exportacion(
     except Exception as e:
         logger.error(f"Error exportando datos: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error obteniendo datos para exportación")
+
+def _valor_exportable(valor):
+    """Fechas en ISO y decimales como texto para CSV/NDJSON."""
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _filas_csv(filas: Iterator[dict], filas_por_bloque: int = 500) -> Iterator[str]:
+    """Serializa las filas como CSV (encabezado con las columnas de la primera fila) en bloques."""
+    buffer = io.StringIO()
+    writer = None
+    pendientes = 0
+    for fila in filas:
+        if writer is None:
+            writer = csv.writer(buffer)
+            writer.writerow(fila.keys())
+        writer.writerow(_valor_exportable(v) for v in fila.values())
+        pendientes += 1
+        if pendientes >= filas_por_bloque:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pendientes = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _filas_ndjson(filas: Iterator[dict], filas_por_bloque: int = 500) -> Iterator[str]:
+    """Serializa las filas como JSON por línea (NDJSON) en bloques."""
+    bloque = []
+    for fila in filas:
+        bloque.append(json.dumps({k: _valor_exportable(v) for k, v in fila.items()}, ensure_ascii=False))
+        if len(bloque) >= filas_por_bloque:
+            yield '\n'.join(bloque) + '\n'
+            bloque = []
+    if bloque:
+        yield '\n'.join(bloque) + '\n'
+
+
+class _ConexionExportacion:
+    """
+    Conexión del pool prestada a una exportación en streaming. Se toma en el
+    endpoint (para responder 503 si el pool está agotado antes de enviar
+    encabezados) y se devuelve una sola vez, al terminar el stream o en la
+    tarea de fondo si el stream nunca llegó a iniciar.
+    """
+
+    def __init__(self):
+        self.pool = get_connection_pool()
+        try:
+            self.conn = self.pool.getconn()
+        except PoolAgotadoError as e:
+            raise DatabaseConnectionException(e)
+        self._liberada = False
+
+    def liberar(self):
+        if not self._liberada:
+            self._liberada = True
+            # Si el cliente cortó la descarga, putconn revierte la transacción abierta
+            self.pool.putconn(self.conn)
+
+
+def _stream_exportacion(prestamo: _ConexionExportacion, formato: str, limit: Optional[int], plain: bool) -> Iterator[str]:
+    """Recorre la exportación con un cursor de servidor y la serializa en bloques."""
+    try:
+        repo = PostgresMovimientoRepository(prestamo.conn)
+        filas = repo.iterar_datos_exportacion(limit=limit, plain_format=plain)
+        serializar = _filas_csv if formato == 'csv' else _filas_ndjson
+        yield from serializar(filas)
+        prestamo.conn.commit()
+    finally:
+        prestamo.liberar()
+
+
+@router.get("/exportar/stream")
+def exportar_stream(
+    formato: str = Query('csv', pattern='^(csv|ndjson)$'),
+    limit: Optional[int] = None,
+    plain: bool = False
+):
+    """
+    Exportación en streaming (CSV o NDJSON) con memoria constante sin importar
+    el tamaño del historial. Mismas opciones que /exportar/datos.
+
+    Usa su propia conexión del pool: las dependencias con yield terminan antes
+    de que se envíe el cuerpo de un StreamingResponse.
+    """
+    logger.info(f"Exportación en streaming - Formato: {formato}, Limit: {limit}, Plain: {plain}")
+    prestamo = _ConexionExportacion()
+    media_type = 'text/csv; charset=utf-8' if formato == 'csv' else 'application/x-ndjson'
+    nombre = f"movimientos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+    return StreamingResponse(
+        _stream_exportacion(prestamo, formato, limit, plain),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'},
+        background=BackgroundTask(prestamo.liberar)
+    )
+
+
 class ReclasificacionRequest(BaseModel):
     tercero_id: int
     centro_costo_id: Optional[int] = None
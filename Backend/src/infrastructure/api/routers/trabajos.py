@@ -0,0 +1,130 @@
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from typing import Dict, Any, Optional, List
+from decimal import Decimal
+import json
+
+from src.application.services.ingesta_service import IngestaService
+from src.domain.models.trabajo_ingesta import TrabajoIngesta, TIPO_MOVIMIENTOS, TIPO_EXTRACTO
+from src.domain.ports.trabajo_ingesta_repository import TrabajoIngestaRepository
+from src.infrastructure.api.cola_ingesta import cola_ingesta
+from src.infrastructure.api.dependencies import get_trabajo_ingesta_repository
+
+router = APIRouter(prefix="/api/trabajos", tags=["trabajos"])
+
+
+def _segundos(desde, hasta) -> Optional[float]:
+    return round((hasta - desde).total_seconds(), 3) if desde and hasta else None
+
+
+def _a_dict(trabajo: TrabajoIngesta) -> Dict[str, Any]:
+    return {
+        "id": trabajo.id,
+        "tipo": trabajo.tipo,
+        "archivo": trabajo.archivo,
+        "tipo_cuenta": trabajo.tipo_cuenta,
+        "cuenta_id": trabajo.cuenta_id,
+        "estado": trabajo.estado,
+        "etapa": trabajo.etapa,
+        "filas_procesadas": trabajo.filas_procesadas,
+        "filas_total": trabajo.filas_total,
+        "tiempos_ms": trabajo.tiempos_ms,
+        "intentos": trabajo.intentos,
+        "resultado": trabajo.resultado,
+        "error": trabajo.error,
+        "created_at": trabajo.created_at,
+        "iniciado_at": trabajo.iniciado_at,
+        "terminado_at": trabajo.terminado_at,
+        "segundos_en_cola": _segundos(trabajo.created_at, trabajo.iniciado_at),
+        "segundos_ejecucion": _segundos(trabajo.iniciado_at, trabajo.terminado_at),
+        "url": f"/api/trabajos/{trabajo.id}",
+    }
+
+
+def _encolar(repo: TrabajoIngestaRepository, tipo: str, file: UploadFile, tipo_cuenta: str,
+             cuenta_id: int, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        trabajo = IngestaService(repo).encolar(
+            tipo, file.filename, file.file.read(), tipo_cuenta, cuenta_id, parametros
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    cola_ingesta.notificar()
+    return _a_dict(trabajo)
+
+
+@router.post("/movimientos", status_code=202)
+def encolar_movimientos(
+    file: UploadFile = File(...),
+    tipo_cuenta: str = Form(...),
+    cuenta_id: int = Form(...),
+    actualizar_descripciones: bool = Form(False),
+    repo: TrabajoIngestaRepository = Depends(get_trabajo_ingesta_repository)
+) -> Dict[str, Any]:
+    """
+    Encola un PDF de movimientos (mismo proceso que POST /api/archivos/cargar).
+    Responde de inmediato con el trabajo; el avance se consulta en GET /api/trabajos/{id}.
+    """
+    return _encolar(repo, TIPO_MOVIMIENTOS, file, tipo_cuenta, cuenta_id, {
+        "actualizar_descripciones": actualizar_descripciones
+    })
+
+
+@router.post("/extractos", status_code=202)
+def encolar_extracto(
+    file: UploadFile = File(...),
+    tipo_cuenta: str = Form(...),
+    cuenta_id: int = Form(...),
+    year: Optional[int] = Form(None),
+    month: Optional[int] = Form(None),
+    saldo_anterior: Optional[Decimal] = Form(None),
+    entradas: Optional[Decimal] = Form(None),
+    salidas: Optional[Decimal] = Form(None),
+    saldo_final: Optional[Decimal] = Form(None),
+    movimientos_json: Optional[str] = Form(None),
+    repo: TrabajoIngestaRepository = Depends(get_trabajo_ingesta_repository)
+) -> Dict[str, Any]:
+    """
+    Encola un extracto (mismo proceso que POST /api/conciliaciones/cargar-extracto).
+    """
+    valores = {
+        'saldo_anterior': saldo_anterior, 'entradas': entradas,
+        'salidas': salidas, 'saldo_final': saldo_final
+    }
+    # Como texto: los parámetros se guardan en JSONB y se reconvierten a Decimal al ejecutar
+    overrides = {clave: str(valor) for clave, valor in valores.items() if valor is not None}
+
+    movimientos_confirmados = None
+    if movimientos_json:
+        try:
+            movimientos_confirmados = json.loads(movimientos_json)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Format error in movimientos_json")
+
+    return _encolar(repo, TIPO_EXTRACTO, file, tipo_cuenta, cuenta_id, {
+        "year": year,
+        "month": month,
+        "overrides": overrides,
+        "movimientos_confirmados": movimientos_confirmados,
+    })
+
+
+@router.get("")
+def listar_trabajos(
+    estado: Optional[str] = None,
+    limit: int = 50,
+    repo: TrabajoIngestaRepository = Depends(get_trabajo_ingesta_repository)
+) -> List[Dict[str, Any]]:
+    """Trabajos más recientes primero, opcionalmente filtrados por estado."""
+    return [_a_dict(t) for t in repo.listar(estado=estado, limit=min(max(limit, 1), 500))]
+
+
+@router.get("/{trabajo_id}")
+def obtener_trabajo(
+    trabajo_id: int,
+    repo: TrabajoIngestaRepository = Depends(get_trabajo_ingesta_repository)
+) -> Dict[str, Any]:
+    """Estado, etapa actual, filas procesadas y ms por etapa de un trabajo."""
+    trabajo = repo.obtener_por_id(trabajo_id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return _a_dict(trabajo)
@@ -0,0 +1,187 @@
+"""
+Caché de catálogos en memoria del proceso, invalidada con LISTEN/NOTIFY.
+
+Los catálogos (terceros, cuentas, monedas, conceptos, centros de costo, filtros
+de centros de costo, tipos de cuenta) cambian poco y se leían en cada request.
+Cada entrada del caché declara de qué tablas depende y guarda la versión de
+esas tablas al cargarse; una escritura sube la versión de la tabla y la entrada
+deja de ser válida.
+
+Las escrituras de los repositorios llaman notificar_cambio() dentro de su
+transacción: emite `pg_notify('catalogos_cambio', tabla)`, que PostgreSQL
+entrega al confirmar. EscuchaCatalogos (un hilo por proceso, iniciado en el
+lifespan de la API) recibe la notificación e invalida el caché local, así todos
+los workers de uvicorn quedan consistentes. Un TTL sirve de red de seguridad
+para procesos sin listener (scripts).
+"""
+from copy import copy
+from typing import Callable, Dict, Iterable, Optional, Tuple, TypeVar
+import os
+import select
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from src.infrastructure.logging.config import logger
+
+T = TypeVar('T')
+
+CANAL_CATALOGOS = 'catalogos_cambio'
+TABLAS_CATALOGO = frozenset({
+    'terceros',
+    'cuentas',
+    'monedas',
+    'conceptos',
+    'centro_costos',
+    'config_filtros_centro_costos',
+    'tipo_cuenta',
+})
+TTL_CATALOGOS_SEGUNDOS = float(os.getenv('CATALOGOS_TTL_SEGUNDOS', '300'))
+
+
+class CacheCatalogos:
+    """Caché thread-safe con versión por tabla y TTL de respaldo."""
+
+    def __init__(self, ttl: float = TTL_CATALOGOS_SEGUNDOS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versiones: Dict[str, int] = {}
+        # clave -> (versiones de sus tablas, instante de carga, valor)
+        self._entradas: Dict[str, Tuple[Tuple[int, ...], float, object]] = {}
+        self._aciertos = 0
+        self._fallos = 0
+
+    def _versiones_de(self, tablas: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._versiones.get(t, 0) for t in tablas)
+
+    def obtener(self, clave: str, tablas: Iterable[str], cargar: Callable[[], T]) -> T:
+        """
+        Retorna el valor en caché de `clave` o lo carga con `cargar()`.
+
+        Args:
+            clave: Identificador de la entrada
+            tablas: Tablas de las que depende; un cambio en cualquiera la invalida
+            cargar: Función que consulta la BD
+        """
+        tablas = tuple(tablas)
+        ahora = time.monotonic()
+        with self._lock:
+            versiones = self._versiones_de(tablas)
+            entrada = self._entradas.get(clave)
+            if entrada and entrada[0] == versiones and ahora - entrada[1] < self.ttl:
+                self._aciertos += 1
+                return entrada[2]
+            self._fallos += 1
+
+        # Cargar fuera del lock; solo se guarda si nadie invalidó entretanto
+        valor = cargar()
+        with self._lock:
+            if self._versiones_de(tablas) == versiones:
+                self._entradas[clave] = (versiones, ahora, valor)
+        return valor
+
+    def obtener_lista(self, clave: str, tablas: Iterable[str], cargar: Callable[[], list]) -> list:
+        """Como obtener(), pero retorna copias de los elementos para que el llamador pueda modificarlos."""
+        return [copy(x) for x in self.obtener(clave, tablas, cargar)]
+
+    def invalidar(self, tabla: Optional[str] = None) -> None:
+        """Invalida lo que depende de `tabla` (o todo si es None)."""
+        with self._lock:
+            if tabla is None:
+                for t in set(self._versiones) | TABLAS_CATALOGO:
+                    self._versiones[t] = self._versiones.get(t, 0) + 1
+                self._entradas.clear()
+            else:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {
+                'entradas': sorted(self._entradas),
+                'versiones': dict(self._versiones),
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'ttl_segundos': self.ttl,
+                'escuchando': _escucha is not None and _escucha.is_alive(),
+            }
+
+
+cache_catalogos = CacheCatalogos()
+
+
+def notificar_cambio(cursor, tabla: str) -> None:
+    """
+    Anuncia el cambio de una tabla de catálogo. Debe ejecutarse dentro de la
+    transacción de la escritura (la notificación se entrega al confirmarla).
+    """
+    cursor.execute("SELECT pg_notify(%s, %s)", (CANAL_CATALOGOS, tabla))
+    cache_catalogos.invalidar(tabla)
+
+
+class EscuchaCatalogos(threading.Thread):
+    """Hilo que escucha el canal de catálogos con una conexión dedicada y reconecta si se pierde."""
+
+    def __init__(self, conectar: Callable, cache: CacheCatalogos = cache_catalogos, intervalo: float = 5.0):
+        super().__init__(name='escucha-catalogos', daemon=True)
+        self._conectar = conectar
+        self._cache = cache
+        self._intervalo = intervalo
+        self._detener = threading.Event()
+
+    def detener(self) -> None:
+        self._detener.set()
+
+    def run(self) -> None:
+        espera = 1.0
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = self._conectar()
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CANAL_CATALOGOS}")
+                cursor.close()
+                # Lo que cambió mientras no se escuchaba se perdió: invalidar todo
+                self._cache.invalidar()
+                logger.info(f"Escuchando cambios de catálogos en el canal '{CANAL_CATALOGOS}'")
+                espera = 1.0
+                while not self._detener.is_set():
+                    if select.select([conn], [], [], self._intervalo) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        aviso = conn.notifies.pop(0)
+                        self._cache.invalidar(aviso.payload or None)
+            except Exception as e:
+                logger.warning(f"Escucha de catálogos interrumpida ({e}); reintentando en {espera:.0f}s")
+                self._cache.invalidar()
+                self._detener.wait(espera)
+                espera = min(espera * 2, 60.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+_escucha: Optional[EscuchaCatalogos] = None
+
+
+def iniciar_escucha_catalogos(**db_config) -> None:
+    """Inicia el listener del proceso (idempotente)."""
+    global _escucha
+    if _escucha is not None and _escucha.is_alive():
+        return
+    _escucha = EscuchaCatalogos(lambda: psycopg2.connect(**db_config))
+    _escucha.start()
+
+
+def detener_escucha_catalogos() -> None:
+    global _escucha
+    if _escucha is not None:
+        _escucha.detener()
+        _escucha.join(timeout=10)
+        _escucha = None
@@ -0,0 +1,61 @@
+"""
+Utilidades de carga masiva con COPY FROM STDIN.
+
+Los repositorios copian las filas a una tabla temporal (ON COMMIT DROP) y
+luego las integran a la tabla definitiva con una sola sentencia INSERT ... SELECT,
+en lugar de un INSERT por fila.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from typing import Iterable, List, Sequence
+
+# Caracteres especiales del formato texto de COPY
+_ESCAPES_COPY = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def formatear_valor_copy(valor) -> str:
+    """Representa un valor de Python en el formato texto de COPY (None -> \\N)."""
+    if valor is None:
+        return '\\N'
+    if isinstance(valor, bool):
+        return 't' if valor else 'f'
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return format(valor, 'f')
+    return str(valor).translate(_ESCAPES_COPY)
+
+
+def serializar_filas_copy(filas: Iterable[Sequence]) -> StringIO:
+    """Serializa filas (tuplas) como un buffer listo para COPY ... FROM STDIN."""
+    buffer = StringIO()
+    for fila in filas:
+        buffer.write('\t'.join(formatear_valor_copy(v) for v in fila))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def copiar_a_temporal(cursor, tabla: str, definicion: str, columnas: List[str], filas: Iterable[Sequence]) -> None:
+    """
+    Crea la tabla temporal `tabla` (que se elimina al confirmar la transacción)
+    y le copia las filas con COPY FROM STDIN.
+
+    Args:
+        cursor: Cursor psycopg2 dentro de la transacción de la carga
+        tabla: Nombre de la tabla temporal
+        definicion: Definición de columnas de la tabla temporal (SQL)
+        columnas: Columnas que trae cada fila, en orden
+        filas: Tuplas con los valores
+    """
+    cursor.execute(f"CREATE TEMP TABLE {tabla} ({definicion}) ON COMMIT DROP")
+    cursor.copy_expert(
+        f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN",
+        serializar_filas_copy(filas)
+    )
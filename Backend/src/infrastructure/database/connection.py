@@ -1,8 +1,11 @@
 import psycopg2
-from psycopg2 import pool
 import os
+import threading
 from typing import Generator
 from dotenv import load_dotenv
+from src.domain.exceptions import DatabaseConnectionException
+from src.infrastructure.database.pool import PoolConexiones, PoolAgotadoError
+from src.infrastructure.database.instrumentacion import CursorInstrumentado
 from src.infrastructure.logging.config import logger
 
 # Cargar variables de entorno desde archivo .env
@@ -29,38 +32,49 @@ if not DB_CONFIG['password']:
 _connection_pool = None
 
 
-def get_connection_pool() -> pool.SimpleConnectionPool:
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> PoolConexiones:
     """
     Obtiene o crea el pool de conexiones global.
     
     El pool se crea lazy (al primer uso) para evitar problemas con
     imports circulares y permitir que la configuración se cargue primero.
+    Es thread-safe: los endpoints síncronos de FastAPI corren en un threadpool.
     
     Returns:
-        SimpleConnectionPool: Pool de conexiones a PostgreSQL
+        PoolConexiones: Pool de conexiones a PostgreSQL
     """
     global _connection_pool
     
     if _connection_pool is None:
-        # Configurar tamaño del pool desde variables de entorno
-        min_connections = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
-        max_connections = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
-        
-        logger.info(
-            f"Inicializando connection pool: "
-            f"min={min_connections}, max={max_connections}"
-        )
-        
-        try:
-            _connection_pool = pool.SimpleConnectionPool(
-                minconn=min_connections,
-                maxconn=max_connections,
-                **DB_CONFIG
-            )
-            logger.info("Connection pool inicializado correctamente")
-        except psycopg2.Error as e:
-            logger.error(f"Error al inicializar connection pool: {e}")
-            raise
+        with _pool_lock:
+            if _connection_pool is None:
+                # Configurar tamaño y límites del pool desde variables de entorno
+                min_connections = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+                max_connections = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+                
+                logger.info(
+                    f"Inicializando connection pool: "
+                    f"min={min_connections}, max={max_connections}"
+                )
+                
+                try:
+                    _connection_pool = PoolConexiones(
+                        minconn=min_connections,
+                        maxconn=max_connections,
+                        timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                        max_en_espera=int(os.getenv('DB_POOL_MAX_ESPERA', '50')),
+                        max_usos=int(os.getenv('DB_POOL_MAX_USOS', '5000')),
+                        max_edad=float(os.getenv('DB_POOL_MAX_EDAD', '3600')),
+                        verificar_tras=float(os.getenv('DB_POOL_VERIFICAR_TRAS', '30')),
+                        **DB_CONFIG
+                    )
+                    logger.info("Connection pool inicializado correctamente")
+                except psycopg2.Error as e:
+                    logger.error(f"Error al inicializar connection pool: {e}")
+                    raise
     
     return _connection_pool
 
@@ -71,13 +85,20 @@ def get_db_connection() -> Generator:
     
     Obtiene una conexión del pool, la yields para uso,
     y luego la devuelve al pool (en lugar de cerrarla).
+    Los cursores de la conexión se instrumentan (conteo y tiempo de SQL por request).
     
     Yields:
         psycopg2.connection: Conexión a PostgreSQL del pool
     """
     connection_pool = get_connection_pool()
-    conn = connection_pool.getconn()
+    try:
+        conn = connection_pool.getconn()
+    except PoolAgotadoError as e:
+        logger.error(f"Pool de conexiones agotado: {e}")
+        raise DatabaseConnectionException(e)
     
+    # Todos los conn.cursor() de los repositorios quedan medidos
+    conn.cursor_factory = CursorInstrumentado
     try:
         yield conn
         # Si todo salió bien, hacer commit automático
@@ -100,8 +121,12 @@ def close_all_connections():
     """
     global _connection_pool
     
-    if _connection_pool is not None:
-        logger.info("Cerrando todas las conexiones del pool...")
-        _connection_pool.closeall()
+    with _pool_lock:
+        if _connection_pool is None:
+            return
+        pool_actual = _connection_pool
         _connection_pool = None
-        logger.info("Todas las conexiones cerradas")
+    
+    logger.info("Cerrando todas las conexiones del pool...")
+    pool_actual.closeall()
+    logger.info("Todas las conexiones cerradas")
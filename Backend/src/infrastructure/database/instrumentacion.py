@@ -0,0 +1,205 @@
+"""
+Instrumentación de SQL por request.
+
+get_db_connection instala CursorInstrumentado como cursor_factory de la conexión
+prestada, así todos los `conn.cursor()` de los repositorios quedan medidos sin
+cambiarlos. Cada sentencia se acumula en las MetricasSQL del request actual
+(ContextVar que abre el middleware de main.py): cantidad de sentencias, tiempo
+total en BD y filas. Las sentencias que superan el umbral se capturan con su
+SQL normalizado y, opcionalmente, una muestra de EXPLAIN (ANALYZE, BUFFERS).
+
+Fuera de un request (scripts, workers) el cursor se comporta como uno normal.
+"""
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+import os
+import random
+import re
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions, sql as psycopg2_sql
+
+from src.infrastructure.logging.config import logger
+
+
+# Umbral (ms) a partir del cual una sentencia se considera lenta
+UMBRAL_LENTA_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+# Fracción (0..1) de las sentencias lentas de solo lectura a las que se les toma EXPLAIN ANALYZE
+MUESTREO_EXPLAIN = float(os.getenv('DB_EXPLAIN_MUESTREO', '0'))
+# Máximo de sentencias lentas guardadas por request y en el histórico global
+MAX_LENTAS_POR_REQUEST = 20
+MAX_LENTAS_RECIENTES = 100
+
+_RE_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_SOLO_LECTURA = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_RE_ESCRITURA = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+
+def normalizar_sql(texto: str) -> str:
+    """SQL con literales reemplazados por ? y espacios colapsados (agrupa sentencias iguales)."""
+    texto = _RE_CADENAS.sub('?', texto)
+    texto = _RE_NUMEROS.sub('?', texto)
+    texto = _RE_LISTAS.sub('(...)', texto)
+    return _RE_ESPACIOS.sub(' ', texto).strip()
+
+
+@dataclass
+class ConsultaLenta:
+    """Sentencia que superó el umbral de lentitud."""
+    sql: str
+    ms: float
+    filas: int
+    ruta: Optional[str] = None
+    plan: Optional[str] = None
+
+
+@dataclass
+class MetricasSQL:
+    """Acumulado de las sentencias SQL de un request."""
+    ruta: Optional[str] = None
+    consultas: int = 0
+    tiempo_ms: float = 0.0
+    filas: int = 0
+    lentas: List[ConsultaLenta] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def registrar(self, ms: float, filas: int) -> None:
+        with self._lock:
+            self.consultas += 1
+            self.tiempo_ms += ms
+            self.filas += max(filas, 0)
+
+    def registrar_lenta(self, consulta: ConsultaLenta) -> None:
+        with self._lock:
+            if len(self.lentas) < MAX_LENTAS_POR_REQUEST:
+                self.lentas.append(consulta)
+        with _lentas_lock:
+            _lentas_recientes.append(consulta)
+
+    def server_timing(self) -> str:
+        """Valor del header Server-Timing."""
+        return (
+            f'db;dur={self.tiempo_ms:.1f};desc="{self.consultas} consultas, {self.filas} filas", '
+            f'db-lentas;desc="{len(self.lentas)}"'
+        )
+
+    def resumen(self) -> dict:
+        return {
+            'ruta': self.ruta,
+            'consultas': self.consultas,
+            'tiempo_ms': round(self.tiempo_ms, 3),
+            'filas': self.filas,
+            'lentas': len(self.lentas),
+        }
+
+
+_metricas_actuales: ContextVar[Optional[MetricasSQL]] = ContextVar('metricas_sql', default=None)
+_lentas_recientes: deque = deque(maxlen=MAX_LENTAS_RECIENTES)
+_lentas_lock = threading.Lock()
+
+
+def iniciar_metricas(ruta: Optional[str] = None):
+    """Abre las métricas del request actual. Retorna (metricas, token) para finalizar_metricas."""
+    metricas = MetricasSQL(ruta=ruta)
+    return metricas, _metricas_actuales.set(metricas)
+
+
+def finalizar_metricas(token) -> None:
+    _metricas_actuales.reset(token)
+
+
+def metricas_actuales() -> Optional[MetricasSQL]:
+    return _metricas_actuales.get()
+
+
+def consultas_lentas_recientes() -> List[dict]:
+    """Últimas sentencias lentas capturadas (más reciente primero)."""
+    with _lentas_lock:
+        return [asdict(c) for c in reversed(_lentas_recientes)]
+
+
+class CursorInstrumentado(extensions.cursor):
+    """Cursor psycopg2 que reporta cada sentencia a las MetricasSQL del request actual."""
+
+    def execute(self, query, vars=None):
+        metricas = _metricas_actuales.get()
+        if metricas is None:
+            return super().execute(query, vars)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._medir(metricas, inicio, query, vars)
+
+    def executemany(self, query, vars_list):
+        metricas = _metricas_actuales.get()
+        if metricas is None:
+            return super().executemany(query, vars_list)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._medir(metricas, inicio, query)
+
+    def copy_expert(self, sql, file, size=8192):
+        metricas = _metricas_actuales.get()
+        if metricas is None:
+            return super().copy_expert(sql, file, size)
+        inicio = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            self._medir(metricas, inicio, sql)
+
+    def _medir(self, metricas: MetricasSQL, inicio: float, query, vars=None) -> None:
+        ms = (time.perf_counter() - inicio) * 1000
+        filas = self.rowcount if self.rowcount is not None else 0
+        metricas.registrar(ms, filas)
+        if ms < UMBRAL_LENTA_MS:
+            return
+        try:
+            texto = self._texto(query)
+            consulta = ConsultaLenta(sql=normalizar_sql(texto), ms=round(ms, 3), filas=filas, ruta=metricas.ruta)
+            if MUESTREO_EXPLAIN > 0 and random.random() < MUESTREO_EXPLAIN:
+                consulta.plan = self._explicar(texto, vars)
+            metricas.registrar_lenta(consulta)
+            logger.warning(f"Consulta lenta ({ms:.1f} ms, {filas} filas) en {metricas.ruta}: {consulta.sql[:500]}")
+        except Exception as e:
+            logger.debug(f"No se pudo capturar la consulta lenta: {e}")
+
+    def _texto(self, query) -> str:
+        if isinstance(query, psycopg2_sql.Composable):
+            return query.as_string(self.connection)
+        if isinstance(query, bytes):
+            return query.decode('utf-8', 'replace')
+        return str(query)
+
+    def _explicar(self, texto: str, vars) -> Optional[str]:
+        """
+        EXPLAIN (ANALYZE, BUFFERS) de la sentencia. ANALYZE la vuelve a ejecutar,
+        así que solo se toma para lecturas y fuera de una transacción abortada.
+        """
+        if not _RE_SOLO_LECTURA.match(texto) or _RE_ESCRITURA.search(texto):
+            return None
+        if self.connection.info.transaction_status == extensions.TRANSACTION_STATUS_INERROR:
+            return None
+        cursor = extensions.cursor(self.connection)
+        try:
+            cursor.execute("SAVEPOINT explain_consulta_lenta")
+            try:
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + texto, vars)
+                return '\n'.join(fila[0] for fila in cursor.fetchall())
+            except psycopg2.Error as e:
+                return f"EXPLAIN no disponible: {e}"
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_consulta_lenta")
+                cursor.execute("RELEASE SAVEPOINT explain_consulta_lenta")
+        finally:
+            cursor.close()
@@ -0,0 +1,326 @@
+"""
+Pool de conexiones PostgreSQL thread-safe e instrumentado.
+
+Reemplaza a psycopg2.pool.SimpleConnectionPool (que no es thread-safe) con la
+misma interfaz getconn/putconn/closeall, más:
+
+- Cola de espera acotada con timeout cuando todas las conexiones están en uso.
+- Verificación de salud de conexiones que llevan tiempo inactivas.
+- Reciclaje de conexiones tras N usos o cierta edad.
+- Métricas en vivo: en uso, en espera, histograma de espera y duración del préstamo.
+"""
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+from src.infrastructure.logging.config import logger
+
+
+# Límites superiores (ms) de los buckets de los histogramas; el último es +Inf
+BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class PoolAgotadoError(pool.PoolError):
+    """No hay conexión disponible dentro del tiempo de espera o la cola está llena."""
+    pass
+
+
+class Histograma:
+    """Histograma acumulado de duraciones en milisegundos (no thread-safe por sí solo)."""
+
+    def __init__(self, buckets_ms: List[float] = BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.conteos = [0] * (len(self.buckets_ms) + 1)
+        self.total = 0
+        self.suma_ms = 0.0
+        self.maximo_ms = 0.0
+
+    def registrar(self, ms: float) -> None:
+        self.conteos[bisect_left(self.buckets_ms, ms)] += 1
+        self.total += 1
+        self.suma_ms += ms
+        self.maximo_ms = max(self.maximo_ms, ms)
+
+    def resumen(self) -> dict:
+        etiquetas = [f"<={b}" for b in self.buckets_ms] + ["+Inf"]
+        return {
+            'total': self.total,
+            'promedio_ms': round(self.suma_ms / self.total, 3) if self.total else 0.0,
+            'maximo_ms': round(self.maximo_ms, 3),
+            'buckets': dict(zip(etiquetas, self.conteos)),
+        }
+
+
+@dataclass
+class _EstadoConexion:
+    """Datos de vida de una conexión del pool."""
+    creada: float
+    usos: int = 0
+    ultimo_uso: float = 0.0
+    prestada_desde: Optional[float] = None
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones thread-safe con espera acotada, salud, reciclaje y métricas.
+
+    Args:
+        minconn: Conexiones que se abren al crear el pool
+        maxconn: Máximo de conexiones abiertas a la vez
+        timeout: Segundos máximos de espera por una conexión
+        max_en_espera: Máximo de hilos esperando; si se supera se falla de inmediato
+        max_usos: Préstamos tras los cuales la conexión se cierra y se reemplaza (0 = sin límite)
+        max_edad: Segundos de vida tras los cuales la conexión se recicla (0 = sin límite)
+        verificar_tras: Segundos de inactividad tras los cuales se verifica con SELECT 1
+        conectar: Fábrica de conexiones (por defecto psycopg2.connect(**kwargs))
+        **kwargs: Parámetros de conexión de psycopg2
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        timeout: float = 30.0,
+        max_en_espera: int = 50,
+        max_usos: int = 5000,
+        max_edad: float = 3600.0,
+        verificar_tras: float = 30.0,
+        conectar: Optional[Callable] = None,
+        **kwargs
+    ):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError("Se requiere 0 <= minconn <= maxconn y maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_en_espera = max_en_espera
+        self.max_usos = max_usos
+        self.max_edad = max_edad
+        self.verificar_tras = verificar_tras
+        self._conectar = conectar or (lambda: psycopg2.connect(**kwargs))
+
+        self._condicion = threading.Condition(threading.Lock())
+        self._libres: deque = deque()
+        self._estados: Dict[int, _EstadoConexion] = {}
+        self._prestadas: Dict[int, object] = {}
+        self._abiertas = 0  # Incluye las que se están creando
+        self._en_espera = 0
+        self.closed = False
+
+        self._contadores = {
+            'prestamos': 0,
+            'creadas': 0,
+            'recicladas': 0,
+            'descartadas': 0,
+            'timeouts': 0,
+            'rechazadas_cola_llena': 0,
+        }
+        self._espera = Histograma()
+        self._duracion_prestamo = Histograma()
+
+        for _ in range(minconn):
+            with self._condicion:
+                self._abiertas += 1
+            conn = self._crear()
+            with self._condicion:
+                self._libres.append(conn)
+
+    # --- Interfaz compatible con psycopg2.pool ---
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Presta una conexión, esperando como máximo `timeout` segundos.
+
+        Raises:
+            PoolAgotadoError: Si vence el tiempo o la cola de espera está llena
+        """
+        timeout = self.timeout if timeout is None else timeout
+        inicio = time.perf_counter()
+        limite = inicio + timeout
+
+        while True:
+            crear = False
+            conn = None
+            with self._condicion:
+                if self.closed:
+                    raise pool.PoolError("El pool de conexiones está cerrado")
+
+                if not self._libres and self._abiertas >= self.maxconn:
+                    if self._en_espera >= self.max_en_espera:
+                        self._contadores['rechazadas_cola_llena'] += 1
+                        raise PoolAgotadoError(
+                            f"Cola de espera llena ({self._en_espera} esperando, {self.maxconn} conexiones en uso)"
+                        )
+                    self._en_espera += 1
+                    try:
+                        while not self._libres and self._abiertas >= self.maxconn and not self.closed:
+                            restante = limite - time.perf_counter()
+                            if restante <= 0:
+                                self._contadores['timeouts'] += 1
+                                raise PoolAgotadoError(
+                                    f"No hay conexiones disponibles tras {timeout}s "
+                                    f"({self.maxconn} en uso)"
+                                )
+                            self._condicion.wait(restante)
+                    finally:
+                        self._en_espera -= 1
+                    continue
+
+                if self._libres:
+                    conn = self._libres.pop()
+                else:
+                    self._abiertas += 1
+                    crear = True
+
+            # Crear o verificar fuera del lock (operaciones de red)
+            if crear:
+                try:
+                    conn = self._crear()
+                except Exception:
+                    with self._condicion:
+                        self._abiertas -= 1
+                        self._condicion.notify()
+                    raise
+            elif self._debe_reciclarse(self._estados[id(conn)], time.perf_counter()):
+                self._descartar(conn, 'recicladas')
+                continue
+            elif not self._saludable(conn):
+                self._descartar(conn, 'descartadas')
+                continue
+
+            ahora = time.perf_counter()
+            with self._condicion:
+                estado = self._estados[id(conn)]
+                estado.usos += 1
+                estado.prestada_desde = ahora
+                self._prestadas[id(conn)] = conn
+                self._contadores['prestamos'] += 1
+                self._espera.registrar((ahora - inicio) * 1000)
+            return conn
+
+    def putconn(self, conn, key=None, close: bool = False) -> None:
+        """Devuelve una conexión al pool (o la cierra si debe reciclarse)."""
+        ahora = time.perf_counter()
+        with self._condicion:
+            if self._prestadas.pop(id(conn), None) is None:
+                raise pool.PoolError("La conexión no pertenece a este pool")
+            estado = self._estados[id(conn)]
+            if estado.prestada_desde is not None:
+                self._duracion_prestamo.registrar((ahora - estado.prestada_desde) * 1000)
+            estado.prestada_desde = None
+            estado.ultimo_uso = ahora
+
+        motivo = None
+        if close or self.closed or conn.closed:
+            motivo = 'descartadas'
+        elif self._debe_reciclarse(estado, ahora):
+            motivo = 'recicladas'
+        else:
+            # Igual que psycopg2.pool: no devolver conexiones con transacción abierta
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                motivo = 'descartadas'
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    motivo = 'descartadas'
+
+        if motivo:
+            self._descartar(conn, motivo)
+            return
+
+        with self._condicion:
+            self._libres.append(conn)
+            self._condicion.notify()
+
+    def closeall(self) -> None:
+        """Cierra todas las conexiones (las prestadas se cierran también)."""
+        with self._condicion:
+            self.closed = True
+            conexiones = list(self._libres) + list(self._prestadas.values())
+            self._libres.clear()
+            self._prestadas.clear()
+            self._estados.clear()
+            self._abiertas = 0
+            self._condicion.notify_all()
+        for conn in conexiones:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # --- Métricas ---
+
+    def metricas(self) -> dict:
+        """Fotografía de las métricas del pool."""
+        ahora = time.perf_counter()
+        with self._condicion:
+            prestamo_mas_largo = max(
+                (ahora - e.prestada_desde for e in self._estados.values() if e.prestada_desde is not None),
+                default=0.0
+            )
+            return {
+                'minconn': self.minconn,
+                'maxconn': self.maxconn,
+                'abiertas': self._abiertas,
+                'en_uso': len(self._prestadas),
+                'libres': len(self._libres),
+                'en_espera': self._en_espera,
+                'max_en_espera': self.max_en_espera,
+                'timeout_segundos': self.timeout,
+                'prestamo_activo_mas_largo_ms': round(prestamo_mas_largo * 1000, 3),
+                **self._contadores,
+                'espera_ms': self._espera.resumen(),
+                'duracion_prestamo_ms': self._duracion_prestamo.resumen(),
+            }
+
+    # --- Internos ---
+
+    def _crear(self):
+        conn = self._conectar()
+        with self._condicion:
+            self._estados[id(conn)] = _EstadoConexion(creada=time.perf_counter(), ultimo_uso=time.perf_counter())
+            self._contadores['creadas'] += 1
+        return conn
+
+    def _descartar(self, conn, motivo: str) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._condicion:
+            self._estados.pop(id(conn), None)
+            self._abiertas -= 1
+            self._contadores[motivo] += 1
+            self._condicion.notify()
+
+    def _debe_reciclarse(self, estado: _EstadoConexion, ahora: float) -> bool:
+        if self.max_usos and estado.usos >= self.max_usos:
+            return True
+        return bool(self.max_edad) and ahora - estado.creada >= self.max_edad
+
+    def _saludable(self, conn) -> bool:
+        """Descarta conexiones cerradas y verifica las que llevan tiempo inactivas."""
+        if conn.closed:
+            return False
+        estado = self._estados.get(id(conn))
+        if estado is None or time.perf_counter() - estado.ultimo_uso < self.verificar_tras:
+            return True
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Conexión del pool no saludable, se reemplaza: {e}")
+            return False
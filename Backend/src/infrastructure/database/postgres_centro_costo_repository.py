@@ -2,6 +2,7 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.centro_costo import CentroCosto
 from src.domain.ports.centro_costo_repository import CentroCostoRepository
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 class PostgresCentroCostoRepository(CentroCostoRepository):
     def __init__(self, connection):
@@ -21,6 +22,7 @@ class PostgresCentroCostoRepository(CentroCostoRepository):
                     (centro_costo.centro_costo, centro_costo.activa)
                 )
                 centro_costo.centro_costo_id = cursor.fetchone()[0]
+            notificar_cambio(cursor, 'centro_costos')
             self.conn.commit()
             return centro_costo
         except Exception as e:
@@ -37,6 +39,10 @@ class PostgresCentroCostoRepository(CentroCostoRepository):
         return CentroCosto(centro_costo_id=row[0], centro_costo=row[1], activa=row[2]) if row else None
 
     def obtener_todos(self) -> List[CentroCosto]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('centro_costos', ('centro_costos',), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[CentroCosto]:
         cursor = self.conn.cursor()
         cursor.execute("SELECT centro_costo_id, centro_costo, activa FROM centro_costos WHERE activa = TRUE ORDER BY centro_costo")
         rows = cursor.fetchall()
@@ -54,6 +60,7 @@ class PostgresCentroCostoRepository(CentroCostoRepository):
         cursor = self.conn.cursor()
         try:
             cursor.execute("UPDATE centro_costos SET activa = FALSE WHERE centro_costo_id = %s", (centro_costo_id,))
+            notificar_cambio(cursor, 'centro_costos')
             self.conn.commit()
         except Exception as e:
             self.conn.rollback()
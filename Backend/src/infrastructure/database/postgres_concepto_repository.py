@@ -2,6 +2,7 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.concepto import Concepto
 from src.domain.ports.concepto_repository import ConceptoRepository
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 class PostgresConceptoRepository(ConceptoRepository):
     def __init__(self, connection):
@@ -31,6 +32,7 @@ class PostgresConceptoRepository(ConceptoRepository):
                     (concepto.concepto, concepto.centro_costo_id, concepto.activa)
                 )
                 concepto.conceptoid = cursor.fetchone()[0]
+            notificar_cambio(cursor, 'conceptos')
             self.conn.commit()
             return concepto
         except Exception as e:
@@ -57,6 +59,10 @@ class PostgresConceptoRepository(ConceptoRepository):
         return None
 
     def obtener_todos(self) -> List[Concepto]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('conceptos', ('conceptos',), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[Concepto]:
         cursor = self.conn.cursor()
         cursor.execute("SELECT conceptoid, concepto, centro_costo_id, activa FROM conceptos WHERE activa = TRUE ORDER BY concepto")
         rows = cursor.fetchall()
@@ -98,6 +104,7 @@ class PostgresConceptoRepository(ConceptoRepository):
         try:
             # Soft delete
             cursor.execute("UPDATE conceptos SET activa = FALSE WHERE conceptoid = %s", (conceptoid,))
+            notificar_cambio(cursor, 'conceptos')
             self.conn.commit()
         except Exception as e:
             self.conn.rollback()
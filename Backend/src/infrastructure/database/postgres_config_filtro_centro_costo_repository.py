@@ -2,6 +2,7 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.config_filtro_centro_costo import ConfigFiltroCentroCosto
 from src.domain.ports.config_filtro_centro_costo_repository import ConfigFiltroCentroCostoRepository
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 class PostgresConfigFiltroCentroCostoRepository(ConfigFiltroCentroCostoRepository):
     """PostgreSQL implementation of ConfigFiltroCentroCostoRepository."""
@@ -32,6 +33,7 @@ class PostgresConfigFiltroCentroCostoRepository(ConfigFiltroCentroCostoRepositor
                 )
                 config.id = cursor.fetchone()[0]
             
+            notificar_cambio(cursor, 'config_filtros_centro_costos')
             self.conn.commit()
             return config
         except psycopg2.IntegrityError as e:
@@ -69,6 +71,10 @@ class PostgresConfigFiltroCentroCostoRepository(ConfigFiltroCentroCostoRepositor
             cursor.close()
 
     def obtener_todos(self) -> List[ConfigFiltroCentroCosto]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('config_filtros_centro_costos', ('config_filtros_centro_costos',), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[ConfigFiltroCentroCosto]:
         """Get all filter configurations."""
         cursor = self.conn.cursor()
         try:
@@ -99,6 +105,7 @@ class PostgresConfigFiltroCentroCostoRepository(ConfigFiltroCentroCostoRepositor
                 "DELETE FROM config_filtros_centro_costos WHERE id = %s",
                 (id,)
             )
+            notificar_cambio(cursor, 'config_filtros_centro_costos')
             self.conn.commit()
         except Exception as e:
             self.conn.rollback()
@@ -2,6 +2,7 @@ from typing import List, Optional
 from decimal import Decimal
 from src.domain.models.cuenta import Cuenta
 from src.domain.ports.cuenta_repository import CuentaRepository
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 
 class PostgresCuentaRepository(CuentaRepository):
@@ -74,6 +75,7 @@ class PostgresCuentaRepository(CuentaRepository):
                      cuenta.permite_conciliar, cuenta.tipo_cuenta_id)
                 )
                 cuenta.cuentaid = cursor.fetchone()[0]
+            notificar_cambio(cursor, 'cuentas')
             self.conn.commit()
             return cuenta
         except Exception as e:
@@ -97,6 +99,10 @@ class PostgresCuentaRepository(CuentaRepository):
         return self._row_to_cuenta_con_tipo(row)
 
     def obtener_todos(self) -> List[Cuenta]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('cuentas', ('cuentas', 'tipo_cuenta'), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[Cuenta]:
         cursor = self.conn.cursor()
         cursor.execute(f"""
             SELECT {self._get_select_con_tipo()}
@@ -130,6 +136,7 @@ class PostgresCuentaRepository(CuentaRepository):
         try:
             # Soft delete
             cursor.execute("UPDATE cuentas SET activa = FALSE WHERE cuentaid = %s", (cuentaid,))
+            notificar_cambio(cursor, 'cuentas')
             self.conn.commit()
         except Exception as e:
             self.conn.rollback()
@@ -2,6 +2,7 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.moneda import Moneda
 from src.domain.ports.moneda_repository import MonedaRepository
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 class PostgresMonedaRepository(MonedaRepository):
     def __init__(self, connection):
@@ -21,6 +22,7 @@ class PostgresMonedaRepository(MonedaRepository):
                     (moneda.isocode, moneda.moneda, moneda.activa)
                 )
                 moneda.monedaid = cursor.fetchone()[0]
+            notificar_cambio(cursor, 'monedas')
             self.conn.commit()
             return moneda
         except Exception as e:
@@ -39,6 +41,10 @@ class PostgresMonedaRepository(MonedaRepository):
         return None
 
     def obtener_todos(self) -> List[Moneda]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('monedas', ('monedas',), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[Moneda]:
         cursor = self.conn.cursor()
         cursor.execute("SELECT monedaid, isocode, moneda, activa FROM monedas WHERE activa = TRUE ORDER BY moneda")
         rows = cursor.fetchall()
@@ -58,6 +64,7 @@ class PostgresMonedaRepository(MonedaRepository):
         cursor = self.conn.cursor()
         try:
             cursor.execute("UPDATE monedas SET activa = FALSE WHERE monedaid = %s", (monedaid,))
+            notificar_cambio(cursor, 'monedas')
             self.conn.commit()
         except Exception as e:
             self.conn.rollback()
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from src.domain.models.movimiento_extracto import MovimientoExtracto
 from src.domain.ports.movimiento_extracto_repository import MovimientoExtractoRepository
+from src.infrastructure.database.carga_masiva import copiar_a_temporal
 class PostgresMovimientoExtractoRepository(MovimientoExtractoRepository):
     """
     Implementación PostgreSQL del repositorio de Movimientos de Extracto.
@@ -62,29 +63,56 @@ class PostgresMovimientoExtractoRepository(MovimientoExtractoRepository):
             cursor.close()
     
     def guardar_lote(self, movimientos: List[MovimientoExtracto]) -> int:
+        """
+        Inserta el lote copiándolo a una tabla temporal con COPY FROM STDIN y
+        una sola sentencia INSERT ... SELECT. Asigna id y created_at a cada movimiento.
+        """
         if not movimientos:
             return 0
         
         cursor = self.conn.cursor()
         try:
+            copiar_a_temporal(
+                cursor, 'tmp_carga_extracto',
+                """orden INTEGER, cuenta_id INTEGER, year INTEGER, month INTEGER, fecha DATE,
+                   descripcion TEXT, referencia TEXT, valor NUMERIC, usd NUMERIC, trm NUMERIC,
+                   numero_linea INTEGER, raw_text TEXT""",
+                ['orden', 'cuenta_id', 'year', 'month', 'fecha', 'descripcion',
+                 'referencia', 'valor', 'usd', 'trm', 'numero_linea', 'raw_text'],
+                (
+                    (i, m.cuenta_id, m.year, m.month, m.fecha, m.descripcion,
+                     m.referencia, m.valor, m.usd, m.trm, m.numero_linea, m.raw_text)
+                    for i, m in enumerate(movimientos)
+                )
+            )
+            
+            # IDs reservados de la secuencia para relacionar cada fila con su objeto
             query = """
-                INSERT INTO movimientos_extracto (
-                    cuenta_id, year, month, fecha, descripcion, 
-                    referencia, valor, usd, trm, numero_linea, raw_text
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                WITH nuevos AS (
+                    SELECT t.*, nextval(pg_get_serial_sequence('movimientos_extracto', 'id')) AS id
+                    FROM tmp_carga_extracto t
+                ),
+                insertados AS (
+                    INSERT INTO movimientos_extracto (
+                        id, cuenta_id, year, month, fecha, descripcion, 
+                        referencia, valor, usd, trm, numero_linea, raw_text
+                    )
+                    SELECT id, cuenta_id, year, month, fecha, descripcion,
+                           referencia, valor, usd, trm, numero_linea, raw_text
+                    FROM nuevos
+                    RETURNING id, created_at
+                )
+                SELECT n.orden, i.id, i.created_at
+                FROM insertados i JOIN nuevos n ON n.id = i.id
             """
-            
-            data = [
-                (m.cuenta_id, m.year, m.month, m.fecha, m.descripcion,
-                 m.referencia, m.valor, m.usd, m.trm, m.numero_linea, m.raw_text)
-                for m in movimientos
-            ]
-            
-            cursor.executemany(query, data)
-            count = cursor.rowcount
+            cursor.execute(query)
+            filas = cursor.fetchall()
+            for orden, id_generado, created_at in filas:
+                movimientos[orden].id = id_generado
+                movimientos[orden].created_at = created_at
             self.conn.commit()
             
-            return count
+            return len(filas)
             
         except Exception as e:
             self.conn.rollback()
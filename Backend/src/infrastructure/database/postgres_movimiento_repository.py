@@ -1,16 +1,54 @@
-from typing import List, Optional
-from datetime import date
-from decimal import Decimal
+from typing import Iterator, List, Optional
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+import base64
+import json
+import os
+import threading
+import time
+import uuid
 import psycopg2
 from src.domain.models.movimiento import Movimiento
 from src.domain.models.movimiento_detalle import MovimientoDetalle
 from src.domain.ports.movimiento_repository import MovimientoRepository
 from src.infrastructure.database.postgres_conciliacion_repository import PostgresConciliacionRepository
+from src.infrastructure.database.carga_masiva import copiar_a_temporal
+from src.infrastructure.database.cache_catalogos import cache_catalogos
+from src.infrastructure.database.sentencias_preparadas import sentencias
+
+# Los reportes leen de resumen_mensual_movimientos cuando el filtro lo permite (ver Sql/migration_resumen_mensual.sql)
+USAR_RESUMEN_MENSUAL = os.getenv('REPORTES_RESUMEN_MENSUAL', '1') == '1'
+
+# Resúmenes (conteo y totales) de búsquedas paginadas por keyset, con TTL corto
+TTL_RESUMEN_SEGUNDOS = 30
+MAX_RESUMENES_CACHE = 256
+_cache_resumenes: dict = {}
+_cache_resumenes_lock = threading.Lock()
+
+
+def _codificar_cursor(fecha: date, valor_abs: Decimal, id: int) -> str:
+    """Token opaco con la última clave (fecha, abs(valor), id) de una página."""
+    crudo = json.dumps([fecha.isoformat(), str(valor_abs), id]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> tuple:
+    """Inverso de _codificar_cursor; ValueError si el token no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, valor_abs, id = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return date.fromisoformat(fecha), Decimal(valor_abs), int(id)
+    except (ValueError, TypeError, InvalidOperation, json.JSONDecodeError) as e:
+        raise ValueError(f"Cursor de paginación inválido: {cursor}") from e
+
 
 class PostgresMovimientoRepository(MovimientoRepository):
     """
     Adaptador de Base de Datos para Movimientos en PostgreSQL.
     """
+
+    # Existencia de resumen_mensual_movimientos (None = aún no verificada en este proceso)
+    _resumen_mensual_existe: Optional[bool] = None
     
     
 
@@ -21,7 +59,12 @@ class PostgresMovimientoRepository(MovimientoRepository):
         self.conciliacion_repo = PostgresConciliacionRepository(connection)
 
     def _get_ids_traslados(self) -> tuple[Optional[int], Optional[int]]:
-        """Busca dinámicamente el ID de centro_costo y concepto para 'Traslados'"""
+        """Busca dinámicamente el ID de centro_costo y concepto para 'Traslados' (en caché de catálogos)"""
+        return cache_catalogos.obtener(
+            'ids_traslados', ('config_filtros_centro_costos', 'conceptos'), self._consultar_ids_traslados
+        )
+
+    def _consultar_ids_traslados(self) -> tuple[Optional[int], Optional[int]]:
         cursor = self.conn.cursor()
         try:
             # 1. Buscar centro_costo en config_filtros_centro_costos (label 'Excluir Traslados')
@@ -125,6 +168,85 @@ class PostgresMovimientoRepository(MovimientoRepository):
              
         return f" AND {' AND '.join(conditions)}", params
 
+    def _usar_resumen_mensual(self,
+                              fecha_inicio: Optional[date] = None,
+                              fecha_fin: Optional[date] = None,
+                              tipo_movimiento: Optional[str] = None) -> bool:
+        """
+        Indica si un reporte puede leerse de resumen_mensual_movimientos.
+        El resumen tiene grano mensual: solo responde exacto con rangos de meses
+        completos y sin filtro por tipo de movimiento (signo del encabezado).
+        """
+        if not USAR_RESUMEN_MENSUAL or tipo_movimiento in ('ingresos', 'egresos'):
+            return False
+        if fecha_inicio and fecha_inicio.day != 1:
+            return False
+        if fecha_fin and (fecha_fin + timedelta(days=1)).day != 1:
+            return False
+
+        cls = PostgresMovimientoRepository
+        if cls._resumen_mensual_existe is None:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute("SELECT to_regclass('resumen_mensual_movimientos') IS NOT NULL")
+                cls._resumen_mensual_existe = bool(cursor.fetchone()[0])
+            finally:
+                cursor.close()
+        return cls._resumen_mensual_existe
+
+    def _construir_filtros_resumen(self,
+                                   fecha_inicio: Optional[date] = None,
+                                   fecha_fin: Optional[date] = None,
+                                   cuenta_id: Optional[int] = None,
+                                   tercero_id: Optional[int] = None,
+                                   centro_costo_id: Optional[int] = None,
+                                   concepto_id: Optional[int] = None,
+                                   centros_costos_excluidos: Optional[List[int]] = None
+    ) -> tuple[str, list]:
+        """Equivalente de _construir_filtros sobre r (resumen_mensual_movimientos)."""
+        conditions = []
+        params = []
+
+        if fecha_inicio:
+            conditions.append("(r.year, r.month) >= (%s, %s)")
+            params.extend([fecha_inicio.year, fecha_inicio.month])
+        if fecha_fin:
+            conditions.append("(r.year, r.month) <= (%s, %s)")
+            params.extend([fecha_fin.year, fecha_fin.month])
+        if cuenta_id:
+            conditions.append("r.cuenta_id = %s")
+            params.append(cuenta_id)
+        if tercero_id:
+            conditions.append("r.tercero_id = %s")
+            params.append(tercero_id)
+        if centro_costo_id:
+            conditions.append("r.centro_costo_id = %s")
+            params.append(centro_costo_id)
+        if concepto_id:
+            conditions.append("r.concepto_id = %s")
+            params.append(concepto_id)
+        if centros_costos_excluidos and len(centros_costos_excluidos) > 0:
+            conditions.append("(r.centro_costo_id IS NULL OR r.centro_costo_id NOT IN %s)")
+            params.append(tuple(centros_costos_excluidos))
+
+        if not conditions:
+            return "", []
+        return f" AND {' AND '.join(conditions)}", params
+
+    def reconstruir_resumen_mensual(self) -> int:
+        """Reconstruye resumen_mensual_movimientos desde cero. Retorna los periodos recalculados."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT reconstruir_resumen_mensual()")
+            periodos = cursor.fetchone()[0]
+            self.conn.commit()
+            return int(periodos or 0)
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
     def _row_to_movimiento(self, row) -> Movimiento:
         """Helper para convertir fila de BD (Encabezado) a objeto Movimiento"""
         # Nuevo orden esperado (según query actualizada): 
@@ -198,7 +320,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
             LEFT JOIN terceros t ON d.TerceroID = t.terceroid
             WHERE d.movimiento_id = ANY(%s)
         """
-        cursor.execute(query, (ids,))
+        sentencias.ejecutar(cursor, 'detalles_por_movimientos', query, (ids,))
         rows = cursor.fetchall()
         cursor.close()
 
@@ -234,7 +356,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
             
         cursor = self.conn.cursor()
         query = "SELECT estado FROM conciliaciones WHERE cuenta_id = %s AND year = %s AND month = %s"
-        cursor.execute(query, (cuenta_id, fecha.year, fecha.month))
+        sentencias.ejecutar(cursor, 'estado_conciliacion_periodo', query, (cuenta_id, fecha.year, fecha.month))
         row = cursor.fetchone()
         cursor.close()
         
@@ -370,6 +492,154 @@ class PostgresMovimientoRepository(MovimientoRepository):
         finally:
             cursor.close()
 
+    def _validar_bloqueo_periodos(self, cursor, periodos: set):
+        """Lanza error si alguno de los periodos (cuenta_id, year, month) está CONCILIADO (una sola consulta)."""
+        if not periodos:
+            return
+        cursor.execute("""
+            SELECT cuenta_id, year, month FROM conciliaciones
+            WHERE estado = 'CONCILIADO' AND (cuenta_id, year, month) IN %s
+            ORDER BY year, month, cuenta_id
+        """, (tuple(sorted(periodos)),))
+        bloqueados = cursor.fetchall()
+        if bloqueados:
+            periodos_txt = ', '.join(f"{y}-{m} (cuenta {c})" for c, y, m in bloqueados)
+            raise ValueError(f"No se permite modificar movimientos: Periodos CONCILIADOS y bloqueados: {periodos_txt}.")
+
+    def guardar_lote(self, movimientos: List[Movimiento], recalcular_conciliacion: bool = True) -> List[Movimiento]:
+        """
+        Inserta movimientos nuevos en bloque.
+
+        Copia encabezados y detalles a tablas temporales con COPY FROM STDIN y
+        los integra con una sola sentencia. Los bloqueos de periodo se validan
+        una vez por mes distinto. Asigna id y created_at a cada movimiento y
+        detalle. Todo o nada: si algo falla no se inserta ningún movimiento.
+        Con recalcular_conciliacion=False no se recalculan las conciliaciones
+        de los periodos (la carga por etapas lo hace en su etapa CONCILIACION).
+        """
+        if not movimientos:
+            return []
+
+        periodos = set()
+        for mov in movimientos:
+            if mov.id:
+                raise ValueError(f"guardar_lote solo inserta movimientos nuevos (recibido ID {mov.id})")
+            if mov.detalles:
+                total_detalles = sum(d.valor for d in mov.detalles)
+                if abs(total_detalles - mov.valor) > Decimal('0.01'):
+                    raise ValueError(
+                        f"La suma de los valores de los detalles ({total_detalles}) debe ser igual "
+                        f"al valor del encabezado ({mov.valor}). Diferencia encontrada: {mov.valor - total_detalles}"
+                    )
+                # Misma sincronización de tercero que guardar()
+                if len(mov.detalles) == 1 and mov.detalles[0].tercero_id:
+                    mov.tercero_id = mov.detalles[0].tercero_id
+            else:
+                mov.detalles = [MovimientoDetalle(
+                    valor=mov.valor,
+                    centro_costo_id=None,
+                    concepto_id=None,
+                    tercero_id=mov.tercero_id
+                )]
+            if mov.cuenta_id and mov.fecha:
+                periodos.add((mov.cuenta_id, mov.fecha.year, mov.fecha.month))
+
+        cursor = self.conn.cursor()
+        try:
+            self._validar_bloqueo_periodos(cursor, periodos)
+
+            copiar_a_temporal(
+                cursor, 'tmp_carga_encabezado',
+                """orden INTEGER, fecha DATE, descripcion TEXT, referencia TEXT, valor NUMERIC,
+                   usd NUMERIC, trm NUMERIC, moneda_id INTEGER, cuenta_id INTEGER,
+                   tercero_id INTEGER, detalle TEXT""",
+                ['orden', 'fecha', 'descripcion', 'referencia', 'valor', 'usd', 'trm',
+                 'moneda_id', 'cuenta_id', 'tercero_id', 'detalle'],
+                (
+                    (i, m.fecha, m.descripcion, m.referencia, m.valor, m.usd, m.trm,
+                     m.moneda_id, m.cuenta_id, m.tercero_id, m.detalle)
+                    for i, m in enumerate(movimientos)
+                )
+            )
+            copiar_a_temporal(
+                cursor, 'tmp_carga_detalle',
+                """orden_movimiento INTEGER, orden INTEGER, centro_costo_id INTEGER,
+                   concepto_id INTEGER, tercero_id INTEGER, valor NUMERIC""",
+                ['orden_movimiento', 'orden', 'centro_costo_id', 'concepto_id', 'tercero_id', 'valor'],
+                (
+                    (i, j, d.centro_costo_id, d.concepto_id, d.tercero_id, d.valor)
+                    for i, m in enumerate(movimientos)
+                    for j, d in enumerate(m.detalles)
+                )
+            )
+
+            # Los IDs se reservan de las secuencias antes de insertar para poder
+            # relacionar cada fila generada con su objeto por `orden`.
+            cursor.execute("""
+                WITH nuevos AS (
+                    SELECT t.*, nextval(pg_get_serial_sequence('movimientos_encabezado', 'id')) AS id
+                    FROM tmp_carga_encabezado t
+                ),
+                nuevos_detalles AS (
+                    SELECT d.*, n.id AS movimiento_id,
+                           nextval(pg_get_serial_sequence('movimientos_detalle', 'id')) AS id
+                    FROM tmp_carga_detalle d
+                    JOIN nuevos n ON n.orden = d.orden_movimiento
+                ),
+                encabezados AS (
+                    INSERT INTO movimientos_encabezado (
+                        Id, Fecha, Descripcion, Referencia, Valor, USD, TRM,
+                        MonedaID, CuentaID, terceroid, Detalle
+                    )
+                    SELECT id, fecha, descripcion, referencia, valor, usd, trm,
+                           moneda_id, cuenta_id, tercero_id, detalle
+                    FROM nuevos
+                    RETURNING Id, created_at
+                ),
+                detalles AS (
+                    INSERT INTO movimientos_detalle (id, movimiento_id, centro_costo_id, ConceptoID, TerceroID, Valor)
+                    SELECT id, movimiento_id, centro_costo_id, concepto_id, tercero_id, valor
+                    FROM nuevos_detalles
+                    RETURNING id, created_at
+                )
+                SELECT n.orden, NULL::INTEGER, e.Id, e.created_at
+                FROM encabezados e JOIN nuevos n ON n.id = e.Id
+                UNION ALL
+                SELECT nd.orden_movimiento, nd.orden, d.id, d.created_at
+                FROM detalles d JOIN nuevos_detalles nd ON nd.id = d.id
+            """)
+
+            for orden, orden_detalle, id_generado, created_at in cursor.fetchall():
+                mov = movimientos[orden]
+                if orden_detalle is None:
+                    mov.id = id_generado
+                    mov.created_at = created_at
+                else:
+                    detalle = mov.detalles[orden_detalle]
+                    detalle.id = id_generado
+                    detalle.created_at = created_at
+            for mov in movimientos:
+                for d in mov.detalles:
+                    d.movimiento_id = mov.id
+
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+        # --- AUTO-RECONCILIATION HOOK (una vez por periodo) ---
+        if not recalcular_conciliacion:
+            return movimientos
+        for cuenta_id, year, month in sorted(periodos):
+            try:
+                self.conciliacion_repo.recalcular_sistema(cuenta_id, year, month)
+            except Exception as e:
+                print(f"WARNING: Error al recalcular conciliacion: {e}")
+
+        return movimientos
+
     def obtener_por_id(self, id: int) -> Optional[Movimiento]:
         cursor = self.conn.cursor()
         query = """
@@ -412,7 +682,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
             WHERE m.Id = ANY(%s)
             ORDER BY m.Fecha DESC
         """
-        cursor.execute(query, (ids,))
+        sentencias.ejecutar(cursor, 'movimientos_por_ids', query, (ids,))
         rows = cursor.fetchall()
         cursor.close()
         
@@ -540,6 +810,21 @@ class PostgresMovimientoRepository(MovimientoRepository):
         self._cargar_detalles_para_movimientos(movimientos)
         return movimientos
 
+    def obtener_por_cuenta_y_rango(self, cuenta_id: int, fecha_inicio: date, fecha_fin: date) -> List[Movimiento]:
+        cursor = self.conn.cursor()
+        query = """
+            SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.USD, m.TRM, 
+                   m.MonedaID, m.CuentaID, m.terceroid, m.Detalle, m.created_at
+            FROM movimientos_encabezado m
+            WHERE m.CuentaID = %s AND m.Fecha BETWEEN %s AND %s
+            ORDER BY m.Id
+        """
+        cursor.execute(query, (cuenta_id, fecha_inicio, fecha_fin))
+        rows = cursor.fetchall()
+        cursor.close()
+        
+        return [self._row_to_movimiento(row) for row in rows]
+
     def existe_movimiento(self, fecha: date, valor: Decimal, referencia: str, cuenta_id: int, descripcion: str = None, usd: Decimal = None) -> bool:
         cursor = self.conn.cursor()
         
@@ -582,7 +867,8 @@ class PostgresMovimientoRepository(MovimientoRepository):
                 # This is risky but standard fallback
                 pass
             
-        cursor.execute(query, tuple(params))
+        # Cada variante (referencia/USD/descripción) queda como una sentencia preparada distinta
+        sentencias.ejecutar(cursor, 'existe_movimiento', query, params)
         exists = cursor.fetchone() is not None
         cursor.close()
         return exists
@@ -746,6 +1032,147 @@ class PostgresMovimientoRepository(MovimientoRepository):
         
         return movimientos, total_count
     
+    def buscar_avanzado_keyset(self,
+                       fecha_inicio: Optional[date] = None,
+                       fecha_fin: Optional[date] = None,
+                       cuenta_id: Optional[int] = None,
+                       tercero_id: Optional[int] = None,
+                       centro_costo_id: Optional[int] = None,
+                       concepto_id: Optional[int] = None,
+                       centros_costos_excluidos: Optional[List[int]] = None,
+                       solo_pendientes: bool = False,
+                       solo_clasificados: bool = False,
+                       tipo_movimiento: Optional[str] = None,
+                       descripcion_contiene: Optional[str] = None,
+                       referencia: Optional[str] = None,
+                       limit: int = 50,
+                       cursor: Optional[str] = None,
+                       contar: bool = False
+    ) -> tuple[List[Movimiento], Optional[str], Optional[dict]]:
+        """
+        Paginación por keyset: encabezados en una consulta y detalles en otra.
+        
+        A diferencia de OFFSET, el costo de una página no crece con su profundidad:
+        la consulta busca directamente las filas posteriores a la última clave
+        (fecha, abs(valor), id) de la página anterior.
+        """
+        where_clause, params = self._construir_filtros(
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            cuenta_id=cuenta_id,
+            tercero_id=tercero_id,
+            centro_costo_id=centro_costo_id,
+            concepto_id=concepto_id,
+            centros_costos_excluidos=centros_costos_excluidos,
+            solo_pendientes=solo_pendientes,
+            solo_clasificados=solo_clasificados,
+            tipo_movimiento=tipo_movimiento,
+            descripcion_contiene=descripcion_contiene,
+            referencia=referencia
+        )
+        # Los filtros sobre el detalle (md) requieren el JOIN; sin ellos se filtra solo el encabezado
+        requiere_detalle = "md." in where_clause
+        filtro_ids = f"""
+            SELECT m.Id FROM movimientos_encabezado m
+            {"LEFT JOIN movimientos_detalle md ON m.Id = md.movimiento_id" if requiere_detalle else ""}
+            WHERE 1=1 {where_clause}
+        """
+        
+        query = f"""
+            SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.USD, m.TRM, 
+                   m.MonedaID, m.CuentaID, m.terceroid, m.Detalle, m.created_at,
+                   c.cuenta AS cuenta_nombre,
+                   mon.moneda AS moneda_nombre,
+                   t.tercero AS tercero_nombre
+            FROM movimientos_encabezado m
+            LEFT JOIN cuentas c ON m.CuentaID = c.cuentaid
+            LEFT JOIN monedas mon ON m.MonedaID = mon.monedaid
+            LEFT JOIN terceros t ON m.terceroid = t.terceroid
+            WHERE m.Id IN ({filtro_ids})
+        """
+        query_params = list(params)
+        if cursor:
+            query += " AND (m.Fecha, ABS(m.Valor), m.Id) < (%s, %s, %s)"
+            query_params.extend(_decodificar_cursor(cursor))
+        # Se pide una fila extra para saber si hay página siguiente
+        query += " ORDER BY m.Fecha DESC, ABS(m.Valor) DESC, m.Id DESC LIMIT %s"
+        query_params.append(limit + 1)
+        
+        cur = self.conn.cursor()
+        try:
+            cur.execute(query, tuple(query_params))
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        
+        siguiente_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            ultimo = rows[-1]
+            siguiente_cursor = _codificar_cursor(ultimo[1], abs(ultimo[4] or Decimal('0')), ultimo[0])
+        
+        movimientos = [self._row_to_movimiento(row) for row in rows]
+        self._cargar_detalles_para_movimientos(movimientos)
+        
+        if centro_costo_id is not None or concepto_id is not None:
+            self._calcular_valores_filtrados(movimientos, centro_costo_id, concepto_id)
+        
+        resumen = None
+        if contar:
+            filtra_valor_detalle = centro_costo_id is not None or concepto_id is not None
+            resumen = self._resumir_busqueda(where_clause, params, requiere_detalle, filtra_valor_detalle)
+        
+        return movimientos, siguiente_cursor, resumen
+
+    def _resumir_busqueda(
+        self,
+        where_clause: str,
+        params: list,
+        requiere_detalle: bool,
+        filtra_valor_detalle: bool
+    ) -> dict:
+        """
+        Total de movimientos e ingresos/egresos de una búsqueda, cacheado por TTL_RESUMEN_SEGUNDOS.
+        
+        Con filtro por centro de costo o concepto suma solo los detalles que
+        coinciden (igual que valor_filtrado); si no, el valor del encabezado.
+        """
+        clave = (where_clause, tuple(
+            tuple(p) if isinstance(p, list) else p for p in params
+        ), filtra_valor_detalle)
+        ahora = time.monotonic()
+        with _cache_resumenes_lock:
+            guardado = _cache_resumenes.get(clave)
+            if guardado and guardado[0] > ahora:
+                return dict(guardado[1])
+        
+        valor = "SUM(md.Valor)" if filtra_valor_detalle else "MAX(m.Valor)"
+        query = f"""
+            SELECT COUNT(*),
+                   COALESCE(SUM(v) FILTER (WHERE v > 0), 0),
+                   COALESCE(-SUM(v) FILTER (WHERE v < 0), 0)
+            FROM (
+                SELECT m.Id, {valor} AS v
+                FROM movimientos_encabezado m
+                {"LEFT JOIN movimientos_detalle md ON m.Id = md.movimiento_id" if requiere_detalle else ""}
+                WHERE 1=1 {where_clause}
+                GROUP BY m.Id
+            ) s
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute(query, tuple(params))
+            total, ingresos, egresos = cur.fetchone()
+        finally:
+            cur.close()
+        
+        resumen = {'total': total, 'ingresos': float(ingresos), 'egresos': float(egresos)}
+        with _cache_resumenes_lock:
+            if len(_cache_resumenes) >= MAX_RESUMENES_CACHE:
+                _cache_resumenes.clear()
+            _cache_resumenes[clave] = (ahora + TTL_RESUMEN_SEGUNDOS, resumen)
+        return dict(resumen)
+    
     def _calcular_valores_filtrados(
         self, 
         movimientos: List[Movimiento], 
@@ -789,6 +1216,12 @@ class PostgresMovimientoRepository(MovimientoRepository):
                                  centros_costos_excluidos: Optional[List[int]] = None,
                                  tipo_movimiento: Optional[str] = None
     ) -> List[dict]:
+        if tipo_agrupacion in ('centro_costo', 'tercero', 'concepto') and self._usar_resumen_mensual(fecha_inicio, fecha_fin, tipo_movimiento):
+            return self._resumir_por_clasificacion_desde_resumen(
+                tipo_agrupacion, fecha_inicio, fecha_fin, cuenta_id, tercero_id,
+                centro_costo_id, concepto_id, centros_costos_excluidos
+            )
+
         cursor = self.conn.cursor()
         
         # Determinar campo de agrupación y joins necesarios
@@ -847,6 +1280,53 @@ class PostgresMovimientoRepository(MovimientoRepository):
             for row in rows
         ]
 
+    def _resumir_por_clasificacion_desde_resumen(self, tipo_agrupacion: str, fecha_inicio, fecha_fin, cuenta_id,
+                                                 tercero_id, centro_costo_id, concepto_id,
+                                                 centros_costos_excluidos) -> List[dict]:
+        """resumir_por_clasificacion leyendo del resumen mensual."""
+        joins = {
+            'centro_costo': ("COALESCE(g.centro_costo, 'Sin Centro de Costo')",
+                             "LEFT JOIN centro_costos g ON r.centro_costo_id = g.centro_costo_id"),
+            'tercero': ("COALESCE(t.tercero, 'Sin Tercero')",
+                        "LEFT JOIN terceros t ON r.tercero_id = t.terceroid"),
+            'concepto': ("COALESCE(con.concepto, 'Sin Concepto')",
+                         "LEFT JOIN conceptos con ON r.concepto_id = con.conceptoid"),
+        }
+        group_field, join_clause = joins[tipo_agrupacion]
+
+        query = f"""
+            SELECT
+                {group_field} as nombre,
+                SUM(r.ingresos) as ingresos,
+                SUM(r.egresos) as egresos,
+                SUM(r.saldo) as saldo
+            FROM resumen_mensual_movimientos r
+            {join_clause}
+            WHERE 1=1
+        """
+        where_clause, params = self._construir_filtros_resumen(
+            fecha_inicio, fecha_fin, cuenta_id, tercero_id, centro_costo_id, concepto_id, centros_costos_excluidos
+        )
+        query += where_clause
+        query += f" GROUP BY {group_field} ORDER BY SUM(r.saldo) ASC"
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        return [
+            {
+                "nombre": row[0],
+                "ingresos": float(row[1] or 0),
+                "egresos": float(row[2] or 0),
+                "saldo": float(row[3] or 0)
+            }
+            for row in rows
+        ]
+
     def buscar_contexto_por_descripcion_similar(self, patron: str, limite: int = 5) -> List[Movimiento]:
         cursor = self.conn.cursor()
         query = """
@@ -907,10 +1387,8 @@ class PostgresMovimientoRepository(MovimientoRepository):
         finally:
             cursor.close()
 
-    def obtener_datos_exportacion(self, limit: int = None, plain_format: bool = False) -> List[dict]:
-        cursor = self.conn.cursor()
-        
-        # Exportación debe incluir detalles
+    def _query_exportacion(self, limit: Optional[int], plain_format: bool) -> tuple:
+        """Consulta (y parámetros) de la exportación; incluye detalles."""
         if plain_format:
             query = """
                 SELECT 
@@ -943,9 +1421,13 @@ class PostgresMovimientoRepository(MovimientoRepository):
             """
             
         if limit:
-            query += f" LIMIT {limit}"
-            
-        cursor.execute(query)
+            return query + " LIMIT %s", (limit,)
+        return query, ()
+
+    def obtener_datos_exportacion(self, limit: int = None, plain_format: bool = False) -> List[dict]:
+        cursor = self.conn.cursor()
+        query, params = self._query_exportacion(limit, plain_format)
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         
         # Get column names
@@ -960,6 +1442,26 @@ class PostgresMovimientoRepository(MovimientoRepository):
             
         return results
 
+    def iterar_datos_exportacion(self, limit: int = None, plain_format: bool = False, itersize: int = 2000) -> Iterator[dict]:
+        """
+        Igual que obtener_datos_exportacion, pero con un cursor de servidor (named cursor):
+        las filas llegan en bloques de `itersize`, así la memoria no crece con el historial.
+        Debe consumirse completo (o cerrarse) dentro de la transacción de la conexión.
+        """
+        cursor = self.conn.cursor(name=f"exportacion_{uuid.uuid4().hex}")
+        cursor.itersize = itersize
+        try:
+            query, params = self._query_exportacion(limit, plain_format)
+            cursor.execute(query, params)
+            col_names = None
+            for row in cursor:
+                # En cursores de servidor la descripción existe tras el primer fetch
+                if col_names is None:
+                    col_names = [desc[0] for desc in cursor.description]
+                yield dict(zip(col_names, row))
+        finally:
+            cursor.close()
+
     def resumir_ingresos_gastos_por_mes(self, 
                                  fecha_inicio: Optional[date] = None, 
                                  fecha_fin: Optional[date] = None,
@@ -969,6 +1471,11 @@ class PostgresMovimientoRepository(MovimientoRepository):
                                  concepto_id: Optional[int] = None,
                                  centros_costos_excluidos: Optional[List[int]] = None
     ) -> List[dict]:
+        if self._usar_resumen_mensual(fecha_inicio, fecha_fin):
+            return self._resumir_ingresos_gastos_desde_resumen(
+                fecha_inicio, fecha_fin, cuenta_id, tercero_id, centro_costo_id, concepto_id, centros_costos_excluidos
+            )
+
         cursor = self.conn.cursor()
         
         # Agregamos por Mes usando valores DE LOS DETALLES (md.Valor)
@@ -1015,6 +1522,42 @@ class PostgresMovimientoRepository(MovimientoRepository):
             }
             for row in rows
         ]
+
+    def _resumir_ingresos_gastos_desde_resumen(self, fecha_inicio, fecha_fin, cuenta_id, tercero_id,
+                                               centro_costo_id, concepto_id, centros_costos_excluidos) -> List[dict]:
+        """resumir_ingresos_gastos_por_mes leyendo del resumen mensual."""
+        query = """
+            SELECT
+                TO_CHAR(make_date(r.year, r.month, 1), 'YYYY-MM') as mes,
+                SUM(r.ingresos) as ingresos,
+                SUM(r.egresos) as egresos,
+                SUM(r.saldo) as saldo
+            FROM resumen_mensual_movimientos r
+            WHERE 1=1
+        """
+        where_clause, params = self._construir_filtros_resumen(
+            fecha_inicio, fecha_fin, cuenta_id, tercero_id, centro_costo_id, concepto_id, centros_costos_excluidos
+        )
+        query += where_clause
+        query += " GROUP BY r.year, r.month ORDER BY mes DESC"
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        return [
+            {
+                "mes": row[0],
+                "ingresos": float(row[1] or 0),
+                "egresos": float(row[2] or 0),
+                "saldo": float(row[3] or 0)
+            }
+            for row in rows
+        ]
+
     def obtener_sugerencias_reclasificacion(self, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> List[dict]:
         """
         Agrupa movimientos por Tercero que NO sean traslados y que tengan Ingresos > 0.
@@ -1228,6 +1771,11 @@ class PostgresMovimientoRepository(MovimientoRepository):
                                concepto_id: Optional[int] = None,
                                centros_costos_excluidos: Optional[List[int]] = None
     ) -> List[dict]:
+        if nivel in ('tercero', 'centro_costo', 'concepto') and self._usar_resumen_mensual(fecha_inicio, fecha_fin):
+            return self._desglose_gastos_desde_resumen(
+                nivel, fecha_inicio, fecha_fin, cuenta_id, tercero_id, centro_costo_id, concepto_id, centros_costos_excluidos
+            )
+
         cursor = self.conn.cursor()
         
         # Mapping level to columns (Updated for DETAILS)
@@ -1296,12 +1844,104 @@ class PostgresMovimientoRepository(MovimientoRepository):
             for row in rows
         ]
 
+    def _desglose_gastos_desde_resumen(self, nivel: str, fecha_inicio, fecha_fin, cuenta_id, tercero_id,
+                                       centro_costo_id, concepto_id, centros_costos_excluidos) -> List[dict]:
+        """obtener_desglose_gastos leyendo del resumen mensual (tercero del detalle, como la consulta original)."""
+        niveles = {
+            'tercero': ("r.detalle_tercero_id", "t.tercero",
+                        "LEFT JOIN terceros t ON r.detalle_tercero_id = t.terceroid", "ORDER BY egresos DESC"),
+            'centro_costo': ("r.centro_costo_id", "g.centro_costo",
+                             "LEFT JOIN centro_costos g ON r.centro_costo_id = g.centro_costo_id", "ORDER BY egresos ASC"),
+            'concepto': ("r.concepto_id", "con.concepto",
+                         "LEFT JOIN conceptos con ON r.concepto_id = con.conceptoid", "ORDER BY egresos DESC"),
+        }
+        col_id, col_name, join_clause, order_clause = niveles[nivel]
+
+        query = f"""
+            SELECT
+                {col_id} as id,
+                COALESCE({col_name}, 'Sin Clasificar') as nombre,
+                SUM(r.ingresos) as ingresos,
+                SUM(r.egresos) as egresos,
+                SUM(r.saldo) as saldo
+            FROM resumen_mensual_movimientos r
+            {join_clause}
+            WHERE 1=1
+        """
+        where_clause, params = self._construir_filtros_resumen(
+            fecha_inicio, fecha_fin, cuenta_id, tercero_id, centro_costo_id, concepto_id, centros_costos_excluidos
+        )
+        query += where_clause
+        query += f" GROUP BY {col_id}, {col_name} {order_clause}"
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        return [
+            {
+                "id": row[0],
+                "nombre": row[1],
+                "ingresos": float(row[2] or 0),
+                "egresos": float(row[3] or 0),
+                "saldo": float(row[4] or 0)
+            }
+            for row in rows
+        ]
+
     def obtener_estadisticas_dashboard(self,
                                       fecha_inicio: Optional[date] = None,
                                       fecha_fin: Optional[date] = None
     ) -> List[dict]:
+        if self._usar_resumen_mensual(fecha_inicio, fecha_fin):
+            # conteo: r.movimientos marca cada encabezado una vez por centro de costo,
+            # equivalente al COUNT(DISTINCT m.Id) de la consulta sobre el detalle
+            query = """
+                SELECT
+                    TO_CHAR(make_date(r.year, r.month, 1), 'YYYY-Mon') as periodo,
+                    r.cuenta_id, c.cuenta as cuenta_nombre,
+                    r.centro_costo_id, g.centro_costo as centro_costo_nombre,
+                    SUM(r.movimientos) as conteo,
+                    SUM(r.ingresos) as ingresos,
+                    SUM(r.egresos) as egresos
+                FROM resumen_mensual_movimientos r
+                LEFT JOIN cuentas c ON r.cuenta_id = c.cuentaid
+                LEFT JOIN centro_costos g ON r.centro_costo_id = g.centro_costo_id
+                WHERE 1=1
+            """
+            where_clause, params = self._construir_filtros_resumen(fecha_inicio, fecha_fin)
+            query += where_clause
+            query += """
+                GROUP BY r.year, r.month, r.cuenta_id, c.cuenta, r.centro_costo_id, g.centro_costo
+                ORDER BY r.year DESC, r.month DESC, c.cuenta, g.centro_costo
+            """
+        else:
+            query, params = self._query_estadisticas_dashboard(fecha_inicio, fecha_fin)
+
         cursor = self.conn.cursor()
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+        cursor.close()
         
+        return [
+            {
+                "periodo": row[0],
+                "cuenta_id": row[1],
+                "cuenta_nombre": row[2] or "Desconocida",
+                "centro_costo_id": row[3],
+                "centro_costo_nombre": row[4] or "Sin Clasificar",
+                "conteo": int(row[5]),
+                "ingresos": float(row[6] or 0),
+                "egresos": float(row[7] or 0)
+            }
+            for row in rows
+        ]
+
+    def _query_estadisticas_dashboard(self, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> tuple:
+        """Consulta del dashboard sobre encabezado x detalle (rangos que no son meses completos)."""
         query = """
             SELECT 
                 TO_CHAR(m.Fecha, 'YYYY-Mon') as periodo,
@@ -1329,24 +1969,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
             GROUP BY TO_CHAR(m.Fecha, 'YYYY-Mon'), TO_CHAR(m.Fecha, 'YYYY-MM'), m.CuentaID, c.cuenta, md.centro_costo_id, g.centro_costo
             ORDER BY TO_CHAR(m.Fecha, 'YYYY-MM') DESC, c.cuenta, g.centro_costo
         """
-        
-        cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
-        cursor.close()
-        
-        return [
-            {
-                "periodo": row[0],
-                "cuenta_id": row[1],
-                "cuenta_nombre": row[2] or "Desconocida",
-                "centro_costo_id": row[3],
-                "centro_costo_nombre": row[4] or "Sin Clasificar",
-                "conteo": int(row[5]),
-                "ingresos": float(row[6] or 0),
-                "egresos": float(row[7] or 0)
-            }
-            for row in rows
-        ]
+        return query, params
 
     def eliminar(self, id: int) -> None:
         if not id:
@@ -2,12 +2,15 @@ from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 import psycopg2
+from psycopg2.extras import execute_values
 from src.domain.models.movimiento_match import MovimientoMatch, MatchEstado
 from src.domain.models.movimiento_extracto import MovimientoExtracto
 from src.domain.models.movimiento import Movimiento
 from src.domain.ports.movimiento_vinculacion_repository import MovimientoVinculacionRepository
 from src.infrastructure.database.postgres_movimiento_extracto_repository import PostgresMovimientoExtractoRepository
 from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+from src.infrastructure.database.sentencias_preparadas import sentencias
+from src.infrastructure.logging.config import logger
 
 
 class PostgresMovimientoVinculacionRepository(MovimientoVinculacionRepository):
@@ -59,6 +62,63 @@ class PostgresMovimientoVinculacionRepository(MovimientoVinculacionRepository):
         repo = PostgresMovimientoRepository(self.conn)
         return repo.obtener_por_id(id)
 
+    def _obtener_vinculaciones_periodo(
+        self,
+        cuenta_id: int,
+        year: int,
+        month: int,
+        filtro: str = "",
+        params: tuple = ()
+    ) -> List[MovimientoMatch]:
+        """
+        Carga las vinculaciones de un periodo en dos consultas.
+
+        1. Vinculaciones + movimiento del extracto (JOIN) en una sola consulta.
+        2. Movimientos del sistema (con sus detalles) en lote con ANY(%s).
+
+        Args:
+            filtro: Condición SQL adicional sobre v (ej. "AND v.estado = %s")
+            params: Parámetros de la condición adicional
+        """
+        cursor = self.conn.cursor()
+        try:
+            query = f"""
+                SELECT v.id, v.movimiento_sistema_id, v.movimiento_extracto_id, v.estado,
+                       v.score_similitud, v.score_fecha, v.score_valor, v.score_descripcion,
+                       v.confirmado_por_usuario, v.fecha_confirmacion, v.created_by, 
+                       v.notas, v.created_at,
+                       me.id, me.cuenta_id, me.year, me.month, me.fecha,
+                       me.descripcion, me.referencia, me.valor, me.usd, me.trm,
+                       me.numero_linea, me.raw_text, me.created_at,
+                       c.cuenta
+                FROM movimiento_vinculaciones v
+                INNER JOIN movimientos_extracto me ON v.movimiento_extracto_id = me.id
+                INNER JOIN cuentas c ON me.cuenta_id = c.cuentaid
+                WHERE me.cuenta_id = %s AND me.year = %s AND me.month = %s
+                  {filtro}
+                ORDER BY me.fecha DESC, ABS(me.valor) DESC
+            """
+            cursor.execute(query, (cuenta_id, year, month) + tuple(params))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        sistema_ids = list({row[1] for row in rows if row[1]})
+        movs_sistema = {
+            mov.id: mov
+            for mov in PostgresMovimientoRepository(self.conn).obtener_por_ids(sistema_ids)
+        }
+
+        repo_extracto = PostgresMovimientoExtractoRepository(self.conn)
+        return [
+            self._row_to_movimiento_match(
+                row,
+                repo_extracto._row_to_movimiento(row[13:]),
+                movs_sistema.get(row[1]) if row[1] else None
+            )
+            for row in rows
+        ]
+
     def guardar(self, vinculacion: MovimientoMatch) -> MovimientoMatch:
         """
         Guarda o actualiza una vinculación entre extracto y sistema.
@@ -138,45 +198,112 @@ class PostgresMovimientoVinculacionRepository(MovimientoVinculacionRepository):
         finally:
             cursor.close()
     
-    def obtener_por_periodo(
-        self, 
-        cuenta_id: int, 
-        year: int, 
-        month: int
-    ) -> List[MovimientoMatch]:
+    def guardar_lote(self, vinculaciones: List[MovimientoMatch]) -> List[Optional[Exception]]:
         """
-        Obtiene todas las vinculaciones de un periodo específico.
+        Guarda o actualiza varias vinculaciones con INSERT multi-fila.
+        
+        Usa ON CONFLICT sobre el índice único de movimiento_extracto_id, de modo
+        que una vinculación existente del mismo extracto se actualiza (conservando
+        su created_at). El bloque se confirma en una sola transacción; si falla
+        (ej. uq_vinculacion_sistema porque el movimiento del sistema ya está
+        vinculado en otro periodo) se reintenta fila por fila y solo las filas
+        en conflicto quedan sin guardar (id None).
+        
+        Returns:
+            El error de cada vinculación, en el mismo orden (None si se guardó)
         """
+        if not vinculaciones:
+            return []
+        
+        # Un extracto solo puede aparecer una vez por sentencia ON CONFLICT (gana el último)
+        por_extracto = {}
+        for vinculacion in vinculaciones:
+            if not vinculacion.mov_extracto or not vinculacion.mov_extracto.id:
+                raise ValueError("La vinculación debe tener un movimiento del extracto válido")
+            por_extracto[vinculacion.mov_extracto.id] = vinculacion
+        
+        try:
+            self._upsert(list(por_extracto.values()))
+            return [None] * len(vinculaciones)
+        except Exception as e:
+            logger.warning(f"Guardado en bloque de {len(por_extracto)} vinculaciones falló ({e}); se reintenta una por una")
+        
+        errores_por_extracto = {}
+        for extracto_id, vinculacion in por_extracto.items():
+            try:
+                self._upsert([vinculacion])
+                errores_por_extracto[extracto_id] = None
+            except Exception as e:
+                logger.error(f"No se pudo guardar la vinculación del extracto {extracto_id}: {e}")
+                errores_por_extracto[extracto_id] = e
+        return [errores_por_extracto[v.mov_extracto.id] for v in vinculaciones]
+    
+    def _upsert(self, vinculaciones: List[MovimientoMatch]) -> None:
+        """INSERT ... ON CONFLICT de las vinculaciones en una transacción; asigna id y created_at."""
+        por_extracto = {v.mov_extracto.id: v for v in vinculaciones}
+        filas = [
+            (
+                v.mov_sistema.id if v.mov_sistema else None,
+                v.mov_extracto.id,
+                v.estado.value,
+                float(v.score_total),
+                float(v.score_fecha),
+                float(v.score_valor),
+                float(v.score_descripcion),
+                v.confirmado_por_usuario,
+                v.fecha_confirmacion,
+                v.created_by,
+                v.notas
+            )
+            for v in vinculaciones
+        ]
+        
         cursor = self.conn.cursor()
         try:
             query = """
-                SELECT v.id, v.movimiento_sistema_id, v.movimiento_extracto_id, v.estado,
-                       v.score_similitud, v.score_fecha, v.score_valor, v.score_descripcion,
-                       v.confirmado_por_usuario, v.fecha_confirmacion, v.created_by, 
-                       v.notas, v.created_at
-                FROM movimiento_vinculaciones v
-                INNER JOIN movimientos_extracto me ON v.movimiento_extracto_id = me.id
-                WHERE me.cuenta_id = %s AND me.year = %s AND me.month = %s
-                ORDER BY me.fecha DESC, ABS(me.valor) DESC
+                INSERT INTO movimiento_vinculaciones (
+                    movimiento_sistema_id, movimiento_extracto_id, estado,
+                    score_similitud, score_fecha, score_valor, score_descripcion,
+                    confirmado_por_usuario, fecha_confirmacion, created_by, notas
+                ) VALUES %s
+                ON CONFLICT (movimiento_extracto_id) DO UPDATE
+                SET movimiento_sistema_id = EXCLUDED.movimiento_sistema_id,
+                    estado = EXCLUDED.estado,
+                    score_similitud = EXCLUDED.score_similitud,
+                    score_fecha = EXCLUDED.score_fecha,
+                    score_valor = EXCLUDED.score_valor,
+                    score_descripcion = EXCLUDED.score_descripcion,
+                    confirmado_por_usuario = EXCLUDED.confirmado_por_usuario,
+                    fecha_confirmacion = EXCLUDED.fecha_confirmacion,
+                    created_by = EXCLUDED.created_by,
+                    notas = EXCLUDED.notas
+                RETURNING movimiento_extracto_id, id, created_at
             """
-            cursor.execute(query, (cuenta_id, year, month))
-            rows = cursor.fetchall()
-            
-            vinculaciones = []
-            for row in rows:
-                # Obtener movimientos relacionados
-                mov_extracto = self._obtener_movimiento_extracto(row[2])
-                mov_sistema = self._obtener_movimiento_sistema(row[1]) if row[1] else None
-                
-                if mov_extracto:
-                    vinculacion = self._row_to_movimiento_match(row, mov_extracto, mov_sistema)
-                    vinculaciones.append(vinculacion)
+            resultados = execute_values(cursor, query, filas, page_size=1000, fetch=True)
+            self.conn.commit()
             
-            return vinculaciones
+            for extracto_id, id, created_at in resultados:
+                vinculacion = por_extracto[extracto_id]
+                vinculacion.id = id
+                vinculacion.created_at = created_at
             
+        except Exception as e:
+            self.conn.rollback()
+            raise e
         finally:
             cursor.close()
     
+    def obtener_por_periodo(
+        self, 
+        cuenta_id: int, 
+        year: int, 
+        month: int
+    ) -> List[MovimientoMatch]:
+        """
+        Obtiene todas las vinculaciones de un periodo específico.
+        """
+        return self._obtener_vinculaciones_periodo(cuenta_id, year, month)
+    
     def obtener_por_extracto_id(
         self, 
         movimiento_extracto_id: int
@@ -194,7 +321,7 @@ class PostgresMovimientoVinculacionRepository(MovimientoVinculacionRepository):
                 FROM movimiento_vinculaciones
                 WHERE movimiento_extracto_id = %s
             """
-            cursor.execute(query, (movimiento_extracto_id,))
+            sentencias.ejecutar(cursor, 'vinculacion_por_extracto', query, (movimiento_extracto_id,))
             row = cursor.fetchone()
             
             if not row:
@@ -307,37 +434,9 @@ class PostgresMovimientoVinculacionRepository(MovimientoVinculacionRepository):
         month: int
     ) -> List[MovimientoMatch]:
         """Obtiene vinculaciones que requieren confirmación del usuario."""
-        cursor = self.conn.cursor()
-        try:
-            query = """
-                SELECT v.id, v.movimiento_sistema_id, v.movimiento_extracto_id, v.estado,
-                       v.score_similitud, v.score_fecha, v.score_valor, v.score_descripcion,
-                       v.confirmado_por_usuario, v.fecha_confirmacion, v.created_by, 
-                       v.notas, v.created_at
-                FROM movimiento_vinculaciones v
-                INNER JOIN movimientos_extracto me ON v.movimiento_extracto_id = me.id
-                WHERE me.cuenta_id = %s 
-                  AND me.year = %s 
-                  AND me.month = %s
-                  AND v.confirmado_por_usuario = FALSE
-                ORDER BY me.fecha DESC, ABS(me.valor) DESC
-            """
-            cursor.execute(query, (cuenta_id, year, month))
-            rows = cursor.fetchall()
-            
-            vinculaciones = []
-            for row in rows:
-                mov_extracto = self._obtener_movimiento_extracto(row[2])
-                mov_sistema = self._obtener_movimiento_sistema(row[1]) if row[1] else None
-                
-                if mov_extracto:
-                    vinculacion = self._row_to_movimiento_match(row, mov_extracto, mov_sistema)
-                    vinculaciones.append(vinculacion)
-            
-            return vinculaciones
-            
-        finally:
-            cursor.close()
+        return self._obtener_vinculaciones_periodo(
+            cuenta_id, year, month, "AND v.confirmado_por_usuario = FALSE"
+        )
     
     def obtener_por_estado(
         self, 
@@ -347,47 +446,41 @@ class PostgresMovimientoVinculacionRepository(MovimientoVinculacionRepository):
         estado: MatchEstado
     ) -> List[MovimientoMatch]:
         """Obtiene vinculaciones filtradas por estado."""
+        return self._obtener_vinculaciones_periodo(
+            cuenta_id, year, month, "AND v.estado = %s", (estado.value,)
+        )
+    
+    def eliminar(self, id: int) -> None:
+        """
+        Elimina físicamente un registro de vinculación.
+        """
         cursor = self.conn.cursor()
         try:
-            query = """
-                SELECT v.id, v.movimiento_sistema_id, v.movimiento_extracto_id, v.estado,
-                       v.score_similitud, v.score_fecha, v.score_valor, v.score_descripcion,
-                       v.confirmado_por_usuario, v.fecha_confirmacion, v.created_by, 
-                       v.notas, v.created_at
-                FROM movimiento_vinculaciones v
-                INNER JOIN movimientos_extracto me ON v.movimiento_extracto_id = me.id
-                WHERE me.cuenta_id = %s 
-                  AND me.year = %s 
-                  AND me.month = %s
-                  AND v.estado = %s
-                ORDER BY me.fecha DESC, ABS(me.valor) DESC
-            """
-            cursor.execute(query, (cuenta_id, year, month, estado.value))
-            rows = cursor.fetchall()
-            
-            vinculaciones = []
-            for row in rows:
-                mov_extracto = self._obtener_movimiento_extracto(row[2])
-                mov_sistema = self._obtener_movimiento_sistema(row[1]) if row[1] else None
-                
-                if mov_extracto:
-                    vinculacion = self._row_to_movimiento_match(row, mov_extracto, mov_sistema)
-                    vinculaciones.append(vinculacion)
-            
-            return vinculaciones
-            
+            query = "DELETE FROM movimiento_vinculaciones WHERE id = %s"
+            cursor.execute(query, (id,))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise e
         finally:
             cursor.close()
 
-    def eliminar(self, id: int) -> None:
+    def eliminar_lote(self, ids: List[int]) -> int:
         """
-        Elimina físicamente un registro de vinculación.
+        Elimina físicamente varias vinculaciones con un único DELETE.
         """
+        if not ids:
+            return 0
+        
         cursor = self.conn.cursor()
         try:
-            query = "DELETE FROM movimiento_vinculaciones WHERE id = %s"
-            cursor.execute(query, (id,))
+            cursor.execute(
+                "DELETE FROM movimiento_vinculaciones WHERE id = ANY(%s)",
+                (list(ids),)
+            )
+            eliminados = cursor.rowcount
             self.conn.commit()
+            return eliminados
         except Exception as e:
             self.conn.rollback()
             raise e
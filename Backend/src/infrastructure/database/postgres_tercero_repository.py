@@ -3,6 +3,7 @@ import psycopg2
 from src.domain.models.tercero import Tercero
 from src.domain.ports.tercero_repository import TerceroRepository
 from src.infrastructure.logging.config import logger
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 class PostgresTerceroRepository(TerceroRepository):
     """
@@ -37,6 +38,7 @@ class PostgresTerceroRepository(TerceroRepository):
                 new_id = cursor.fetchone()[0]
                 tercero.terceroid = new_id
             
+            notificar_cambio(cursor, 'terceros')
             self.conn.commit()
             return tercero
         except Exception as e:
@@ -58,6 +60,10 @@ class PostgresTerceroRepository(TerceroRepository):
         return None
 
     def obtener_todos(self) -> List[Tercero]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('terceros', ('terceros',), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[Tercero]:
         cursor = self.conn.cursor()
         query = "SELECT terceroid, tercero, activa FROM terceros WHERE activa = TRUE ORDER BY tercero"
         cursor.execute(query)
@@ -125,6 +131,7 @@ class PostgresTerceroRepository(TerceroRepository):
         try:
             # Soft delete
             cursor.execute("UPDATE terceros SET activa = FALSE WHERE terceroid = %s", (terceroid,))
+            notificar_cambio(cursor, 'terceros')
             self.conn.commit()
         except Exception as e:
             self.conn.rollback()
@@ -2,6 +2,7 @@ from typing import List, Optional
 from decimal import Decimal
 from src.domain.models.tipo_cuenta import TipoCuenta
 from src.domain.ports.tipo_cuenta_repository import TipoCuentaRepository
+from src.infrastructure.database.cache_catalogos import cache_catalogos, notificar_cambio
 
 
 class PostgresTipoCuentaRepository(TipoCuentaRepository):
@@ -55,6 +56,10 @@ class PostgresTipoCuentaRepository(TipoCuentaRepository):
         return self._row_to_tipo_cuenta(row) if row else None
 
     def obtener_todos(self) -> List[TipoCuenta]:
+        """Catálogo completo (caché del proceso, invalidado por NOTIFY al escribir)."""
+        return cache_catalogos.obtener_lista('tipo_cuenta', ('tipo_cuenta',), self._consultar_todos)
+
+    def _consultar_todos(self) -> List[TipoCuenta]:
         cursor = self.conn.cursor()
         cursor.execute(f"""
             SELECT {self._get_select_fields()}
@@ -112,6 +117,7 @@ class PostgresTipoCuentaRepository(TipoCuentaRepository):
                 ))
                 tipo_cuenta.id = cursor.fetchone()[0]
 
+            notificar_cambio(cursor, 'tipo_cuenta')
             self.conn.commit()
             return tipo_cuenta
         except Exception as e:
@@ -0,0 +1,191 @@
+from typing import Any, Dict, List, Optional
+import json
+
+import psycopg2
+
+from src.domain.models.trabajo_ingesta import TrabajoIngesta
+from src.domain.ports.trabajo_ingesta_repository import TrabajoIngestaRepository
+from src.infrastructure.logging.config import logger
+
+
+# Llave del advisory lock que serializa el reclamo de trabajos entre procesos
+LLAVE_RECLAMO = 7301
+
+_COLUMNAS = """
+    id, tipo, archivo, tipo_cuenta, cuenta_id, parametros, estado, etapa,
+    filas_total, filas_procesadas, tiempos_ms, resultado, error, intentos, worker,
+    created_at, iniciado_at, actualizado_at, terminado_at
+"""
+
+
+def _json(valor: Any) -> Optional[str]:
+    # default=str: los resultados de los servicios traen Decimal y fechas
+    return None if valor is None else json.dumps(valor, default=str)
+
+
+class PostgresTrabajoIngestaRepository(TrabajoIngestaRepository):
+    def __init__(self, connection):
+        self.conn = connection
+
+    def _a_trabajo(self, row) -> TrabajoIngesta:
+        return TrabajoIngesta(
+            id=row[0], tipo=row[1], archivo=row[2], tipo_cuenta=row[3], cuenta_id=row[4],
+            parametros=row[5] or {}, estado=row[6], etapa=row[7],
+            filas_total=row[8], filas_procesadas=row[9], tiempos_ms=row[10] or {},
+            resultado=row[11], error=row[12], intentos=row[13], worker=row[14],
+            created_at=row[15], iniciado_at=row[16], actualizado_at=row[17], terminado_at=row[18]
+        )
+
+    def crear(self, trabajo: TrabajoIngesta, contenido: Optional[bytes]) -> TrabajoIngesta:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                INSERT INTO trabajos_ingesta (tipo, archivo, tipo_cuenta, cuenta_id, parametros, contenido)
+                VALUES (%s, %s, %s, %s, %s::jsonb, %s)
+                RETURNING {_COLUMNAS}
+            """, (
+                trabajo.tipo, trabajo.archivo, trabajo.tipo_cuenta, trabajo.cuenta_id,
+                _json(trabajo.parametros or {}),
+                psycopg2.Binary(contenido) if contenido is not None else None
+            ))
+            creado = self._a_trabajo(cursor.fetchone())
+            self.conn.commit()
+            return creado
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def obtener_por_id(self, id: int) -> Optional[TrabajoIngesta]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT {_COLUMNAS} FROM trabajos_ingesta WHERE id = %s", (id,))
+            row = cursor.fetchone()
+            return self._a_trabajo(row) if row else None
+        finally:
+            cursor.close()
+
+    def listar(self, estado: Optional[str] = None, limit: int = 50) -> List[TrabajoIngesta]:
+        cursor = self.conn.cursor()
+        try:
+            query = f"SELECT {_COLUMNAS} FROM trabajos_ingesta"
+            params: list = []
+            if estado:
+                query += " WHERE estado = %s"
+                params.append(estado)
+            query += " ORDER BY id DESC LIMIT %s"
+            params.append(limit)
+            cursor.execute(query, params)
+            return [self._a_trabajo(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def obtener_contenido(self, id: int) -> Optional[bytes]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT contenido FROM trabajos_ingesta WHERE id = %s", (id,))
+            row = cursor.fetchone()
+            return bytes(row[0]) if row and row[0] is not None else None
+        finally:
+            cursor.close()
+
+    def reclamar_siguiente(self, worker: str, max_concurrentes: int, vencimiento_segundos: float, max_intentos: int) -> Optional[TrabajoIngesta]:
+        cursor = self.conn.cursor()
+        try:
+            # El conteo de EN_CURSO y el UPDATE deben ser atómicos entre procesos
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (LLAVE_RECLAMO,))
+
+            # Trabajos de un proceso que murió: reintentar o abandonar
+            cursor.execute("""
+                UPDATE trabajos_ingesta
+                SET estado = CASE WHEN intentos >= %s THEN 'ERROR' ELSE 'EN_COLA' END,
+                    error = CASE WHEN intentos >= %s
+                                 THEN 'El worker dejó de responder (' || intentos || ' intentos)'
+                                 ELSE error END,
+                    terminado_at = CASE WHEN intentos >= %s THEN CURRENT_TIMESTAMP ELSE NULL END,
+                    contenido = CASE WHEN intentos >= %s THEN NULL ELSE contenido END,
+                    worker = NULL,
+                    actualizado_at = CURRENT_TIMESTAMP
+                WHERE estado = 'EN_CURSO'
+                  AND actualizado_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                RETURNING id, estado
+            """, (max_intentos, max_intentos, max_intentos, max_intentos, vencimiento_segundos))
+            for trabajo_id, estado in cursor.fetchall():
+                logger.warning(f"Trabajo de ingesta {trabajo_id} sin latido: pasa a {estado}")
+
+            cursor.execute("SELECT COUNT(*) FROM trabajos_ingesta WHERE estado = 'EN_CURSO'")
+            if cursor.fetchone()[0] >= max_concurrentes:
+                self.conn.commit()
+                return None
+
+            cursor.execute(f"""
+                UPDATE trabajos_ingesta
+                SET estado = 'EN_CURSO', worker = %s, intentos = intentos + 1,
+                    iniciado_at = CURRENT_TIMESTAMP, actualizado_at = CURRENT_TIMESTAMP,
+                    etapa = NULL, filas_procesadas = 0, filas_total = NULL, tiempos_ms = '{{}}'
+                WHERE id = (
+                    SELECT id FROM trabajos_ingesta
+                    WHERE estado = 'EN_COLA'
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING {_COLUMNAS}
+            """, (worker,))
+            row = cursor.fetchone()
+            self.conn.commit()
+            return self._a_trabajo(row) if row else None
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def actualizar_progreso(self, id: int, etapa: Optional[str], filas_procesadas: int, filas_total: Optional[int], tiempos_ms: Dict[str, float]) -> None:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE trabajos_ingesta
+                SET etapa = %s, filas_procesadas = %s, filas_total = %s, tiempos_ms = %s::jsonb,
+                    actualizado_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND estado = 'EN_CURSO'
+            """, (etapa, filas_procesadas, filas_total, _json(tiempos_ms), id))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def registrar_latido(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE trabajos_ingesta SET actualizado_at = CURRENT_TIMESTAMP
+                WHERE id = ANY(%s) AND estado = 'EN_CURSO'
+            """, (list(ids),))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def finalizar(self, id: int, estado: str, tiempos_ms: Dict[str, float], resultado: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE trabajos_ingesta
+                SET estado = %s, tiempos_ms = %s::jsonb, resultado = %s::jsonb, error = %s,
+                    contenido = NULL, terminado_at = CURRENT_TIMESTAMP, actualizado_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+            """, (estado, _json(tiempos_ms), _json(resultado), error, id))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
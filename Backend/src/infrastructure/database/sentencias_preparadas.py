@@ -0,0 +1,206 @@
+"""
+Registro de sentencias preparadas para las consultas más frecuentes.
+
+Los repositorios ejecutan sus consultas calientes con
+`sentencias.ejecutar(cursor, nombre, sql, params)` en lugar de
+`cursor.execute(sql, params)`. La primera vez que una conexión del pool ve una
+sentencia se hace `PREPARE`; las siguientes llamadas solo envían
+`EXECUTE nombre(...)`, así PostgreSQL no vuelve a parsear ni a planificar.
+
+El SQL se escribe con los mismos `%s` de siempre. El nombre real de la sentencia
+lleva un hash del SQL, de modo que las variantes de una consulta armada por
+partes (p. ej. existe_movimiento con o sin referencia) quedan como sentencias
+distintas y un cambio de SQL nunca reutiliza un plan viejo.
+
+Las sentencias preparadas viven en la sesión de BD: el estado por conexión se
+guarda en un WeakKeyDictionary y desaparece cuando el pool recicla la conexión.
+Si ese estado se desfasa de la sesión, una sentencia que no existe se olvida
+para volver a prepararla y un PREPARE duplicado se toma como ya preparada.
+DB_SENTENCIAS_PREPARADAS=0 las desactiva (p. ej. detrás de un pooler en modo
+transacción); los cursores con nombre y los que no son de psycopg2 ejecutan el
+SQL directamente.
+"""
+from dataclasses import dataclass
+from typing import Dict, Sequence
+import hashlib
+import os
+import re
+import threading
+import time
+import weakref
+
+import psycopg2
+import psycopg2.errors
+
+from src.infrastructure.logging.config import logger
+
+
+HABILITADAS = os.getenv('DB_SENTENCIAS_PREPARADAS', '1') == '1'
+
+_RE_MARCADORES = re.compile(r"%%|%s")
+
+
+def convertir_marcadores(sql: str) -> tuple[str, int]:
+    """Convierte los %s de psycopg2 a $1..$n (y %% a %). Retorna (sql, cantidad de parámetros)."""
+    contador = 0
+
+    def reemplazar(m):
+        nonlocal contador
+        if m.group(0) == '%%':
+            return '%'
+        contador += 1
+        return f"${contador}"
+
+    return _RE_MARCADORES.sub(reemplazar, sql), contador
+
+
+@dataclass
+class Sentencia:
+    """Sentencia registrada con sus contadores de uso."""
+    nombre: str
+    nombre_preparado: str
+    sql_preparado: str
+    parametros: int
+    llamadas: int = 0
+    preparaciones: int = 0
+    errores: int = 0
+    ms_total: float = 0.0
+    ms_max: float = 0.0
+
+    def resumen(self) -> dict:
+        reutilizadas = self.llamadas - self.preparaciones
+        return {
+            'nombre': self.nombre,
+            'sentencia': self.nombre_preparado,
+            'llamadas': self.llamadas,
+            'preparaciones': self.preparaciones,
+            'errores': self.errores,
+            'tasa_reutilizacion': round(reutilizadas / self.llamadas, 4) if self.llamadas else None,
+            'ms_promedio': round(self.ms_total / self.llamadas, 3) if self.llamadas else None,
+            'ms_max': round(self.ms_max, 3),
+        }
+
+
+class RegistroSentencias:
+    """Registro global de sentencias y de qué conexiones ya las prepararon."""
+
+    def __init__(self, habilitadas: bool = HABILITADAS):
+        self.habilitadas = habilitadas
+        self._lock = threading.Lock()
+        self._sentencias: Dict[str, Sentencia] = {}
+        # conexión -> nombres preparados en su sesión
+        self._preparadas = weakref.WeakKeyDictionary()
+
+    def _sentencia(self, nombre: str, sql: str) -> Sentencia:
+        huella = hashlib.sha1(sql.encode()).hexdigest()[:8]
+        nombre_preparado = f"{nombre}_{huella}"
+        with self._lock:
+            sentencia = self._sentencias.get(nombre_preparado)
+            if sentencia is None:
+                sql_preparado, parametros = convertir_marcadores(sql)
+                if not parametros:
+                    # Sin parámetros psycopg2 envía el SQL tal cual (sin desescapar %%)
+                    sql_preparado = sql
+                sentencia = Sentencia(nombre, nombre_preparado, sql_preparado, parametros)
+                self._sentencias[nombre_preparado] = sentencia
+            return sentencia
+
+    def ejecutar(self, cursor, nombre: str, sql: str, params: Sequence = ()) -> None:
+        """
+        Ejecuta `sql` como sentencia preparada en la conexión del cursor.
+
+        Args:
+            cursor: Cursor de psycopg2; el resultado se lee con fetchone/fetchall como siempre
+            nombre: Identificador legible (prefijo del nombre preparado y clave de métricas)
+            sql: SQL con marcadores %s
+            params: Valores de los marcadores, en orden
+        """
+        params = tuple(params or ())
+        conn = getattr(cursor, 'connection', None)
+        if not self.habilitadas or conn is None or getattr(cursor, 'name', None):
+            cursor.execute(sql, params or None)
+            return
+
+        sentencia = self._sentencia(nombre, sql)
+        if len(params) != sentencia.parametros:
+            raise ValueError(
+                f"La sentencia '{nombre}' espera {sentencia.parametros} parámetros y recibió {len(params)}"
+            )
+
+        with self._lock:
+            preparadas = self._preparadas.setdefault(conn, set())
+            preparar = sentencia.nombre_preparado not in preparadas
+
+        preparada = False
+        inicio = time.perf_counter()
+        try:
+            if preparar:
+                preparada = self._preparar(cursor, conn, sentencia)
+                with self._lock:
+                    preparadas.add(sentencia.nombre_preparado)
+            if sentencia.parametros:
+                marcadores = ', '.join(['%s'] * sentencia.parametros)
+                cursor.execute(f"EXECUTE {sentencia.nombre_preparado} ({marcadores})", params)
+            else:
+                cursor.execute(f"EXECUTE {sentencia.nombre_preparado}")
+        except psycopg2.errors.InvalidSqlStatementName:
+            # La sesión perdió la sentencia (DEALLOCATE, DISCARD): se vuelve a preparar en el
+            # próximo uso. Solo se olvida esta; si otras también se perdieron, fallarán y se
+            # olvidarán igual, y las que sigan vivas no se re-preparan.
+            logger.warning(f"Sentencia preparada '{sentencia.nombre_preparado}' no existe en la sesión; se preparará de nuevo")
+            with self._lock:
+                preparadas.discard(sentencia.nombre_preparado)
+                sentencia.errores += 1
+            raise
+        except Exception:
+            with self._lock:
+                sentencia.errores += 1
+            raise
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            with self._lock:
+                sentencia.llamadas += 1
+                sentencia.preparaciones += int(preparada)
+                sentencia.ms_total += ms
+                sentencia.ms_max = max(sentencia.ms_max, ms)
+
+    def _preparar(self, cursor, conn, sentencia: Sentencia) -> bool:
+        """
+        Hace PREPARE en la sesión. Si la sesión ya la tiene (el registro la olvidó
+        pero sigue viva) la da por preparada en vez de fallar: el savepoint evita
+        que el error aborte la transacción del llamador. Retorna si se preparó.
+        """
+        # En autocommit un error no deja transacción abortada (y SAVEPOINT no aplica)
+        protegida = not getattr(conn, 'autocommit', False)
+        if protegida:
+            cursor.execute("SAVEPOINT preparar_sentencia")
+        try:
+            cursor.execute(f"PREPARE {sentencia.nombre_preparado} AS {sentencia.sql_preparado}")
+            preparada = True
+        except psycopg2.errors.DuplicatePreparedStatement:
+            if protegida:
+                cursor.execute("ROLLBACK TO SAVEPOINT preparar_sentencia")
+            logger.info(f"Sentencia '{sentencia.nombre_preparado}' ya estaba preparada en la sesión")
+            preparada = False
+        if protegida:
+            cursor.execute("RELEASE SAVEPOINT preparar_sentencia")
+        return preparada
+
+    def metricas(self) -> dict:
+        """Llamadas, preparaciones y tiempos por sentencia, más la tasa global de reutilización de planes."""
+        with self._lock:
+            detalle = sorted((s.resumen() for s in self._sentencias.values()), key=lambda r: -r['llamadas'])
+            llamadas = sum(s.llamadas for s in self._sentencias.values())
+            preparaciones = sum(s.preparaciones for s in self._sentencias.values())
+            conexiones = len(self._preparadas)
+        return {
+            'habilitadas': self.habilitadas,
+            'conexiones': conexiones,
+            'llamadas': llamadas,
+            'preparaciones': preparaciones,
+            'tasa_reutilizacion': round((llamadas - preparaciones) / llamadas, 4) if llamadas else None,
+            'sentencias': detalle,
+        }
+
+
+sentencias = RegistroSentencias()
@@ -3,7 +3,7 @@ Extractor de resumen mensual para Cuenta de Ahorros Bancolombia.
 Lee PDFs de extracto bancario (principios de mes).
 """
 
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 from typing import Dict, Any, Optional
 from decimal import Decimal
@@ -25,7 +25,7 @@ def extraer_resumen(file_obj: Any) -> Dict[str, Any]:
     resumen = {}
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             # Generalmente el resumen está en la primera o segunda página
             for page in pdf.pages[:2]:
                 texto = page.extract_text()
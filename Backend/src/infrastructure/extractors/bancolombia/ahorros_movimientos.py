@@ -3,7 +3,7 @@ Extractor de movimientos para Cuenta de Ahorros Bancolombia.
 Lee PDFs de movimientos diarios/mensuales.
 """
 
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 from typing import List, Dict, Any
 from ..utils import parsear_fecha, parsear_valor
@@ -16,7 +16,7 @@ def extraer_movimientos(file_obj: Any) -> List[Dict]:
     movimientos_raw = []
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             for page in pdf.pages:
                 texto = page.extract_text()
                 if texto:
@@ -4,7 +4,7 @@ Lee PDFs de movimientos del fondo.
 """
 
 from decimal import Decimal
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 import logging
 from typing import List, Dict, Any
@@ -21,7 +21,7 @@ def extraer_movimientos(file_obj: Any) -> List[Dict]:
     movimientos_raw = []
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             for page in pdf.pages:
                 texto = page.extract_text()
                 if texto:
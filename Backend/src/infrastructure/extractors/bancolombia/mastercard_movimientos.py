@@ -3,7 +3,7 @@ Extractor de movimientos para Tarjeta de Crédito MasterCard Bancolombia.
 Maneja tanto COP (pesos) como USD (dólares).
 """
 
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 from typing import List, Dict, Any
 from ..utils import parsear_fecha, parsear_valor
@@ -17,7 +17,7 @@ def extraer_movimientos(file_obj: Any) -> List[Dict]:
     movimientos = []
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             for page in pdf.pages:
                 text = page.extract_text()
                 if not text: continue
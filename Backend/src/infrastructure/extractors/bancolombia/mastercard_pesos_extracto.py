@@ -3,7 +3,7 @@ Extractor de resumen mensual para Tarjeta de Crédito MasterCard Bancolombia (Pe
 Lee PDFs de extracto bancario mensual.
 """
 
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 from typing import Dict, Any, Optional
 from decimal import Decimal
@@ -33,7 +33,7 @@ def extraer_resumen(file_obj: Any) -> Dict[str, Any]:
     logger.info("=" * 80)
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             logger.info(f"Total de páginas en el PDF: {len(pdf.pages)}")
             
             # IMPORTANTE: Este PDF puede contener AMBAS secciones (DOLARES y PESOS)
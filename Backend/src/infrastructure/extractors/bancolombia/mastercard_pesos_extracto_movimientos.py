@@ -3,7 +3,7 @@ Extractor de movimientos individuales para MasterCard Pesos Bancolombia (Nuevo F
 Lee PDFs de extracto y extrae cada transacción con el formato:
 Autorización | Fecha | Movimiento | Valor ...
 """
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 from typing import List, Dict, Any
 from decimal import Decimal
@@ -24,7 +24,7 @@ def extraer_movimientos(file_obj: Any) -> List[Dict[str, Any]]:
     movimientos = []
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             numero_linea = 0
             
             for page in pdf.pages:
@@ -4,7 +4,7 @@ FORMATO ANTIGUO (Pre-Septiembre 2025)
 Lee PDFs de extracto bancario mensual con formato anterior.
 """
 
-import pdfplumber
+from ..documento_pdf import abrir_pdf
 import re
 from typing import Dict, Any, Optional
 from decimal import Decimal
@@ -34,7 +34,7 @@ def extraer_resumen(file_obj: Any) -> Dict[str, Any]:
     logger.info("=" * 80)
     
     try:
-        with pdfplumber.open(file_obj) as pdf:
+        with abrir_pdf(file_obj) as pdf:
             logger.info(f"Total de páginas en el PDF: {len(pdf.pages)}")
             
             # Este PDF puede contener AMBAS secciones (DOLARES y PESOS)
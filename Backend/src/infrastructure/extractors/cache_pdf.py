@@ -0,0 +1,261 @@
+"""
+Caché en disco, direccionado por contenido, del texto de los PDFs y de las
+salidas de los extractores.
+
+La UI analiza el mismo extracto varias veces (/analizar, /procesar-local con
+accion=analizar y luego accion=cargar, /buscar-pagina-resumen) y cada llamada
+corría pdfplumber desde cero. Las entradas se guardan por el SHA-256 del
+archivo:
+
+- `<sha>.documento.json.gz`: texto (y palabras/tablas si se extrajeron) de cada
+  página, versionado por la versión de pdfplumber y FORMATO_DOCUMENTO.
+- `<sha>.<modulo>.<funcion>.<version>.json.gz`: resultado de un extractor; la
+  versión es un hash del código fuente del módulo y del código común
+  (utils.py, documento_pdf.py), así que editar un extractor invalida solo sus
+  entradas y editar el código común invalida las de todos.
+
+Los valores se serializan como JSON comprimido con marcas de tipo para
+Decimal/date/datetime (se recuperan con el mismo tipo). La expulsión es LRU
+por tamaño: la fecha de modificación de cada archivo se actualiza al leerlo y,
+al superar PDF_CACHE_MAX_MB, se borran los menos usados.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pdfplumber
+
+from src.infrastructure.logging.config import logger
+
+
+HABILITADO = os.getenv('PDF_CACHE_HABILITADO', '1') == '1'
+DIRECTORIO = os.getenv('PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'mvtos_cache_pdf'))
+MAX_BYTES = int(float(os.getenv('PDF_CACHE_MAX_MB', '256')) * 1024 * 1024)
+
+# Subir si cambia lo que se guarda por página
+FORMATO_DOCUMENTO = 1
+EXTENSION = '.json.gz'
+
+
+def _codificar(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return {'__decimal__': str(valor)}
+    if isinstance(valor, datetime):
+        return {'__datetime__': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'__date__': valor.isoformat()}
+    raise TypeError(f"Tipo no serializable en caché de PDF: {type(valor).__name__}")
+
+
+def _decodificar(objeto: Dict[str, Any]) -> Any:
+    if len(objeto) == 1:
+        if '__decimal__' in objeto:
+            return Decimal(objeto['__decimal__'])
+        if '__datetime__' in objeto:
+            return datetime.fromisoformat(objeto['__datetime__'])
+        if '__date__' in objeto:
+            return date.fromisoformat(objeto['__date__'])
+    return objeto
+
+
+def huella_archivo(file_obj: Any) -> str:
+    """SHA-256 del contenido (ruta o archivo binario; el puntero queda al inicio)."""
+    sha = hashlib.sha256()
+    if isinstance(file_obj, (str, os.PathLike)):
+        with open(file_obj, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloque)
+        return sha.hexdigest()
+
+    file_obj.seek(0)
+    for bloque in iter(lambda: file_obj.read(1024 * 1024), b''):
+        sha.update(bloque)
+    file_obj.seek(0)
+    return sha.hexdigest()
+
+
+_versiones_modulos: Dict[str, tuple] = {}
+
+# Código compartido por los extractores (parseo de valores/fechas, lectura del PDF):
+# cambiarlo invalida las salidas de todos
+_DIRECTORIO_EXTRACTORES = os.path.dirname(os.path.abspath(__file__))
+FUENTES_COMUNES = tuple(
+    os.path.join(_DIRECTORIO_EXTRACTORES, nombre) for nombre in ('utils.py', 'documento_pdf.py')
+)
+# Subir si cambia algo que afecte a los extractores y no esté en su módulo ni en FUENTES_COMUNES
+FORMATO_EXTRACTORES = 1
+
+
+def _version_archivo(ruta: str) -> str:
+    """Hash corto del contenido del archivo (recalculado si cambia su fecha de modificación)."""
+    mtime = os.path.getmtime(ruta)
+    guardada = _versiones_modulos.get(ruta)
+    if guardada and guardada[0] == mtime:
+        return guardada[1]
+    with open(ruta, 'rb') as f:
+        version = hashlib.sha1(f.read()).hexdigest()[:12]
+    _versiones_modulos[ruta] = (mtime, version)
+    return version
+
+
+def version_modulo(modulo: Any) -> str:
+    """Hash corto del código fuente del módulo (recalculado si el archivo cambia)."""
+    ruta = getattr(modulo, '__file__', None)
+    if not ruta:
+        return '0'
+    return _version_archivo(ruta)
+
+
+def version_extractor(modulo: Any) -> str:
+    """Versión de las salidas de un extractor: su módulo, FUENTES_COMUNES y FORMATO_EXTRACTORES."""
+    partes = [version_modulo(modulo), str(FORMATO_EXTRACTORES)]
+    partes.extend(_version_archivo(ruta) for ruta in FUENTES_COMUNES if os.path.exists(ruta))
+    return hashlib.sha1('.'.join(partes).encode()).hexdigest()[:12]
+
+
+class CachePDF:
+    """Caché de archivos JSON comprimidos en un directorio, con expulsión LRU por tamaño."""
+
+    def __init__(self, directorio: str = DIRECTORIO, max_bytes: int = MAX_BYTES, habilitado: bool = HABILITADO):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.habilitado = habilitado
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave + EXTENSION)
+
+    def leer(self, clave: str) -> Optional[Any]:
+        """Valor guardado o None. Marca la entrada como usada recientemente."""
+        if not self.habilitado:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+                valor = json.load(f, object_hook=_decodificar)
+            os.utime(ruta)
+        except FileNotFoundError:
+            with self._lock:
+                self._fallos += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de caché PDF corrupta ({clave}): {e}; se descarta")
+            self._borrar(ruta)
+            with self._lock:
+                self._fallos += 1
+            return None
+        with self._lock:
+            self._aciertos += 1
+        return valor
+
+    def guardar(self, clave: str, valor: Any) -> None:
+        """Escribe la entrada de forma atómica y expulsa las menos usadas si se supera el tamaño."""
+        if not self.habilitado:
+            return
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as crudo, gzip.GzipFile(fileobj=crudo, mode='wb', compresslevel=6, mtime=0) as f:
+                f.write(json.dumps(valor, default=_codificar, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+            os.replace(temporal, self._ruta(clave))
+        except (OSError, TypeError) as e:
+            logger.warning(f"No se pudo guardar la entrada de caché PDF {clave}: {e}")
+            return
+        self._expulsar()
+
+    def obtener(self, clave: str, calcular: Callable[[], Any]) -> Any:
+        valor = self.leer(clave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def _entradas(self) -> list:
+        entradas = []
+        try:
+            with os.scandir(self.directorio) as it:
+                for e in it:
+                    if e.is_file() and e.name.endswith(EXTENSION):
+                        st = e.stat()
+                        entradas.append((st.st_mtime, st.st_size, e.path))
+        except FileNotFoundError:
+            pass
+        return entradas
+
+    def _expulsar(self) -> None:
+        with self._lock:
+            entradas = self._entradas()
+            total = sum(tam for _, tam, _ in entradas)
+            if total <= self.max_bytes:
+                return
+            for _, tam, ruta in sorted(entradas):
+                self._borrar(ruta)
+                total -= tam
+                if total <= self.max_bytes:
+                    break
+
+    def _borrar(self, ruta: str) -> None:
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+    def limpiar(self) -> int:
+        """Borra todas las entradas. Retorna cuántas se borraron."""
+        with self._lock:
+            entradas = self._entradas()
+            for _, _, ruta in entradas:
+                self._borrar(ruta)
+            return len(entradas)
+
+    def estado(self) -> dict:
+        with self._lock:
+            entradas = self._entradas()
+            return {
+                'habilitado': self.habilitado,
+                'directorio': self.directorio,
+                'entradas': len(entradas),
+                'bytes': sum(tam for _, tam, _ in entradas),
+                'max_bytes': self.max_bytes,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+            }
+
+
+cache_pdf = CachePDF()
+
+
+def clave_documento(sha256: str) -> str:
+    return f"{sha256}.documento.{pdfplumber.__version__}.{FORMATO_DOCUMENTO}"
+
+
+def ejecutar_extractor(modulo: Any, funcion: str, documento: Any, cache: Optional[CachePDF] = None) -> Any:
+    """
+    Ejecuta `modulo.<funcion>(documento)` usando el resultado en caché si el mismo
+    archivo ya pasó por la misma versión del extractor. Las excepciones no se guardan.
+    """
+    cache = cache or cache_pdf
+    sha256 = getattr(documento, 'sha256', None)
+    extraer = getattr(modulo, funcion)
+    if not sha256 or not cache.habilitado:
+        return extraer(documento)
+
+    nombre = modulo.__name__.rsplit('.', 1)[-1]
+    clave = f"{sha256}.{nombre}.{funcion}.{version_extractor(modulo)}"
+    inicio = time.perf_counter()
+    valor = cache.leer(clave)
+    if valor is not None:
+        logger.debug(f"Caché PDF: {nombre}.{funcion} en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        return valor
+    valor = extraer(documento)
+    cache.guardar(clave, valor)
+    return valor
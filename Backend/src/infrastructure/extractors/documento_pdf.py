@@ -0,0 +1,250 @@
+"""
+PDF parseado una sola vez y compartido por todos los extractores de un upload.
+
+Analizar un extracto prueba varios módulos (uno o más de RESUMEN y luego los de
+MOVIMIENTOS, p. ej. el formato actual y el anterior) y cada uno abría el PDF y
+corría `page.extract_text()` en todas las páginas. DocumentoPDF extrae el texto
+(y opcionalmente palabras y tablas) de cada página una vez.
+
+Los extractores abren su entrada con `abrir_pdf(file_obj)` en lugar de
+`pdfplumber.open(file_obj)`: si reciben un DocumentoPDF lo usan tal cual, y si
+reciben un archivo lo parsean. DocumentoPDF expone la misma interfaz que usan
+los módulos sobre pdfplumber (`with ... as pdf`, `pdf.pages`,
+`page.extract_text()`), así que sus recorridos de páginas no cambian.
+
+abrir_pdf() pasa por el caché en disco (cache_pdf): un archivo ya parseado se
+recupera por su SHA-256 sin volver a correr pdfplumber.
+
+Extracción en paralelo: `extract_text()` es CPU y corre en un solo hilo. Desde
+PDF_PAGINAS_PARALELO_MIN páginas, desde_archivo() reparte rangos contiguos de
+páginas entre un pool de procesos acotado (PDF_PROCESOS_EXTRACCION) y une los
+resultados por número de página; cada página se extrae igual que en serie, así
+que el resultado es el mismo. Los archivos pequeños, o si el pool falla, se
+extraen en serie.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+
+import pdfplumber
+
+from src.infrastructure.extractors.cache_pdf import CachePDF, cache_pdf, clave_documento, huella_archivo
+from src.infrastructure.logging.config import logger
+
+
+# 0 = os.cpu_count()
+PROCESOS_EXTRACCION = int(os.getenv('PDF_PROCESOS_EXTRACCION', '0'))
+PAGINAS_MIN_PARALELO = int(os.getenv('PDF_PAGINAS_PARALELO_MIN', '24'))
+# Páginas mínimas por rango: rangos más chicos no compensan abrir el PDF en el worker
+PAGINAS_POR_RANGO_MIN = 8
+
+
+@dataclass
+class PaginaPDF:
+    """Contenido ya extraído de una página (numero empieza en 1)."""
+    numero: int
+    texto: Optional[str]
+    palabras: Optional[List[Dict[str, Any]]] = None
+    tablas: Optional[List[List[List[Optional[str]]]]] = None
+
+    @property
+    def page_number(self) -> int:
+        return self.numero
+
+    def extract_text(self) -> Optional[str]:
+        return self.texto
+
+    def extract_words(self) -> List[Dict[str, Any]]:
+        if self.palabras is None:
+            raise ValueError("El documento se parseó sin palabras (use DocumentoPDF.desde_archivo(..., palabras=True))")
+        return self.palabras
+
+    def extract_tables(self) -> List[List[List[Optional[str]]]]:
+        if self.tablas is None:
+            raise ValueError("El documento se parseó sin tablas (use DocumentoPDF.desde_archivo(..., tablas=True))")
+        return self.tablas
+
+
+@dataclass
+class DocumentoPDF:
+    """Páginas de un PDF con su texto extraído, en orden."""
+    paginas: List[PaginaPDF] = field(default_factory=list)
+    # SHA-256 del archivo de origen (clave del caché); None si no se calculó
+    sha256: Optional[str] = None
+
+    @classmethod
+    def desde_archivo(
+        cls, file_obj: Any, palabras: bool = False, tablas: bool = False, procesos: Optional[int] = None
+    ) -> 'DocumentoPDF':
+        """
+        Parsea el PDF completo (ruta o archivo abierto, leído desde el inicio).
+
+        Args:
+            file_obj: Ruta o archivo binario
+            palabras: Extraer también `extract_words()` de cada página
+            tablas: Extraer también `extract_tables()` de cada página
+            procesos: Máximo de procesos para extraer (None = PDF_PROCESOS_EXTRACCION; 1 = en serie)
+        """
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+        with pdfplumber.open(file_obj) as pdf:
+            total = len(pdf.pages)
+            procesos = _procesos_para(total, procesos)
+            if procesos <= 1:
+                return cls(_extraer_paginas(pdf.pages, 1, palabras, tablas))
+
+        if isinstance(file_obj, (str, os.PathLike)):
+            origen = os.fspath(file_obj)
+        else:
+            file_obj.seek(0)
+            origen = file_obj.read()
+            file_obj.seek(0)
+
+        paginas = _extraer_en_paralelo(origen, total, procesos, palabras, tablas)
+        if paginas is None:
+            return cls.desde_archivo(origen if isinstance(origen, str) else io.BytesIO(origen),
+                                     palabras=palabras, tablas=tablas, procesos=1)
+        return cls(paginas)
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> 'DocumentoPDF':
+        return cls(paginas=[PaginaPDF(**p) for p in datos['paginas']], sha256=datos.get('sha256'))
+
+    def a_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @property
+    def pages(self) -> List[PaginaPDF]:
+        return self.paginas
+
+    @property
+    def textos(self) -> List[str]:
+        return [p.texto or "" for p in self.paginas]
+
+    def texto_completo(self, separador: str = "\n") -> str:
+        return separador.join(t for t in self.textos if t)
+
+    # Permite `with abrir_pdf(x) as pdf:` igual que pdfplumber.open
+    def __enter__(self) -> 'DocumentoPDF':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+def _extraer_paginas(pages, primera: int, palabras: bool, tablas: bool) -> List[PaginaPDF]:
+    return [
+        PaginaPDF(
+            numero=numero,
+            texto=page.extract_text(),
+            palabras=page.extract_words() if palabras else None,
+            tablas=page.extract_tables() if tablas else None,
+        )
+        for numero, page in enumerate(pages, primera)
+    ]
+
+
+def _extraer_rango(origen: Any, inicio: int, fin: int, palabras: bool, tablas: bool) -> List[Dict[str, Any]]:
+    """Worker: extrae las páginas [inicio, fin) (base 0) de una ruta o de los bytes del PDF."""
+    with pdfplumber.open(io.BytesIO(origen) if isinstance(origen, bytes) else origen) as pdf:
+        paginas = _extraer_paginas(pdf.pages[inicio:fin], inicio + 1, palabras, tablas)
+    return [asdict(p) for p in paginas]
+
+
+def _procesos_para(total_paginas: int, procesos: Optional[int] = None) -> int:
+    """Procesos a usar para un PDF de `total_paginas` (1 = en serie)."""
+    if procesos is None:
+        procesos = PROCESOS_EXTRACCION or os.cpu_count() or 1
+    if total_paginas < max(PAGINAS_MIN_PARALELO, 2):
+        return 1
+    return max(1, min(procesos, total_paginas // PAGINAS_POR_RANGO_MIN))
+
+
+def rangos_paginas(total_paginas: int, partes: int) -> List[Tuple[int, int]]:
+    """Divide [0, total) en `partes` rangos contiguos de tamaño casi igual."""
+    partes = max(1, min(partes, total_paginas))
+    base, resto = divmod(total_paginas, partes)
+    rangos, inicio = [], 0
+    for i in range(partes):
+        fin = inicio + base + (1 if i < resto else 0)
+        rangos.append((inicio, fin))
+        inicio = fin
+    return rangos
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_procesos = 0
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool(procesos: int) -> ProcessPoolExecutor:
+    """Pool compartido (se crea al primer uso; arrancar procesos 'spawn' en cada upload cuesta más que extraer)."""
+    global _pool, _pool_procesos
+    with _pool_lock:
+        if _pool is None or _pool_procesos < procesos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # 'spawn': los hijos no heredan conexiones ni el pool de BD del proceso padre
+            _pool = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn'))
+            _pool_procesos = procesos
+        return _pool
+
+
+def cerrar_pool() -> None:
+    global _pool, _pool_procesos
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_procesos = None, 0
+
+
+atexit.register(cerrar_pool)
+
+
+def _extraer_en_paralelo(
+    origen: Any, total_paginas: int, procesos: int, palabras: bool, tablas: bool
+) -> Optional[List[PaginaPDF]]:
+    """Extrae por rangos en el pool y une en orden de página. None si el pool falló (el llamador reintenta en serie)."""
+    rangos = rangos_paginas(total_paginas, procesos)
+    try:
+        pool = _obtener_pool(procesos)
+        futuros = [pool.submit(_extraer_rango, origen, inicio, fin, palabras, tablas) for inicio, fin in rangos]
+        paginas = [PaginaPDF(**p) for futuro in futuros for p in futuro.result()]
+    except BrokenProcessPool as e:
+        logger.warning(f"Pool de extracción de PDF caído ({e}); se recrea en el próximo uso y se extrae en serie")
+        cerrar_pool()
+        return None
+    except Exception as e:
+        logger.warning(f"Extracción paralela de PDF falló ({total_paginas} páginas, {procesos} procesos): {e}; se extrae en serie")
+        return None
+    paginas.sort(key=lambda p: p.numero)
+    return paginas
+
+
+def abrir_pdf(origen: Any, palabras: bool = False, tablas: bool = False, cache: Optional[CachePDF] = None) -> DocumentoPDF:
+    """
+    Retorna `origen` si ya es un DocumentoPDF; si no, lo recupera del caché por
+    el SHA-256 del archivo o lo parsea y lo guarda.
+    """
+    if isinstance(origen, DocumentoPDF):
+        return origen
+    cache = cache or cache_pdf
+    if not cache.habilitado:
+        return DocumentoPDF.desde_archivo(origen, palabras=palabras, tablas=tablas)
+
+    sha256 = huella_archivo(origen)
+    clave = f"{clave_documento(sha256)}.p{int(palabras)}t{int(tablas)}"
+    datos = cache.leer(clave)
+    if datos is not None:
+        return DocumentoPDF.desde_dict(datos)
+
+    documento = DocumentoPDF.desde_archivo(origen, palabras=palabras, tablas=tablas)
+    documento.sha256 = sha256
+    cache.guardar(clave, documento.a_dict())
+    return documento
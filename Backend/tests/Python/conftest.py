@@ -7,3 +7,35 @@ def client():
     # Usamos TestClient de FastAPI que internamente usa httpx
     with TestClient(app) as client:
         yield client
+
+
+def _generar_pdf(paginas):
+    """PDF mínimo (Helvetica) con una lista de líneas por página."""
+    objetos = {1: "<< /Type /Catalog /Pages 2 0 R >>", 3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for i, lineas in enumerate(paginas):
+        pagina, contenido = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{pagina} 0 R")
+        texto = "".join(f"({linea}) Tj 0 -14 Td " for linea in lineas)
+        stream = f"BT /F1 10 Tf 40 760 Td {texto}ET"
+        objetos[pagina] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                           f"/Resources << /Font << /F1 3 0 R >> >> /Contents {contenido} 0 R >>")
+        objetos[contenido] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+    objetos[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    salida = b"%PDF-1.4\n"
+    offsets = {}
+    for numero in sorted(objetos):
+        offsets[numero] = len(salida)
+        salida += f"{numero} 0 obj\n{objetos[numero]}\nendobj\n".encode("latin-1")
+    xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    salida += "".join(f"{offsets[n]:010d} 00000 n \n" for n in sorted(objetos)).encode()
+    salida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return salida
+
+
+@pytest.fixture
+def pdf_con_paginas():
+    """Genera los bytes de un PDF con texto real (una lista de líneas por página)."""
+    return _generar_pdf
@@ -0,0 +1,75 @@
+import random
+
+from src.domain.models.matching_alias import MatchingAlias
+from src.domain.services.automata_aliases import AutomataAliases, obtener_automata
+from src.domain.services.similitud_descripcion import proyectar_descripcion
+from src.application.services.clasificacion_service import ClasificacionService
+
+
+def _alias(patron, reemplazo, cuenta_id=1):
+    return MatchingAlias(cuenta_id=cuenta_id, patron=patron, reemplazo=reemplazo)
+
+
+def _ultimo_por_bucle(texto, reglas):
+    """Implementación de referencia (bucle original de MatchingService)"""
+    resultado = texto
+    for patron, reemplazo in reglas:
+        if patron in texto:
+            resultado = texto.replace(patron, reemplazo)
+    return resultado
+
+
+def _cadena_por_bucle(texto, reglas):
+    """Implementación de referencia (bucle original de ClasificacionService)"""
+    for patron, reemplazo in reglas:
+        if patron in texto:
+            texto = texto.replace(patron, reemplazo)
+    return texto
+
+
+def test_matching_gana_el_ultimo_alias_presente():
+    """Si varios patrones aparecen, solo se aplica el último alias de la lista, sobre el texto original"""
+    aliases = [_alias("PSE", "PAGO"), _alias("PAGO PSE", "TRANSFERENCIA")]
+    assert proyectar_descripcion("PAGO PSE EPM", aliases) == "TRANSFERENCIA EPM"
+
+    invertidos = list(reversed(aliases))
+    assert proyectar_descripcion("PAGO PSE EPM", invertidos) == "PAGO PAGO EPM"
+
+
+def test_clasificacion_aplica_aliases_en_cadena():
+    """En clasificación cada alias se aplica sobre el resultado del anterior, sin acentos"""
+    servicio = ClasificacionService(None, None, None)
+    servicio._cache_aliases_cuenta = {1: [_alias("ABONO", "ADICION"), _alias("ADICIÓN", "TRASLADO")]}
+
+    assert servicio._aplicar_aliases("abono nómina", 1) == "TRASLADO NOMINA"
+    # Sin alias aplicable se conservan los acentos
+    assert servicio._aplicar_aliases("pago nómina", 1) == "PAGO NÓMINA"
+
+
+def test_automata_equivale_a_los_bucles_originales():
+    """El autómata reproduce ambas semánticas en textos y reglas aleatorias"""
+    generador = random.Random(7)
+    alfabeto = "AB C"
+
+    def texto(maximo):
+        return ''.join(generador.choice(alfabeto) for _ in range(generador.randint(1, maximo)))
+
+    for _ in range(2000):
+        reglas = [(texto(3), texto(3)) for _ in range(generador.randint(1, 6))]
+        automata = AutomataAliases(reglas)
+        descripcion = texto(12)
+
+        assert automata.aplicar_ultimo(descripcion) == _ultimo_por_bucle(descripcion, reglas)
+        assert automata.aplicar_en_cadena(descripcion)[0] == _cadena_por_bucle(descripcion, reglas)
+
+
+def test_obtener_automata_se_recompila_cuando_cambian_los_aliases():
+    """El autómata de una cuenta se reutiliza hasta que sus reglas cambian"""
+    aliases = [_alias("ABONO", "TRASLADO", cuenta_id=99)]
+    primero = obtener_automata(aliases)
+
+    assert obtener_automata([_alias("ABONO", "TRASLADO", cuenta_id=99)]) is primero
+
+    cambiados = aliases + [_alias("NOMINA", "SALARIO", cuenta_id=99)]
+    assert obtener_automata(cambiados) is not primero
+    assert obtener_automata(cambiados).aplicar_ultimo("ABONO NOMINA") == "ABONO SALARIO"
@@ -0,0 +1,75 @@
+from src.domain.models.moneda import Moneda
+from src.infrastructure.database.cache_catalogos import CacheCatalogos, cache_catalogos
+from src.infrastructure.database.postgres_moneda_repository import PostgresMonedaRepository
+
+
+class _Cursor:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, query, params=None):
+        self.conexion.consultas.append((query, params))
+
+    def fetchall(self):
+        return [(1, 'COP', 'Pesos', True), (2, 'USD', 'Dólares', True)]
+
+    def fetchone(self):
+        return (3,)
+
+    def close(self):
+        pass
+
+
+class _Conexion:
+    def __init__(self):
+        self.consultas = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_cache_invalida_solo_las_entradas_de_la_tabla_modificada():
+    cache = CacheCatalogos(ttl=60)
+    cargas = []
+
+    def cargar(nombre):
+        cargas.append(nombre)
+        return nombre
+
+    for _ in range(3):
+        cache.obtener('cuentas', ('cuentas', 'tipo_cuenta'), lambda: cargar('cuentas'))
+        cache.obtener('monedas', ('monedas',), lambda: cargar('monedas'))
+    assert cargas == ['cuentas', 'monedas']
+
+    cache.invalidar('tipo_cuenta')
+    cache.obtener('cuentas', ('cuentas', 'tipo_cuenta'), lambda: cargar('cuentas'))
+    cache.obtener('monedas', ('monedas',), lambda: cargar('monedas'))
+    assert cargas == ['cuentas', 'monedas', 'cuentas']
+
+    cache.invalidar()
+    cache.obtener('monedas', ('monedas',), lambda: cargar('monedas'))
+    assert cargas[-1] == 'monedas' and cache.estado()['aciertos'] == 5
+
+
+def test_repositorio_usa_cache_y_notifica_al_escribir():
+    cache_catalogos.invalidar()
+    conexion = _Conexion()
+    repo = PostgresMonedaRepository(conexion)
+
+    primera = repo.obtener_todos()
+    primera[0].moneda = 'modificada por el llamador'
+    assert [m.isocode for m in repo.obtener_todos()] == ['COP', 'USD']
+    assert repo.obtener_todos()[0].moneda == 'Pesos'
+    assert len(conexion.consultas) == 1
+
+    repo.guardar(Moneda(monedaid=None, isocode='EUR', moneda='Euros', activa=True))
+    assert ("SELECT pg_notify(%s, %s)", ('catalogos_cambio', 'monedas')) in conexion.consultas
+
+    repo.obtener_todos()
+    assert sum('FROM monedas' in q for q, _ in conexion.consultas) == 2
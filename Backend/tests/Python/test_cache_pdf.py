@@ -0,0 +1,80 @@
+import io
+import os
+import time
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pdfplumber
+
+from src.infrastructure.extractors import cache_pdf as cache_pdf_modulo, documento_pdf
+from src.infrastructure.extractors.cache_pdf import CachePDF, ejecutar_extractor
+from src.infrastructure.extractors.documento_pdf import abrir_pdf
+
+
+def test_documento_se_recupera_por_contenido_sin_reparsear(tmp_path, monkeypatch, pdf_con_paginas):
+    cache = CachePDF(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024, habilitado=True)
+    contenido = pdf_con_paginas([["PAGINA UNO"], ["PAGINA DOS"]])
+
+    aperturas = []
+    abrir_original = pdfplumber.open
+    monkeypatch.setattr(documento_pdf.pdfplumber, "open", lambda *a, **k: aperturas.append(1) or abrir_original(*a, **k))
+
+    primero = abrir_pdf(io.BytesIO(contenido), cache=cache)
+    # Mismo contenido en otro objeto (p. ej. otro upload del mismo archivo)
+    segundo = abrir_pdf(io.BytesIO(contenido), cache=cache)
+
+    assert len(aperturas) == 1
+    assert segundo.textos == primero.textos == ["PAGINA UNO", "PAGINA DOS"]
+    assert segundo.sha256 == primero.sha256 and len(segundo.sha256) == 64
+
+
+def test_salida_de_extractor_conserva_tipos_y_se_reutiliza(tmp_path):
+    cache = CachePDF(str(tmp_path), max_bytes=10 * 1024 * 1024, habilitado=True)
+    llamadas = []
+
+    def extraer_movimientos(documento):
+        llamadas.append(documento)
+        return [{'fecha': date(2025, 3, 1), 'valor': Decimal('-10.50'), 'descripcion': 'PAGO'}]
+
+    modulo = SimpleNamespace(__name__='src.infrastructure.extractors.bancolombia.falso', __file__=__file__,
+                             extraer_movimientos=extraer_movimientos)
+    documento = SimpleNamespace(sha256='ab' * 32)
+
+    primero = ejecutar_extractor(modulo, 'extraer_movimientos', documento, cache=cache)
+    segundo = ejecutar_extractor(modulo, 'extraer_movimientos', documento, cache=cache)
+
+    assert len(llamadas) == 1
+    assert segundo == primero and isinstance(segundo[0]['valor'], Decimal) and segundo[0]['fecha'] == date(2025, 3, 1)
+    assert cache.estado()['aciertos'] == 1
+
+
+def test_cambiar_codigo_comun_invalida_salidas_de_extractores(tmp_path, monkeypatch):
+    utils = tmp_path / "utils.py"
+    utils.write_text("def parsear_valor(texto): return texto\n")
+    monkeypatch.setattr(cache_pdf_modulo, "FUENTES_COMUNES", (str(utils),))
+    modulo = SimpleNamespace(__name__='src.infrastructure.extractors.bancolombia.falso', __file__=__file__)
+
+    antes = cache_pdf_modulo.version_extractor(modulo)
+    utils.write_text("def parsear_valor(texto): return texto.strip()\n")
+    os.utime(utils, (time.time() + 5, time.time() + 5))
+
+    assert cache_pdf_modulo.version_extractor(modulo) != antes
+    monkeypatch.setattr(cache_pdf_modulo, "FORMATO_EXTRACTORES", 2)
+    assert cache_pdf_modulo.version_extractor(modulo) != antes
+
+
+def test_expulsion_lru_por_tamano(tmp_path):
+    cache = CachePDF(str(tmp_path), max_bytes=10 ** 9, habilitado=True)
+    for clave in ('a', 'b', 'c'):
+        cache.guardar(clave, {'texto': os.urandom(2000).hex()})
+    pasado = time.time() - 100
+    for i, clave in enumerate(('a', 'b', 'c')):
+        os.utime(tmp_path / f"{clave}.json.gz", (pasado + i, pasado + i))
+    cache.leer('a')  # 'a' pasa a ser la más reciente
+
+    cache.max_bytes = cache.estado()['bytes'] - 1
+    cache.guardar('d', {'texto': 'x'})
+
+    assert cache.leer('b') is None
+    assert cache.leer('a') is not None and cache.leer('c') is not None and cache.leer('d') is not None
@@ -0,0 +1,92 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from src.domain.models.movimiento import Movimiento
+from src.infrastructure.database.carga_masiva import serializar_filas_copy
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+
+
+class _Cursor:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.conexion.consultas.append(query)
+        if "FROM conciliaciones" in query:
+            self.rows = [p for p in params[0] if p in self.conexion.bloqueados]
+        elif "INSERT INTO movimientos_encabezado" in query:
+            self.rows = self.conexion.generados
+        else:
+            self.rows = []
+
+    def copy_expert(self, sql, buffer):
+        self.conexion.copias[sql.split()[1]] = buffer.read()
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class _Conexion:
+    def __init__(self, generados=(), bloqueados=()):
+        self.generados = list(generados)
+        self.bloqueados = set(bloqueados)
+        self.consultas = []
+        self.copias = {}
+        self.commits = 0
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def _mov(dia, valor, descripcion='PAGO PSE'):
+    return Movimiento(moneda_id=1, cuenta_id=1, fecha=date(2025, 3, dia), valor=valor, descripcion=descripcion)
+
+
+def test_serializar_filas_copy_escapa_caracteres_especiales():
+    buffer = serializar_filas_copy([
+        (1, date(2025, 3, 1), 'A\tB\\C\nD', None, Decimal('-1E+2'), True),
+    ])
+
+    assert buffer.read() == '1\t2025-03-01\tA\\tB\\\\C\\nD\t\\N\t-100\tt\n'
+
+
+def test_guardar_lote_asigna_ids_y_valida_bloqueo_una_vez_por_periodo():
+    creado = datetime(2025, 3, 31)
+    conexion = _Conexion(generados=[
+        (0, None, 500, creado), (1, None, 501, creado), (2, None, 502, creado),
+        (0, 0, 900, creado), (1, 0, 901, creado), (2, 0, 902, creado),
+    ])
+    repo = PostgresMovimientoRepository(conexion)
+    repo.conciliacion_repo = type('Conciliaciones', (), {'recalcular_sistema': lambda *a: None})()
+    movs = [_mov(1, Decimal('-100')), _mov(2, Decimal('50')), _mov(15, Decimal('-7.5'))]
+
+    repo.guardar_lote(movs)
+
+    assert [m.id for m in movs] == [500, 501, 502]
+    assert [m.detalles[0].id for m in movs] == [900, 901, 902]
+    assert all(m.detalles[0].movimiento_id == m.id for m in movs)
+    assert sum("FROM conciliaciones" in q for q in conexion.consultas) == 1
+    assert conexion.copias['tmp_carga_encabezado'].count('\n') == 3
+    assert conexion.commits == 1
+
+
+def test_guardar_lote_rechaza_periodo_conciliado():
+    conexion = _Conexion(bloqueados=[(1, 2025, 3)])
+    repo = PostgresMovimientoRepository(conexion)
+
+    with pytest.raises(ValueError, match="CONCILIADO"):
+        repo.guardar_lote([_mov(1, Decimal('-100'))])
+
+    assert not conexion.copias and conexion.commits == 0
@@ -0,0 +1,79 @@
+import pdfplumber
+
+from src.application.services.cargar_extracto_bancario_service import CargarExtractoBancarioService
+from src.infrastructure.extractors import documento_pdf
+from src.infrastructure.extractors.cache_pdf import cache_pdf
+from src.infrastructure.extractors.documento_pdf import DocumentoPDF, abrir_pdf
+
+
+class _CuentaExtractorRepo:
+    def obtener_modulos(self, cuenta_id, tipo):
+        if tipo == 'RESUMEN':
+            return ['mastercard_pesos_extracto', 'mastercard_pesos_extracto_anterior']
+        return ['mastercard_pesos_extracto_movimientos', 'mastercard_pesos_extracto_anterior_movimientos']
+
+
+def test_documento_extrae_cada_pagina_una_vez(tmp_path, pdf_con_paginas):
+    ruta = tmp_path / "extracto.pdf"
+    ruta.write_bytes(pdf_con_paginas([["PAGINA UNO", "SALDO 100"], [], ["PAGINA TRES"]]))
+
+    with open(ruta, "rb") as f:
+        f.read(10)  # El parser debe leer desde el inicio aunque el puntero se haya movido
+        documento = DocumentoPDF.desde_archivo(f, palabras=True)
+
+    assert [p.page_number for p in documento.pages] == [1, 2, 3]
+    assert documento.pages[0].extract_text() == "PAGINA UNO\nSALDO 100"
+    assert documento.textos[1] == ""
+    assert documento.texto_completo() == "PAGINA UNO\nSALDO 100\nPAGINA TRES"
+    assert [w["text"] for w in documento.pages[2].extract_words()] == ["PAGINA", "TRES"]
+    assert abrir_pdf(documento) is documento
+
+
+def test_analizar_extracto_parsea_el_pdf_una_sola_vez(tmp_path, monkeypatch, pdf_con_paginas):
+    ruta = tmp_path / "extracto.pdf"
+    ruta.write_bytes(pdf_con_paginas([["ESTADO DE CUENTA PESOS"], ["SIN MOVIMIENTOS"]]))
+    monkeypatch.chdir(tmp_path)  # Los extractores MasterCard escriben archivos de depuración en el cwd
+    monkeypatch.setattr(cache_pdf, "directorio", str(tmp_path / "cache"))
+
+    aperturas = []
+    abrir_original = pdfplumber.open
+
+    def contar_aperturas(*args, **kwargs):
+        aperturas.append(args[0])
+        return abrir_original(*args, **kwargs)
+
+    monkeypatch.setattr(documento_pdf.pdfplumber, "open", contar_aperturas)
+    service = CargarExtractoBancarioService(None, None, _CuentaExtractorRepo())
+
+    with open(ruta, "rb") as f:
+        datos = service.analizar_extracto(f, "2025-03.pdf", "MasterCardPesos", cuenta_id=6)
+
+    # Dos módulos de RESUMEN y dos de MOVIMIENTOS leyeron el mismo documento
+    assert len(aperturas) == 1
+    assert datos["movimientos_count"] == 0 and (datos["year"], datos["month"]) == (2025, 3)
+
+    # Un segundo análisis del mismo archivo sale del caché en disco
+    with open(ruta, "rb") as f:
+        assert service.analizar_extracto(f, "2025-03.pdf", "MasterCardPesos", cuenta_id=6) == datos
+    assert len(aperturas) == 1
+
+
+def test_extraccion_paralela_igual_a_serie(tmp_path, monkeypatch, pdf_con_paginas):
+    paginas = [[f"PAGINA {i}", f"MOVIMIENTO {i} VALOR {i * 1000}"] for i in range(1, 11)]
+    ruta = tmp_path / "extracto.pdf"
+    ruta.write_bytes(pdf_con_paginas(paginas))
+    monkeypatch.setattr(documento_pdf, "PAGINAS_MIN_PARALELO", 4)
+    monkeypatch.setattr(documento_pdf, "PAGINAS_POR_RANGO_MIN", 2)
+
+    assert documento_pdf._procesos_para(3, 4) == 1  # Archivos pequeños: en serie
+    assert documento_pdf.rangos_paginas(10, 3) == [(0, 4), (4, 7), (7, 10)]
+
+    serie = DocumentoPDF.desde_archivo(str(ruta), palabras=True, procesos=1)
+    try:
+        with open(ruta, "rb") as f:
+            paralelo = DocumentoPDF.desde_archivo(f, palabras=True, procesos=3)
+    finally:
+        documento_pdf.cerrar_pool()
+
+    assert [p.numero for p in paralelo.pages] == list(range(1, 11))
+    assert paralelo.a_dict() == serie.a_dict()
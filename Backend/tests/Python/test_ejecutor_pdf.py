@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from src.infrastructure.api import ejecutor_pdf as modulo
+from src.infrastructure.api.ejecutor_pdf import EjecutorPDF, EjecutorSaturadoError, TrabajoExpiradoError
+
+
+class _ConexionFalsa:
+    def __init__(self):
+        self.eventos = []
+
+    def cancel(self):
+        self.eventos.append("cancel")
+
+
+@pytest.fixture
+def conexion(monkeypatch):
+    conn = _ConexionFalsa()
+
+    @contextmanager
+    def conexion_trabajo():
+        try:
+            yield conn
+            conn.eventos.append("commit")
+        except Exception:
+            conn.eventos.append("rollback")
+            raise
+
+    monkeypatch.setattr(modulo, "_conexion_trabajo", conexion_trabajo)
+    return conn
+
+
+def test_el_loop_sigue_atendiendo_mientras_corre_un_trabajo():
+    ejecutor = EjecutorPDF(hilos=1, max_pendientes=2, timeout=5)
+    liberar = threading.Event()
+
+    async def escenario():
+        trabajo = asyncio.create_task(ejecutor.ejecutar("pdf", liberar.wait, 2))
+        await asyncio.sleep(0.05)
+        # Otro request se atiende mientras el PDF sigue bloqueado
+        atendido = await asyncio.wait_for(asyncio.sleep(0, result="catalogos"), 1)
+        liberar.set()
+        return atendido, await trabajo
+
+    try:
+        assert asyncio.run(escenario()) == ("catalogos", True)
+        assert ejecutor.estado()["completados"] == 1
+    finally:
+        ejecutor.cerrar()
+
+
+def test_admision_rechaza_por_encima_del_limite():
+    ejecutor = EjecutorPDF(hilos=1, max_pendientes=1, timeout=5)
+    liberar = threading.Event()
+
+    async def escenario():
+        primero = asyncio.create_task(ejecutor.ejecutar("pdf", liberar.wait, 2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(EjecutorSaturadoError):
+            await ejecutor.ejecutar("pdf", lambda: None)
+        liberar.set()
+        await primero
+
+    try:
+        asyncio.run(escenario())
+        estado = ejecutor.estado()
+        assert estado["rechazados"] == 1 and estado["en_curso"] == 0
+    finally:
+        ejecutor.cerrar()
+
+
+def test_trabajo_expirado_cancela_la_consulta_y_revierte(conexion):
+    ejecutor = EjecutorPDF(hilos=1, max_pendientes=2, timeout=5)
+    liberar = threading.Event()
+    terminado = threading.Event()
+
+    def cargar(conn):
+        liberar.wait()
+        return {"ok": True}
+
+    async def escenario():
+        with pytest.raises(TrabajoExpiradoError):
+            await ejecutor.ejecutar("cargar", cargar, con_conexion=True, timeout=0.05)
+        # El cupo sigue ocupado hasta que el hilo termina de verdad
+        assert ejecutor.estado()["en_curso"] == 1
+        liberar.set()
+
+    try:
+        asyncio.run(escenario())
+        ejecutor._obtener_executor().submit(terminado.set).result(timeout=5)
+        assert conexion.eventos == ["cancel", "rollback"]
+        estado = ejecutor.estado()
+        assert estado["expirados"] == 1 and estado["en_curso"] == 0 and estado["completados"] == 0
+    finally:
+        ejecutor.cerrar()
@@ -0,0 +1,66 @@
+from datetime import date
+from decimal import Decimal
+
+from src.infrastructure.api.routers.movimientos import _filas_csv, _filas_ndjson
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+
+
+class _CursorServidor:
+    """Cursor con nombre: la descripción solo existe tras el primer fetch."""
+
+    def __init__(self, conexion, name):
+        self.conexion = conexion
+        self.name = name
+        self.itersize = None
+        self.description = None
+        self.cerrado = False
+
+    def execute(self, query, params=None):
+        self.conexion.ejecutadas.append((query, params))
+
+    def __iter__(self):
+        for i in range(self.conexion.total):
+            self.description = [('id',), ('fecha',), ('valor',)]
+            yield (i, date(2025, 3, 1), Decimal('-10.50'))
+
+    def close(self):
+        self.cerrado = True
+
+
+class _Conexion:
+    def __init__(self, total):
+        self.total = total
+        self.ejecutadas = []
+        self.cursores = []
+
+    def cursor(self, name=None):
+        cursor = _CursorServidor(self, name)
+        self.cursores.append(cursor)
+        return cursor
+
+
+def test_iterar_datos_exportacion_usa_cursor_de_servidor():
+    conexion = _Conexion(total=5)
+    repo = PostgresMovimientoRepository(conexion)
+
+    filas = repo.iterar_datos_exportacion(limit=5, itersize=2)
+    primera = next(filas)
+
+    cursor = conexion.cursores[0]
+    assert cursor.name.startswith('exportacion_') and cursor.itersize == 2
+    assert primera == {'id': 0, 'fecha': date(2025, 3, 1), 'valor': Decimal('-10.50')}
+    assert conexion.ejecutadas[0][1] == (5,)
+    assert len(list(filas)) == 4 and cursor.cerrado
+
+
+def test_serializacion_csv_y_ndjson_por_bloques():
+    filas = [{'id': i, 'fecha': date(2025, 3, 1), 'valor': Decimal('-10.50'), 'nota': 'a,b'} for i in range(5)]
+
+    bloques_csv = list(_filas_csv(iter(filas), filas_por_bloque=2))
+    assert len(bloques_csv) == 3
+    assert ''.join(bloques_csv).splitlines()[:2] == ['id,fecha,valor,nota', '0,2025-03-01,-10.50,"a,b"']
+
+    bloques_json = list(_filas_ndjson(iter(filas), filas_por_bloque=2))
+    assert len(bloques_json) == 3
+    assert ''.join(bloques_json).splitlines()[4] == '{"id": 4, "fecha": "2025-03-01", "valor": "-10.50", "nota": "a,b"}'
+    assert list(_filas_csv(iter([]))) == []
@@ -0,0 +1,113 @@
+from datetime import date
+from decimal import Decimal
+
+from src.application.services.cargar_movimientos_service import CargarMovimientosService
+from src.domain.models.movimiento import Movimiento
+from src.domain.services.indice_duplicados import IndiceDuplicados, coincide_ilike
+
+
+def _mov(id, fecha, valor, descripcion, referencia="", usd=None):
+    return Movimiento(
+        id=id, moneda_id=1, cuenta_id=1, fecha=fecha, valor=Decimal(valor),
+        descripcion=descripcion, referencia=referencia, usd=usd
+    )
+
+
+def test_coincide_ilike_como_postgres():
+    assert coincide_ilike("Pago Pse Epm", "PAGO PSE EPM")
+    assert coincide_ilike("Pago 50% Epm", "pago 50% epm")
+    assert coincide_ilike("Pago X Epm", "Pago _ Epm")
+    assert not coincide_ilike("Pago XY Epm", "Pago _ Epm")
+    assert coincide_ilike("Pago_Epm", "Pago\\_Epm") and not coincide_ilike("PagoXEpm", "Pago\\_Epm")
+    assert not coincide_ilike(None, "%")
+
+
+def test_indice_duplicados_misma_semantica_que_existe_movimiento():
+    indice = IndiceDuplicados([
+        _mov(1, date(2025, 3, 10), "-50000", "Compra Exito", referencia="123"),
+        _mov(2, date(2025, 3, 10), "-20000", "Pago Pse"),
+        _mov(3, date(2025, 3, 11), "0", "Compra Amazon", usd=Decimal("15.50")),
+    ])
+
+    # Con referencia: basta fecha + referencia
+    assert indice.existe("2025-03-10", -1, "123", "Otra")
+    assert not indice.existe("2025-03-11", -50000, "123", "Compra Exito")
+    # Sin referencia: valor + descripción (ILIKE)
+    assert indice.existe("2025-03-10", -20000.0, "", "PAGO PSE")
+    assert not indice.existe("2025-03-10", -20000, "", "Pago Nequi")
+    assert indice.existe("2025-03-10", -20000, "", "")
+    # USD compara la columna USD
+    assert indice.existe("2025-03-11", 0, "", "Compra Amazon", usd=15.5)
+    assert not indice.existe("2025-03-11", 0, "", "Compra Amazon", usd=16)
+    # Coincidencia blanda: fecha + valor
+    assert indice.coincidencia_blanda("2025-03-10", -50000).id == 1
+    assert indice.coincidencia_blanda("2025-03-12", -50000) is None
+
+
+def test_procesar_archivo_una_consulta_y_duplicados_dentro_del_archivo():
+    class Repo:
+        def __init__(self):
+            self.consultas = 0
+            self.guardados = []
+
+        def obtener_por_cuenta_y_rango(self, cuenta_id, desde, hasta):
+            self.consultas += 1
+            assert (desde, hasta) == (date(2025, 3, 10), date(2025, 3, 12))
+            return [_mov(1, date(2025, 3, 10), "-20000", "Pago Pse")]
+
+        def guardar_lote(self, movs):
+            self.lotes += 1
+            for mov in movs:
+                mov.id = 100 + len(self.guardados)
+                self.guardados.append(mov)
+            return movs
+
+    repo = Repo()
+    repo.lotes = 0
+    servicio = CargarMovimientosService(repo, moneda_repo=None)
+    servicio._extraer_movimientos = lambda *args: [
+        {'fecha': '2025-03-10', 'descripcion': 'Pago Pse', 'referencia': '', 'valor': -20000},
+        {'fecha': '2025-03-12', 'descripcion': 'Retiro', 'referencia': '', 'valor': -100000},
+        {'fecha': '2025-03-12', 'descripcion': 'Retiro', 'referencia': '', 'valor': -100000},
+    ]
+
+    resultado = servicio.procesar_archivo(None, "archivo.pdf", "Ahorros", cuenta_id=1)
+
+    assert repo.consultas == 1
+    assert resultado["nuevos_insertados"] == 1 and resultado["duplicados"] == 2
+    assert [m.descripcion for m in repo.guardados] == ['Retiro']
+    assert repo.lotes == 1 and repo.guardados[0].id == 100
+    assert resultado["egresos_cargados"] == -100000 and resultado["egresos_duplicados"] == -120000
+    assert resultado["total_egresos"] == -220000
+
+
+def test_procesar_archivo_reintenta_fila_por_fila_si_falla_el_lote():
+    class Repo:
+        def __init__(self):
+            self.guardados = []
+
+        def obtener_por_cuenta_y_rango(self, cuenta_id, desde, hasta):
+            return []
+
+        def guardar_lote(self, movs):
+            raise ValueError("El periodo 2025-3 está CONCILIADO y bloqueado.")
+
+        def guardar(self, mov):
+            if mov.fecha.month == 3:
+                raise ValueError("El periodo 2025-3 está CONCILIADO y bloqueado.")
+            mov.id = 100 + len(self.guardados)
+            self.guardados.append(mov)
+            return mov
+
+    repo = Repo()
+    servicio = CargarMovimientosService(repo, moneda_repo=None)
+    servicio._extraer_movimientos = lambda *args: [
+        {'fecha': '2025-03-31', 'descripcion': 'Pago Pse', 'referencia': '', 'valor': -20000},
+        {'fecha': '2025-04-01', 'descripcion': 'Abono', 'referencia': '', 'valor': 50000},
+    ]
+
+    resultado = servicio.procesar_archivo(None, "archivo.pdf", "Ahorros", cuenta_id=1)
+
+    assert resultado["nuevos_insertados"] == 1 and resultado["errores"] == 1
+    assert resultado["ingresos_cargados"] == 50000 and resultado["egresos_errores"] == -20000
+    assert "CONCILIADO" in resultado["detalle_errores"][0]["error"]
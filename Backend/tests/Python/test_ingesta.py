@@ -0,0 +1,127 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.application.services.cargar_movimientos_service import CargarMovimientosService
+from src.application.services.ingesta_service import IngestaService
+from src.domain.models.trabajo_ingesta import TrabajoIngesta, TIPO_EXTRACTO, TIPO_MOVIMIENTOS
+from src.infrastructure.api import cola_ingesta as modulo
+from src.infrastructure.api.cola_ingesta import ReporteProgreso
+
+
+def test_reporte_progreso_mide_etapas_y_limita_escrituras(monkeypatch):
+    reloj = iter([0.0, 0.1, 0.2, 0.3, 1.0, 1.5])
+    monkeypatch.setattr(modulo.time, "perf_counter", lambda: next(reloj))
+    guardados = []
+    reporte = ReporteProgreso(7, guardar=lambda *args: guardados.append(args), intervalo=0.5)
+
+    reporte("PARSEO")                  # 0.1: cambio de etapa, se guarda
+    reporte("DEDUPLICACION", 0, 400)   # 0.2: cambio de etapa, se guarda
+    reporte("DEDUPLICACION", 200, 400) # 0.3: dentro del intervalo, no se guarda
+    reporte("DEDUPLICACION", 400, 400) # 1.0: venció el intervalo
+    tiempos = reporte.cerrar()         # 1.5
+
+    assert [(g[1], g[2], g[3]) for g in guardados] == [
+        ("PARSEO", 0, None), ("DEDUPLICACION", 0, 400), ("DEDUPLICACION", 400, 400)
+    ]
+    assert guardados[1][4] == {"PARSEO": 100.0}
+    assert tiempos == {"PARSEO": 100.0, "DEDUPLICACION": 1300.0, "total": 1500.0}
+
+
+def test_encolar_valida_y_ejecutar_despacha_por_tipo():
+    class Repo:
+        def crear(self, trabajo, contenido):
+            trabajo.id = 1
+            return trabajo
+
+    servicio = IngestaService(Repo())
+    with pytest.raises(ValueError):
+        servicio.encolar(TIPO_MOVIMIENTOS, "extracto.xlsx", b"%PDF", "Ahorros", 1)
+    with pytest.raises(ValueError):
+        servicio.encolar(TIPO_MOVIMIENTOS, "extracto.pdf", b"", "Ahorros", 1)
+    trabajo = servicio.encolar(TIPO_EXTRACTO, "extracto.pdf", b"%PDF", "Ahorros", 1, {
+        "year": 2025, "month": 3, "overrides": {"saldo_final": "1500.25"}
+    })
+
+    class Procesador:
+        def procesar_extracto(self, file_obj, filename, tipo_cuenta, cuenta_id, year, month,
+                              overrides=None, movimientos_confirmados=None, progreso=None):
+            progreso("PARSEO")
+            return {"archivo": filename, "contenido": file_obj.read(), "periodo": (year, month), "overrides": overrides}
+
+    etapas = []
+    resultado = IngestaService.ejecutar(trabajo, b"%PDF", Procesador(), lambda etapa, *a: etapas.append(etapa))
+
+    assert trabajo.id == 1 and etapas == ["PARSEO"]
+    assert resultado == {
+        "archivo": "extracto.pdf", "contenido": b"%PDF", "periodo": (2025, 3),
+        "overrides": {"saldo_final": Decimal("1500.25")}
+    }
+
+
+def test_procesar_archivo_reporta_etapas_y_recalcula_una_vez_por_periodo():
+    class Repo:
+        def obtener_por_cuenta_y_rango(self, cuenta_id, desde, hasta):
+            return []
+
+        def guardar_lote(self, movs, recalcular_conciliacion=True):
+            assert recalcular_conciliacion is False
+            for i, mov in enumerate(movs):
+                mov.id = 100 + i
+            return movs
+
+    class Conciliaciones:
+        def __init__(self):
+            self.recalculados = []
+
+        def recalcular_sistema(self, cuenta_id, year, month):
+            self.recalculados.append((cuenta_id, year, month))
+
+    conciliaciones = Conciliaciones()
+    servicio = CargarMovimientosService(Repo(), moneda_repo=None, conciliacion_repo=conciliaciones)
+    servicio._extraer_movimientos = lambda *args: [
+        {'fecha': '2025-03-10', 'descripcion': 'Pago Pse', 'referencia': '', 'valor': -20000},
+        {'fecha': '2025-03-12', 'descripcion': 'Retiro', 'referencia': '', 'valor': -100000},
+        {'fecha': '2025-04-02', 'descripcion': 'Abono', 'referencia': '', 'valor': 50000},
+    ]
+    avisos = []
+
+    resultado = servicio.procesar_archivo(None, "archivo.pdf", "Ahorros", cuenta_id=1,
+                                          progreso=lambda *args: avisos.append(args))
+
+    assert resultado["nuevos_insertados"] == 3
+    assert avisos == [("PARSEO",), ("DEDUPLICACION", 0, 3), ("INSERCION", 0, 3), ("CONCILIACION", 3, 3)]
+    assert conciliaciones.recalculados == [(1, 2025, 3), (1, 2025, 4)]
+
+
+def test_matching_lote_se_encola_sin_archivo_y_reporta_periodos(monkeypatch):
+    from src.application.services import matching_lote_service
+    from src.application.services.matching_lote_service import MatchingLoteService
+
+    class Repo:
+        def crear(self, trabajo, contenido):
+            assert contenido is None
+            trabajo.id = 2
+            return trabajo
+
+    servicio = IngestaService(Repo())
+    with pytest.raises(ValueError):
+        servicio.encolar_matching_lote(2025, month=13)
+    trabajo = servicio.encolar_matching_lote(2025, cuenta_ids=[1], max_procesos=1)
+    assert trabajo.tipo == "MATCHING_LOTE" and trabajo.archivo is None
+
+    lote = MatchingLoteService(connection=None)
+    lote.listar_periodos = lambda year, cuenta_ids, month: [
+        {'cuenta_id': 1, 'year': year, 'month': 1, 'estado': 'CONCILIADO'},
+        {'cuenta_id': 1, 'year': year, 'month': 2, 'estado': None},
+    ]
+    monkeypatch.setattr(matching_lote_service, "_procesar_periodo", lambda c, y, m: {
+        'cuenta_id': c, 'year': y, 'month': m, 'estado': 'PROCESADO', 'segundos': 0.1, 'segundos_cpu': 0.1
+    })
+    avisos = []
+
+    resultado = IngestaService.ejecutar_matching_lote(trabajo, lote, lambda *args: avisos.append(args))
+
+    assert avisos == [("MATCHING", 1, 2), ("MATCHING", 2, 2)]
+    assert [p['estado'] for p in resultado['periodos']] == ['BLOQUEADO', 'PROCESADO']
@@ -0,0 +1,43 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.infrastructure.api.main import instrumentacion_sql
+from src.infrastructure.database import instrumentacion
+from src.infrastructure.database.instrumentacion import ConsultaLenta, metricas_actuales, normalizar_sql
+
+
+def test_normalizar_sql_reemplaza_literales_y_listas():
+    sql = """
+        SELECT * FROM movimientos_encabezado
+        WHERE CuentaID = 3 AND Descripcion ILIKE 'PAGO ''PSE''%' AND Id IN (1, 2, 3)
+    """
+
+    assert normalizar_sql(sql) == (
+        "SELECT * FROM movimientos_encabezado WHERE CuentaID = ? AND Descripcion ILIKE ? AND Id IN (...)"
+    )
+
+
+def test_middleware_emite_server_timing_con_las_consultas_del_request():
+    app = FastAPI()
+    app.middleware("http")(instrumentacion_sql)
+
+    @app.get("/sin-sql")
+    def sin_sql():
+        return {}
+
+    @app.get("/con-sql")
+    def con_sql():
+        # Endpoint síncrono (threadpool): debe ver las métricas del request
+        metricas = metricas_actuales()
+        metricas.registrar(12.5, 10)
+        metricas.registrar(7.5, 5)
+        metricas.registrar_lenta(ConsultaLenta(sql="SELECT ?", ms=250.0, filas=1, ruta=metricas.ruta))
+        return {}
+
+    client = TestClient(app)
+
+    assert "Server-Timing" not in client.get("/sin-sql").headers
+    header = client.get("/con-sql").headers["Server-Timing"]
+    assert header == 'db;dur=20.0;desc="2 consultas, 15 filas", db-lentas;desc="1"'
+    assert instrumentacion.consultas_lentas_recientes()[0]['ruta'] == "GET /con-sql"
+    assert metricas_actuales() is None
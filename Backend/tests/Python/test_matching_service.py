@@ -0,0 +1,307 @@
+from datetime import date
+from decimal import Decimal
+
+from src.domain.models.configuracion_matching import ConfiguracionMatching
+from src.domain.models.movimiento import Movimiento
+from src.domain.models.movimiento_extracto import MovimientoExtracto
+from src.domain.models.movimiento_match import MatchEstado
+from src.domain.services.indice_candidatos import IndiceCandidatos
+from src.domain.services.matching_service import MatchingService
+
+
+def _extracto(id, fecha, valor, descripcion="PAGO PSE"):
+    return MovimientoExtracto(
+        id=id, cuenta_id=1, year=fecha.year, month=fecha.month,
+        fecha=fecha, descripcion=descripcion, referencia=None, valor=Decimal(valor)
+    )
+
+
+def _sistema(id, fecha, valor, descripcion="PAGO PSE"):
+    return Movimiento(
+        id=id, moneda_id=1, cuenta_id=1, fecha=fecha,
+        valor=Decimal(valor), descripcion=descripcion
+    )
+
+
+def test_indice_candidatos_ventana_y_orden():
+    """Solo devuelve vecinos de ±1 día, en el orden original de entrada"""
+    movs = [
+        _sistema(1, date(2025, 3, 12), "-100"),
+        _sistema(2, date(2025, 3, 10), "-100"),
+        _sistema(3, date(2025, 3, 5), "-100"),
+        _sistema(4, date(2025, 3, 11), "-100"),
+        _sistema(5, date(2025, 3, 9), "-100"),
+    ]
+    indice = IndiceCandidatos(movs)
+
+    candidatos = indice.candidatos(date(2025, 3, 11))
+    assert [m.id for m in candidatos] == [1, 2, 4]
+
+
+def test_indice_candidatos_remover():
+    """Un movimiento removido deja de ser candidato y no afecta a los demás"""
+    movs = [_sistema(1, date(2025, 3, 10), "-100"), _sistema(2, date(2025, 3, 10), "-100")]
+    indice = IndiceCandidatos(movs)
+
+    indice.remover(movs[0])
+    indice.remover(movs[0])  # Idempotente
+
+    assert [m.id for m in indice.candidatos(date(2025, 3, 10))] == [2]
+    assert len(indice) == 1
+    assert movs[0] not in indice
+
+
+def test_matching_no_reutiliza_movimiento_sistema():
+    """Un movimiento del sistema vinculado no se ofrece a otro extracto"""
+    config = ConfiguracionMatching.crear_configuracion_default()
+    extractos = [
+        _extracto(1, date(2025, 3, 10), "-50000"),
+        _extracto(2, date(2025, 3, 10), "-50000"),
+    ]
+    sistema = [_sistema(10, date(2025, 3, 10), "-50000")]
+
+    matches = MatchingService().ejecutar_matching(extractos, sistema, config)
+
+    assert matches[0].estado == MatchEstado.OK
+    assert matches[0].mov_sistema.id == 10
+    assert matches[1].estado == MatchEstado.SIN_MATCH
+    assert matches[1].mov_sistema is None
+
+
+def test_matching_ignora_candidatos_fuera_de_ventana():
+    """Movimientos a más de un día de distancia no son candidatos"""
+    config = ConfiguracionMatching.crear_configuracion_default()
+    extractos = [_extracto(1, date(2025, 3, 10), "-50000")]
+    sistema = [_sistema(10, date(2025, 3, 12), "-50000")]
+
+    matches = MatchingService().ejecutar_matching(extractos, sistema, config)
+
+    assert matches[0].estado == MatchEstado.SIN_MATCH
+
+
+def test_matching_optimo_mejora_asignacion_greedy():
+    """El modo OPTIMO reasigna cuando el greedy le quita a una fila posterior su mejor par"""
+    from dataclasses import replace
+    from src.domain.models.configuracion_matching import ModoAsignacion
+
+    fecha = date(2025, 3, 10)
+    extractos = [
+        _extracto(1, fecha, "-50000", "PAGO PSE EPM"),
+        _extracto(2, fecha, "-50000", "COMPRA EXITO"),
+    ]
+    sistema = [
+        _sistema(10, fecha, "-50000", "COMPRA EXITO"),
+        _sistema(20, fecha, "-50050", "PAGO PSE EPM"),
+    ]
+    base = ConfiguracionMatching.crear_configuracion_default()
+
+    greedy = MatchingService().ejecutar_matching(extractos, sistema, base)
+    assert greedy[0].mov_sistema.id == 10
+    assert greedy[1].estado == MatchEstado.SIN_MATCH
+
+    config = replace(base, modo_asignacion=ModoAsignacion.OPTIMO)
+    optimo = MatchingService().ejecutar_matching(extractos, sistema, config)
+    assert [m.mov_sistema.id for m in optimo] == [20, 10]
+    assert optimo[1].estado == MatchEstado.OK
+
+
+def test_configuracion_modo_asignacion_invalido():
+    """modo_asignacion acepta strings válidos y rechaza valores desconocidos"""
+    import pytest
+    from dataclasses import replace
+    from src.domain.models.configuracion_matching import ModoAsignacion
+
+    base = ConfiguracionMatching.crear_configuracion_default()
+    assert replace(base, modo_asignacion="optimo").modo_asignacion == ModoAsignacion.OPTIMO
+    with pytest.raises(ValueError):
+        replace(base, modo_asignacion="HUNGARO")
+
+
+def test_evaluador_entero_coincide_con_scores_decimal():
+    """La ruta entera ordena y umbraliza igual que los scores Decimal"""
+    from src.domain.services.puntaje_entero import EvaluadorEntero
+    from src.domain.services.similitud_descripcion import ComparadorDescripciones
+
+    config = ConfiguracionMatching.crear_configuracion_default()
+    servicio = MatchingService()
+    comparador = ComparadorDescripciones()
+    fecha = date(2025, 3, 10)
+    extracto = _extracto(1, fecha, "-50000", "PAGO PSE EPM")
+    sistema = [
+        _sistema(10, fecha, "-50000", "PAGO PSE"),
+        _sistema(20, fecha, "-50003.33", "PAGO PSE EPM"),
+        _sistema(30, date(2025, 3, 11), "-50000", "PAGO EPM"),
+    ]
+    evaluador = EvaluadorEntero.crear(config, [extracto] + sistema)
+
+    for mov in sistema:
+        descripcion = comparador.centesimas(
+            comparador.proyectar(extracto.descripcion), comparador.normalizar(mov.descripcion)
+        )
+        numerador, _ = evaluador.evaluar(extracto, mov, descripcion)
+        score = servicio._evaluar_candidato(extracto, mov, config, [])[0]
+        assert Decimal(numerador) / evaluador.denominador == score
+        assert (numerador >= evaluador.umbral(config.score_minimo_exacto)) == (score >= config.score_minimo_exacto)
+
+
+def test_evaluador_entero_no_aplica_con_montos_fraccionales():
+    """Montos con más de dos decimales usan la ruta Decimal"""
+    from src.domain.services.puntaje_entero import EvaluadorEntero
+
+    config = ConfiguracionMatching.crear_configuracion_default()
+    movs = [_sistema(10, date(2025, 3, 10), "-100.005")]
+
+    assert EvaluadorEntero.crear(config, movs) is None
+
+
+def test_comparador_descripciones_coincide_con_score_y_descarta_por_cota():
+    """El comparador cacheado da el mismo score y la cota descarta pares sin posibilidad"""
+    from src.domain.services.similitud_descripcion import ComparadorDescripciones
+
+    servicio = MatchingService()
+    comparador = ComparadorDescripciones()
+    pares = [("pago pse epm ", "PAGO PSE"), ("COMPRA EXITO", "ABONO NOMINA"), ("  ", " "), ("", "X")]
+
+    for desc_extracto, desc_sistema in pares:
+        esperada, sistema = comparador.proyectar(desc_extracto), comparador.normalizar(desc_sistema)
+        assert Decimal(comparador.centesimas(esperada, sistema)) / 100 == \
+            servicio.calcular_score_descripcion(desc_extracto, desc_sistema)
+
+    # "AB" vs "ABCDEFGH" no puede superar 0.40 (cota por longitudes)
+    assert comparador.centesimas_acotadas("AB", "ABCDEFGH", lambda cota: cota >= 50) is None
+    assert comparador.centesimas_acotadas("AB", "ABCDEFGH", lambda cota: cota >= 40) == 40
+
+
+def test_matching_incremental_solo_recalcula_filas_afectadas():
+    """Sin cambios no se recalcula nada; un cambio solo afecta su vecindad de fechas"""
+    config = ConfiguracionMatching.crear_configuracion_default()
+    servicio = MatchingService()
+    extractos = [
+        _extracto(1, date(2025, 3, 3), "-70000", "RETIRO CAJERO"),
+        _extracto(2, date(2025, 3, 20), "-80000", "PAGO TARJETA"),
+    ]
+    sistema = [_sistema(10, date(2025, 3, 12), "-10000", "OTRO")]
+
+    matches, instantanea = servicio.ejecutar_matching_incremental(extractos, sistema, config)
+    assert instantanea.recalculados == 2
+    assert all(m.estado == MatchEstado.SIN_MATCH for m in matches)
+
+    _, instantanea = servicio.ejecutar_matching_incremental(extractos, sistema, config, previa=instantanea)
+    assert instantanea.recalculados == 0
+
+    # Aparece en el sistema el pago de la fila 2: solo esa fila se recalcula
+    sistema.append(_sistema(20, date(2025, 3, 20), "-80000", "PAGO TARJETA"))
+    matches, instantanea = servicio.ejecutar_matching_incremental(extractos, sistema, config, previa=instantanea)
+    assert instantanea.recalculados == 1
+    assert matches[0].estado == MatchEstado.SIN_MATCH
+    assert matches[1].mov_sistema.id == 20
+    assert 2 not in instantanea.pendientes and 20 not in instantanea.disponibles
+
+    # Un cambio de configuración recalcula todo
+    from dataclasses import replace
+    otra = replace(config, tolerancia_valor=Decimal("1.00"))
+    _, instantanea = servicio.ejecutar_matching_incremental(extractos[:1], sistema[:1], otra, previa=instantanea)
+    assert instantanea.recalculados == 1
+
+
+def test_buscar_subconjunto_coincide_con_fuerza_bruta():
+    """El meet-in-the-middle encuentra el subconjunto mínimo igual que la búsqueda exhaustiva"""
+    import random
+    from itertools import combinations
+    from src.domain.services.suma_subconjuntos import buscar_subconjunto
+
+    generador = random.Random(3)
+    for _ in range(300):
+        valores = [generador.randint(1, 40) for _ in range(generador.randint(2, 12))]
+        objetivo = generador.randint(2, 90)
+        esperado = next(
+            (k for k in range(2, 5) for combo in combinations(valores, k) if sum(combo) == objetivo),
+            None
+        )
+        indices = buscar_subconjunto(objetivo, valores, max_combinaciones=10**6)
+        if esperado is None:
+            assert indices is None
+        else:
+            assert len(indices) == esperado
+            assert sum(valores[i] for i in indices) == objetivo
+
+
+def test_detectar_grupos_pago_dividido_en_ambos_sentidos():
+    """Un extracto explicado por varios del sistema, y un sistema explicado por varios extractos"""
+    config = ConfiguracionMatching.crear_configuracion_default()
+    extractos = [
+        _extracto(1, date(2025, 3, 10), "-150000", "PAGO TARJETA"),
+        _extracto(2, date(2025, 3, 20), "-40000", "COMPRA 1"),
+        _extracto(3, date(2025, 3, 21), "-60000", "COMPRA 2"),
+    ]
+    sistema = [
+        _sistema(10, date(2025, 3, 9), "-50000"),
+        _sistema(11, date(2025, 3, 10), "-70000"),
+        _sistema(12, date(2025, 3, 11), "-30000"),
+        _sistema(13, date(2025, 3, 10), "25000"),  # Otro signo: nunca participa
+        _sistema(20, date(2025, 3, 21), "-100000", "TRASLADO AGRUPADO"),
+    ]
+
+    grupos = MatchingService().detectar_grupos(extractos, sistema, config)
+
+    assert [(g.tipo, [m.id for m in g.movs_extracto], [m.id for m in g.movs_sistema]) for g in grupos] == [
+        ('1_A_MUCHOS', [1], [10, 11, 12]),
+        ('MUCHOS_A_1', [2, 3], [20]),
+    ]
+    assert all(g.diferencia == 0 for g in grupos)
+
+
+def test_buscar_subconjunto_respeta_presupuesto():
+    """Con muchos candidatos el presupuesto de combinaciones recorta la búsqueda"""
+    from src.domain.services.suma_subconjuntos import buscar_subconjunto
+
+    valores = list(range(1, 200))
+    # Solo caben los primeros candidatos: 198 + 199 queda fuera del presupuesto
+    assert buscar_subconjunto(397, valores, max_combinaciones=500) is None
+    assert buscar_subconjunto(3, valores, max_combinaciones=500) == (0, 1)
+
+
+def test_matching_periodo_excluye_vinculados_y_guarda_en_lote():
+    """Solo procesa pendientes, no reutiliza sistemas ocupados y guarda OK/PROBABLE en un lote"""
+    from src.application.services.matching_periodo_service import MatchingPeriodoService
+    from src.domain.models.movimiento_match import MovimientoMatch
+
+    config = ConfiguracionMatching.crear_configuracion_default()
+    extractos = [
+        _extracto(1, date(2025, 3, 10), "-50000"),
+        _extracto(2, date(2025, 3, 10), "-50000"),
+        _extracto(3, date(2025, 3, 25), "-999", "OTRO"),
+    ]
+    sistema = [_sistema(10, date(2025, 3, 10), "-50000"), _sistema(11, date(2025, 3, 10), "-50000")]
+    existente = MovimientoMatch(
+        mov_extracto=extractos[0], mov_sistema=sistema[0], estado=MatchEstado.OK,
+        score_total=Decimal("1"), score_fecha=Decimal("1"),
+        score_valor=Decimal("1"), score_descripcion=Decimal("1"), id=100
+    )
+
+    class Repo:
+        def __init__(self, **metodos):
+            self.__dict__.update(metodos)
+
+    guardados = []
+    vinculacion_repo = Repo(
+        obtener_por_periodo=lambda c, y, m: [existente],
+        eliminar_lote=lambda ids: 0,
+        guardar_lote=lambda matches: guardados.extend(matches) or [None] * len(matches),
+    )
+    servicio = MatchingPeriodoService(
+        MatchingService(),
+        Repo(obtener_por_periodo=lambda c, y, m: extractos),
+        vinculacion_repo,
+        Repo(obtener_activa=lambda: config),
+        Repo(obtener_por_cuenta=lambda c: []),
+        Repo(obtener_universo_sistema=lambda c, y, m: sistema),
+    )
+
+    resultado = servicio.ejecutar(1, 2025, 3)
+
+    assert [m.mov_extracto.id for m in resultado.matches_nuevos] == [2, 3]
+    assert resultado.matches_nuevos[0].mov_sistema.id == 11
+    assert [m.mov_extracto.id for m in guardados] == [2]
+    assert resultado.matches_existentes == [existente]
+    assert resultado.errores == []
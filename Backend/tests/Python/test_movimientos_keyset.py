@@ -0,0 +1,64 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.infrastructure.database.postgres_movimiento_repository import (
+    PostgresMovimientoRepository, _codificar_cursor, _decodificar_cursor
+)
+
+
+class _Conexion:
+    def __init__(self, filas):
+        self.filas = filas
+        self.consultas = []
+
+    def cursor(self):
+        conexion = self
+
+        class _Cursor:
+            def execute(self, query, params=None):
+                conexion.consultas.append((query, params))
+                self.rows = conexion.filas if "FROM movimientos_encabezado m" in query and "movimientos_detalle d" not in query else []
+
+            def fetchall(self):
+                return self.rows
+
+            def close(self):
+                pass
+
+        return _Cursor()
+
+
+def _fila(id, fecha, valor):
+    return (id, fecha, 'PAGO', '', Decimal(valor), None, None, 1, 1, None, None, None, 'Ahorros', 'COP', None)
+
+
+def test_cursor_keyset_ida_y_vuelta():
+    token = _codificar_cursor(date(2025, 3, 10), Decimal('1500.50'), 42)
+    assert _decodificar_cursor(token) == (date(2025, 3, 10), Decimal('1500.50'), 42)
+    with pytest.raises(ValueError):
+        _decodificar_cursor("no-es-un-cursor")
+
+
+def test_buscar_avanzado_keyset_dos_consultas_y_siguiente_cursor():
+    filas = [_fila(3, date(2025, 3, 10), '-900'), _fila(2, date(2025, 3, 10), '500'), _fila(1, date(2025, 3, 9), '-100')]
+    conexion = _Conexion(filas)
+    repo = PostgresMovimientoRepository(conexion)
+
+    movimientos, siguiente, resumen = repo.buscar_avanzado_keyset(cuenta_id=1, limit=2)
+
+    assert [m.id for m in movimientos] == [3, 2]
+    assert resumen is None
+    assert _decodificar_cursor(siguiente) == (date(2025, 3, 10), Decimal('500'), 2)
+    # Encabezados + detalles
+    assert len(conexion.consultas) == 2
+    query, params = conexion.consultas[0]
+    assert "OFFSET" not in query and params[-1] == 3
+
+    conexion.filas = filas[2:]
+    movimientos, siguiente, _ = repo.buscar_avanzado_keyset(cuenta_id=1, limit=2, cursor=siguiente)
+    query, params = conexion.consultas[2]
+    assert "(m.Fecha, ABS(m.Valor), m.Id) < (%s, %s, %s)" in query
+    assert params == (1, date(2025, 3, 10), Decimal('500'), 2, 3)
+    assert [m.id for m in movimientos] == [1] and siguiente is None
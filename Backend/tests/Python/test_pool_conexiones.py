@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions
+
+from src.infrastructure.database.pool import PoolConexiones, PoolAgotadoError
+
+
+class _Info:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class _Conexion:
+    def __init__(self):
+        self.closed = 0
+        self.info = _Info()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool(**kwargs):
+    return PoolConexiones(conectar=_Conexion, **kwargs)
+
+
+def test_pool_espera_acotada_y_timeout():
+    """Con todas las conexiones prestadas se espera hasta el timeout o se rechaza si la cola está llena"""
+    pool = _pool(minconn=0, maxconn=1, timeout=0.05, max_en_espera=1)
+    conn = pool.getconn()
+
+    with pytest.raises(PoolAgotadoError):
+        pool.getconn()
+
+    # Un hilo que devuelve la conexión desbloquea al que espera
+    threading.Timer(0.02, pool.putconn, args=(conn,)).start()
+    assert pool.getconn(timeout=1) is conn
+
+    metricas = pool.metricas()
+    assert metricas['timeouts'] == 1
+    assert metricas['en_uso'] == 1 and metricas['prestamos'] == 2
+    assert metricas['espera_ms']['total'] == 2
+
+
+def test_pool_recicla_por_usos_y_descarta_cerradas():
+    pool = _pool(minconn=1, maxconn=2, max_usos=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    pool.putconn(conn)  # Segundo uso: se recicla
+    assert conn.closed
+
+    nueva = pool.getconn()
+    assert nueva is not conn
+    nueva.closed = 1
+    pool.putconn(nueva)
+
+    metricas = pool.metricas()
+    assert metricas['recicladas'] == 1 and metricas['descartadas'] == 1
+    assert metricas['abiertas'] == 0 and metricas['creadas'] == 2
+
+
+def test_pool_concurrente_no_excede_maximo():
+    pool = _pool(minconn=0, maxconn=3, timeout=5)
+    maximo = [0]
+    lock = threading.Lock()
+
+    def trabajar():
+        for _ in range(20):
+            conn = pool.getconn()
+            with lock:
+                maximo[0] = max(maximo[0], pool.metricas()['en_uso'])
+            time.sleep(0.001)
+            pool.putconn(conn)
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    metricas = pool.metricas()
+    assert maximo[0] <= 3
+    assert metricas['prestamos'] == 160 and metricas['en_uso'] == 0
+    assert metricas['creadas'] <= 3
@@ -0,0 +1,88 @@
+from datetime import date
+
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+
+
+class _Cursor:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, query, params=None):
+        self.conexion.consultas.append((' '.join(query.split()), params))
+
+    def fetchone(self):
+        return (self.conexion.resumen_existe,)
+
+    def fetchall(self):
+        return self.conexion.filas
+
+    def close(self):
+        pass
+
+
+class _Conexion:
+    def __init__(self, resumen_existe=True):
+        self.resumen_existe = resumen_existe
+        self.consultas = []
+        self.filas = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+def _repo(resumen_existe=True):
+    PostgresMovimientoRepository._resumen_mensual_existe = None
+    conexion = _Conexion(resumen_existe)
+    return PostgresMovimientoRepository(conexion), conexion
+
+
+def test_meses_completos_leen_del_resumen():
+    repo, conexion = _repo()
+    conexion.filas = [('2025-Mar', 1, 'Ahorros', 4, 'Hogar', 3, 0, 150)]
+
+    stats = repo.obtener_estadisticas_dashboard(date(2025, 1, 1), date(2025, 3, 31))
+    conexion.filas = []
+    repo.resumir_por_clasificacion('centro_costo', date(2025, 2, 1), date(2025, 2, 28), centros_costos_excluidos=[7])
+
+    assert stats[0]['conteo'] == 3 and stats[0]['egresos'] == 150.0
+    dashboard, clasificacion = [c for c in conexion.consultas if 'to_regclass' not in c[0]]
+    assert 'FROM resumen_mensual_movimientos r' in dashboard[0]
+    assert dashboard[1] == (2025, 1, 2025, 3)
+    assert 'r.centro_costo_id NOT IN %s' in clasificacion[0] and clasificacion[1] == (2025, 2, 2025, 2, (7,))
+    # La existencia de la tabla se verifica una sola vez por proceso
+    assert sum('to_regclass' in q for q, _ in conexion.consultas) == 1
+
+
+def test_rangos_parciales_o_tipo_movimiento_usan_el_detalle():
+    repo, conexion = _repo()
+
+    repo.obtener_estadisticas_dashboard(date(2025, 1, 15), date(2025, 3, 31))
+    repo.resumir_por_clasificacion('tercero', date(2025, 1, 1), date(2025, 1, 31), tipo_movimiento='egresos')
+
+    assert all('resumen_mensual_movimientos r' not in q for q, _ in conexion.consultas)
+    assert all('FROM movimientos_encabezado m' in q for q, _ in conexion.consultas)
+
+
+def test_sin_tabla_de_resumen_usa_el_detalle():
+    repo, conexion = _repo(resumen_existe=False)
+
+    repo.resumir_ingresos_gastos_por_mes()
+
+    assert 'FROM movimientos_encabezado m' in conexion.consultas[-1][0]
+    PostgresMovimientoRepository._resumen_mensual_existe = None
+
+
+def test_restaurar_movimientos_reconstruye_el_resumen():
+    from src.infrastructure.api.routers.admin import _reconstruir_resumen_mensual
+
+    class Cursor(_Cursor):
+        def fetchone(self):
+            return (True,) if 'to_regprocedure' in self.conexion.consultas[-1][0] else (12,)
+
+    conexion = _Conexion()
+    cursor = Cursor(conexion)
+
+    assert _reconstruir_resumen_mensual(cursor, ["terceros", "movimientos_extracto"]) is None
+    assert conexion.consultas == []
+    assert _reconstruir_resumen_mensual(cursor, ["terceros", "movimientos_detalle"]) == 12
+    assert conexion.consultas[-1][0] == "SELECT reconstruir_resumen_mensual()"
@@ -0,0 +1,114 @@
+from datetime import date
+
+import pytest
+
+from src.infrastructure.database.sentencias_preparadas import RegistroSentencias, convertir_marcadores
+
+
+class _Conexion:
+    pass
+
+
+class _Cursor:
+    def __init__(self, conexion, ejecutadas):
+        self.connection = conexion
+        self.name = None
+        self.ejecutadas = ejecutadas
+
+    def execute(self, query, params=None):
+        self.ejecutadas.append((query, params))
+
+
+def test_convertir_marcadores_a_parametros_posicionales():
+    sql, parametros = convertir_marcadores("SELECT 1 FROM t WHERE a = %s AND b ILIKE 'x%%' AND c = ANY(%s)")
+
+    assert sql == "SELECT 1 FROM t WHERE a = $1 AND b ILIKE 'x%' AND c = ANY($2)"
+    assert parametros == 2
+
+
+def test_prepara_una_vez_por_conexion_y_reporta_reutilizacion():
+    registro = RegistroSentencias(habilitadas=True)
+    ejecutadas = []
+    sql = "SELECT estado FROM conciliaciones WHERE cuenta_id = %s AND year = %s AND month = %s"
+    conexiones = [_Conexion(), _Conexion()]
+
+    for conexion in conexiones + conexiones + conexiones:
+        registro.ejecutar(_Cursor(conexion, ejecutadas), 'estado_periodo', sql, (3, 2025, 1))
+
+    preparadas = [q for q, _ in ejecutadas if q.startswith('PREPARE')]
+    assert len(preparadas) == 2
+    assert preparadas[0].endswith("AS SELECT estado FROM conciliaciones WHERE cuenta_id = $1 AND year = $2 AND month = $3")
+    nombre = preparadas[0].split()[1]
+    assert [q for q, _ in ejecutadas[:4]] == [
+        "SAVEPOINT preparar_sentencia", preparadas[0], "RELEASE SAVEPOINT preparar_sentencia",
+        f"EXECUTE {nombre} (%s, %s, %s)"
+    ]
+    assert ejecutadas[3][1] == (3, 2025, 1)
+
+    metricas = registro.metricas()
+    assert metricas['llamadas'] == 6 and metricas['preparaciones'] == 2 and metricas['conexiones'] == 2
+    assert metricas['sentencias'][0]['tasa_reutilizacion'] == round(4 / 6, 4)
+
+
+def test_variantes_del_mismo_nombre_y_modo_deshabilitado():
+    registro = RegistroSentencias(habilitadas=True)
+    ejecutadas = []
+    cursor = _Cursor(_Conexion(), ejecutadas)
+
+    registro.ejecutar(cursor, 'existe', "SELECT 1 FROM t WHERE f = %s AND r = %s", (date(2025, 1, 2), 'A'))
+    registro.ejecutar(cursor, 'existe', "SELECT 1 FROM t WHERE f = %s AND v = %s", (date(2025, 1, 2), 10))
+    assert len({q.split()[1] for q, _ in ejecutadas if q.startswith('PREPARE')}) == 2
+
+    with pytest.raises(ValueError):
+        registro.ejecutar(cursor, 'existe', "SELECT 1 FROM t WHERE f = %s AND v = %s", (date(2025, 1, 2),))
+
+    directo = []
+    RegistroSentencias(habilitadas=False).ejecutar(_Cursor(_Conexion(), directo), 'x', "SELECT %s", (1,))
+    assert directo == [("SELECT %s", (1,))]
+
+
+def test_sentencia_perdida_o_duplicada_no_deja_la_conexion_inservible():
+    import psycopg2.errors
+
+    registro = RegistroSentencias(habilitadas=True)
+    conexion = _Conexion()
+    sesion = set()
+    ejecutadas = []
+
+    class Cursor(_Cursor):
+        def execute(self, query, params=None):
+            super().execute(query, params)
+            partes = query.split()
+            if partes[0] == 'PREPARE':
+                if partes[1] in sesion:
+                    raise psycopg2.errors.DuplicatePreparedStatement()
+                sesion.add(partes[1])
+            elif partes[0] == 'EXECUTE' and partes[1] not in sesion:
+                raise psycopg2.errors.InvalidSqlStatementName()
+
+    cursor = Cursor(conexion, ejecutadas)
+    registro.ejecutar(cursor, 'a', "SELECT %s", (1,))
+    registro.ejecutar(cursor, 'b', "SELECT %s + 1", (1,))
+    nombre_a, nombre_b = sorted(sesion)
+
+    # DEALLOCATE de una sola: solo esa falla y se olvida
+    sesion.discard(nombre_a)
+    with pytest.raises(psycopg2.errors.InvalidSqlStatementName):
+        registro.ejecutar(cursor, 'a', "SELECT %s", (1,))
+    ejecutadas.clear()
+    registro.ejecutar(cursor, 'b', "SELECT %s + 1", (1,))
+    assert ejecutadas == [(f"EXECUTE {nombre_b} (%s)", (1,))]
+    registro.ejecutar(cursor, 'a', "SELECT %s", (1,))
+    assert nombre_a in sesion
+
+    # Estado local perdido con la sentencia viva en la sesión: PREPARE duplicado se tolera
+    registro._preparadas.pop(conexion)
+    ejecutadas.clear()
+    registro.ejecutar(cursor, 'b', "SELECT %s + 1", (2,))
+    assert [q for q, _ in ejecutadas] == [
+        "SAVEPOINT preparar_sentencia", f"PREPARE {nombre_b} AS SELECT $1 + 1",
+        "ROLLBACK TO SAVEPOINT preparar_sentencia", "RELEASE SAVEPOINT preparar_sentencia",
+        f"EXECUTE {nombre_b} (%s)"
+    ]
+    registro.ejecutar(cursor, 'b', "SELECT %s + 1", (3,))
+    assert ejecutadas[-1] == (f"EXECUTE {nombre_b} (%s)", (3,))
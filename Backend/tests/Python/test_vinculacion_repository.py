@@ -0,0 +1,93 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from src.domain.models.movimiento_match import MatchEstado
+from src.infrastructure.database.postgres_movimiento_vinculacion_repository import PostgresMovimientoVinculacionRepository
+
+
+class _Cursor:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.conexion.consultas.append(query)
+        if "FROM movimiento_vinculaciones" in query:
+            self.rows = self.conexion.vinculaciones
+        elif "FROM movimientos_encabezado" in query:
+            self.rows = [r for r in self.conexion.sistema if r[0] in params[0]]
+        else:
+            self.rows = []
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class _Conexion:
+    def __init__(self, vinculaciones, sistema):
+        self.vinculaciones = vinculaciones
+        self.sistema = sistema
+        self.consultas = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+def _fila_vinculacion(id, sistema_id, extracto_id, estado):
+    vinculacion = (id, sistema_id, extracto_id, estado, 0.95, 1, 1, 0.8, False, None, 'sistema', None, datetime(2025, 3, 1))
+    extracto = (extracto_id, 1, 2025, 3, date(2025, 3, 10), 'PAGO PSE', None, Decimal('-100'), None, None, extracto_id, None, None, 'Ahorros')
+    return vinculacion + extracto
+
+
+def _fila_sistema(id):
+    return (id, date(2025, 3, 10), 'PAGO PSE', '', Decimal('-100'), None, None, 1, 1, None, None, None, 'Ahorros', 'COP', None)
+
+
+def test_obtener_por_periodo_carga_en_lote_sin_n_mas_1():
+    """Las vinculaciones de un periodo se cargan con un número fijo de consultas"""
+    filas = [_fila_vinculacion(i, 100 + i if i % 2 else None, 10 + i, 'OK' if i % 2 else 'SIN_MATCH') for i in range(1, 51)]
+    conexion = _Conexion(filas, [_fila_sistema(100 + i) for i in range(1, 51, 2)])
+
+    matches = PostgresMovimientoVinculacionRepository(conexion).obtener_por_periodo(1, 2025, 3)
+
+    # Vinculaciones + extracto, movimientos del sistema y sus detalles
+    assert len(conexion.consultas) == 3
+    assert [m.id for m in matches] == list(range(1, 51))
+    assert matches[0].mov_sistema.id == 101 and matches[0].estado == MatchEstado.OK
+    assert matches[1].mov_sistema is None and matches[1].mov_extracto.id == 12
+
+
+def test_guardar_lote_reintenta_por_fila_si_el_bloque_falla():
+    """Un conflicto (ej. uq_vinculacion_sistema) solo pierde su fila, no el lote"""
+    from src.domain.models.movimiento_extracto import MovimientoExtracto
+    from src.domain.models.movimiento_match import MovimientoMatch
+
+    def match(extracto_id):
+        extracto = MovimientoExtracto(
+            id=extracto_id, cuenta_id=1, year=2025, month=3, fecha=date(2025, 3, 10),
+            descripcion='PAGO PSE', referencia=None, valor=Decimal('-100')
+        )
+        return MovimientoMatch(mov_extracto=extracto, mov_sistema=None, estado=MatchEstado.OK,
+                               score_total=Decimal('1'), score_fecha=Decimal('1'),
+                               score_valor=Decimal('1'), score_descripcion=Decimal('1'))
+
+    repo = PostgresMovimientoVinculacionRepository(_Conexion([], []))
+    lotes = []
+
+    def upsert(vinculaciones):
+        lotes.append([v.mov_extracto.id for v in vinculaciones])
+        if len(vinculaciones) > 1 or vinculaciones[0].mov_extracto.id == 2:
+            raise Exception('duplicate key value violates unique constraint "uq_vinculacion_sistema"')
+        vinculaciones[0].id = 500 + vinculaciones[0].mov_extracto.id
+
+    repo._upsert = upsert
+    matches = [match(1), match(2), match(3)]
+
+    errores = repo.guardar_lote(matches)
+
+    assert lotes == [[1, 2, 3], [1], [2], [3]]
+    assert errores[0] is None and errores[2] is None and 'uq_vinculacion_sistema' in str(errores[1])
+    assert [m.id for m in matches] == [501, None, 503]
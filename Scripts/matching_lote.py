@@ -0,0 +1,69 @@
+import sys
+import os
+import argparse
+
+# Add Backend to python path
+sys.path.append(os.path.join(os.getcwd(), 'Backend'))
+
+from src.infrastructure.database.connection import get_connection_pool
+from src.application.services.matching_lote_service import MatchingLoteService
+
+def matching_lote(year, cuentas=None, month=None, procesos=None):
+    """
+    Ejecuta el matching de todos los periodos del año (todas o varias cuentas)
+    repartiendo los periodos en un pool de procesos. Los periodos CONCILIADO se omiten.
+    """
+    print("Initializing connection pool...")
+    pool = get_connection_pool()
+    conn = pool.getconn()
+
+    try:
+        servicio = MatchingLoteService(conn)
+        resultado = servicio.ejecutar(year, cuenta_ids=cuentas, month=month, max_procesos=procesos)
+
+        print("\n=== Matching en Lote ===")
+        headers = ["CUENTA", "PERIODO", "ESTADO", "EXTRACTO", "OK", "PROB", "SIN", "SEG"]
+        widths = [8, 10, 12, 10, 8, 8, 8, 10]
+        print("".join(h.ljust(widths[i]) if i < 3 else h.rjust(widths[i]) for i, h in enumerate(headers)))
+        print("-" * sum(widths))
+
+        for r in resultado['periodos']:
+            valores = [
+                str(r['cuenta_id']),
+                f"{r['year']}/{r['month']:02d}",
+                r['estado'],
+                str(r.get('movimientos_extracto', '')),
+                str(r.get('ok', '')),
+                str(r.get('probables', '')),
+                str(r.get('sin_match', '')),
+                f"{r['segundos']:.2f}" if 'segundos' in r else '',
+            ]
+            print("".join(v.ljust(widths[i]) if i < 3 else v.rjust(widths[i]) for i, v in enumerate(valores)))
+            if r.get('error'):
+                print(f"    Error: {r['error']}")
+
+        t = resultado['totales']
+        print("=" * sum(widths))
+        print(f"Periodos: {t['periodos']} | Procesados: {t['procesados']} | "
+              f"Bloqueados: {t['bloqueados']} | Errores: {t['errores']}")
+        print(f"Vinculados OK: {t['ok']} | Probables: {t['probables']} | Sin match: {t['sin_match']}")
+        print(f"Tiempo total: {t['segundos']:.2f}s con {t['procesos']} procesos "
+              f"(suma por periodo: {t['segundos_periodos']:.2f}s, CPU: {t['segundos_cpu']:.2f}s)")
+
+    except Exception as e:
+        print(f"\nError ejecutando matching en lote: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        pool.putconn(conn)
+        pool.closeall()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Matching en lote por cuentas y periodos')
+    parser.add_argument('--year', type=int, required=True, help='Año a procesar')
+    parser.add_argument('--cuenta', type=int, action='append', help='ID de cuenta (repetible; por defecto todas)')
+    parser.add_argument('--month', type=int, help='Mes especifico')
+    parser.add_argument('--procesos', type=int, help='Procesos del pool (por defecto, CPUs disponibles)')
+
+    args = parser.parse_args()
+    matching_lote(args.year, args.cuenta, args.month, args.procesos)
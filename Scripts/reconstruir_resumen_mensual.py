@@ -0,0 +1,36 @@
+import sys
+import os
+import argparse
+import time
+
+# Add Backend to python path
+sys.path.append(os.path.join(os.getcwd(), 'Backend'))
+
+from src.infrastructure.database.connection import get_connection_pool
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+
+def reconstruir_resumen_mensual():
+    """
+    Reconstruye resumen_mensual_movimientos (Sql/migration_resumen_mensual.sql)
+    desde movimientos_encabezado x movimientos_detalle.
+    """
+    print("Initializing connection pool...")
+    pool = get_connection_pool()
+    conn = pool.getconn()
+
+    try:
+        inicio = time.perf_counter()
+        periodos = PostgresMovimientoRepository(conn).reconstruir_resumen_mensual()
+        print(f"Resumen mensual reconstruido: {periodos} periodos en {time.perf_counter() - inicio:.2f}s")
+    except Exception as e:
+        print(f"\nError reconstruyendo resumen mensual: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        pool.putconn(conn)
+        pool.closeall()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruye la tabla de resumen mensual de movimientos")
+    parser.parse_args()
+    reconstruir_resumen_mensual()
@@ -0,0 +1,27 @@
+-- =====================================================
+-- MIGRACIÓN: Agregar modo_asignacion a configuracion_matching
+-- Fecha: 2026-10-18
+-- Propósito: Permitir elegir el motor de asignación del matching
+--            GREEDY (por orden del extracto) u OPTIMO (asignación 1-a-1 de score máximo)
+-- =====================================================
+
+-- 1. Agregar columna modo_asignacion
+ALTER TABLE configuracion_matching
+ADD COLUMN IF NOT EXISTS modo_asignacion VARCHAR(20) NOT NULL DEFAULT 'GREEDY';
+
+-- 2. Restringir valores válidos
+ALTER TABLE configuracion_matching
+DROP CONSTRAINT IF EXISTS check_modo_asignacion;
+
+ALTER TABLE configuracion_matching
+ADD CONSTRAINT check_modo_asignacion CHECK (modo_asignacion IN ('GREEDY', 'OPTIMO'));
+
+-- 3. Comentario descriptivo
+COMMENT ON COLUMN configuracion_matching.modo_asignacion
+IS 'Motor de asignación: GREEDY (orden del extracto) u OPTIMO (maximiza el score total del periodo)';
+
+-- 4. Verificar cambio
+SELECT column_name, data_type, is_nullable, column_default
+FROM information_schema.columns
+WHERE table_name = 'configuracion_matching'
+AND column_name = 'modo_asignacion';
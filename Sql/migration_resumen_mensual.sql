@@ -0,0 +1,218 @@
+-- =====================================================
+-- MIGRACIÓN: Tabla de resumen mensual de movimientos
+-- Fecha: 2026-10-18
+-- Propósito: Los reportes (dashboard, ingresos/gastos por mes, resumen por
+-- clasificación, desglose de gastos) leen de una tabla agregada en lugar de
+-- recorrer movimientos_encabezado x movimientos_detalle en cada request.
+--
+-- Grano: (cuenta, año, mes, moneda, tercero del encabezado, tercero del
+-- detalle, centro de costo, concepto). Una fila de la unión
+-- encabezado LEFT JOIN detalle aporta a exactamente una fila del resumen
+-- (los encabezados sin detalle aportan con dimensiones de detalle NULL).
+--
+-- Se mantiene con triggers de sentencia: cada INSERT/UPDATE/DELETE sobre
+-- encabezados o detalles recalcula los periodos (cuenta, año, mes) que tocó.
+-- reconstruir_resumen_mensual() reconstruye todo (reparación de desvíos).
+-- =====================================================
+
+-- 1. Tabla
+CREATE TABLE IF NOT EXISTS resumen_mensual_movimientos (
+    cuenta_id INTEGER,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    moneda_id INTEGER,
+    tercero_id INTEGER,               -- Tercero del encabezado (filtros)
+    detalle_tercero_id INTEGER,       -- Tercero del detalle (desglose por tercero)
+    centro_costo_id INTEGER,
+    concepto_id INTEGER,
+    ingresos NUMERIC NOT NULL DEFAULT 0,
+    egresos NUMERIC NOT NULL DEFAULT 0,       -- Valor absoluto
+    saldo NUMERIC NOT NULL DEFAULT 0,
+    cantidad_ingresos INTEGER NOT NULL DEFAULT 0,
+    cantidad_egresos INTEGER NOT NULL DEFAULT 0,
+    -- Encabezados distintos por (periodo, cuenta, centro de costo): cada encabezado
+    -- se cuenta en la fila de su primer detalle de cada centro de costo.
+    movimientos INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_resumen_mensual_periodo
+ON resumen_mensual_movimientos(year, month, cuenta_id);
+
+CREATE INDEX IF NOT EXISTS idx_resumen_mensual_cuenta_periodo
+ON resumen_mensual_movimientos(cuenta_id, year, month);
+
+COMMENT ON TABLE resumen_mensual_movimientos
+IS 'Agregado mensual de movimientos_encabezado x movimientos_detalle. Mantenido por triggers; reconstruir con reconstruir_resumen_mensual().';
+
+-- 2. Recalcular un periodo (cuenta, año, mes)
+CREATE OR REPLACE FUNCTION recalcular_resumen_mensual(p_cuenta_id INTEGER, p_year INTEGER, p_month INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    -- Serializa los recálculos del mismo periodo: sin esto, en READ COMMITTED el
+    -- DELETE de una segunda transacción no ve las filas que la primera reinsertó
+    -- y ambas quedan sumadas (ingesta en paralelo con reclasificación).
+    PERFORM pg_advisory_xact_lock(COALESCE(p_cuenta_id, 0), p_year * 100 + p_month);
+
+    DELETE FROM resumen_mensual_movimientos
+    WHERE cuenta_id IS NOT DISTINCT FROM p_cuenta_id AND year = p_year AND month = p_month;
+
+    INSERT INTO resumen_mensual_movimientos (
+        cuenta_id, year, month, moneda_id, tercero_id, detalle_tercero_id,
+        centro_costo_id, concepto_id, ingresos, egresos, saldo,
+        cantidad_ingresos, cantidad_egresos, movimientos
+    )
+    SELECT
+        f.cuenta_id, p_year, p_month, f.moneda_id, f.tercero_id, f.detalle_tercero_id,
+        f.centro_costo_id, f.concepto_id,
+        COALESCE(SUM(CASE WHEN f.valor > 0 THEN f.valor ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN f.valor < 0 THEN ABS(f.valor) ELSE 0 END), 0),
+        COALESCE(SUM(f.valor), 0),
+        COUNT(*) FILTER (WHERE f.valor > 0),
+        COUNT(*) FILTER (WHERE f.valor < 0),
+        COUNT(*) FILTER (WHERE f.primero_del_centro)
+    FROM (
+        SELECT
+            m.CuentaID AS cuenta_id, m.MonedaID AS moneda_id, m.terceroid AS tercero_id,
+            md.TerceroID AS detalle_tercero_id, md.centro_costo_id, md.ConceptoID AS concepto_id,
+            md.Valor AS valor,
+            ROW_NUMBER() OVER (PARTITION BY m.Id, md.centro_costo_id ORDER BY md.id) = 1 AS primero_del_centro
+        FROM movimientos_encabezado m
+        LEFT JOIN movimientos_detalle md ON m.Id = md.movimiento_id
+        WHERE m.CuentaID IS NOT DISTINCT FROM p_cuenta_id
+          AND m.Fecha >= make_date(p_year, p_month, 1)
+          AND m.Fecha < make_date(p_year, p_month, 1) + INTERVAL '1 month'
+    ) f
+    GROUP BY f.cuenta_id, f.moneda_id, f.tercero_id, f.detalle_tercero_id, f.centro_costo_id, f.concepto_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Reconstrucción completa
+CREATE OR REPLACE FUNCTION reconstruir_resumen_mensual()
+RETURNS INTEGER AS $$
+DECLARE
+    periodo RECORD;
+    total INTEGER := 0;
+BEGIN
+    TRUNCATE resumen_mensual_movimientos;
+    FOR periodo IN
+        SELECT DISTINCT CuentaID AS cuenta_id,
+               EXTRACT(YEAR FROM Fecha)::INTEGER AS year,
+               EXTRACT(MONTH FROM Fecha)::INTEGER AS month
+        FROM movimientos_encabezado
+    LOOP
+        PERFORM recalcular_resumen_mensual(periodo.cuenta_id, periodo.year, periodo.month);
+        total := total + 1;
+    END LOOP;
+    RETURN total;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Triggers de sentencia (una recalculación por periodo distinto afectado).
+--    Las tablas de transición no admiten triggers de varios eventos: uno por evento,
+--    y cada rama de TG_OP solo menciona las tablas de transición que existen.
+CREATE OR REPLACE FUNCTION recalcular_resumen_movimientos(p_ids INTEGER[])
+RETURNS VOID AS $$
+DECLARE
+    periodo RECORD;
+BEGIN
+    FOR periodo IN
+        SELECT DISTINCT m.CuentaID AS cuenta_id,
+               EXTRACT(YEAR FROM m.Fecha)::INTEGER AS year,
+               EXTRACT(MONTH FROM m.Fecha)::INTEGER AS month
+        FROM movimientos_encabezado m
+        WHERE m.Id = ANY(p_ids)
+    LOOP
+        PERFORM recalcular_resumen_mensual(periodo.cuenta_id, periodo.year, periodo.month);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION trg_resumen_mensual_encabezado()
+RETURNS TRIGGER AS $$
+DECLARE
+    periodo RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        FOR periodo IN
+            SELECT DISTINCT CuentaID AS cuenta_id, EXTRACT(YEAR FROM Fecha)::INTEGER AS year, EXTRACT(MONTH FROM Fecha)::INTEGER AS month
+            FROM filas_nuevas
+        LOOP
+            PERFORM recalcular_resumen_mensual(periodo.cuenta_id, periodo.year, periodo.month);
+        END LOOP;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Un cambio de fecha o cuenta mueve el movimiento: recalcular origen y destino
+        FOR periodo IN
+            SELECT CuentaID AS cuenta_id, EXTRACT(YEAR FROM Fecha)::INTEGER AS year, EXTRACT(MONTH FROM Fecha)::INTEGER AS month
+            FROM filas_nuevas
+            UNION
+            SELECT CuentaID, EXTRACT(YEAR FROM Fecha)::INTEGER, EXTRACT(MONTH FROM Fecha)::INTEGER
+            FROM filas_anteriores
+        LOOP
+            PERFORM recalcular_resumen_mensual(periodo.cuenta_id, periodo.year, periodo.month);
+        END LOOP;
+    ELSE
+        FOR periodo IN
+            SELECT DISTINCT CuentaID AS cuenta_id, EXTRACT(YEAR FROM Fecha)::INTEGER AS year, EXTRACT(MONTH FROM Fecha)::INTEGER AS month
+            FROM filas_anteriores
+        LOOP
+            PERFORM recalcular_resumen_mensual(periodo.cuenta_id, periodo.year, periodo.month);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION trg_resumen_mensual_detalle()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Si el encabezado ya no existe (borrado en cascada) su trigger recalcula el periodo
+    IF TG_OP = 'INSERT' THEN
+        PERFORM recalcular_resumen_movimientos(ARRAY(SELECT DISTINCT movimiento_id FROM filas_nuevas));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM recalcular_resumen_movimientos(ARRAY(
+            SELECT movimiento_id FROM filas_nuevas UNION SELECT movimiento_id FROM filas_anteriores
+        ));
+    ELSE
+        PERFORM recalcular_resumen_movimientos(ARRAY(SELECT DISTINCT movimiento_id FROM filas_anteriores));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_resumen_encabezado_ins ON movimientos_encabezado;
+DROP TRIGGER IF EXISTS trg_resumen_encabezado_upd ON movimientos_encabezado;
+DROP TRIGGER IF EXISTS trg_resumen_encabezado_del ON movimientos_encabezado;
+DROP TRIGGER IF EXISTS trg_resumen_detalle_ins ON movimientos_detalle;
+DROP TRIGGER IF EXISTS trg_resumen_detalle_upd ON movimientos_detalle;
+DROP TRIGGER IF EXISTS trg_resumen_detalle_del ON movimientos_detalle;
+
+CREATE TRIGGER trg_resumen_encabezado_ins AFTER INSERT ON movimientos_encabezado
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION trg_resumen_mensual_encabezado();
+
+CREATE TRIGGER trg_resumen_encabezado_upd AFTER UPDATE ON movimientos_encabezado
+REFERENCING NEW TABLE AS filas_nuevas OLD TABLE AS filas_anteriores
+FOR EACH STATEMENT EXECUTE FUNCTION trg_resumen_mensual_encabezado();
+
+CREATE TRIGGER trg_resumen_encabezado_del AFTER DELETE ON movimientos_encabezado
+REFERENCING OLD TABLE AS filas_anteriores
+FOR EACH STATEMENT EXECUTE FUNCTION trg_resumen_mensual_encabezado();
+
+CREATE TRIGGER trg_resumen_detalle_ins AFTER INSERT ON movimientos_detalle
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION trg_resumen_mensual_detalle();
+
+CREATE TRIGGER trg_resumen_detalle_upd AFTER UPDATE ON movimientos_detalle
+REFERENCING NEW TABLE AS filas_nuevas OLD TABLE AS filas_anteriores
+FOR EACH STATEMENT EXECUTE FUNCTION trg_resumen_mensual_detalle();
+
+CREATE TRIGGER trg_resumen_detalle_del AFTER DELETE ON movimientos_detalle
+REFERENCING OLD TABLE AS filas_anteriores
+FOR EACH STATEMENT EXECUTE FUNCTION trg_resumen_mensual_detalle();
+
+-- 5. Carga inicial
+SELECT reconstruir_resumen_mensual();
+
+-- Verificación: el resumen debe coincidir con el detalle
+-- SELECT SUM(saldo) FROM resumen_mensual_movimientos;
+-- SELECT SUM(COALESCE(md.Valor, 0)) FROM movimientos_encabezado m LEFT JOIN movimientos_detalle md ON m.Id = md.movimiento_id;
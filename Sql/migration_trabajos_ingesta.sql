@@ -0,0 +1,54 @@
+-- =====================================================
+-- MIGRACIÓN: Cola de trabajos de ingesta de archivos
+-- Fecha: 2026-10-18
+-- Propósito: POST /api/trabajos/{movimientos|extractos} encola el archivo y
+-- responde con el id; los workers de ColaIngesta lo procesan por etapas
+-- (PARSEO, DEDUPLICACION, INSERCION, CONCILIACION) y GET /api/trabajos/{id}
+-- muestra etapa, filas y tiempos. POST /api/matching/lote encola el matching
+-- de un año en la misma tabla (tipo MATCHING_LOTE, sin archivo).
+--
+-- El archivo se guarda en la fila (contenido) hasta que el trabajo termina,
+-- así un trabajo encolado o interrumpido sobrevive a un reinicio. Un trabajo
+-- EN_CURSO cuyo latido (actualizado_at) venció vuelve a la cola.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS trabajos_ingesta (
+    id BIGSERIAL PRIMARY KEY,
+    tipo VARCHAR(20) NOT NULL,                      -- MOVIMIENTOS | EXTRACTO | MATCHING_LOTE
+    archivo VARCHAR(255),                           -- NULL en MATCHING_LOTE
+    tipo_cuenta VARCHAR(50),
+    cuenta_id INTEGER,
+    parametros JSONB NOT NULL DEFAULT '{}',
+    contenido BYTEA,                                -- NULL al terminar
+    estado VARCHAR(20) NOT NULL DEFAULT 'EN_COLA',  -- EN_COLA | EN_CURSO | COMPLETADO | ERROR
+    etapa VARCHAR(20),
+    filas_total INTEGER,
+    filas_procesadas INTEGER NOT NULL DEFAULT 0,
+    tiempos_ms JSONB NOT NULL DEFAULT '{}',         -- Duración por etapa
+    resultado JSONB,
+    error TEXT,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    worker VARCHAR(100),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    iniciado_at TIMESTAMP,
+    actualizado_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    terminado_at TIMESTAMP,
+    CONSTRAINT chk_trabajos_ingesta_tipo CHECK (tipo IN ('MOVIMIENTOS', 'EXTRACTO', 'MATCHING_LOTE')),
+    CONSTRAINT chk_trabajos_ingesta_estado CHECK (estado IN ('EN_COLA', 'EN_CURSO', 'COMPLETADO', 'ERROR'))
+);
+
+-- Tablas creadas antes de admitir MATCHING_LOTE (POST /api/matching/lote)
+ALTER TABLE trabajos_ingesta ALTER COLUMN archivo DROP NOT NULL;
+ALTER TABLE trabajos_ingesta ALTER COLUMN tipo_cuenta DROP NOT NULL;
+ALTER TABLE trabajos_ingesta DROP CONSTRAINT IF EXISTS chk_trabajos_ingesta_tipo;
+ALTER TABLE trabajos_ingesta ADD CONSTRAINT chk_trabajos_ingesta_tipo
+    CHECK (tipo IN ('MOVIMIENTOS', 'EXTRACTO', 'MATCHING_LOTE'));
+
+-- Reclamo del siguiente trabajo y detección de latidos vencidos
+CREATE INDEX IF NOT EXISTS idx_trabajos_ingesta_pendientes
+    ON trabajos_ingesta (estado, id)
+    WHERE estado IN ('EN_COLA', 'EN_CURSO');
+
+-- Listado reciente
+CREATE INDEX IF NOT EXISTS idx_trabajos_ingesta_created
+    ON trabajos_ingesta (created_at DESC);
@@ -1,6 +1,6 @@
 import React, { useState } from 'react'
 import { Save, X } from 'lucide-react'
-import type { ConfiguracionMatching, ConfiguracionMatchingUpdate } from '../../types/Matching'
+import type { ConfiguracionMatching, ConfiguracionMatchingUpdate, ModoAsignacion } from '../../types/Matching'
 
 interface ConfiguracionMatchingFormProps {
     configuracion: ConfiguracionMatching
@@ -28,7 +28,8 @@ export const ConfiguracionMatchingForm = ({
         peso_valor: configuracion.peso_valor,
         peso_descripcion: configuracion.peso_descripcion,
         score_minimo_exacto: configuracion.score_minimo_exacto,
-        score_minimo_probable: configuracion.score_minimo_probable
+        score_minimo_probable: configuracion.score_minimo_probable,
+        modo_asignacion: configuracion.modo_asignacion ?? 'GREEDY'
     })
 
     const [loading, setLoading] = useState(false)
@@ -192,6 +193,22 @@ export const ConfiguracionMatchingForm = ({
                 {errors.scores && <p className="text-xs text-red-600">{errors.scores}</p>}
             </div>
 
+            {/* Motor de Asignación */}
+            <div className="space-y-4">
+                <h3 className="text-sm font-semibold text-gray-700 border-b pb-2">Motor de Asignación</h3>
+
+                <div>
+                    <select
+                        value={formData.modo_asignacion}
+                        onChange={(e) => setFormData({ ...formData, modo_asignacion: e.target.value as ModoAsignacion })}
+                        className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                    >
+                        <option value="GREEDY">Greedy (orden del extracto)</option>
+                        <option value="OPTIMO">Óptimo (maximiza el score total del periodo)</option>
+                    </select>
+                </div>
+            </div>
+
 
 
             {/* Botones */}
@@ -14,6 +14,8 @@ export interface PaginatedResponse<T> {
         egresos: number;
         saldo: number;
     };
+    /** Paginación keyset: cursor de la siguiente página (null = última) */
+    siguiente_cursor?: string | null;
 }
 
 /**
@@ -121,12 +121,25 @@ export interface MatchingResult {
     estadisticas: MatchingEstadisticas
     integridad: MatchingIntegridad
     movimientos_sistema_sin_match: MovimientoSistema[] // Array de movimientos del sistema no emparejados
+    grupos_sugeridos?: MatchGrupo[] // Pagos divididos sugeridos (1 a muchos / muchos a 1)
+}
+
+export interface MatchGrupo {
+    tipo: '1_A_MUCHOS' | 'MUCHOS_A_1'
+    movs_extracto: MovimientoExtracto[]
+    movs_sistema: MovimientoSistema[]
+    diferencia: number
 }
 
 // ============================================================================
 // Configuración
 // ============================================================================
 
+/**
+ * Motor de asignación del matching
+ */
+export type ModoAsignacion = 'GREEDY' | 'OPTIMO'
+
 /**
  * Configuración del algoritmo de matching
  */
@@ -139,6 +152,7 @@ export interface ConfiguracionMatching {
     peso_descripcion: number
     score_minimo_exacto: number
     score_minimo_probable: number
+    modo_asignacion: ModoAsignacion
     activo: boolean
     created_at: string | null
     updated_at: string | null
@@ -155,6 +169,7 @@ export interface ConfiguracionMatchingUpdate {
     peso_descripcion: number
     score_minimo_exacto: number
     score_minimo_probable: number
+    modo_asignacion?: ModoAsignacion
 }
 
 // ============================================================================